@@ -7,8 +7,9 @@
 """
 
 import logging
+import time
 from typing import List
-from flask import Flask
+from flask import Flask, Response, g, request
 from flask_cors import CORS
 
 from .utils.config import init_config, config_manager
@@ -44,6 +45,9 @@ def create_app():
     # 注册错误处理器
     _register_error_handlers(app)
 
+    # 请求耗时采集和指标端点
+    _register_metrics(app)
+
     # 添加API文档端点
     _add_api_docs(app)
 
@@ -70,10 +74,12 @@ def _register_blueprints(app):
     from .routes.data_input import data_input_bp
     from .routes.analysis import analysis_bp
     from .routes.visualization import visualization_bp
+    from .routes.stream import stream_bp
 
     app.register_blueprint(data_input_bp, url_prefix='/api/data')
     app.register_blueprint(analysis_bp, url_prefix='/api/analysis')
     app.register_blueprint(visualization_bp, url_prefix='/api/visualization')
+    app.register_blueprint(stream_bp, url_prefix='/api/stream')
 
 
 def _register_error_handlers(app):
@@ -102,6 +108,34 @@ def _register_error_handlers(app):
         }, 500
 
 
+def _register_metrics(app):
+    """注册请求耗时采集中间件和 /metrics 端点"""
+    from .utils import metrics
+
+    metrics.registry.enabled = config_manager.get('metrics.enabled', True)
+    if not metrics.registry.enabled:
+        return
+
+    @app.before_request
+    def _start_timer():
+        g.request_start = time.perf_counter()
+
+    @app.after_request
+    def _record_latency(response):
+        start = g.pop('request_start', None)
+        if start is not None:
+            # 按路由模板而非实际路径分组，避免路径参数导致标签数量膨胀
+            endpoint = request.url_rule.rule if request.url_rule else '<unmatched>'
+            metrics.observe_request(endpoint, request.method, response.status_code,
+                                    time.perf_counter() - start)
+        return response
+
+    @app.route('/metrics')
+    def prometheus_metrics():
+        """Prometheus文本格式的运行指标"""
+        return Response(metrics.registry.render(), content_type=metrics.CONTENT_TYPE)
+
+
 def _add_api_docs(app):
     """添加API文档端点"""
 
@@ -117,12 +151,19 @@ def _add_api_docs(app):
                     'macro': '/api/data/macro',
                     'market_sentiment': '/api/data/market-sentiment',
                     'industry': '/api/data/industry',
+                    'revisions': '/api/data/revisions',
                     'health': '/api/data/health'
                 },
                 'analysis': {
                     'timing_indicators': '/api/analysis/timing-indicators',
                     'ai_analysis': '/api/analysis/ai-analysis',
+                    'ai_analysis_history': '/api/analysis/ai-analysis/history',
                     'position_sizing': '/api/analysis/position-sizing',
+                    'position_sizing_batch': '/api/analysis/position-sizing/batch',
+                    'sensitivity': '/api/analysis/sensitivity',
+                    'scenarios': '/api/analysis/scenarios',
+                    'backtest': '/api/analysis/backtest',
+                    'optimize': '/api/analysis/optimize',
                     'market_comparison': '/api/analysis/market-comparison',
                     'summary': '/api/analysis/summary',
                     'health': '/api/analysis/health'
@@ -134,8 +175,16 @@ def _add_api_docs(app):
                     'position_sizing_chart': '/api/visualization/position-sizing-chart',
                     'sentiment_analysis': '/api/visualization/sentiment-analysis',
                     'macro_indicators': '/api/visualization/macro-indicators',
+                    'correlation_heatmap': '/api/visualization/correlation-heatmap',
                     'dashboard_summary': '/api/visualization/dashboard-summary',
                     'health': '/api/visualization/health'
+                },
+                'stream': {
+                    'events': '/api/stream/events',
+                    'health': '/api/stream/health'
+                },
+                'monitoring': {
+                    'metrics': '/metrics'
                 }
             }
         }
\ No newline at end of file
@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+ASGI服务入口
+
+AI分析等待外部接口的时间远长于本地计算，同步工作进程在等待期间被整个占用。
+异步模式下 POST /api/analysis/ai-analysis 由事件循环处理（AsyncOpenAI，存储读写放入线程池），
+单进程即可同时保持数百个进行中的AI请求；GET /api/stream/events 的SSE订阅同样由事件循环等待，
+不占用桥接线程；其余路由通过WSGI桥接到同一个Flask应用，
+请求和响应格式与同步模式完全一致，阻塞的存储I/O在桥接线程池中执行。
+
+依赖 starlette、a2wsgi 和 ASGI服务器（uvicorn）:
+    python run.py --asgi
+    uvicorn app.asgi:app --host 0.0.0.0 --port 5000
+"""
+
+import argparse
+import asyncio
+import logging
+import sys
+import time
+from contextlib import asynccontextmanager
+from typing import Optional
+
+from starlette.applications import Starlette
+from starlette.middleware.cors import CORSMiddleware
+from starlette.requests import Request
+from starlette.responses import JSONResponse, StreamingResponse
+from starlette.routing import Mount, Route
+from a2wsgi import WSGIMiddleware
+
+from .models.timing_models import AIAnalysisRequest
+from .models.validation import RequestValidationError, validate_record
+from .utils import metrics
+from .utils.config import config_manager
+
+logger = logging.getLogger(__name__)
+
+AI_ANALYSIS_PATH = '/api/analysis/ai-analysis'
+STREAM_EVENTS_PATH = '/api/stream/events'
+
+
+async def ai_analysis(request: Request) -> JSONResponse:
+    """获取AI分析结果（异步），请求和响应格式与同步模式的同名路由一致"""
+    start = time.perf_counter()
+    response = await _ai_analysis(request)
+    metrics.observe_request(AI_ANALYSIS_PATH, request.method, response.status_code,
+                            time.perf_counter() - start)
+    return response
+
+
+async def _ai_analysis(request: Request) -> JSONResponse:
+    from .services.ai_service import AIService
+
+    try:
+        # 数据验证
+        data = validate_record(AIAnalysisRequest, await request.json())
+
+        # 构造服务会读取配置和数据文件，放入线程池
+        ai_service = await asyncio.to_thread(AIService)
+        result = await ai_service.analyze_timing_indicators_async(data)
+
+        return JSONResponse({
+            'message': 'AI分析成功',
+            'data': result
+        })
+
+    except RequestValidationError as e:
+        return JSONResponse({
+            'error': str(e),
+            'details': e.errors
+        }, status_code=400)
+    except Exception as e:
+        logger.error(f"获取AI分析失败: {e}")
+        return JSONResponse({
+            'error': '获取AI分析失败',
+            'message': str(e)
+        }, status_code=500)
+
+
+async def stream_events(request: Request):
+    """订阅实时事件（异步），参数和事件格式与同步模式的同名路由一致"""
+    from .routes.stream import SSE_HEADERS, configured_broker, parse_subscription
+    from .services.event_broker import SubscriberLimitError, stream_async
+
+    if not config_manager.get('stream.enabled', True):
+        return JSONResponse({'error': '实时推送未启用'}, status_code=404)
+
+    markets, last_id = parse_subscription(
+        request.query_params.get('markets'),
+        request.headers.get('last-event-id') or request.query_params.get('last_event_id')
+    )
+    broker = configured_broker()
+    try:
+        broker.subscribe()
+    except SubscriberLimitError as e:
+        return JSONResponse({'error': '订阅数已达上限', 'message': str(e)}, status_code=503)
+
+    if last_id is None:
+        last_id = broker.last_id
+    heartbeat = config_manager.get('stream.heartbeat_seconds', 15)
+    return StreamingResponse(stream_async(broker, markets, last_id, heartbeat),
+                             media_type='text/event-stream', headers=SSE_HEADERS)
+
+
+@asynccontextmanager
+async def _lifespan(app):
+    from .services.backup_service import start_backup_scheduler
+    start_backup_scheduler()
+    yield
+
+
+def create_asgi_app(flask_app=None, bridge_threads: Optional[int] = None) -> Starlette:
+    """
+    创建ASGI应用
+
+    Args:
+        flask_app: 桥接的Flask应用，默认调用create_app创建
+        bridge_threads: WSGI桥接线程池大小，默认取server.asgi_bridge_threads
+
+    Returns:
+        Starlette: ASGI应用
+    """
+    if flask_app is None:
+        from . import create_app
+        flask_app = create_app()
+
+    threads = bridge_threads or config_manager.get('server.asgi_bridge_threads', 16)
+
+    # 原生路由单独处理CORS；桥接的Flask路由由Flask-CORS处理，避免重复的响应头
+    native = CORSMiddleware(
+        Starlette(routes=[
+            Route(AI_ANALYSIS_PATH, ai_analysis, methods=['POST']),
+            Route(STREAM_EVENTS_PATH, stream_events, methods=['GET'])
+        ]),
+        allow_origins=config_manager.get('server.cors_origins', []),
+        allow_methods=['*'],
+        allow_headers=['*']
+    )
+
+    return Starlette(
+        routes=[
+            Route(AI_ANALYSIS_PATH, native),
+            Route(STREAM_EVENTS_PATH, native),
+            Mount('/', app=WSGIMiddleware(flask_app, workers=threads))
+        ],
+        lifespan=_lifespan
+    )
+
+
+def main(argv=None) -> int:
+    """主函数"""
+    parser = argparse.ArgumentParser(description='ASGI服务')
+    parser.add_argument('--host', help='监听地址，默认取server.host')
+    parser.add_argument('--port', type=int, help='监听端口，默认取server.port')
+    args = parser.parse_args(argv)
+
+    try:
+        import uvicorn
+    except ImportError:
+        logger.error("异步模式需要安装uvicorn: pip install uvicorn")
+        return 1
+
+    app = create_asgi_app()
+    host = args.host or config_manager.get('server.host', '0.0.0.0')
+    port = args.port or config_manager.get('server.port', 5000)
+    logger.info(f"异步模式启动: {host}:{port}")
+    uvicorn.run(app, host=host, port=port, log_level='warning')
+    return 0
+
+
+def __getattr__(name):
+    # uvicorn app.asgi:app 时再创建应用，导入本模块本身不读取配置
+    if name == 'app':
+        globals()['app'] = create_asgi_app()
+        return globals()['app']
+    raise AttributeError(name)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
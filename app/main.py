@@ -17,6 +17,16 @@ from app import create_app
 
 def main():
     """主应用入口"""
+    # 生产模式：多进程WSGI服务器
+    if '--production' in sys.argv[1:]:
+        from app.server import main as production_main
+        sys.exit(production_main([arg for arg in sys.argv[1:] if arg != '--production']))
+
+    # 异步模式：ASGI服务器
+    if '--asgi' in sys.argv[1:]:
+        from app.asgi import main as asgi_main
+        sys.exit(asgi_main([arg for arg in sys.argv[1:] if arg != '--asgi']))
+
     try:
         app = create_app()
 
@@ -26,9 +36,16 @@ def main():
         port = config_manager.get('server.port', 5000)
         debug = config_manager.get('app.debug', False)
 
+        # 调试模式下重载器的父进程不处理请求，只在实际服务进程中启动定时备份
+        if not debug or os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+            from app.services.backup_service import start_backup_scheduler
+            start_backup_scheduler()
+
         print(f"启动量化择时指标应用...")
         print(f"服务地址: http://{host}:{port}")
         print(f"调试模式: {debug}")
+        if not debug:
+            print("当前为开发服务器，生产环境请使用: python run.py --production")
 
         app.run(host=host, port=port, debug=debug)
 
@@ -11,13 +11,37 @@ from .timing_models import (
     MarketSentiment,
     IndustryData,
     TimingIndicators,
-    AIAnalysis
+    AIAnalysis,
+    TimingIndicatorsRequest,
+    AIAnalysisRequest,
+    PositionSizingRequest,
+    PositionSizingPortfolio,
+    PositionSizingBatchRequest,
+    SensitivityRequest,
+    ScenarioInput,
+    ScenarioRequest,
+    BacktestRequest,
+    OptimizeRequest
 )
+from .validation import RequestValidationError, validate_record, validate_records
 
 __all__ = [
     'MacroData',
     'MarketSentiment',
     'IndustryData',
     'TimingIndicators',
-    'AIAnalysis'
-]
\ No newline at end of file
+    'AIAnalysis',
+    'TimingIndicatorsRequest',
+    'AIAnalysisRequest',
+    'PositionSizingRequest',
+    'PositionSizingPortfolio',
+    'PositionSizingBatchRequest',
+    'SensitivityRequest',
+    'ScenarioInput',
+    'ScenarioRequest',
+    'BacktestRequest',
+    'OptimizeRequest',
+    'RequestValidationError',
+    'validate_record',
+    'validate_records'
+]
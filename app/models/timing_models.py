@@ -8,7 +8,7 @@
 
 from datetime import datetime
 from typing import Dict, List, Any, Optional
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 
 
 class MacroData(BaseModel):
@@ -16,7 +16,7 @@ class MacroData(BaseModel):
     id: Optional[str] = None
     date: str
     market: str
-    pmi: Optional[float] = None
+    pmi: Optional[float] = Field(None, ge=0, le=100)
     cpi: Optional[float] = None
     ppi: Optional[float] = None
     m2: Optional[float] = None
@@ -24,19 +24,19 @@ class MacroData(BaseModel):
     other_macro: Optional[Dict[str, Any]] = None
     created_at: Optional[str] = None
 
-    class Config:
-        schema_extra = {
-            "example": {
-                "date": "2024-01-15",
-                "market": "a_share",
-                "pmi": 50.5,
-                "cpi": 2.1,
-                "ppi": 1.8,
-                "m2": 8.5,
-                "interest_rate": 3.0,
-                "other_macro": {}
-            }
+    # 未声明的字段原样保留
+    model_config = ConfigDict(extra='allow', json_schema_extra={
+        "example": {
+            "date": "2024-01-15",
+            "market": "a_share",
+            "pmi": 50.5,
+            "cpi": 2.1,
+            "ppi": 1.8,
+            "m2": 8.5,
+            "interest_rate": 3.0,
+            "other_macro": {}
         }
+    })
 
 
 class MarketSentiment(BaseModel):
@@ -44,25 +44,25 @@ class MarketSentiment(BaseModel):
     id: Optional[str] = None
     date: str
     market: str
-    volatility: Optional[float] = None
-    investor_sentiment: Optional[float] = None
+    volatility: Optional[float] = Field(None, ge=0)
+    investor_sentiment: Optional[float] = Field(None, ge=0, le=100)
     technical_indicators: Optional[Dict[str, Any]] = None
     created_at: Optional[str] = None
 
-    class Config:
-        schema_extra = {
-            "example": {
-                "date": "2024-01-15",
-                "market": "a_share",
-                "volatility": 15.5,
-                "investor_sentiment": 65.0,
-                "technical_indicators": {
-                    "rsi": 55.0,
-                    "macd": 2.5,
-                    "bollinger_bands": 1.2
-                }
+    # 未声明的字段原样保留
+    model_config = ConfigDict(extra='allow', json_schema_extra={
+        "example": {
+            "date": "2024-01-15",
+            "market": "a_share",
+            "volatility": 15.5,
+            "investor_sentiment": 65.0,
+            "technical_indicators": {
+                "rsi": 55.0,
+                "macd": 2.5,
+                "bollinger_bands": 1.2
             }
         }
+    })
 
 
 class IndustryData(BaseModel):
@@ -72,19 +72,19 @@ class IndustryData(BaseModel):
     market: str
     industry: str
     free_cash_flow: Optional[float] = None
-    industry_sentiment: Optional[float] = None
+    industry_sentiment: Optional[float] = Field(None, ge=0, le=100)
     created_at: Optional[str] = None
 
-    class Config:
-        schema_extra = {
-            "example": {
-                "date": "2024-01-15",
-                "market": "a_share",
-                "industry": "technology",
-                "free_cash_flow": 120.5,
-                "industry_sentiment": 70.0
-            }
+    # 未声明的字段原样保留
+    model_config = ConfigDict(extra='allow', json_schema_extra={
+        "example": {
+            "date": "2024-01-15",
+            "market": "a_share",
+            "industry": "technology",
+            "free_cash_flow": 120.5,
+            "industry_sentiment": 70.0
         }
+    })
 
 
 class TimingIndicators(BaseModel):
@@ -101,23 +101,22 @@ class TimingIndicators(BaseModel):
     calculated_at: Optional[str] = None
     created_at: Optional[str] = None
 
-    class Config:
-        schema_extra = {
-            "example": {
-                "market": "a_share",
-                "date": "2024-01-15",
-                "overall_score": 75.5,
-                "macro_score": 80.0,
-                "industry_score": 70.0,
-                "sentiment_score": 65.0,
-                "weights": {
-                    "macro_fundamental": 0.4,
-                    "industry_fundamental": 0.3,
-                    "market_sentiment": 0.3
-                },
-                "strength_level": "strong"
-            }
+    model_config = ConfigDict(json_schema_extra={
+        "example": {
+            "market": "a_share",
+            "date": "2024-01-15",
+            "overall_score": 75.5,
+            "macro_score": 80.0,
+            "industry_score": 70.0,
+            "sentiment_score": 65.0,
+            "weights": {
+                "macro_fundamental": 0.4,
+                "industry_fundamental": 0.3,
+                "market_sentiment": 0.3
+            },
+            "strength_level": "strong"
         }
+    })
 
 
 class AIAnalysis(BaseModel):
@@ -134,18 +133,17 @@ class AIAnalysis(BaseModel):
     calculated_at: Optional[str] = None
     created_at: Optional[str] = None
 
-    class Config:
-        schema_extra = {
-            "example": {
-                "market": "a_share",
-                "date": "2024-01-15",
-                "ai_analysis": "基于当前择时指标分析，市场整体表现积极...",
-                "summary": "择时评分75.5，强度strong",
-                "recommendation": "建议买入",
-                "risk_level": "medium",
-                "time_horizon": "short_term"
-            }
+    model_config = ConfigDict(json_schema_extra={
+        "example": {
+            "market": "a_share",
+            "date": "2024-01-15",
+            "ai_analysis": "基于当前择时指标分析，市场整体表现积极...",
+            "summary": "择时评分75.5，强度strong",
+            "recommendation": "建议买入",
+            "risk_level": "medium",
+            "time_horizon": "short_term"
         }
+    })
 
 
 class PositionSizing(BaseModel):
@@ -161,20 +159,19 @@ class PositionSizing(BaseModel):
     risk_amount: float
     calculated_at: Optional[str] = None
 
-    class Config:
-        schema_extra = {
-            "example": {
-                "market": "a_share",
-                "date": "2024-01-15",
-                "timing_score": 75.5,
-                "strength_level": "strong",
-                "position_percentage": 60.0,
-                "position_amount": 60000.0,
-                "available_capital": 100000.0,
-                "risk_per_trade_percentage": 2.0,
-                "risk_amount": 2000.0
-            }
+    model_config = ConfigDict(json_schema_extra={
+        "example": {
+            "market": "a_share",
+            "date": "2024-01-15",
+            "timing_score": 75.5,
+            "strength_level": "strong",
+            "position_percentage": 60.0,
+            "position_amount": 60000.0,
+            "available_capital": 100000.0,
+            "risk_per_trade_percentage": 2.0,
+            "risk_amount": 2000.0
         }
+    })
 
 
 class MarketComparison(BaseModel):
@@ -183,29 +180,28 @@ class MarketComparison(BaseModel):
     best_market: Optional[str] = None
     comparison_date: str
 
-    class Config:
-        schema_extra = {
-            "example": {
-                "markets": {
-                    "a_share": {
-                        "overall_score": 75.5,
-                        "macro_score": 80.0,
-                        "industry_score": 70.0,
-                        "sentiment_score": 65.0,
-                        "strength_level": "strong"
-                    },
-                    "hong_kong": {
-                        "overall_score": 65.0,
-                        "macro_score": 70.0,
-                        "industry_score": 60.0,
-                        "sentiment_score": 65.0,
-                        "strength_level": "neutral"
-                    }
+    model_config = ConfigDict(json_schema_extra={
+        "example": {
+            "markets": {
+                "a_share": {
+                    "overall_score": 75.5,
+                    "macro_score": 80.0,
+                    "industry_score": 70.0,
+                    "sentiment_score": 65.0,
+                    "strength_level": "strong"
                 },
-                "best_market": "a_share",
-                "comparison_date": "2024-01-15"
-            }
+                "hong_kong": {
+                    "overall_score": 65.0,
+                    "macro_score": 70.0,
+                    "industry_score": 60.0,
+                    "sentiment_score": 65.0,
+                    "strength_level": "neutral"
+                }
+            },
+            "best_market": "a_share",
+            "comparison_date": "2024-01-15"
         }
+    })
 
 
 class AnalysisSummary(BaseModel):
@@ -218,24 +214,135 @@ class AnalysisSummary(BaseModel):
     key_indicators: Dict[str, Optional[float]]
     recommendation: str
 
-    class Config:
-        schema_extra = {
-            "example": {
-                "market": "a_share",
-                "analysis_date": "2024-01-15",
-                "overall_score": 75.5,
-                "strength_level": "strong",
-                "component_scores": {
-                    "macro": 80.0,
-                    "industry": 70.0,
-                    "sentiment": 65.0
-                },
-                "key_indicators": {
-                    "pmi": 50.5,
-                    "cpi": 2.1,
-                    "volatility": 15.5,
-                    "investor_sentiment": 65.0
-                },
-                "recommendation": "建议买入 - 择时信号强劲"
-            }
-        }
\ No newline at end of file
+    model_config = ConfigDict(json_schema_extra={
+        "example": {
+            "market": "a_share",
+            "analysis_date": "2024-01-15",
+            "overall_score": 75.5,
+            "strength_level": "strong",
+            "component_scores": {
+                "macro": 80.0,
+                "industry": 70.0,
+                "sentiment": 65.0
+            },
+            "key_indicators": {
+                "pmi": 50.5,
+                "cpi": 2.1,
+                "volatility": 15.5,
+                "investor_sentiment": 65.0
+            },
+            "recommendation": "建议买入 - 择时信号强劲"
+        }
+    })
+
+
+class TimingIndicatorsRequest(BaseModel):
+    """择时指标计算请求"""
+    market: str
+    date: str
+    macro_data: Optional[Dict[str, Any]] = None
+    industry_data: Optional[Dict[str, Any]] = None
+    market_sentiment: Optional[Dict[str, Any]] = None
+
+    model_config = ConfigDict(extra='allow')
+
+
+class AIAnalysisRequest(BaseModel):
+    """AI分析请求"""
+    market: str
+    date: str
+    timing_indicators: Optional[Dict[str, Any]] = None
+    include_position_sizing: Optional[bool] = None
+
+    model_config = ConfigDict(extra='allow')
+
+
+class PositionSizingRequest(BaseModel):
+    """仓位计算请求"""
+    market: str
+    date: str
+    timing_score: float = Field(..., ge=0, le=100)
+    available_capital: Optional[float] = Field(None, ge=0)
+    risk_per_trade_percentage: Optional[float] = Field(None, ge=0, le=100)
+
+    model_config = ConfigDict(extra='allow')
+
+
+class PositionSizingPortfolio(BaseModel):
+    """批量仓位计算中的单个组合"""
+    timing_score: float = Field(..., ge=0, le=100)
+    available_capital: Optional[float] = Field(None, ge=0)
+    risk_per_trade_percentage: Optional[float] = Field(None, ge=0, le=100)
+
+
+class PositionSizingBatchRequest(BaseModel):
+    """批量仓位计算请求"""
+    market: str
+    date: str
+    portfolios: List[Dict[str, Any]] = Field(..., min_length=1)
+    available_capital: Optional[float] = Field(None, ge=0)
+    risk_per_trade_percentage: Optional[float] = Field(None, ge=0, le=100)
+
+
+class SensitivityRequest(BaseModel):
+    """敏感性分析请求"""
+    market: str
+    date: Optional[str] = None
+    macro_data: Optional[Dict[str, Any]] = None
+    industry_data: Optional[Dict[str, Any]] = None
+    market_sentiment: Optional[Dict[str, Any]] = None
+    n_samples: Optional[int] = Field(None, gt=0)
+    input_noise: Optional[Dict[str, float]] = None
+    weight_noise: Optional[float] = Field(None, ge=0)
+
+    model_config = ConfigDict(extra='allow')
+
+
+class ScenarioInput(BaseModel):
+    """单个假设情景：在基准输入上覆盖的字段"""
+    name: Optional[str] = None
+    macro_data: Optional[Dict[str, Any]] = None
+    industry_data: Optional[Dict[str, Any]] = None
+    market_sentiment: Optional[Dict[str, Any]] = None
+
+
+class ScenarioRequest(BaseModel):
+    """情景评估请求"""
+    market: str
+    date: Optional[str] = None
+    macro_data: Optional[Dict[str, Any]] = None
+    industry_data: Optional[Dict[str, Any]] = None
+    market_sentiment: Optional[Dict[str, Any]] = None
+    scenarios: List[Dict[str, Any]] = Field(..., min_length=1)
+
+
+class BacktestRequest(BaseModel):
+    """策略回测请求"""
+    markets: List[str] = Field(..., min_length=1)
+    start_date: Optional[str] = None
+    end_date: Optional[str] = None
+    cost_bps: Optional[float] = Field(None, ge=0)
+    include_curve: Optional[bool] = None
+    series: Optional[Dict[str, Dict[str, Any]]] = None
+
+    model_config = ConfigDict(extra='allow')
+
+
+class OptimizeRequest(BaseModel):
+    """参数优化请求"""
+    markets: List[str] = Field(..., min_length=1)
+    start_date: Optional[str] = None
+    end_date: Optional[str] = None
+    method: Optional[str] = None
+    n_samples: Optional[int] = Field(None, gt=0)
+    seed: Optional[int] = None
+    spread: Optional[float] = Field(None, ge=0)
+    grid: Optional[Dict[str, List[float]]] = None
+    folds: Optional[int] = Field(None, gt=0)
+    metric: Optional[str] = None
+    top_n: Optional[int] = Field(None, gt=0)
+    workers: Optional[int] = None
+    cost_bps: Optional[float] = Field(None, ge=0)
+    series: Optional[Dict[str, Dict[str, Any]]] = None
+
+    model_config = ConfigDict(extra='allow')
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+请求数据验证
+
+按数据模型的字段（类型、必需与否、取值范围）生成TypedDict，再由pydantic-core编译为验证器并按模型缓存。
+验证直接输出dict，不构造模型实例，也不需要再model_dump；只包含请求中提供的字段，
+数值字符串等可转换的输入按字段类型统一转换，模型声明extra='allow'时保留未声明的字段。
+单条和批量验证共用同一套规则，缺少必需字段、类型不符或超出范围时抛出RequestValidationError；
+批量验证在一次调用中验证整个数组，避免逐条调用的开销。
+注意：只复制字段定义，模型上的field_validator/model_validator不会生效
+"""
+
+from functools import lru_cache
+from typing import Annotated, Any, Dict, List, Type
+
+from pydantic import BaseModel, ConfigDict, TypeAdapter, ValidationError
+from typing_extensions import NotRequired, Required, TypedDict
+
+
+class RequestValidationError(ValueError):
+    """请求数据验证失败"""
+
+    def __init__(self, errors: List[Dict[str, Any]], batch: bool = False):
+        self.errors = errors
+        super().__init__(_describe(errors[0], batch))
+
+
+def _describe(error: Dict[str, Any], batch: bool) -> str:
+    """将pydantic错误转换为与原有接口一致的错误信息"""
+    loc = list(error['loc'])
+    prefix = f"第{loc.pop(0) + 1}条记录" if batch and loc and isinstance(loc[0], int) else ''
+    field = '.'.join(str(part) for part in loc)
+
+    if error['type'] == 'missing':
+        return f"{prefix}缺少必需字段: {field}"
+    if not field:
+        return f"{prefix}请求数据格式无效: {error['msg']}"
+    return f"{prefix}字段 {field} 无效: {error['msg']}"
+
+
+@lru_cache(maxsize=None)
+def _record_type(model: Type[BaseModel]) -> type:
+    """由模型字段生成等价的TypedDict"""
+    fields = {}
+    for name, field in model.model_fields.items():
+        annotation = Annotated[(field.annotation, *field.metadata)] if field.metadata else field.annotation
+        fields[name] = Required[annotation] if field.is_required() else NotRequired[annotation]
+
+    record_type = TypedDict(f"{model.__name__}Record", fields)
+    record_type.__pydantic_config__ = ConfigDict(extra=model.model_config.get('extra') or 'ignore')
+    return record_type
+
+
+@lru_cache(maxsize=None)
+def get_validator(model: Type[BaseModel], many: bool = False) -> TypeAdapter:
+    """
+    获取模型的验证器（首次调用时编译，之后复用）
+
+    Args:
+        model: 数据模型
+        many: 是否验证记录数组
+
+    Returns:
+        TypeAdapter: 验证器
+    """
+    record_type = _record_type(model)
+    return TypeAdapter(List[record_type] if many else record_type)
+
+
+def _errors(e: ValidationError) -> List[Dict[str, Any]]:
+    return e.errors(include_url=False, include_context=False, include_input=False)
+
+
+def validate_record(model: Type[BaseModel], data: Any) -> Dict[str, Any]:
+    """
+    验证单条记录
+
+    Args:
+        model: 数据模型
+        data: 请求数据
+
+    Returns:
+        Dict[str, Any]: 转换后的记录（只包含请求中提供的字段）
+    """
+    try:
+        return get_validator(model).validate_python(data)
+    except ValidationError as e:
+        raise RequestValidationError(_errors(e)) from None
+
+
+def validate_records(model: Type[BaseModel], records: Any) -> List[Dict[str, Any]]:
+    """
+    批量验证记录数组，任一记录无效时整体失败
+
+    Args:
+        model: 数据模型
+        records: 记录数组
+
+    Returns:
+        List[Dict[str, Any]]: 转换后的记录
+    """
+    try:
+        return get_validator(model, many=True).validate_python(records)
+    except ValidationError as e:
+        raise RequestValidationError(_errors(e), batch=True) from None
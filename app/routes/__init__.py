@@ -3,11 +3,12 @@
 """
 API路由模块
 
-包含数据输入、分析和可视化相关的API端点
+包含数据输入、分析、可视化和实时推送相关的API端点
 """
 
 from .data_input import data_input_bp
 from .analysis import analysis_bp
 from .visualization import visualization_bp
+from .stream import stream_bp
 
-__all__ = ['data_input_bp', 'analysis_bp', 'visualization_bp']
\ No newline at end of file
+__all__ = ['data_input_bp', 'analysis_bp', 'visualization_bp', 'stream_bp']
\ No newline at end of file
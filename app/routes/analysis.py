@@ -9,14 +9,36 @@
 import logging
 from flask import Blueprint, request, jsonify
 
+from ..models.timing_models import (
+    AIAnalysisRequest, BacktestRequest, OptimizeRequest, PositionSizingBatchRequest, PositionSizingPortfolio,
+    PositionSizingRequest, ScenarioInput, ScenarioRequest, SensitivityRequest, TimingIndicatorsRequest
+)
+from ..models.validation import RequestValidationError, validate_record, validate_records
 from ..services.indicator_service import IndicatorService
 from ..services.ai_service import AIService
+from ..services.backtest_service import BacktestService
+from ..services.optimizer_service import OptimizerService
 
 # 创建蓝图
 analysis_bp = Blueprint('analysis', __name__)
 logger = logging.getLogger(__name__)
 
 
+def _validation_error(e: RequestValidationError):
+    """请求数据验证失败的响应：error为首个错误，details为全部错误"""
+    return jsonify({
+        'error': str(e),
+        'details': e.errors
+    }), 400
+
+
+def _with_markets(data):
+    """兼容只提供单个market的请求，转换为markets数组后再验证"""
+    if isinstance(data, dict) and 'markets' not in data and data.get('market'):
+        return {**data, 'markets': [data['market']]}
+    return data
+
+
 @analysis_bp.route('/health', methods=['GET'])
 def health_check():
     """健康检查端点"""
@@ -41,15 +63,8 @@ def calculate_timing_indicators():
     }
     """
     try:
-        data = request.get_json()
-
         # 数据验证
-        required_fields = ['market', 'date']
-        for field in required_fields:
-            if field not in data:
-                return jsonify({
-                    'error': f'缺少必需字段: {field}'
-                }), 400
+        data = validate_record(TimingIndicatorsRequest, request.get_json())
 
         # 计算指标
         indicator_service = IndicatorService()
@@ -60,6 +75,8 @@ def calculate_timing_indicators():
             'data': result
         })
 
+    except RequestValidationError as e:
+        return _validation_error(e)
     except Exception as e:
         logger.error(f"计算择时指标失败: {e}")
         return jsonify({
@@ -113,15 +130,8 @@ def get_ai_analysis():
     }
     """
     try:
-        data = request.get_json()
-
         # 数据验证
-        required_fields = ['market', 'date']
-        for field in required_fields:
-            if field not in data:
-                return jsonify({
-                    'error': f'缺少必需字段: {field}'
-                }), 400
+        data = validate_record(AIAnalysisRequest, request.get_json())
 
         # 获取AI分析
         ai_service = AIService()
@@ -132,6 +142,8 @@ def get_ai_analysis():
             'data': result
         })
 
+    except RequestValidationError as e:
+        return _validation_error(e)
     except Exception as e:
         logger.error(f"获取AI分析失败: {e}")
         return jsonify({
@@ -140,6 +152,42 @@ def get_ai_analysis():
         }), 500
 
 
+@analysis_bp.route('/ai-analysis/history', methods=['GET'])
+def get_ai_analysis_history():
+    """
+    获取AI分析历史
+
+    默认只返回摘要，不读取分析全文
+
+    Query Parameters:
+    - market: 市场类型
+    - start_date: 开始日期
+    - end_date: 结束日期
+    - include_text: 是否返回分析全文 (true/false)
+    """
+    try:
+        market = request.args.get('market', 'a_share')
+        start_date = request.args.get('start_date')
+        end_date = request.args.get('end_date')
+        include_text = request.args.get('include_text', 'false').lower() == 'true'
+
+        ai_service = AIService()
+        history = ai_service.get_ai_analysis_history(market, start_date, end_date, include_text)
+
+        return jsonify({
+            'message': 'AI分析历史获取成功',
+            'data': history,
+            'count': len(history)
+        })
+
+    except Exception as e:
+        logger.error(f"获取AI分析历史失败: {e}")
+        return jsonify({
+            'error': '获取AI分析历史失败',
+            'message': str(e)
+        }), 500
+
+
 @analysis_bp.route('/position-sizing', methods=['POST'])
 def calculate_position_sizing():
     """
@@ -155,15 +203,8 @@ def calculate_position_sizing():
     }
     """
     try:
-        data = request.get_json()
-
         # 数据验证
-        required_fields = ['market', 'date', 'timing_score']
-        for field in required_fields:
-            if field not in data:
-                return jsonify({
-                    'error': f'缺少必需字段: {field}'
-                }), 400
+        data = validate_record(PositionSizingRequest, request.get_json())
 
         # 计算仓位
         indicator_service = IndicatorService()
@@ -174,6 +215,8 @@ def calculate_position_sizing():
             'data': result
         })
 
+    except RequestValidationError as e:
+        return _validation_error(e)
     except Exception as e:
         logger.error(f"计算仓位失败: {e}")
         return jsonify({
@@ -182,6 +225,224 @@ def calculate_position_sizing():
         }), 500
 
 
+@analysis_bp.route('/position-sizing/batch', methods=['POST'])
+def calculate_position_sizing_batch():
+    """
+    批量计算仓位建议（多个组合或多个资金规模）
+
+    Request Body:
+    {
+        "market": "a_share",
+        "date": "2024-01-15",
+        "risk_per_trade_percentage": 2,
+        "portfolios": [
+            {"timing_score": 75.5, "available_capital": 100000},
+            {"timing_score": 75.5, "available_capital": 5000000},
+            {"timing_score": 42, "available_capital": 200000, "risk_per_trade_percentage": 1}
+        ]
+    }
+    """
+    try:
+        # 数据验证
+        data = validate_record(PositionSizingBatchRequest, request.get_json())
+        data['portfolios'] = validate_records(PositionSizingPortfolio, data['portfolios'])
+
+        # 计算仓位
+        indicator_service = IndicatorService()
+        result = indicator_service.calculate_position_sizing_batch(data)
+
+        return jsonify({
+            'message': '仓位计算成功',
+            'data': result
+        })
+
+    except RequestValidationError as e:
+        return _validation_error(e)
+    except Exception as e:
+        logger.error(f"批量计算仓位失败: {e}")
+        return jsonify({
+            'error': '批量计算仓位失败',
+            'message': str(e)
+        }), 500
+
+
+@analysis_bp.route('/sensitivity', methods=['POST'])
+def analyze_sensitivity():
+    """
+    择时评分的蒙特卡洛敏感性分析
+
+    Request Body:
+    {
+        "market": "a_share",
+        "date": "2024-01-15",
+        "macro_data": {...},
+        "industry_data": {...},
+        "market_sentiment": {...},
+        "n_samples": 10000,
+        "input_noise": {"pmi": 0.5, "cpi": 0.2},
+        "weight_noise": 0.05
+    }
+    """
+    try:
+        # 数据验证
+        data = validate_record(SensitivityRequest, request.get_json())
+
+        indicator_service = IndicatorService()
+        result = indicator_service.analyze_sensitivity(data)
+
+        return jsonify({
+            'message': '敏感性分析完成',
+            'data': result
+        })
+
+    except RequestValidationError as e:
+        return _validation_error(e)
+    except ValueError as e:
+        return jsonify({
+            'error': '敏感性分析参数错误',
+            'message': str(e)
+        }), 400
+    except Exception as e:
+        logger.error(f"敏感性分析失败: {e}")
+        return jsonify({
+            'error': '敏感性分析失败',
+            'message': str(e)
+        }), 500
+
+
+@analysis_bp.route('/scenarios', methods=['POST'])
+def evaluate_scenarios():
+    """
+    批量评估假设情景（不保存结果）
+
+    Request Body:
+    {
+        "market": "a_share",
+        "date": "2024-01-15",
+        "macro_data": {...},
+        "industry_data": {...},
+        "market_sentiment": {...},
+        "scenarios": [
+            {"name": "PMI回落", "macro_data": {"pmi": 48}},
+            {"name": "PMI回落且波动上升", "macro_data": {"pmi": 48}, "market_sentiment": {"volatility": 25}}
+        ]
+    }
+    """
+    try:
+        # 数据验证
+        data = validate_record(ScenarioRequest, request.get_json())
+        data['scenarios'] = validate_records(ScenarioInput, data['scenarios'])
+
+        indicator_service = IndicatorService()
+        result = indicator_service.evaluate_scenarios(data)
+
+        return jsonify({
+            'message': '情景评估完成',
+            'data': result
+        })
+
+    except RequestValidationError as e:
+        return _validation_error(e)
+    except ValueError as e:
+        return jsonify({
+            'error': '情景评估参数错误',
+            'message': str(e)
+        }), 400
+    except Exception as e:
+        logger.error(f"情景评估失败: {e}")
+        return jsonify({
+            'error': '情景评估失败',
+            'message': str(e)
+        }), 500
+
+
+@analysis_bp.route('/backtest', methods=['POST'])
+def run_backtest():
+    """
+    按历史择时评分回测仓位规则
+
+    Request Body:
+    {
+        "markets": ["a_share", "nasdaq"],
+        "start_date": "2015-01-01",
+        "end_date": "2024-12-31",
+        "cost_bps": 5,
+        "include_curve": false,
+        "series": {"a_share": {"dates": [...], "prices": [...]}}
+    }
+    """
+    try:
+        # 数据验证
+        data = validate_record(BacktestRequest, _with_markets(request.get_json()))
+
+        backtest_service = BacktestService()
+        result = backtest_service.run_backtest(data)
+
+        return jsonify({
+            'message': '回测完成',
+            'data': result
+        })
+
+    except RequestValidationError as e:
+        return _validation_error(e)
+    except ValueError as e:
+        return jsonify({
+            'error': '回测参数错误',
+            'message': str(e)
+        }), 400
+    except Exception as e:
+        logger.error(f"回测失败: {e}")
+        return jsonify({
+            'error': '回测失败',
+            'message': str(e)
+        }), 500
+
+
+@analysis_bp.route('/optimize', methods=['POST'])
+def optimize_parameters():
+    """
+    前推优化择时权重和宏观阈值
+
+    Request Body:
+    {
+        "markets": ["a_share", "nasdaq"],
+        "start_date": "2015-01-01",
+        "end_date": "2024-12-31",
+        "method": "random",
+        "n_samples": 2000,
+        "grid": {"weights.macro_fundamental": [0.3, 0.4, 0.5]},
+        "folds": 4,
+        "metric": "sharpe",
+        "top_n": 10
+    }
+    """
+    try:
+        # 数据验证
+        data = validate_record(OptimizeRequest, _with_markets(request.get_json()))
+
+        optimizer_service = OptimizerService()
+        result = optimizer_service.optimize(data)
+
+        return jsonify({
+            'message': '参数优化完成',
+            'data': result
+        })
+
+    except RequestValidationError as e:
+        return _validation_error(e)
+    except ValueError as e:
+        return jsonify({
+            'error': '参数优化参数错误',
+            'message': str(e)
+        }), 400
+    except Exception as e:
+        logger.error(f"参数优化失败: {e}")
+        return jsonify({
+            'error': '参数优化失败',
+            'message': str(e)
+        }), 500
+
+
 @analysis_bp.route('/market-comparison', methods=['GET'])
 def compare_markets():
     """
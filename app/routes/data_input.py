@@ -6,15 +6,113 @@
 处理宏观数据、市场情绪数据的手动输入和查询
 """
 
+import json
 import logging
-from flask import Blueprint, request, jsonify
+from typing import Optional
 
+from flask import Blueprint, Response, request, jsonify, stream_with_context
+
+from ..models.validation import RequestValidationError
 from ..services.data_service import DataService
 
 # 创建蓝图
 data_input_bp = Blueprint('data_input', __name__)
 logger = logging.getLogger(__name__)
 
+# 单页最大条数
+MAX_PAGE_LIMIT = 1000
+
+
+def _parse_limit():
+    """解析limit参数，未提供时返回None，不是正整数时抛出ValueError"""
+    raw = request.args.get('limit')
+    if raw is None:
+        return None
+    try:
+        limit = int(raw)
+    except ValueError:
+        raise ValueError(f"limit必须是正整数: {raw}") from None
+    if limit < 1:
+        raise ValueError(f"limit必须是正整数: {raw}")
+    return min(limit, MAX_PAGE_LIMIT)
+
+
+def _list_response(data_service: DataService, collection: str, market: str,
+                   start_date: Optional[str], end_date: Optional[str], industry: Optional[str] = None):
+    """
+    根据查询参数返回全量、分页或NDJSON流式结果
+
+    分页和流式输出直接从存储层按 (日期, ID) 倒序读取，不先加载整个结果列表
+
+    Query Parameters:
+    - limit: 每页条数，提供时启用键集分页
+    - cursor: 上一页返回的next_cursor
+    - format: 为ndjson时逐行流式返回
+    """
+    cursor = request.args.get('cursor')
+    limit = _parse_limit()
+
+    if cursor:
+        # 提前校验游标，避免流式响应开始后才报错
+        data_service.decode_cursor(cursor)
+
+    if request.args.get('format') == 'ndjson':
+        records = data_service.iter_market_records(collection, market, start_date, end_date, cursor, industry)
+
+        def generate():
+            for record in records:
+                yield json.dumps(record, ensure_ascii=False) + '\n'
+
+        return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
+    if limit is None and cursor is None:
+        records = data_service.iter_market_records(collection, market, start_date, end_date, None, industry)
+        data = list(records)
+        return jsonify({
+            'data': data,
+            'count': len(data)
+        })
+
+    page = data_service.paginate_market_records(collection, market, limit or MAX_PAGE_LIMIT,
+                                                start_date, end_date, cursor, industry)
+
+    return jsonify({
+        'data': page['data'],
+        'count': len(page['data']),
+        'next_cursor': page['next_cursor']
+    })
+
+
+def _save_response(collection: str, save, message: str):
+    """
+    保存请求体中的记录：对象按单条保存，数组按批量保存（一次验证、一次写入）
+
+    验证失败时返回400，error为首个错误，details为全部错误
+    """
+    try:
+        data = request.get_json()
+        data_service = DataService()
+
+        if isinstance(data, list):
+            result = data_service.save_batch(collection, data)
+            return jsonify({
+                'message': message,
+                'data': result,
+                'count': len(result)
+            }), 201
+
+        result = save(data_service, data)
+        return jsonify({
+            'message': message,
+            'data': result
+        }), 201
+
+    except RequestValidationError as e:
+        return jsonify({
+            'error': str(e),
+            'details': e.errors
+        }), 400
+
 
 @data_input_bp.route('/health', methods=['GET'])
 def health_check():
@@ -41,26 +139,11 @@ def add_macro_data():
         "interest_rate": 3.0,
         "other_macro": {}
     }
+
+    请求体也可以是上述对象的数组，整体验证通过后一次保存
     """
     try:
-        data = request.get_json()
-
-        # 数据验证
-        required_fields = ['date', 'market']
-        for field in required_fields:
-            if field not in data:
-                return jsonify({
-                    'error': f'缺少必需字段: {field}'
-                }), 400
-
-        # 保存数据
-        data_service = DataService()
-        result = data_service.save_macro_data(data)
-
-        return jsonify({
-            'message': '宏观数据保存成功',
-            'data': result
-        }), 201
+        return _save_response('macro_data', DataService.save_macro_data, '宏观数据保存成功')
 
     except Exception as e:
         logger.error(f"保存宏观数据失败: {e}")
@@ -79,6 +162,7 @@ def get_macro_data():
     - market: 市场类型 (a_share, hong_kong, nasdaq)
     - start_date: 开始日期
     - end_date: 结束日期
+    - limit / cursor / format: 分页与流式参数，见_list_response
     """
     try:
         market = request.args.get('market', 'a_share')
@@ -86,13 +170,12 @@ def get_macro_data():
         end_date = request.args.get('end_date')
 
         data_service = DataService()
-        data = data_service.get_macro_data(market, start_date, end_date)
+        return _list_response(data_service, 'macro_data', market, start_date, end_date)
 
+    except ValueError as e:
         return jsonify({
-            'data': data,
-            'count': len(data)
-        })
-
+            'error': str(e)
+        }), 400
     except Exception as e:
         logger.error(f"获取宏观数据失败: {e}")
         return jsonify({
@@ -118,26 +201,11 @@ def add_market_sentiment():
             "bollinger_bands": 1.2
         }
     }
+
+    请求体也可以是上述对象的数组，整体验证通过后一次保存
     """
     try:
-        data = request.get_json()
-
-        # 数据验证
-        required_fields = ['date', 'market']
-        for field in required_fields:
-            if field not in data:
-                return jsonify({
-                    'error': f'缺少必需字段: {field}'
-                }), 400
-
-        # 保存数据
-        data_service = DataService()
-        result = data_service.save_market_sentiment(data)
-
-        return jsonify({
-            'message': '市场情绪数据保存成功',
-            'data': result
-        }), 201
+        return _save_response('market_sentiment', DataService.save_market_sentiment, '市场情绪数据保存成功')
 
     except Exception as e:
         logger.error(f"保存市场情绪数据失败: {e}")
@@ -156,6 +224,7 @@ def get_market_sentiment():
     - market: 市场类型
     - start_date: 开始日期
     - end_date: 结束日期
+    - limit / cursor / format: 分页与流式参数，见_list_response
     """
     try:
         market = request.args.get('market', 'a_share')
@@ -163,13 +232,12 @@ def get_market_sentiment():
         end_date = request.args.get('end_date')
 
         data_service = DataService()
-        data = data_service.get_market_sentiment(market, start_date, end_date)
+        return _list_response(data_service, 'market_sentiment', market, start_date, end_date)
 
+    except ValueError as e:
         return jsonify({
-            'data': data,
-            'count': len(data)
-        })
-
+            'error': str(e)
+        }), 400
     except Exception as e:
         logger.error(f"获取市场情绪数据失败: {e}")
         return jsonify({
@@ -191,26 +259,11 @@ def add_industry_data():
         "free_cash_flow": 120.5,
         "industry_sentiment": 70.0
     }
+
+    请求体也可以是上述对象的数组，整体验证通过后一次保存
     """
     try:
-        data = request.get_json()
-
-        # 数据验证
-        required_fields = ['date', 'market', 'industry']
-        for field in required_fields:
-            if field not in data:
-                return jsonify({
-                    'error': f'缺少必需字段: {field}'
-                }), 400
-
-        # 保存数据
-        data_service = DataService()
-        result = data_service.save_industry_data(data)
-
-        return jsonify({
-            'message': '行业数据保存成功',
-            'data': result
-        }), 201
+        return _save_response('industry_data', DataService.save_industry_data, '行业数据保存成功')
 
     except Exception as e:
         logger.error(f"保存行业数据失败: {e}")
@@ -230,6 +283,7 @@ def get_industry_data():
     - industry: 行业类型
     - start_date: 开始日期
     - end_date: 结束日期
+    - limit / cursor / format: 分页与流式参数，见_list_response
     """
     try:
         market = request.args.get('market', 'a_share')
@@ -238,16 +292,55 @@ def get_industry_data():
         end_date = request.args.get('end_date')
 
         data_service = DataService()
-        data = data_service.get_industry_data(market, industry, start_date, end_date)
+        return _list_response(data_service, 'industry_data', market, start_date, end_date, industry)
 
+    except ValueError as e:
         return jsonify({
-            'data': data,
-            'count': len(data)
-        })
-
+            'error': str(e)
+        }), 400
     except Exception as e:
         logger.error(f"获取行业数据失败: {e}")
         return jsonify({
             'error': '获取行业数据失败',
             'message': str(e)
-        }), 500
\ No newline at end of file
+        }), 500
+
+
+@data_input_bp.route('/revisions', methods=['GET'])
+def get_revisions():
+    """
+    获取某条记录（按自然键）的当前版本和被替换过的历史版本
+
+    Query Parameters:
+    - collection: 集合名称（macro_data, market_sentiment, industry_data, timing_indicators）
+    - market: 市场类型
+    - date: 日期
+    - industry: 行业类型（collection为industry_data时必需）
+    """
+    try:
+        collection = request.args.get('collection', 'macro_data')
+        market = request.args.get('market', 'a_share')
+        date = request.args.get('date')
+        if not date:
+            return jsonify({
+                'error': '缺少必需参数: date'
+            }), 400
+
+        data_service = DataService()
+        result = data_service.get_revisions(collection, market, date, request.args.get('industry'))
+
+        return jsonify({
+            'data': result,
+            'count': len(result['revisions'])
+        })
+
+    except ValueError as e:
+        return jsonify({
+            'error': str(e)
+        }), 400
+    except Exception as e:
+        logger.error(f"获取修订历史失败: {e}")
+        return jsonify({
+            'error': '获取修订历史失败',
+            'message': str(e)
+        }), 500
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+实时推送API路由
+
+以SSE推送新保存的择时指标和AI分析结果
+"""
+
+import logging
+from typing import List, Optional, Tuple
+
+from flask import Blueprint, Response, request, jsonify
+
+from ..services.event_broker import EventBroker, SubscriberLimitError, get_broker, stream
+from ..utils.config import config_manager
+
+# 创建蓝图
+stream_bp = Blueprint('stream', __name__)
+logger = logging.getLogger(__name__)
+
+SSE_HEADERS = {
+    'Cache-Control': 'no-cache',
+    # 关闭nginx等反向代理的响应缓冲
+    'X-Accel-Buffering': 'no'
+}
+
+
+def parse_subscription(markets: Optional[str], last_event_id: Optional[str]
+                       ) -> Tuple[Optional[List[str]], Optional[int]]:
+    """解析订阅的市场列表（逗号分隔，为空表示全部市场）和Last-Event-ID"""
+    market_list = [market.strip() for market in (markets or '').split(',') if market.strip()] or None
+    try:
+        last_id = int(last_event_id) if last_event_id else None
+    except ValueError:
+        last_id = None
+    return market_list, last_id
+
+
+def configured_broker() -> EventBroker:
+    """按stream配置获取事件代理，并在本进程中开始监视数据文件（感知其他工作进程的写入）"""
+    broker = get_broker()
+    broker.configure(config_manager.get('stream.buffer_size', 256),
+                     config_manager.get('stream.max_subscribers', 100))
+    interval = config_manager.get('stream.watch_seconds', 2)
+    if interval and interval > 0:
+        broker.watch(config_manager.get('database.file_path', 'data/application_data.json'), interval)
+    return broker
+
+
+def sync_subscriber_limit() -> int:
+    """
+    同步服务器中每个进程允许的订阅数
+
+    同步模式下每个SSE连接在整个订阅期间占用一个工作线程，
+    按 server.threads * stream.sync_thread_ratio 限制，保证其余线程仍能处理普通请求
+    """
+    threads = config_manager.get('server.threads', 4)
+    ratio = config_manager.get('stream.sync_thread_ratio', 0.5)
+    return max(int(threads * ratio), 0)
+
+
+@stream_bp.route('/events', methods=['GET'])
+def subscribe_events():
+    """
+    订阅实时事件（text/event-stream）
+
+    Query Parameters:
+    - markets: 市场列表，逗号分隔，为空时订阅全部市场
+    - last_event_id: 断线重连时的最后事件ID（也可通过Last-Event-ID请求头传递）
+
+    事件类型: timing_indicators、ai_analysis，有事件丢失时的reset，以及其他工作进程写入数据后的refresh
+
+    同步服务器中每个订阅占用一个工作线程，订阅数受sync_subscriber_limit限制；
+    ASGI模式下由asgi.stream_events处理，不经过本路由
+    """
+    if not config_manager.get('stream.enabled', True):
+        return jsonify({
+            'error': '实时推送未启用'
+        }), 404
+
+    markets, last_id = parse_subscription(
+        request.args.get('markets'),
+        request.headers.get('Last-Event-ID') or request.args.get('last_event_id')
+    )
+    broker = configured_broker()
+    try:
+        broker.subscribe(sync_subscriber_limit())
+    except SubscriberLimitError as e:
+        return jsonify({
+            'error': '订阅数已达上限',
+            'message': f"{e}（同步模式下每个订阅占用一个工作线程，更多订阅请使用异步模式: python run.py --asgi）"
+        }), 503
+
+    if last_id is None:
+        last_id = broker.last_id
+    heartbeat = config_manager.get('stream.heartbeat_seconds', 15)
+    response = Response(stream(broker, markets, last_id, heartbeat),
+                        mimetype='text/event-stream', headers=SSE_HEADERS)
+    # 服务器关闭响应时（包括客户端断开）注销订阅
+    response.call_on_close(broker.unsubscribe)
+    return response
+
+
+@stream_bp.route('/health', methods=['GET'])
+def health_check():
+    """健康检查端点"""
+    broker = get_broker()
+    return jsonify({
+        'status': 'healthy',
+        'service': 'stream',
+        'subscribers': broker.subscribers,
+        'last_event_id': broker.last_id
+    })
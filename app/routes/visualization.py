@@ -15,6 +15,37 @@ from ..services.indicator_service import IndicatorService
 visualization_bp = Blueprint('visualization', __name__)
 logger = logging.getLogger(__name__)
 
+# 滚动窗口上限
+MAX_WINDOW = 5000
+
+
+def _parse_window():
+    """解析window参数，未提供时返回None，不在1到MAX_WINDOW之间时抛出ValueError"""
+    raw = request.args.get('window')
+    if raw is None or raw == '':
+        return None
+    try:
+        window = int(raw)
+    except ValueError:
+        raise ValueError(f"window必须是整数: {raw}") from None
+    if not 1 <= window <= MAX_WINDOW:
+        raise ValueError(f"window必须在1到{MAX_WINDOW}之间: {raw}")
+    return window
+
+
+def _parse_max_points():
+    """解析max_points参数，未提供时返回None，不是不小于3的整数时抛出ValueError（降采样固定保留首尾点）"""
+    raw = request.args.get('max_points')
+    if raw is None or raw == '':
+        return None
+    try:
+        max_points = int(raw)
+    except ValueError:
+        raise ValueError(f"max_points必须是整数: {raw}") from None
+    if max_points < 3:
+        raise ValueError(f"max_points不能小于3: {raw}")
+    return max_points
+
 
 @visualization_bp.route('/health', methods=['GET'])
 def health_check():
@@ -35,16 +66,20 @@ def get_timing_score_trend():
     - start_date: 开始日期
     - end_date: 结束日期
     - indicator_type: 指标类型 (overall, macro, industry, sentiment)
+    - max_points: 最大返回点数（超出时降采样）
+    - window: 滚动窗口大小（可选，附加滚动平滑值和标准分）
     """
     try:
         market = request.args.get('market', 'a_share')
         start_date = request.args.get('start_date')
         end_date = request.args.get('end_date')
         indicator_type = request.args.get('indicator_type', 'overall')
+        max_points = _parse_max_points()
+        window = _parse_window()
 
         indicator_service = IndicatorService()
         data = indicator_service.get_timing_score_trend(
-            market, start_date, end_date, indicator_type
+            market, start_date, end_date, indicator_type, max_points, window
         )
 
         return jsonify({
@@ -52,6 +87,11 @@ def get_timing_score_trend():
             'count': len(data)
         })
 
+    except ValueError as e:
+        return jsonify({
+            'error': '参数错误',
+            'message': str(e)
+        }), 400
     except Exception as e:
         logger.error(f"获取择时评分趋势失败: {e}")
         return jsonify({
@@ -163,21 +203,28 @@ def get_sentiment_analysis():
     - market: 市场类型
     - start_date: 开始日期
     - end_date: 结束日期
+    - window: 滚动窗口大小（可选，附加滚动平滑值和标准分）
     """
     try:
         market = request.args.get('market', 'a_share')
         start_date = request.args.get('start_date')
         end_date = request.args.get('end_date')
+        window = _parse_window()
 
         indicator_service = IndicatorService()
         data = indicator_service.get_sentiment_analysis_data(
-            market, start_date, end_date
+            market, start_date, end_date, window
         )
 
         return jsonify({
             'data': data
         })
 
+    except ValueError as e:
+        return jsonify({
+            'error': '参数错误',
+            'message': str(e)
+        }), 400
     except Exception as e:
         logger.error(f"获取市场情绪分析数据失败: {e}")
         return jsonify({
@@ -218,6 +265,41 @@ def get_macro_indicators():
         }), 500
 
 
+@visualization_bp.route('/correlation-heatmap', methods=['GET'])
+def get_correlation_heatmap():
+    """
+    获取指标相关性热力图数据
+
+    Query Parameters:
+    - markets: 市场列表，逗号分隔（可选，默认全部）
+    - indicators: 指标列表，逗号分隔（可选，默认全部）
+    - window: 滚动窗口，最近的日期数（可选，默认全部历史）
+    """
+    try:
+        markets = [m for m in request.args.get('markets', '').split(',') if m]
+        indicators = [i for i in request.args.get('indicators', '').split(',') if i]
+        window = _parse_window()
+
+        indicator_service = IndicatorService()
+        data = indicator_service.get_correlation_heatmap_data(markets, indicators, window)
+
+        return jsonify({
+            'data': data
+        })
+
+    except ValueError as e:
+        return jsonify({
+            'error': '参数错误',
+            'message': str(e)
+        }), 400
+    except Exception as e:
+        logger.error(f"获取相关性热力图数据失败: {e}")
+        return jsonify({
+            'error': '获取相关性热力图数据失败',
+            'message': str(e)
+        }), 500
+
+
 @visualization_bp.route('/dashboard-summary', methods=['GET'])
 def get_dashboard_summary():
     """
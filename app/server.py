@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+生产环境服务入口
+
+按 server.* 配置以多进程WSGI服务器运行应用：
+- gunicorn（POSIX）：开启preload_app时在主进程中加载应用和派生索引后再fork工作进程，
+  关闭时由每个工作进程各自加载应用；工作进程处理max_requests个请求后自动替换；
+  kill -HUP <主进程>平滑替换全部工作进程（关闭preload_app时新工作进程加载新代码）
+- waitress（未安装gunicorn或Windows）：单进程多线程
+
+使用:
+    python -m app.server
+    python -m app.server --print-config > gunicorn.conf.py && gunicorn -c gunicorn.conf.py app.wsgi:app
+"""
+
+import argparse
+import logging
+import os
+import sys
+from typing import Any, Dict, Optional
+
+from .utils.config import config_manager, init_config
+
+logger = logging.getLogger(__name__)
+
+BACKENDS = ('auto', 'gunicorn', 'waitress')
+
+
+def resolve_workers(workers: Optional[int]) -> int:
+    """工作进程数，0或未配置时为 2 * CPU + 1"""
+    if workers and workers > 0:
+        return int(workers)
+    return 2 * (os.cpu_count() or 1) + 1
+
+
+def resolve_backend(backend: str = 'auto') -> str:
+    """确定可用的WSGI服务器"""
+    if backend not in BACKENDS:
+        raise ValueError(f"不支持的服务器: {backend}")
+    if backend != 'auto':
+        return backend
+
+    if os.name != 'nt':
+        try:
+            import gunicorn  # noqa: F401
+            return 'gunicorn'
+        except ImportError:
+            pass
+    try:
+        import waitress  # noqa: F401
+        return 'waitress'
+    except ImportError:
+        raise RuntimeError("生产模式需要安装gunicorn（Linux/macOS）或waitress: pip install gunicorn waitress") from None
+
+
+def gunicorn_options(**overrides) -> Dict[str, Any]:
+    """
+    由 server.* 配置生成gunicorn设置
+
+    Args:
+        **overrides: 覆盖的设置项（值为None时忽略）
+
+    Returns:
+        Dict[str, Any]: gunicorn设置
+    """
+    host = overrides.pop('host', None) or config_manager.get('server.host', '0.0.0.0')
+    port = overrides.pop('port', None) or config_manager.get('server.port', 5000)
+    threads = overrides.pop('threads', None) or config_manager.get('server.threads', 4)
+
+    options = {
+        'bind': f"{host}:{port}",
+        'workers': resolve_workers(overrides.pop('workers', None) or config_manager.get('server.workers', 0)),
+        'threads': threads,
+        'worker_class': 'gthread' if threads > 1 else 'sync',
+        'timeout': config_manager.get('server.timeout', 120),
+        'graceful_timeout': config_manager.get('server.graceful_timeout', 30),
+        'keepalive': config_manager.get('server.keepalive', 5),
+        'max_requests': config_manager.get('server.max_requests', 1000),
+        'max_requests_jitter': config_manager.get('server.max_requests_jitter', 100),
+        'preload_app': config_manager.get('server.preload_app', True),
+        'accesslog': config_manager.get('server.access_log', None),
+        'errorlog': '-'
+    }
+    options.update({key: value for key, value in overrides.items() if value is not None})
+    return options
+
+
+def render_gunicorn_config(options: Dict[str, Any]) -> str:
+    """输出可用于 gunicorn -c 的配置文件内容"""
+    lines = ["# 由 python -m app.server --print-config 根据 server.* 配置生成"]
+    lines.extend(f"{key} = {value!r}" for key, value in options.items())
+    lines.append("")
+    lines.append("from app.server import when_ready, post_fork  # noqa: E402,F401")
+    return '\n'.join(lines) + '\n'
+
+
+def preload_state():
+    """
+    预加载共享状态
+
+    在fork之前执行一次，构建（或校验）列式存储和分段文件，工作进程继承已导入的模块和已映射的文件
+    """
+    from .services.data_service import DataService
+    data_service = DataService()
+    data_service.prepare_read_paths()
+    logger.info(f"预加载完成: {data_service.data_file}")
+
+
+def load_app(preload: bool):
+    """
+    创建应用
+
+    Args:
+        preload: 是否在主进程中预加载（开启时同时预加载共享状态，供fork出的工作进程继承）
+    """
+    from . import create_app
+    app = create_app()
+    if preload:
+        preload_state()
+    return app
+
+
+def when_ready(server):
+    """gunicorn钩子：主进程就绪后启动定时备份（只在主进程中运行一份）"""
+    from .services.backup_service import start_backup_scheduler
+    start_backup_scheduler()
+
+
+def post_fork(server, worker):
+    """gunicorn钩子：清空从主进程继承的运行指标，各工作进程独立计数"""
+    from .utils.metrics import registry
+    registry.reset()
+
+
+def run_gunicorn(options: Dict[str, Any]):
+    """以gunicorn运行应用（由preload_app决定在主进程还是各工作进程中加载应用）"""
+    from gunicorn.app.base import BaseApplication
+
+    class Application(BaseApplication):
+        def load_config(self):
+            for key, value in options.items():
+                if key in self.cfg.settings and value is not None:
+                    self.cfg.set(key, value)
+            self.cfg.set('when_ready', when_ready)
+            self.cfg.set('post_fork', post_fork)
+
+        def load(self):
+            return load_app(bool(options.get('preload_app')))
+
+    Application().run()
+
+
+def run_waitress(app, host: str, port: int, threads: int):
+    """以waitress运行应用（单进程多线程）"""
+    from waitress import serve
+    from .services.backup_service import start_backup_scheduler
+    start_backup_scheduler()
+    serve(app, host=host, port=port, threads=threads)
+
+
+def main(argv=None) -> int:
+    """主函数"""
+    parser = argparse.ArgumentParser(description='生产环境服务')
+    parser.add_argument('--backend', choices=BACKENDS, default=None, help='WSGI服务器，默认取server.backend')
+    parser.add_argument('--host', help='监听地址，默认取server.host')
+    parser.add_argument('--port', type=int, help='监听端口，默认取server.port')
+    parser.add_argument('--workers', type=int, help='工作进程数，默认取server.workers（0为2*CPU+1）')
+    parser.add_argument('--threads', type=int, help='每个工作进程的线程数，默认取server.threads')
+    parser.add_argument('--print-config', action='store_true', help='输出gunicorn配置文件内容后退出')
+    args = parser.parse_args(argv)
+
+    if not init_config():
+        logger.error("配置初始化失败")
+        return 1
+
+    options = gunicorn_options(host=args.host, port=args.port, workers=args.workers, threads=args.threads)
+    if args.print_config:
+        print(render_gunicorn_config(options), end='')
+        return 0
+
+    try:
+        backend = resolve_backend(args.backend or config_manager.get('server.backend', 'auto'))
+    except (RuntimeError, ValueError) as e:
+        logger.error(str(e))
+        return 1
+
+    host, port = options['bind'].rsplit(':', 1)
+    logger.info(f"生产模式启动: {backend}, {options['bind']}")
+    if backend == 'gunicorn':
+        run_gunicorn(options)
+    else:
+        if options['workers'] > 1:
+            logger.warning("waitress不支持多进程，以单进程多线程运行")
+        run_waitress(load_app(bool(options['preload_app'])), host, int(port),
+                     options['threads'] * options['workers'])
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
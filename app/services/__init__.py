@@ -4,10 +4,25 @@
 服务层模块
 
 包含数据管理、指标计算和AI分析的核心业务逻辑
+
+服务类在首次访问时才导入对应模块，导入本包不会加载AI客户端等依赖
 """
 
-from .data_service import DataService
-from .indicator_service import IndicatorService
-from .ai_service import AIService
+import importlib
+
+_EXPORTS = {
+    'DataService': '.data_service',
+    'IndicatorService': '.indicator_service',
+    'AIService': '.ai_service'
+}
+
+__all__ = ['DataService', 'IndicatorService', 'AIService']
+
 
-__all__ = ['DataService', 'IndicatorService', 'AIService']
\ No newline at end of file
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module, __name__), name)
+    globals()[name] = value
+    return value
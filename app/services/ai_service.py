@@ -6,17 +6,89 @@ AI分析服务
 集成DeepSeek API进行择时分析和建议生成
 """
 
+import asyncio
 import json
 import logging
+import threading
 import time
 from datetime import datetime
-from typing import Dict, List, Any, Optional
-
-from openai import OpenAI
+from types import SimpleNamespace
+from typing import TYPE_CHECKING, Dict, List, Any, Optional
 
 from ..utils.config import config_manager
+from ..utils.metrics import record_cache, timed
 from .data_service import DataService
 
+if TYPE_CHECKING:
+    from openai import OpenAI
+
+
+class OfflineAIClient:
+    """
+    离线AI客户端
+
+    接口与OpenAI客户端的chat.completions.create一致，按配置的延迟返回固定文本，
+    供压测和基准测试在不访问外部API的情况下走完整的AI分析路径
+    """
+
+    RESPONSE = "综合评估：择时信号中性偏强，宏观基本面稳定。建议适度增加仓位，风险等级中等，中期展望积极。"
+
+    def __init__(self, latency_ms: float = 0):
+        self.latency = max(float(latency_ms), 0) / 1000
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create))
+
+    def _create(self, **kwargs):
+        if self.latency:
+            time.sleep(self.latency)
+        return self._response()
+
+    def _response(self):
+        message = SimpleNamespace(content=self.RESPONSE)
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+
+
+class AsyncOfflineAIClient(OfflineAIClient):
+    """离线AI客户端的异步版本，接口与AsyncOpenAI一致"""
+
+    async def _create(self, **kwargs):
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        return self._response()
+
+
+# 异步客户端按配置在进程内共享，复用连接池
+_async_clients: Dict[tuple, Any] = {}
+_async_clients_lock = threading.Lock()
+
+
+def get_async_client():
+    """
+    获取异步AI客户端（AsyncOpenAI或离线客户端），API密钥未配置时返回None
+
+    Returns:
+        异步客户端
+    """
+    ai_config = config_manager.get_ai_config()
+    offline = ai_config.get('provider') == 'offline'
+    if offline:
+        key = ('offline', ai_config.get('offline_latency_ms', 0))
+    else:
+        api_key = ai_config.get('api_key')
+        if not api_key or api_key == "your-deepseek-api-key-here":
+            return None
+        key = (api_key, ai_config.get('base_url'))
+
+    with _async_clients_lock:
+        client = _async_clients.get(key)
+        if client is None:
+            if offline:
+                client = AsyncOfflineAIClient(ai_config.get('offline_latency_ms', 0))
+            else:
+                from openai import AsyncOpenAI
+                client = AsyncOpenAI(api_key=api_key, base_url=ai_config.get('base_url'))
+            _async_clients[key] = client
+        return client
+
 
 class AIService:
     """AI分析服务"""
@@ -27,10 +99,13 @@ class AIService:
         self.client = self._init_openai_client()
         self.cache = {}
 
-    def _init_openai_client(self) -> Optional[OpenAI]:
+    def _init_openai_client(self) -> Optional['OpenAI']:
         """初始化OpenAI客户端"""
         try:
             ai_config = config_manager.get_ai_config()
+            if ai_config.get('provider') == 'offline':
+                return OfflineAIClient(ai_config.get('offline_latency_ms', 0))
+
             api_key = ai_config.get('api_key')
             base_url = ai_config.get('base_url')
 
@@ -38,6 +113,8 @@ class AIService:
                 self.logger.warning("AI API密钥未配置，AI功能将无法使用")
                 return None
 
+            # openai及其依赖的httpx、pydantic导入耗时较长，只在实际需要客户端时导入
+            from openai import OpenAI
             return OpenAI(
                 api_key=api_key,
                 base_url=base_url
@@ -74,23 +151,56 @@ class AIService:
             # 调用AI分析
             analysis_result = self._call_ai_analysis(analysis_data)
 
-            # 保存分析结果
-            analysis_result['calculated_at'] = datetime.now().isoformat()
-            analysis_result['market'] = data['market']
-            analysis_result['date'] = data['date']
+            # 保存并缓存分析结果
+            return self._store_result(cache_key, analysis_result, data)
 
-            self.data_service.save_ai_analysis(analysis_result)
+        except Exception as e:
+            self.logger.error(f"AI分析失败: {e}")
+            return self._generate_fallback_analysis(data)
 
-            # 缓存结果
-            self._cache_result(cache_key, analysis_result)
+    async def analyze_timing_indicators_async(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        AI分析择时指标（异步）
 
-            self.logger.info(f"AI分析完成: {data['market']} - {data['date']}")
-            return analysis_result
+        等待AI接口期间不占用线程；准备数据和保存结果等存储I/O在线程池中执行，不阻塞事件循环
+
+        Args:
+            data: 择时指标数据
+
+        Returns:
+            Dict[str, Any]: AI分析结果
+        """
+        try:
+            cache_key = self._generate_cache_key(data)
+            if self._check_cache(cache_key):
+                self.logger.info("使用缓存的AI分析结果")
+                return self.cache[cache_key]
+
+            client = get_async_client()
+            if not client:
+                return self._generate_fallback_analysis(data)
+
+            analysis_data = await asyncio.to_thread(self._prepare_analysis_data, data)
+            analysis_result = await self._call_ai_analysis_async(client, analysis_data)
+            return await asyncio.to_thread(self._store_result, cache_key, analysis_result, data)
 
         except Exception as e:
             self.logger.error(f"AI分析失败: {e}")
             return self._generate_fallback_analysis(data)
 
+    def _store_result(self, cache_key: str, analysis_result: Dict[str, Any],
+                      data: Dict[str, Any]) -> Dict[str, Any]:
+        """补充字段后保存并缓存分析结果"""
+        analysis_result['calculated_at'] = datetime.now().isoformat()
+        analysis_result['market'] = data['market']
+        analysis_result['date'] = data['date']
+
+        self.data_service.save_ai_analysis(analysis_result)
+        self._cache_result(cache_key, analysis_result)
+
+        self.logger.info(f"AI分析完成: {data['market']} - {data['date']}")
+        return analysis_result
+
     def _prepare_analysis_data(self, data: Dict[str, Any]) -> Dict[str, Any]:
         """准备分析数据"""
         market = data['market']
@@ -128,45 +238,55 @@ class AIService:
 
         return analysis_data
 
+    @timed('ai_service.call_ai_analysis')
     def _call_ai_analysis(self, analysis_data: Dict[str, Any]) -> Dict[str, Any]:
         """调用AI分析"""
         try:
-            # 构建提示词
-            prompt = self._build_analysis_prompt(analysis_data)
-
-            # AI配置
-            ai_config = config_manager.get_ai_config()
-            model = ai_config.get('model', 'deepseek-chat')
-            max_tokens = ai_config.get('max_tokens', 2000)
-            temperature = ai_config.get('temperature', 0.7)
-
-            # 调用API
-            response = self.client.chat.completions.create(
-                model=model,
-                messages=[
-                    {
-                        "role": "system",
-                        "content": "你是一个专业的量化投资分析师，专门从事择时分析。请基于提供的择时指标数据，给出专业的投资分析和建议。"
-                    },
-                    {
-                        "role": "user",
-                        "content": prompt
-                    }
-                ],
-                max_tokens=max_tokens,
-                temperature=temperature
-            )
+            response = self.client.chat.completions.create(**self._completion_request(analysis_data))
 
             # 解析响应
             ai_response = response.choices[0].message.content
-            analysis_result = self._parse_ai_response(ai_response, analysis_data)
+            return self._parse_ai_response(ai_response, analysis_data)
 
-            return analysis_result
+        except Exception as e:
+            self.logger.error(f"调用AI分析API失败: {e}")
+            raise
+
+    @timed('ai_service.call_ai_analysis')
+    async def _call_ai_analysis_async(self, client, analysis_data: Dict[str, Any]) -> Dict[str, Any]:
+        """调用AI分析（异步客户端）"""
+        try:
+            response = await client.chat.completions.create(**self._completion_request(analysis_data))
+            ai_response = response.choices[0].message.content
+            return self._parse_ai_response(ai_response, analysis_data)
 
         except Exception as e:
             self.logger.error(f"调用AI分析API失败: {e}")
             raise
 
+    def _completion_request(self, analysis_data: Dict[str, Any]) -> Dict[str, Any]:
+        """构建chat.completions.create的请求参数"""
+        # 构建提示词
+        prompt = self._build_analysis_prompt(analysis_data)
+
+        # AI配置
+        ai_config = config_manager.get_ai_config()
+        return {
+            'model': ai_config.get('model', 'deepseek-chat'),
+            'messages': [
+                {
+                    "role": "system",
+                    "content": "你是一个专业的量化投资分析师，专门从事择时分析。请基于提供的择时指标数据，给出专业的投资分析和建议。"
+                },
+                {
+                    "role": "user",
+                    "content": prompt
+                }
+            ],
+            'max_tokens': ai_config.get('max_tokens', 2000),
+            'temperature': ai_config.get('temperature', 0.7)
+        }
+
     def _build_analysis_prompt(self, analysis_data: Dict[str, Any]) -> str:
         """构建分析提示词"""
         market = analysis_data['market']
@@ -302,11 +422,13 @@ class AIService:
             cache_ttl = ai_config.get('cache_ttl_minutes', 60) * 60  # 转换为秒
             cached_time = self.cache[cache_key].get('cached_at', 0)
             if time.time() - cached_time < cache_ttl:
+                record_cache('ai_analysis', True)
                 return True
             else:
                 # 缓存过期，删除
                 del self.cache[cache_key]
 
+        record_cache('ai_analysis', False)
         return False
 
     def _cache_result(self, cache_key: str, result: Dict[str, Any]):
@@ -376,7 +498,8 @@ class AIService:
             raise
 
     def get_ai_analysis_history(self, market: str, start_date: Optional[str] = None,
-                               end_date: Optional[str] = None) -> List[Dict[str, Any]]:
+                               end_date: Optional[str] = None,
+                               include_text: bool = False) -> List[Dict[str, Any]]:
         """
         获取AI分析历史
 
@@ -384,12 +507,13 @@ class AIService:
             market: 市场类型
             start_date: 开始日期
             end_date: 结束日期
+            include_text: 是否加载分析全文，默认只返回摘要
 
         Returns:
             List[Dict[str, Any]]: AI分析历史列表
         """
         try:
-            return self.data_service.get_ai_analysis(market, start_date, end_date)
+            return self.data_service.get_ai_analysis(market, start_date, end_date, include_text)
 
         except Exception as e:
             self.logger.error(f"获取AI分析历史失败: {e}")
@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+回测服务
+
+基于历史择时评分和本地价格/收益率序列，按仓位配置规则回放择时信号，
+全部计算以NumPy数组运算完成
+"""
+
+import csv
+import logging
+from pathlib import Path
+from typing import Dict, List, Any, Optional, Tuple, Union
+
+import numpy as np
+
+from ..utils.config import config_manager
+from .data_service import DataService
+from .timing_scorer import STRENGTH_LEVELS, strength_indices
+
+
+def position_fractions(scores: np.ndarray, thresholds: Dict[str, float],
+                       position_sizes: Dict[str, float]) -> np.ndarray:
+    """
+    批量将择时评分映射为仓位比例（0-1）
+
+    Args:
+        scores: 择时评分数组
+        thresholds: position_sizing.scoring_thresholds配置
+        position_sizes: position_sizing.position_sizes配置
+
+    Returns:
+        np.ndarray: 仓位比例数组
+    """
+    sizes = np.array([position_sizes.get(level, 0) for level in STRENGTH_LEVELS], dtype=float) / 100.0
+    return sizes[strength_indices(scores, thresholds)]
+
+
+def compute_metrics(returns: np.ndarray, weights: np.ndarray,
+                    cost_bps: float = 0.0, periods_per_year: int = 252,
+                    return_curve: bool = False) -> Union[Dict[str, Any], Tuple[Dict[str, Any], np.ndarray]]:
+    """
+    计算策略绩效指标
+
+    Args:
+        returns: 标的逐期收益率
+        weights: 各期持仓比例（持有期对应returns的同一期）
+        cost_bps: 单边换手成本（基点）
+        periods_per_year: 年化周期数
+        return_curve: 是否同时返回扣除换手成本后的净值曲线
+
+    Returns:
+        Dict[str, Any]: 收益、回撤、换手和胜率等指标；return_curve为True时返回 (指标, 净值曲线)
+    """
+    n = len(returns)
+    if n == 0:
+        return ({'periods': 0}, np.empty(0)) if return_curve else {'periods': 0}
+
+    turnover = np.abs(np.diff(weights, prepend=0.0))
+    strategy_returns = weights * returns - turnover * cost_bps / 10000.0
+
+    equity = np.cumprod(1.0 + strategy_returns)
+    drawdown = equity / np.maximum.accumulate(equity) - 1.0
+    benchmark_total = float(np.prod(1.0 + returns) - 1.0)
+
+    total_return = float(equity[-1] - 1.0)
+    years = n / periods_per_year
+    std = float(strategy_returns.std(ddof=1)) if n > 1 else 0.0
+    invested = weights > 0
+
+    metrics = {
+        'periods': n,
+        'total_return': round(total_return, 6),
+        'annualized_return': round(float((1.0 + total_return) ** (1.0 / years) - 1.0), 6) if total_return > -1 else -1.0,
+        'annualized_volatility': round(std * np.sqrt(periods_per_year), 6),
+        'sharpe_ratio': round(float(strategy_returns.mean()) / std * np.sqrt(periods_per_year), 4) if std > 0 else 0.0,
+        'max_drawdown': round(float(drawdown.min()), 6),
+        'turnover': round(float(turnover.sum()), 4),
+        'annualized_turnover': round(float(turnover.sum()) / years, 4),
+        'hit_rate': round(float((strategy_returns[invested] > 0).mean()), 4) if invested.any() else 0.0,
+        'average_exposure': round(float(weights.mean()), 4),
+        'benchmark_total_return': round(benchmark_total, 6)
+    }
+    return (metrics, equity) if return_curve else metrics
+
+
+class BacktestService:
+    """择时信号回测服务"""
+
+    def __init__(self):
+        self.data_service = DataService()
+        self.logger = logging.getLogger(__name__)
+
+    def run_backtest(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        运行回测
+
+        Args:
+            data: 回测参数，包含markets、可选的start_date/end_date/cost_bps，
+                  以及可选的series（各市场的dates+prices或dates+returns），
+                  未提供series的市场从backtest.price_dir读取 {market}.csv
+
+        Returns:
+            Dict[str, Any]: 各市场的回测结果
+        """
+        try:
+            markets = data.get('markets') or [data['market']]
+            start_date = data.get('start_date')
+            end_date = data.get('end_date')
+            cost_bps = float(data.get('cost_bps', config_manager.get('backtest.cost_bps', 0)))
+            include_curve = bool(data.get('include_curve', False))
+            periods_per_year = config_manager.get('backtest.periods_per_year', 252)
+            series = data.get('series', {})
+
+            thresholds = config_manager.get('position_sizing.scoring_thresholds', {})
+            position_sizes = config_manager.get('position_sizing.position_sizes', {})
+
+            results = {}
+            for market in markets:
+                dates, returns = self.load_return_series(market, series.get(market), start_date, end_date)
+                signal = self.data_service.get_columns(
+                    'timing_indicators', market, None, end_date, ['overall_score']
+                )
+
+                weights = self._align_weights(
+                    signal['date'], signal['overall_score'], dates, thresholds, position_sizes
+                )
+                result, equity = compute_metrics(returns, weights, cost_bps, periods_per_year, return_curve=True)
+                result['start_date'] = dates[0] if len(dates) else None
+                result['end_date'] = dates[-1] if len(dates) else None
+                result['signals'] = int(len(signal['date']))
+
+                if include_curve:
+                    result['equity_curve'] = [
+                        {'date': date, 'equity': round(value, 6)}
+                        for date, value in zip(dates.tolist(), equity.tolist())
+                    ]
+
+                results[market] = result
+
+            return {
+                'markets': results,
+                'cost_bps': cost_bps,
+                'position_sizes': position_sizes
+            }
+
+        except Exception as e:
+            self.logger.error(f"回测失败: {e}")
+            raise
+
+    def _align_weights(self, signal_dates: np.ndarray, scores: np.ndarray,
+                       return_dates: np.ndarray, thresholds: Dict[str, float],
+                       position_sizes: Dict[str, float]) -> np.ndarray:
+        """
+        将信号对齐到收益率日期
+
+        某日的收益使用该日之前（不含当日）最近一次信号决定的仓位，避免前视偏差
+        """
+        if len(signal_dates) == 0 or len(return_dates) == 0:
+            return np.zeros(len(return_dates))
+
+        fractions = position_fractions(np.nan_to_num(scores), thresholds, position_sizes)
+        index = np.searchsorted(np.asarray(signal_dates, dtype=str), return_dates, side='left') - 1
+        return np.where(index >= 0, fractions[np.clip(index, 0, None)], 0.0)
+
+    def load_return_series(self, market: str, series: Optional[Dict[str, Any]],
+                            start_date: Optional[str],
+                            end_date: Optional[str]) -> Tuple[np.ndarray, np.ndarray]:
+        """加载收益率序列：(日期数组, 收益率数组)，按日期升序"""
+        if series is None:
+            series = self._read_price_file(market)
+
+        dates = np.asarray(series['dates'], dtype=str)
+        if 'returns' in series:
+            field = 'returns'
+        elif 'prices' in series:
+            field = 'prices'
+        else:
+            raise ValueError(f"市场 {market} 的序列需要包含prices或returns")
+
+        values = np.asarray(series[field], dtype=float)
+        if values.shape != dates.shape:
+            raise ValueError(f"市场 {market} 的dates与{field}长度不一致: {len(dates)} != {len(values)}")
+
+        order = np.argsort(dates, kind='stable')
+        dates = dates[order]
+        values = values[order]
+
+        if field == 'returns':
+            returns = values
+        else:
+            returns = values[1:] / values[:-1] - 1.0
+            dates = dates[1:]
+
+        mask = np.ones(len(dates), dtype=bool)
+        if start_date:
+            mask &= dates >= start_date
+        if end_date:
+            mask &= dates <= end_date
+        return dates[mask], returns[mask]
+
+    def _read_price_file(self, market: str) -> Dict[str, List[Any]]:
+        """读取本地价格文件（列：date, close 或 date, return）"""
+        price_dir = Path(config_manager.get('backtest.price_dir', 'data/prices'))
+        path = price_dir / f"{market}.csv"
+        if not path.exists():
+            raise ValueError(f"未找到市场 {market} 的价格文件: {path}")
+
+        with open(path, 'r', encoding='utf-8') as f:
+            rows = list(csv.DictReader(f))
+
+        dates = [row['date'] for row in rows]
+        if rows and 'return' in rows[0]:
+            return {'dates': dates, 'returns': [float(row['return']) for row in rows]}
+        return {'dates': dates, 'prices': [float(row['close']) for row in rows]}
@@ -0,0 +1,444 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+数据备份服务
+
+以"全量 + 增量链"的方式备份JSON数据文件：
+- 快照：单次打开数据文件后流式读取（数据文件以原子替换方式写入，
+  已打开的文件句柄始终对应同一个完整版本），不阻塞写入，也不整体加载到内存
+- 全量备份：快照的紧凑JSON压缩副本，同时生成记录索引（记录键 -> 摘要）
+- 增量备份：与上一次备份的索引比较，只保存新增、修改和删除的记录
+- 恢复：解压全量备份后按顺序重放增量
+- 保留策略：只保留最近N条备份链（全量及其增量）
+- 文本块：AI分析全文的文本块文件按文件名增量复制到备份目录的blobs子目录
+
+压缩优先使用zstd（需安装可选依赖zstandard），未安装时回退为gzip
+"""
+
+import hashlib
+import json
+import logging
+import os
+import shutil
+import threading
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Any, Optional, Tuple
+
+from ..utils.compression import COMPRESSION_SUFFIXES, open_compressed, resolve_compression
+from ..utils.config import config_manager
+from ..utils.json_stream import JsonCollectionStream
+
+MANIFEST_NAME = 'manifest.json'
+LOCK_NAME = '.backup.lock'
+# 超过该时长的锁文件视为进程异常退出后的残留
+STALE_LOCK_SECONDS = 3600
+
+
+def _digest(value: Any) -> str:
+    """记录内容摘要"""
+    canonical = json.dumps(value, sort_keys=True, ensure_ascii=False, separators=(',', ':'))
+    return hashlib.blake2b(canonical.encode('utf-8'), digest_size=8).hexdigest()
+
+
+def _keyed(records) -> Iterator:
+    """
+    逐条产出 (记录键, 记录)
+
+    记录键为ID加上该ID在集合中的出现序号（同一秒生成的ID可能重复），
+    没有ID的记录使用其在集合中的位置
+    """
+    occurrences: Dict[str, int] = {}
+    for position, record in enumerate(records):
+        record_id = record.get('id') if isinstance(record, dict) else None
+        if record_id is None:
+            yield f"@{position}", record
+            continue
+        record_id = str(record_id)
+        count = occurrences.get(record_id, 0)
+        occurrences[record_id] = count + 1
+        yield f"{record_id}#{count}", record
+
+
+class BackupService:
+    """全量 + 增量备份"""
+
+    def __init__(self, data_file: Optional[Path] = None, backup_dir: Optional[str] = None):
+        self.data_file = Path(data_file or config_manager.get('database.file_path', 'data/application_data.json'))
+        self.backup_dir = Path(backup_dir or config_manager.get('database.backup_path', 'data/backups'))
+        self.compression = resolve_compression(config_manager.get('database.backup_compression', 'zstd'))
+        self.full_every = int(config_manager.get('database.backup_full_every', 6))
+        self.retention = max(1, int(config_manager.get('database.backup_retention', 4)))
+        self.blob_dir = Path(config_manager.get('database.blob_path', 'data/blobs'))
+        self.logger = logging.getLogger(__name__)
+
+    def backup(self, force_full: bool = False) -> Dict[str, Any]:
+        """
+        执行一次备份
+
+        当前备份链不存在、增量数达到backup_full_every或force_full时做全量备份，否则做增量备份；
+        与上次备份相比没有变化时不写入文件
+
+        Args:
+            force_full: 是否强制全量备份
+
+        Returns:
+            Dict[str, Any]: 备份类型、文件名、记录数、变更数和耗时
+        """
+        self.backup_dir.mkdir(parents=True, exist_ok=True)
+        with self._exclusive():
+            started = time.perf_counter()
+            manifest = self._load_manifest()
+            chain = manifest['chains'][-1] if manifest['chains'] else None
+            previous_index = self._load_index(manifest) if chain else None
+
+            full = force_full or previous_index is None or len(chain['deltas']) >= self.full_every
+            timestamp = datetime.now().strftime('%Y%m%d_%H%M%S_%f')
+            suffix = COMPRESSION_SUFFIXES[self.compression]
+
+            if full:
+                name = f"full_{timestamp}.json{suffix}"
+                index, stats = self._write_full(self.backup_dir / name)
+                manifest['chains'].append({'full': name, 'created_at': datetime.now().isoformat(), 'deltas': []})
+            else:
+                name = f"delta_{timestamp}.json{suffix}"
+                index, stats = self._write_delta(self.backup_dir / name, previous_index, manifest['latest'])
+                if stats['changed'] == 0:
+                    stats['blobs'] = self._copy_blobs(self.blob_dir, self.backup_dir / 'blobs')
+                    manifest['updated_at'] = datetime.now().isoformat()
+                    self._save_manifest(manifest)
+                    return {'type': 'unchanged', 'file': None,
+                            'seconds': round(time.perf_counter() - started, 3), **stats}
+                chain['deltas'].append(name)
+
+            # 索引与备份一一对应，清单更新前中断不会让后续增量基于错误的索引
+            index_name = f"index_{timestamp}.json{suffix}"
+            with open_compressed(self.backup_dir / index_name, 'w') as f:
+                json.dump(index, f, ensure_ascii=False, separators=(',', ':'))
+
+            stale = [manifest['index']] if manifest.get('index') else []
+            stale += self._apply_retention(manifest)
+            manifest.update({'latest': name, 'index': index_name, 'updated_at': datetime.now().isoformat()})
+            self._save_manifest(manifest)
+
+            # 清单更新后再删除过期文件，中途中断只会留下无人引用的文件
+            for file_name in stale:
+                (self.backup_dir / file_name).unlink(missing_ok=True)
+            stats['blobs'] = self._copy_blobs(self.blob_dir, self.backup_dir / 'blobs')
+
+            result = {
+                'type': 'full' if full else 'delta',
+                'file': name,
+                'size_bytes': (self.backup_dir / name).stat().st_size,
+                'seconds': round(time.perf_counter() - started, 3),
+                **stats
+            }
+            self.logger.info(f"数据备份成功: {name}（变更 {stats['changed']} 条）")
+            return result
+
+    def restore(self, target: Optional[Path] = None, upto: Optional[str] = None) -> Dict[str, Any]:
+        """
+        由全量备份和增量重放恢复数据文件
+
+        Args:
+            target: 恢复到的文件，默认为数据文件本身（原子替换）
+            upto: 恢复到指定的备份文件名（含），默认为最新备份
+
+        Returns:
+            Dict[str, Any]: 恢复目标、使用的备份文件和耗时
+        """
+        started = time.perf_counter()
+        files = self._restore_files(self._load_manifest(), upto)
+
+        # 状态：顶层键 -> ('records', {记录键: 记录}) 或 ('value', 值)
+        with open_compressed(self.backup_dir / files[0], 'r') as f:
+            document = json.load(f)
+        state = {
+            name: ('records', dict(_keyed(value))) if isinstance(value, list) else ('value', value)
+            for name, value in document.items()
+        }
+        del document
+
+        for delta_name in files[1:]:
+            with open_compressed(self.backup_dir / delta_name, 'r') as f:
+                state = self._apply_delta(state, json.load(f))
+
+        document = {
+            name: list(value.values()) if kind == 'records' else value
+            for name, (kind, value) in state.items()
+        }
+
+        target = Path(target or self.data_file)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = target.with_name(f".{target.name}.restore.tmp")
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(document, f, indent=2, ensure_ascii=False)
+        os.replace(tmp_path, target)
+        self._copy_blobs(self.backup_dir / 'blobs', self.blob_dir)
+
+        self.logger.info(f"数据恢复完成: {target}，重放 {len(files) - 1} 个增量")
+        return {'target': str(target), 'files': files, 'seconds': round(time.perf_counter() - started, 3)}
+
+    def list_backups(self) -> List[Dict[str, Any]]:
+        """列出全部备份链（由旧到新）"""
+        return self._load_manifest()['chains']
+
+    def last_backup_time(self) -> Optional[float]:
+        """最近一次执行备份（含无变更）的时间戳（秒），没有备份时返回None"""
+        updated_at = self._load_manifest().get('updated_at')
+        return datetime.fromisoformat(updated_at).timestamp() if updated_at else None
+
+    @staticmethod
+    def _copy_blobs(source: Path, destination: Path) -> int:
+        """
+        复制目标目录中还没有的文本块文件
+
+        文本块按内容寻址且写入后不再修改，按文件名比较即可实现增量复制；
+        备份中的文本块不随备份链过期删除
+        """
+        if not source.exists():
+            return 0
+
+        copied = 0
+        for path in source.glob('*/*'):
+            if path.name.startswith('.') or not path.is_file():
+                continue
+            target = destination / path.parent.name / path.name
+            if not target.exists():
+                target.parent.mkdir(parents=True, exist_ok=True)
+                shutil.copy2(path, target)
+                copied += 1
+        return copied
+
+    def _write_full(self, path: Path) -> Tuple[Dict[str, Any], Dict[str, int]]:
+        """流式写入全量备份，同时生成索引"""
+        index: Dict[str, Any] = {'order': [], 'collections': {}, 'values': {}}
+        records_count = 0
+
+        with open_compressed(path, 'w') as f:
+            f.write('{')
+            for position, (name, value) in enumerate(JsonCollectionStream(self.data_file).iter_top_level()):
+                index['order'].append(name)
+                f.write((',' if position else '') + json.dumps(name, ensure_ascii=False) + ':')
+
+                if isinstance(value, Iterator):
+                    keys, digests = [], []
+                    f.write('[')
+                    for i, (key, record) in enumerate(_keyed(value)):
+                        f.write((',' if i else '') + json.dumps(record, ensure_ascii=False, separators=(',', ':')))
+                        keys.append(key)
+                        digests.append(_digest(record))
+                    f.write(']')
+                    index['collections'][name] = {'keys': keys, 'digests': digests}
+                    records_count += len(keys)
+                else:
+                    f.write(json.dumps(value, ensure_ascii=False, separators=(',', ':')))
+                    index['values'][name] = _digest(value)
+            f.write('}')
+
+        return index, {'records': records_count, 'changed': records_count}
+
+    def _write_delta(self, path: Path, previous: Dict[str, Any],
+                     base: str) -> Tuple[Dict[str, Any], Dict[str, int]]:
+        """与上次备份的索引比较，有变更时写入增量文件"""
+        index: Dict[str, Any] = {'order': [], 'collections': {}, 'values': {}}
+        delta: Dict[str, Any] = {'base': base, 'created_at': datetime.now().isoformat(),
+                                 'order': index['order'], 'collections': {}, 'values': {}}
+        records_count = changed = 0
+
+        for name, value in JsonCollectionStream(self.data_file).iter_top_level():
+            index['order'].append(name)
+            if not isinstance(value, Iterator):
+                digest = index['values'][name] = _digest(value)
+                if previous['values'].get(name) != digest:
+                    delta['values'][name] = value
+                    changed += 1
+                continue
+
+            old = previous['collections'].get(name)
+            old_keys = old['keys'] if old else []
+            old_digests = dict(zip(old_keys, old['digests'])) if old else {}
+            keys, digests, upsert = [], [], []
+            for key, record in _keyed(value):
+                digest = _digest(record)
+                keys.append(key)
+                digests.append(digest)
+                if old_digests.get(key) != digest:
+                    upsert.append([key, record])
+
+            current = set(keys)
+            deleted = [key for key in old_keys if key not in current]
+            # 恢复时保留原有记录的顺序、新记录依次追加；与实际顺序不一致时保存完整顺序
+            expected = [key for key in old_keys if key in current] + [key for key in keys if key not in old_digests]
+
+            entry: Dict[str, Any] = {}
+            if upsert:
+                entry['upsert'] = upsert
+            if deleted:
+                entry['delete'] = deleted
+            if expected != keys:
+                entry['order'] = keys
+            if entry or old is None:
+                delta['collections'][name] = entry
+                changed += len(upsert) + len(deleted) + int('order' in entry or old is None)
+
+            index['collections'][name] = {'keys': keys, 'digests': digests}
+            records_count += len(keys)
+
+        if index['order'] != previous['order']:
+            changed += 1
+
+        if changed:
+            with open_compressed(path, 'w') as f:
+                json.dump(delta, f, ensure_ascii=False, separators=(',', ':'))
+        return index, {'records': records_count, 'changed': changed}
+
+    @staticmethod
+    def _apply_delta(state: Dict[str, Tuple[str, Any]], delta: Dict[str, Any]) -> Dict[str, Tuple[str, Any]]:
+        """将一个增量应用到恢复状态"""
+        for name, entry in delta['collections'].items():
+            kind, records = state.get(name, ('records', {}))
+            if kind != 'records':
+                records = {}
+            for key in entry.get('delete', []):
+                records.pop(key, None)
+            for key, record in entry.get('upsert', []):
+                records[key] = record
+            if 'order' in entry:
+                records = {key: records[key] for key in entry['order']}
+            state[name] = ('records', records)
+
+        for name, value in delta['values'].items():
+            state[name] = ('value', value)
+
+        return {name: state[name] for name in delta['order']}
+
+    def _restore_files(self, manifest: Dict[str, Any], upto: Optional[str]) -> List[str]:
+        """恢复到指定备份所需的文件：所在链的全量备份及其之前的增量"""
+        upto = upto or manifest.get('latest')
+        for chain in manifest['chains']:
+            files = [chain['full']] + chain['deltas']
+            if upto in files:
+                return files[:files.index(upto) + 1]
+        raise ValueError(f"备份不存在: {upto}" if upto else "没有可用的备份")
+
+    def _apply_retention(self, manifest: Dict[str, Any]) -> List[str]:
+        """只保留最近retention条备份链，返回需要删除的文件"""
+        removed = []
+        while len(manifest['chains']) > self.retention:
+            chain = manifest['chains'].pop(0)
+            removed += [chain['full']] + chain['deltas']
+        return removed
+
+    def _load_manifest(self) -> Dict[str, Any]:
+        path = self.backup_dir / MANIFEST_NAME
+        if not path.exists():
+            return {'version': 1, 'chains': [], 'latest': None, 'index': None}
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def _save_manifest(self, manifest: Dict[str, Any]):
+        """原子写入清单"""
+        path = self.backup_dir / MANIFEST_NAME
+        tmp_path = path.with_name(path.name + '.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, indent=2, ensure_ascii=False)
+        os.replace(tmp_path, path)
+
+    def _load_index(self, manifest: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """加载最近一次备份的索引，缺失或损坏时返回None（改做全量备份）"""
+        if not manifest.get('index'):
+            return None
+        try:
+            with open_compressed(self.backup_dir / manifest['index'], 'r') as f:
+                return json.load(f)
+        except Exception as e:
+            self.logger.warning(f"备份索引不可用，将执行全量备份: {e}")
+            return None
+
+    @contextmanager
+    def _exclusive(self):
+        """跨进程的备份互斥锁（锁文件），避免多个进程同时修改备份链"""
+        path = self.backup_dir / LOCK_NAME
+        try:
+            fd = os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+        except FileExistsError:
+            if time.time() - path.stat().st_mtime < STALE_LOCK_SECONDS:
+                raise RuntimeError("其他进程正在执行备份")
+            self.logger.warning("清理残留的备份锁文件")
+            path.unlink(missing_ok=True)
+            fd = os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+
+        try:
+            os.write(fd, str(os.getpid()).encode('ascii'))
+            os.close(fd)
+            yield
+        finally:
+            path.unlink(missing_ok=True)
+
+
+class BackupScheduler:
+    """按backup_interval_hours定期执行备份的后台线程"""
+
+    def __init__(self, service: BackupService, interval_hours: float):
+        self.service = service
+        self.interval = interval_hours * 3600
+        self.logger = logging.getLogger(__name__)
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name='backup-scheduler', daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout: Optional[float] = None):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def next_delay(self) -> float:
+        """距离下次备份的秒数，按最近一次备份的时间计算（重启后不会立即重复备份）"""
+        try:
+            last = self.service.last_backup_time()
+        except Exception:
+            last = None
+        return 0.0 if last is None else max(0.0, last + self.interval - time.time())
+
+    def _run(self):
+        while not self._stop.wait(self.next_delay()):
+            try:
+                self.service.backup()
+            except Exception as e:
+                self.logger.error(f"定时备份失败: {e}")
+                # 失败后等待一个周期再重试，避免连续失败刷屏
+                if self._stop.wait(self.interval):
+                    return
+
+
+_scheduler: Optional[BackupScheduler] = None
+_scheduler_lock = threading.Lock()
+
+
+def start_backup_scheduler() -> Optional[BackupScheduler]:
+    """
+    按配置启动进程内唯一的定时备份线程
+
+    Returns:
+        Optional[BackupScheduler]: 调度器，未启用备份或间隔不大于0时返回None
+    """
+    global _scheduler
+    interval = float(config_manager.get('database.backup_interval_hours', 24) or 0)
+    if not config_manager.get('database.backup_enabled', True) or interval <= 0:
+        return None
+
+    with _scheduler_lock:
+        if _scheduler is None:
+            _scheduler = BackupScheduler(BackupService(), interval)
+        _scheduler.start()
+    logging.getLogger(__name__).info(f"定时备份已启动，间隔 {interval} 小时")
+    return _scheduler
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+内容寻址的文本块存储
+
+AI分析全文等较大的文本按SHA-256内容哈希压缩保存为独立文件
+（<根目录>/<哈希前两位>/<哈希>.zst|.gz），数据记录中只保留引用。
+相同内容只保存一份，文件写入后不再修改
+"""
+
+import hashlib
+import logging
+import os
+import re
+import tempfile
+from pathlib import Path
+from typing import Iterator, Optional
+
+from ..utils.compression import COMPRESSION_SUFFIXES, compress_bytes, decompress_file, resolve_compression
+
+REF_PREFIX = 'sha256:'
+_DIGEST = re.compile(r'[0-9a-f]{64}')
+
+
+class BlobStore:
+    """内容寻址的压缩文本存储"""
+
+    def __init__(self, root: str, compression: Optional[str] = None):
+        self.root = Path(root)
+        self.compression = resolve_compression(compression)
+        self.logger = logging.getLogger(__name__)
+
+    def put(self, text: str) -> str:
+        """
+        保存文本
+
+        Args:
+            text: 文本内容
+
+        Returns:
+            str: 引用（sha256:<哈希>）
+        """
+        data = text.encode('utf-8')
+        digest = hashlib.sha256(data).hexdigest()
+        if self._find(digest) is not None:
+            return REF_PREFIX + digest
+
+        path = self.root / digest[:2] / f"{digest}{COMPRESSION_SUFFIXES[self.compression]}"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(prefix=f".{digest}.", suffix='.tmp', dir=path.parent)
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(compress_bytes(data, self.compression))
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+        return REF_PREFIX + digest
+
+    def get(self, ref: str) -> str:
+        """
+        读取文本
+
+        Args:
+            ref: put返回的引用
+
+        Returns:
+            str: 文本内容
+        """
+        digest = self._digest(ref)
+        path = self._find(digest)
+        if path is None:
+            raise FileNotFoundError(f"文本块不存在: {ref}")
+
+        data = decompress_file(path)
+        if hashlib.sha256(data).hexdigest() != digest:
+            raise ValueError(f"文本块内容校验失败: {ref}")
+        return data.decode('utf-8')
+
+    def exists(self, ref: str) -> bool:
+        return self._find(self._digest(ref)) is not None
+
+    def iter_files(self) -> Iterator[Path]:
+        """全部文本块文件"""
+        if not self.root.exists():
+            return
+        for path in sorted(self.root.glob('*/*')):
+            if path.suffix in COMPRESSION_SUFFIXES.values() and not path.name.startswith('.'):
+                yield path
+
+    @staticmethod
+    def is_ref(value) -> bool:
+        return isinstance(value, str) and value.startswith(REF_PREFIX)
+
+    def _digest(self, ref: str) -> str:
+        digest = ref[len(REF_PREFIX):] if self.is_ref(ref) else ''
+        if not _DIGEST.fullmatch(digest):
+            raise ValueError(f"无效的文本块引用: {ref}")
+        return digest
+
+    def _find(self, digest: str) -> Optional[Path]:
+        """查找文本块文件（兼容以不同压缩算法保存的文件）"""
+        for suffix in COMPRESSION_SUFFIXES.values():
+            path = self.root / digest[:2] / f"{digest}{suffix}"
+            if path.exists():
+                return path
+        return None
@@ -0,0 +1,375 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+列式存储层
+
+将各数据集合按 市场/年份 分区保存为NumPy .npy列文件，
+读取时使用内存映射，单分区范围查询直接返回视图而不复制数据
+"""
+
+import json
+import logging
+import os
+import shutil
+from pathlib import Path
+from typing import Dict, List, Any, Optional, Iterator
+
+import numpy as np
+
+
+# 各集合的列定义：字段名 -> 类型（f: 数值, U: 字符串）
+# 带点号的字段表示嵌套字段，如 technical_indicators.rsi
+COLLECTION_SCHEMAS: Dict[str, Dict[str, str]] = {
+    'macro_data': {
+        'pmi': 'f',
+        'cpi': 'f',
+        'ppi': 'f',
+        'm2': 'f',
+        'interest_rate': 'f'
+    },
+    'market_sentiment': {
+        'volatility': 'f',
+        'investor_sentiment': 'f',
+        'technical_indicators.rsi': 'f',
+        'technical_indicators.macd': 'f',
+        'technical_indicators.bollinger_bands': 'f'
+    },
+    'industry_data': {
+        'industry': 'U',
+        'free_cash_flow': 'f',
+        'industry_sentiment': 'f'
+    },
+    'timing_indicators': {
+        'overall_score': 'f',
+        'macro_score': 'f',
+        'industry_score': 'f',
+        'sentiment_score': 'f',
+        'strength_level': 'U'
+    }
+}
+
+# 每个分区都包含的键列
+KEY_COLUMNS = ('date', 'id')
+
+
+def _get_field(record: Dict[str, Any], field: str) -> Any:
+    """读取（可能嵌套的）字段值"""
+    value: Any = record
+    for part in field.split('.'):
+        if not isinstance(value, dict):
+            return None
+        value = value.get(part)
+    return value
+
+
+def _to_column(values: List[Any], kind: str) -> np.ndarray:
+    """将字段值列表转换为列数组"""
+    if kind == 'f':
+        column = np.full(len(values), np.nan, dtype=np.float64)
+        for i, value in enumerate(values):
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                column[i] = value
+        return column
+
+    strings = ['' if value is None else str(value) for value in values]
+    width = max((len(item) for item in strings), default=1) or 1
+    return np.array(strings, dtype=f'<U{width}')
+
+
+def _empty_column(kind: str) -> np.ndarray:
+    """空列"""
+    return np.empty(0, dtype=np.float64 if kind == 'f' else '<U1')
+
+
+def records_to_columns(collection: str, records: List[Dict[str, Any]],
+                       fields: Optional[List[str]] = None) -> Dict[str, np.ndarray]:
+    """
+    将字典记录列表转换为与read_columns相同结构的列数据
+
+    Args:
+        collection: 集合名称
+        records: 数据记录（保持传入顺序）
+        fields: 需要的字段，默认全部
+
+    Returns:
+        Dict[str, np.ndarray]: 字段名 -> 列数组，包含date和id
+    """
+    schema = COLLECTION_SCHEMAS[collection]
+    fields = list(fields) if fields is not None else list(schema)
+
+    columns = {name: _to_column([r.get(name) for r in records], 'U') for name in KEY_COLUMNS}
+    for name in fields:
+        if name not in KEY_COLUMNS:
+            columns[name] = _to_column([_get_field(r, name) for r in records], schema.get(name, 'f'))
+    return columns
+
+
+class ColumnarStore:
+    """按市场/年份分区的列式存储"""
+
+    def __init__(self, root: str):
+        self.root = Path(root)
+        self.logger = logging.getLogger(__name__)
+
+    def is_built(self) -> bool:
+        """列式存储是否已经构建"""
+        return (self.root / 'manifest.json').exists()
+
+    def rebuild(self, data: Dict[str, Any]):
+        """
+        根据完整数据文档重建列式存储
+
+        Args:
+            data: _load_data返回的数据文档
+        """
+        for collection in COLLECTION_SCHEMAS:
+            collection_dir = self.root / collection
+            if collection_dir.exists():
+                shutil.rmtree(collection_dir)
+
+            partitions: Dict[tuple, List[Dict[str, Any]]] = {}
+            for record in data.get(collection, []):
+                key = self._partition_key(record)
+                if key is not None:
+                    partitions.setdefault(key, []).append(record)
+
+            for (market, year), records in partitions.items():
+                self._write_partition(collection, market, year, records)
+
+        self._write_manifest()
+        self.logger.info(f"列式存储重建完成: {self.root}")
+
+    def append(self, collection: str, record: Dict[str, Any]):
+        """
+        追加单条记录（重写该记录所在的市场/年份分区）
+
+        Args:
+            collection: 集合名称
+            record: 数据记录
+        """
+        if collection not in COLLECTION_SCHEMAS:
+            return
+
+        key = self._partition_key(record)
+        if key is None:
+            return
+
+        market, year = key
+        existing = self._read_partition(collection, market, year)
+        records = list(self.iter_rows(collection, existing, market))
+        records.append(record)
+        self._write_partition(collection, market, year, records)
+
+    def clear(self):
+        """删除清单和全部集合分区"""
+        manifest = self.root / 'manifest.json'
+        if manifest.exists():
+            manifest.unlink()
+        for collection in COLLECTION_SCHEMAS:
+            collection_dir = self.root / collection
+            if collection_dir.exists():
+                shutil.rmtree(collection_dir)
+
+    def mark_built(self):
+        """写入清单，标记存储可供读取（批量写入全部完成后调用）"""
+        self._write_manifest()
+
+    def write_batch(self, collection: str, records: List[Dict[str, Any]]) -> int:
+        """
+        批量写入记录：按市场/年份分组后与已有分区合并，每个分区只重写一次
+
+        与已有记录ID相同的记录以新记录为准，重复写入同一批次结果不变
+
+        Args:
+            collection: 集合名称
+            records: 数据记录
+
+        Returns:
+            int: 写入的记录数（无法确定分区的记录被跳过）
+        """
+        partitions: Dict[tuple, List[Dict[str, Any]]] = {}
+        for record in records:
+            key = self._partition_key(record)
+            if key is not None:
+                partitions.setdefault(key, []).append(record)
+
+        for (market, year), batch in partitions.items():
+            ids = {str(record['id']) for record in batch if record.get('id')}
+            existing = self._read_partition(collection, market, year)
+            kept = [
+                record for record in self.iter_rows(collection, existing, market)
+                if not record.get('id') or record['id'] not in ids
+            ]
+            self._write_partition(collection, market, year, kept + batch)
+
+        return sum(len(batch) for batch in partitions.values())
+
+    def iter_partitions(self, collection: str) -> Iterator[tuple]:
+        """
+        逐个读取集合的全部分区
+
+        Yields:
+            tuple: (市场, 年份, 列数据)
+        """
+        collection_dir = self.root / collection
+        if not collection_dir.exists():
+            return
+
+        for market_dir in sorted(item for item in collection_dir.iterdir() if item.is_dir()):
+            for year in self._years(collection, market_dir.name, None, None):
+                if not year.startswith('.'):
+                    yield market_dir.name, year, self._read_partition(collection, market_dir.name, year)
+
+    def read_columns(self, collection: str, market: str,
+                     start_date: Optional[str] = None,
+                     end_date: Optional[str] = None,
+                     fields: Optional[List[str]] = None) -> Dict[str, np.ndarray]:
+        """
+        范围读取列数据（按日期、ID升序）
+
+        只涉及一个分区时返回内存映射上的切片视图，跨年份时拼接各分区
+
+        Args:
+            collection: 集合名称
+            market: 市场类型
+            start_date: 开始日期
+            end_date: 结束日期
+            fields: 需要的字段，默认全部
+
+        Returns:
+            Dict[str, np.ndarray]: 字段名 -> 列数组，包含date和id
+        """
+        schema = COLLECTION_SCHEMAS[collection]
+        fields = list(fields) if fields is not None else list(schema)
+        names = list(KEY_COLUMNS) + [field for field in fields if field not in KEY_COLUMNS]
+
+        pieces: Dict[str, List[np.ndarray]] = {name: [] for name in names}
+        for year in self._years(collection, market, start_date, end_date):
+            partition = self._read_partition(collection, market, year, names)
+            dates = partition['date']
+            lo = np.searchsorted(dates, start_date, side='left') if start_date else 0
+            hi = np.searchsorted(dates, end_date, side='right') if end_date else len(dates)
+            if hi <= lo:
+                continue
+            for name in names:
+                pieces[name].append(partition[name][lo:hi])
+
+        columns = {}
+        for name in names:
+            kind = 'U' if name in KEY_COLUMNS else schema.get(name, 'f')
+            if not pieces[name]:
+                columns[name] = _empty_column(kind)
+            elif len(pieces[name]) == 1:
+                columns[name] = pieces[name][0]
+            else:
+                columns[name] = np.concatenate(pieces[name])
+        return columns
+
+    def iter_rows(self, collection: str, columns: Dict[str, np.ndarray],
+                  market: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+        """
+        按需将列数据物化为字典记录
+
+        Args:
+            collection: 集合名称
+            columns: read_columns返回的列数据
+            market: 市场类型，提供时写入每条记录
+
+        Yields:
+            Dict[str, Any]: 数据记录（缺失数值为None，嵌套字段还原为子字典）
+        """
+        schema = COLLECTION_SCHEMAS[collection]
+        for i in range(len(columns['date'])):
+            record: Dict[str, Any] = {'market': market} if market is not None else {}
+            for name, column in columns.items():
+                value = column[i].item()
+                if schema.get(name) == 'f' and value != value:
+                    value = None
+                elif isinstance(value, str) and value == '' and name not in KEY_COLUMNS:
+                    value = None
+                if value is None and name not in KEY_COLUMNS:
+                    continue
+
+                parent, _, child = name.rpartition('.')
+                if parent:
+                    record.setdefault(parent, {})[child] = value
+                else:
+                    record[name] = value
+            yield record
+
+    def _partition_key(self, record: Dict[str, Any]) -> Optional[tuple]:
+        """记录所属分区：(市场, 年份)"""
+        market = record.get('market')
+        date = str(record.get('date', ''))
+        if not market or len(date) < 4 or not date[:4].isdigit():
+            return None
+        return (str(market), date[:4])
+
+    def _partition_dir(self, collection: str, market: str, year: str) -> Path:
+        return self.root / collection / market / year
+
+    def _years(self, collection: str, market: str,
+               start_date: Optional[str], end_date: Optional[str]) -> List[str]:
+        """范围内存在数据的年份分区"""
+        market_dir = self.root / collection / market
+        if not market_dir.exists():
+            return []
+
+        years = sorted(item.name for item in market_dir.iterdir() if item.is_dir())
+        if start_date:
+            years = [year for year in years if year >= start_date[:4]]
+        if end_date:
+            years = [year for year in years if year <= end_date[:4]]
+        return years
+
+    def _read_partition(self, collection: str, market: str, year: str,
+                        names: Optional[List[str]] = None) -> Dict[str, np.ndarray]:
+        """以内存映射方式读取分区列"""
+        schema = COLLECTION_SCHEMAS[collection]
+        names = names or list(KEY_COLUMNS) + list(schema)
+        partition_dir = self._partition_dir(collection, market, year)
+
+        columns = {}
+        for name in names:
+            path = partition_dir / f"{name}.npy"
+            kind = 'U' if name in KEY_COLUMNS else schema.get(name, 'f')
+            columns[name] = np.load(path, mmap_mode='r') if path.exists() else _empty_column(kind)
+
+        # 分区内缺少某列时按行数补齐
+        size = len(columns['date'])
+        for name in names:
+            if len(columns[name]) != size:
+                kind = 'U' if name in KEY_COLUMNS else schema.get(name, 'f')
+                columns[name] = _to_column([None] * size, kind)
+        return columns
+
+    def _write_partition(self, collection: str, market: str, year: str,
+                         records: List[Dict[str, Any]]):
+        """写入分区（按日期、ID升序，先写临时目录再替换）"""
+        schema = COLLECTION_SCHEMAS[collection]
+        records = sorted(records, key=lambda r: (str(r.get('date', '')), str(r.get('id', ''))))
+
+        partition_dir = self._partition_dir(collection, market, year)
+        tmp_dir = partition_dir.with_name(f".{year}.tmp")
+        if tmp_dir.exists():
+            shutil.rmtree(tmp_dir)
+        tmp_dir.mkdir(parents=True)
+
+        for name in KEY_COLUMNS:
+            np.save(tmp_dir / f"{name}.npy", _to_column([r.get(name) for r in records], 'U'))
+        for name, kind in schema.items():
+            np.save(tmp_dir / f"{name}.npy", _to_column([_get_field(r, name) for r in records], kind))
+
+        if partition_dir.exists():
+            shutil.rmtree(partition_dir)
+        os.replace(tmp_dir, partition_dir)
+
+    def _write_manifest(self):
+        """写入清单文件"""
+        self.root.mkdir(parents=True, exist_ok=True)
+        manifest = {
+            'format': 'npy',
+            'collections': {name: list(schema) for name, schema in COLLECTION_SCHEMAS.items()}
+        }
+        with open(self.root / 'manifest.json', 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, indent=2, ensure_ascii=False)
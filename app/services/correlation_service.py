@@ -0,0 +1,274 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+相关性矩阵服务
+
+维护各市场指标序列（市场 x 指标）两两之间的协方差累加量：
+首次使用时由完整数据批量计算，之后保存记录时按Welford方式增量更新，
+同一市场、同一日期的指标重复保存时先移除旧值再加入新值。
+两个序列只在双方都有数据的日期上计算（成对完整观测）。
+滚动窗口矩阵按最近N个日期批量计算，并在数据未变化时复用缓存
+"""
+
+import logging
+import threading
+from pathlib import Path
+from typing import Dict, List, Any, Optional, Tuple
+
+import numpy as np
+
+from ..utils.metrics import record_cache
+from .segment_store import file_stamp
+
+# 参与相关性计算的集合与字段
+TRACKED_FIELDS = {
+    'macro_data': ['pmi', 'cpi', 'ppi', 'm2', 'interest_rate'],
+    'market_sentiment': ['volatility', 'investor_sentiment'],
+    'timing_indicators': ['overall_score', 'macro_score', 'industry_score', 'sentiment_score']
+}
+INDICATORS = [field for fields in TRACKED_FIELDS.values() for field in fields]
+
+# 进程内的相关性状态：数据文件路径 -> CorrelationTracker
+_trackers: Dict[str, 'CorrelationTracker'] = {}
+_trackers_lock = threading.Lock()
+
+
+def _pairwise_moments(values: np.ndarray) -> Tuple[np.ndarray, ...]:
+    """
+    成对完整观测的计数、均值和离差平方/交叉积和
+
+    Args:
+        values: (日期数, 变量数) 矩阵，NaN表示缺失
+
+    Returns:
+        Tuple: (n, mean_a, mean_b, m2_a, m2_b, comoment)，均为 (变量数, 变量数)；
+               [i, j] 为在i、j都有数据的日期上，变量i（a）与变量j（b）的统计量
+    """
+    present = (~np.isnan(values)).astype(float)
+    filled = np.where(present > 0, values, 0.0)
+
+    n = present.T @ present
+    sums = filled.T @ present
+    squares = (filled * filled).T @ present
+    products = filled.T @ filled
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean_a = np.where(n > 0, sums / n, 0.0)
+    mean_b = mean_a.T.copy()
+    m2_a = np.maximum(squares - sums * mean_a, 0.0)
+    m2_b = m2_a.T.copy()
+    comoment = products - sums * mean_b
+    return n, mean_a, mean_b, m2_a, m2_b, comoment
+
+
+def _correlation(m2_a: np.ndarray, m2_b: np.ndarray, comoment: np.ndarray,
+                 n: np.ndarray, min_periods: int) -> np.ndarray:
+    """由累加量计算相关系数，观测不足或方差为0处为NaN"""
+    denominator = np.sqrt(m2_a * m2_b)
+    valid = (n >= min_periods) & (denominator > 0)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return np.where(valid, np.clip(comoment / denominator, -1.0, 1.0), np.nan)
+
+
+class CorrelationTracker:
+    """全部指标序列的相关性累加状态"""
+
+    def __init__(self, min_periods: int = 3):
+        self.min_periods = min_periods
+        self.labels: List[Tuple[str, str]] = []
+        self._index: Dict[Tuple[str, str], int] = {}
+        # 日期 -> {变量下标: 数值}
+        self._values: Dict[str, Dict[int, float]] = {}
+        self._moments = tuple(np.zeros((0, 0)) for _ in range(6))
+        self._window_cache: Dict[int, Tuple[int, np.ndarray, np.ndarray]] = {}
+        self.revision = 0
+        self.stamp: Optional[Tuple[int, int]] = None
+        self.lock = threading.Lock()
+
+    def build(self, data: Dict[str, Any]):
+        """根据完整数据文档批量计算累加量"""
+        self.labels, self._index, self._values = [], {}, {}
+        for collection in TRACKED_FIELDS:
+            for record in data.get(collection, []):
+                for var, value in self._extract(collection, record):
+                    self._values.setdefault(str(record['date']), {})[var] = value
+
+        self._moments = _pairwise_moments(self._matrix(sorted(self._values)))
+        self._window_cache.clear()
+        self.revision += 1
+
+    def observe(self, collection: str, record: Dict[str, Any]):
+        """加入一条新保存的记录，按Welford方式增量更新相关行列"""
+        if collection not in TRACKED_FIELDS or not record.get('date'):
+            return
+
+        date = str(record['date'])
+        for var, value in self._extract(collection, record):
+            row = self._values.setdefault(date, {})
+            if var in row:
+                self._update(var, row[var], row, remove=True)
+                del row[var]
+            row[var] = value
+            self._update(var, value, row, remove=False)
+
+        self._window_cache.clear()
+        self.revision += 1
+
+    def _extract(self, collection: str, record: Dict[str, Any]) -> List[Tuple[int, float]]:
+        """记录中需要跟踪的 (变量下标, 数值)"""
+        market = record.get('market')
+        if not market or not record.get('date'):
+            return []
+
+        result = []
+        for field in TRACKED_FIELDS[collection]:
+            value = record.get(field)
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                result.append((self._variable(market, field), float(value)))
+        return result
+
+    def _variable(self, market: str, field: str) -> int:
+        """获取变量下标，新变量时扩展累加矩阵"""
+        key = (market, field)
+        if key not in self._index:
+            self._index[key] = len(self.labels)
+            self.labels.append(key)
+            self._moments = tuple(np.pad(m, ((0, 1), (0, 1))) for m in self._moments)
+        return self._index[key]
+
+    def _update(self, var: int, value: float, row: Dict[int, float], remove: bool):
+        """
+        变量var在某日期新增（或移除）一个值，更新它与该日期所有已有变量的成对累加量
+
+        row须包含var本身（对角线即var的方差累加量）
+        """
+        n, mean_a, mean_b, m2_a, m2_b, comoment = self._moments
+        others = np.fromiter(row.keys(), dtype=np.intp, count=len(row))
+        y = np.fromiter(row.values(), dtype=float, count=len(row))
+        y[others == var] = value
+
+        count = n[var, others] + (-1 if remove else 1)
+        safe = np.where(count > 0, count, 1.0)
+        da = value - mean_a[var, others]
+        db = y - mean_b[var, others]
+
+        if remove:
+            new_mean_a = np.where(count > 0, mean_a[var, others] - da / safe, 0.0)
+            new_mean_b = np.where(count > 0, mean_b[var, others] - db / safe, 0.0)
+            new_m2_a = m2_a[var, others] - da * (value - new_mean_a)
+            new_m2_b = m2_b[var, others] - db * (y - new_mean_b)
+            new_comoment = comoment[var, others] - da * (y - new_mean_b)
+        else:
+            new_mean_a = mean_a[var, others] + da / safe
+            new_mean_b = mean_b[var, others] + db / safe
+            new_m2_a = m2_a[var, others] + da * (value - new_mean_a)
+            new_m2_b = m2_b[var, others] + db * (y - new_mean_b)
+            new_comoment = comoment[var, others] + da * (y - new_mean_b)
+
+        empty = count <= 0
+        n[var, others] = n[others, var] = np.maximum(count, 0)
+        mean_a[var, others] = mean_b[others, var] = new_mean_a
+        mean_b[var, others] = mean_a[others, var] = new_mean_b
+        m2_a[var, others] = m2_b[others, var] = np.where(empty, 0.0, np.maximum(new_m2_a, 0.0))
+        m2_b[var, others] = m2_a[others, var] = np.where(empty, 0.0, np.maximum(new_m2_b, 0.0))
+        comoment[var, others] = comoment[others, var] = np.where(empty, 0.0, new_comoment)
+
+    def _matrix(self, dates: List[str]) -> np.ndarray:
+        """指定日期的 (日期数, 变量数) 数值矩阵"""
+        values = np.full((len(dates), len(self.labels)), np.nan)
+        for i, date in enumerate(dates):
+            row = self._values[date]
+            if row:
+                values[i, list(row.keys())] = list(row.values())
+        return values
+
+    def correlation(self, window: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        全部变量的相关系数矩阵和成对观测数
+
+        Args:
+            window: 滚动窗口（最近的日期数），为空时使用全部历史
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: (相关系数矩阵, 观测数矩阵)
+        """
+        if window is not None and window < 1:
+            raise ValueError("窗口大小必须大于0")
+        if not window:
+            n, _, _, m2_a, m2_b, comoment = self._moments
+            return _correlation(m2_a, m2_b, comoment, n, self.min_periods), n.copy()
+
+        cached = self._window_cache.get(window)
+        hit = bool(cached) and cached[0] == self.revision
+        record_cache('correlation_window', hit)
+        if hit:
+            return cached[1], cached[2]
+
+        dates = sorted(self._values)[-window:]
+        n, _, _, m2_a, m2_b, comoment = _pairwise_moments(self._matrix(dates))
+        result = (_correlation(m2_a, m2_b, comoment, n, self.min_periods), n)
+        self._window_cache[window] = (self.revision,) + result
+        return result
+
+    def select(self, markets: Optional[List[str]] = None,
+               indicators: Optional[List[str]] = None) -> np.ndarray:
+        """按市场和指标筛选变量下标（按市场、指标配置顺序排列）"""
+        order = {field: i for i, field in enumerate(INDICATORS)}
+        selected = [
+            i for i, (market, field) in enumerate(self.labels)
+            if (not markets or market in markets) and (not indicators or field in indicators)
+        ]
+        selected.sort(key=lambda i: (self.labels[i][0], order[self.labels[i][1]]))
+        return np.array(selected, dtype=np.intp)
+
+
+def get_tracker(data_file: Path, load_data, min_periods: int = 3) -> CorrelationTracker:
+    """
+    获取数据文件对应的相关性状态，首次使用或文件被外部修改时重新批量计算
+
+    Args:
+        data_file: JSON数据文件
+        load_data: 加载完整数据文档的函数
+        min_periods: 计算相关系数所需的最少成对观测数
+
+    Returns:
+        CorrelationTracker: 相关性状态
+    """
+    key = str(data_file)
+    stamp = file_stamp(data_file)
+
+    with _trackers_lock:
+        tracker = _trackers.get(key)
+        if tracker is None:
+            tracker = _trackers[key] = CorrelationTracker(min_periods)
+
+    with tracker.lock:
+        tracker.min_periods = min_periods
+        if tracker.stamp != stamp:
+            tracker.build(load_data())
+            tracker.stamp = stamp
+            logging.getLogger(__name__).info(f"重建相关性矩阵: {len(tracker.labels)}个序列")
+    return tracker
+
+
+def observe_record(data_file: Path, collection: str, record: Dict[str, Any],
+                   previous_stamp: Optional[Tuple[int, int]]):
+    """
+    保存记录后增量更新相关性状态（尚未建立状态时不做处理，首次查询时会批量计算）
+
+    Args:
+        data_file: 已写入新记录的JSON数据文件
+        collection: 集合名称
+        record: 新保存的记录
+        previous_stamp: 写入前的文件标识，与状态不一致说明文件曾被外部修改，
+                        此时不做增量更新，留待下次查询时重建
+    """
+    tracker = _trackers.get(str(data_file))
+    if tracker is None:
+        return
+
+    with tracker.lock:
+        if tracker.stamp != previous_stamp:
+            return
+        tracker.observe(collection, record)
+        tracker.stamp = file_stamp(data_file)
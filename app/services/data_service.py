@@ -6,13 +6,53 @@
 负责数据的存储、查询、验证和备份
 """
 
+import base64
+import itertools
 import json
 import logging
+import os
+import tempfile
+import uuid
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Iterator, Tuple
 
+import numpy as np
+
+from ..models.timing_models import IndustryData, MacroData, MarketSentiment
+from ..models.validation import validate_record, validate_records
 from ..utils.config import config_manager
+from ..utils.file_lock import exclusive_lock
+from ..utils.json_stream import JsonCollectionStream
+from ..utils.metrics import timed
+from .backup_service import BackupService
+from .blob_store import BlobStore
+from .columnar_store import COLLECTION_SCHEMAS, ColumnarStore, records_to_columns
+from .correlation_service import observe_record
+from .event_broker import compact_delta, get_broker
+from .key_index import NATURAL_KEYS, RevisionLog, build_positions, get_index, natural_key
+from .segment_store import SegmentStore, file_stamp
+
+# 可录入的集合 -> (数据模型, ID前缀, 名称, 是否增量更新相关性矩阵)
+INGEST_COLLECTIONS = {
+    'macro_data': (MacroData, 'macro', '宏观数据', True),
+    'market_sentiment': (MarketSentiment, 'sentiment', '市场情绪数据', True),
+    'industry_data': (IndustryData, 'industry', '行业数据', False)
+}
+
+
+def new_record_ids(prefix: str, now: datetime, count: int = 1) -> List[str]:
+    """
+    生成记录ID：前缀_时间(微秒)_随机后缀，批量保存时追加补零的序号
+
+    ID在进程和同一秒内的多次保存之间唯一（列式存储按ID替换记录），
+    同一批次内按序号的字典序与保存顺序一致（分段存储、游标按(日期, ID)排序）
+    """
+    base = f"{prefix}_{now.strftime('%Y%m%d_%H%M%S_%f')}_{uuid.uuid4().hex[:8]}"
+    if count == 1:
+        return [base]
+    width = len(str(count - 1))
+    return [f"{base}_{i:0{width}d}" for i in range(count)]
 
 
 class DataService:
@@ -20,14 +60,24 @@ class DataService:
 
     def __init__(self):
         self.data_file = Path(config_manager.get('database.file_path', 'data/application_data.json'))
+        self._previous_stamp: Optional[Tuple[int, int]] = None
         self.logger = logging.getLogger(__name__)
         self._ensure_data_file()
+        self.columnar = self._init_columnar_store()
+        self.segment = self._init_segment_store()
+        self.blobs = self._init_blob_store()
+        self.upsert_enabled = config_manager.get('database.upsert_enabled', True)
+        self.revisions = self._init_revision_log()
 
     def _ensure_data_file(self):
-        """确保数据文件存在"""
+        """确保数据文件存在（多个工作进程同时启动时只有一个创建，其他进程不会截断已写入的数据）"""
         try:
-            if not self.data_file.exists():
-                self.data_file.parent.mkdir(parents=True, exist_ok=True)
+            if self.data_file.exists():
+                return
+            self.data_file.parent.mkdir(parents=True, exist_ok=True)
+            with self._write_lock():
+                if self.data_file.exists():
+                    return
                 initial_data = {
                     'macro_data': [],
                     'market_sentiment': [],
@@ -39,13 +89,320 @@ class DataService:
                         'last_updated': datetime.now().isoformat()
                     }
                 }
-                with open(self.data_file, 'w', encoding='utf-8') as f:
-                    json.dump(initial_data, f, indent=2, ensure_ascii=False)
+                self._write_document(initial_data)
                 self.logger.info(f"创建数据文件: {self.data_file}")
         except Exception as e:
             self.logger.error(f"创建数据文件失败: {e}")
             raise
 
+    def _init_columnar_store(self) -> Optional[ColumnarStore]:
+        """初始化可选的列式存储层"""
+        if not config_manager.get('database.columnar_enabled', False):
+            return None
+
+        try:
+            store = ColumnarStore(config_manager.get('database.columnar_path', 'data/columnar'))
+            if not store.is_built():
+                store.rebuild(self._load_data())
+            return store
+        except Exception as e:
+            self.logger.error(f"初始化列式存储失败，回退到JSON读取: {e}")
+            return None
+
+    def _init_segment_store(self) -> Optional[SegmentStore]:
+        """初始化可选的内存映射分段读取路径"""
+        if not config_manager.get('database.segment_enabled', False):
+            return None
+
+        segment_path = config_manager.get('database.segment_path')
+        if not segment_path:
+            segment_path = str(self.data_file.with_suffix('.seg'))
+        return SegmentStore(segment_path)
+
+    def _init_blob_store(self) -> Optional[BlobStore]:
+        """初始化AI分析全文的文本块存储"""
+        if not config_manager.get('database.blob_enabled', True):
+            return None
+        return BlobStore(config_manager.get('database.blob_path', 'data/blobs'),
+                         config_manager.get('database.blob_compression', 'zstd'))
+
+    def _init_revision_log(self) -> Optional[RevisionLog]:
+        """初始化被替换记录的修订历史"""
+        if not config_manager.get('database.revision_history', True):
+            return None
+
+        revision_path = config_manager.get('database.revision_path')
+        if not revision_path:
+            revision_path = str(self.data_file.with_suffix('.revisions.jsonl'))
+        return RevisionLog(revision_path)
+
+    def prepare_read_paths(self) -> bool:
+        """
+        预先构建派生的读取路径
+
+        列式存储在构造时已就绪，这里校验分段文件，不存在或过期时从JSON重建；
+        生产模式在fork工作进程之前调用一次
+
+        Returns:
+            bool: 分段读取路径是否可用
+        """
+        return self._segment_ready()
+
+    def _segment_ready(self) -> bool:
+        """分段文件是否可用（不存在或过期时从JSON重建）"""
+        if self.segment is None:
+            return False
+
+        try:
+            stamp = file_stamp(self.data_file)
+            if not self.segment.is_fresh(stamp):
+                self.segment.build(self._load_data(), stamp)
+            return True
+        except Exception as e:
+            self.logger.warning(f"分段文件不可用，回退到JSON读取: {e}")
+            return False
+
+    def _load_market_records(self, collection: str, market: str,
+                             start_date: Optional[str] = None,
+                             end_date: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        加载单个市场的记录
+
+        启用分段读取时只解码该市场日期范围内的记录，否则加载整个JSON文件后过滤
+        """
+        if self._segment_ready():
+            return self.segment.read_records(collection, market, start_date, end_date)
+
+        if config_manager.get('database.read_mode', 'json') == 'stream':
+            return list(self.stream_records(collection, market, start_date, end_date))
+
+        data = self._load_data()
+        return [
+            item for item in data.get(collection, [])
+            if item.get('market') == market
+        ]
+
+    def get_latest_records(self, collection: str, markets: List[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        获取各市场最新的一条记录（按日期、ID最大，与get_*结果的第一条一致）
+
+        启用分段读取时按市场索引直接定位，每个市场只解码最后一个日期的记录；
+        否则对集合只扫描一遍，任意数量的市场都只读取一次数据
+
+        Args:
+            collection: 集合名称
+            markets: 市场列表
+
+        Returns:
+            Dict[str, Dict[str, Any]]: 市场 -> 最新记录（没有记录的市场不在结果中）
+        """
+        wanted = set(markets)
+        if not wanted:
+            return {}
+
+        if self._segment_ready():
+            return self.segment.read_latest(collection, markets)
+
+        if config_manager.get('database.read_mode', 'json') == 'stream':
+            records = self.stream_records(collection)
+        else:
+            records = self._load_data().get(collection, [])
+
+        latest: Dict[str, Dict[str, Any]] = {}
+        for item in records:
+            market = item.get('market')
+            if market not in wanted:
+                continue
+            current = latest.get(market)
+            # 严格大于：键相同时保留文件中靠前的记录
+            if current is None or self._record_key(item) > self._record_key(current):
+                latest[market] = item
+        return latest
+
+    def stream_records(self, collection: str, market: Optional[str] = None,
+                       start_date: Optional[str] = None,
+                       end_date: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+        """
+        流式读取单个集合的记录
+
+        只解析目标集合，其他集合直接跳过；逐条按市场和日期过滤，
+        峰值内存取决于结果大小而非文件大小
+
+        Args:
+            collection: 集合名称
+            market: 市场类型
+            start_date: 开始日期
+            end_date: 结束日期
+
+        Yields:
+            Dict[str, Any]: 满足条件的记录（保持文件中的顺序）
+        """
+        try:
+            # ASCII市场名在JSON中的编码固定，可在解析前按字节预过滤
+            contains = None
+            if market is not None and market.isascii():
+                contains = json.dumps(market).encode('ascii')
+
+            stream = JsonCollectionStream(self.data_file)
+            for item in stream.iter_records(collection, contains):
+                if market is not None and item.get('market') != market:
+                    continue
+                date = item.get('date', '')
+                if start_date and date < start_date:
+                    continue
+                if end_date and date > end_date:
+                    continue
+                yield item
+        except Exception as e:
+            self.logger.error(f"流式读取数据文件失败: {e}")
+            raise
+
+    def _sync_columnar(self, collection: str, record: Dict[str, Any]):
+        """将新记录同步到列式存储"""
+        if self.columnar is None:
+            return
+
+        try:
+            self.columnar.append(collection, record)
+        except Exception as e:
+            self.logger.warning(f"同步列式存储失败: {e}")
+
+    def _sync_columnar_batch(self, collection: str, records: List[Dict[str, Any]]):
+        """将一批新记录同步到列式存储（每个分区只重写一次）"""
+        if self.columnar is None:
+            return
+
+        try:
+            self.columnar.write_batch(collection, records)
+        except Exception as e:
+            self.logger.warning(f"同步列式存储失败: {e}")
+
+    def _sync_correlation(self, collection: str, record: Dict[str, Any]):
+        """将新记录增量更新到相关性矩阵"""
+        try:
+            observe_record(self.data_file, collection, record, self._previous_stamp)
+        except Exception as e:
+            self.logger.warning(f"更新相关性矩阵失败: {e}")
+
+    def _publish(self, event_type: str, record: Dict[str, Any]):
+        """向订阅者推送新记录的增量事件"""
+        if not config_manager.get('stream.enabled', True):
+            return
+        try:
+            get_broker().publish(event_type, record.get('market'), compact_delta(event_type, record))
+        except Exception as e:
+            self.logger.warning(f"推送事件失败: {e}")
+
+    def rebuild_columnar(self) -> bool:
+        """根据JSON数据文件重建列式存储"""
+        if self.columnar is None:
+            return False
+
+        self.columnar.rebuild(self._load_data())
+        return True
+
+    def get_columns(self, collection: str, market: str, start_date: Optional[str] = None,
+                    end_date: Optional[str] = None,
+                    fields: Optional[List[str]] = None) -> Dict[str, np.ndarray]:
+        """
+        以列形式获取数据（按日期、ID升序）
+
+        启用列式存储时直接范围读取内存映射列，否则由get_*结果转换
+
+        Args:
+            collection: 集合名称（macro_data, market_sentiment, industry_data, timing_indicators）
+            market: 市场类型
+            start_date: 开始日期
+            end_date: 结束日期
+            fields: 需要的字段，默认全部
+
+        Returns:
+            Dict[str, np.ndarray]: 字段名 -> 列数组，包含date和id
+        """
+        if self.columnar is not None:
+            return self.columnar.read_columns(collection, market, start_date, end_date, fields)
+
+        numeric = [name for name, kind in COLLECTION_SCHEMAS[collection].items() if kind == 'f']
+        wanted = list(fields) if fields is not None else list(COLLECTION_SCHEMAS[collection])
+        if all(name in numeric for name in wanted) and self._segment_ready():
+            columns = self.segment.read_columns(collection, market, start_date, end_date, wanted)
+            if columns:
+                columns['date'] = columns['date'].astype(str)
+                return columns
+
+        getters = {
+            'macro_data': self.get_macro_data,
+            'market_sentiment': self.get_market_sentiment,
+            'industry_data': lambda m, s, e: self.get_industry_data(m, None, s, e),
+            'timing_indicators': self.get_timing_indicators
+        }
+        records = getters[collection](market, start_date, end_date)
+        return records_to_columns(collection, records[::-1], fields)
+
+    def _store_records(self, data: Dict[str, Any], collection: str,
+                       records: List[Dict[str, Any]]) -> Tuple[List[Dict[str, Any]], Optional[Dict]]:
+        """
+        将记录写入已加载的数据文档（需在写锁内调用）
+
+        启用按自然键去重时，与已有记录自然键相同的记录替换原记录（保留原ID和创建时间，修订号加1），
+        否则追加到集合末尾
+
+        Returns:
+            Tuple: 被替换的原记录，以及保存后需交给_commit_records的自然键索引（未去重时为None）
+        """
+        rows = data[collection]
+        if not self.upsert_enabled or collection not in NATURAL_KEYS:
+            rows.extend(records)
+            return [], None
+
+        positions = get_index(self.data_file).checkout(collection, rows, file_stamp(self.data_file))
+        superseded = []
+        for record in records:
+            key = natural_key(collection, record)
+            position = positions.get(key) if key is not None else None
+            if position is not None and (position >= len(rows) or natural_key(collection, rows[position]) != key):
+                # 索引与文件内容不一致时重建
+                positions = build_positions(collection, rows)
+                position = positions.get(key)
+
+            if position is None:
+                if key is not None:
+                    positions[key] = len(rows)
+                rows.append(record)
+                continue
+
+            previous = rows[position]
+            record['id'] = previous.get('id', record['id'])
+            record['updated_at'] = record['created_at']
+            record['created_at'] = previous.get('created_at', record['created_at'])
+            record['revision'] = previous.get('revision', 1) + 1
+            rows[position] = record
+            superseded.append(previous)
+        return superseded, positions
+
+    def _commit_records(self, collection: str, data: Dict[str, Any], superseded: List[Dict[str, Any]],
+                        positions: Optional[Dict]):
+        """保存数据文件后放回自然键索引，并将被替换的记录写入修订历史"""
+        if positions is not None:
+            get_index(self.data_file).commit(collection, positions, len(data[collection]),
+                                             file_stamp(self.data_file))
+
+        if superseded and self.revisions is not None:
+            try:
+                now = datetime.now().isoformat()
+                self.revisions.append([(collection, record, now) for record in superseded])
+            except Exception as e:
+                self.logger.warning(f"写入修订历史失败: {e}")
+
+    def _write_lock(self):
+        """
+        数据文件写锁（跨进程）
+
+        "加载-修改-保存-同步派生存储"整个过程需在锁内完成，多个工作进程并发写入时才不会丢失更新
+        """
+        return exclusive_lock(self.data_file.with_name(f".{self.data_file.name}.lock"))
+
+    @timed('data_service.load_data')
     def _load_data(self) -> Dict[str, Any]:
         """加载数据文件"""
         try:
@@ -55,16 +412,47 @@ class DataService:
             self.logger.error(f"加载数据文件失败: {e}")
             raise
 
+    def _write_document(self, data: Dict[str, Any]):
+        """
+        写入数据文件
+
+        先写临时文件再原子替换，已打开数据文件的读取方（如备份快照）始终看到完整的一致版本
+        """
+        fd, tmp_path = tempfile.mkstemp(prefix=f".{self.data_file.name}.", suffix='.tmp',
+                                        dir=self.data_file.parent)
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(data, f, indent=2, ensure_ascii=False)
+            mode = self.data_file.stat().st_mode & 0o7777 if self.data_file.exists() else 0o644
+            os.chmod(tmp_path, mode)
+            os.replace(tmp_path, self.data_file)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    @timed('data_service.save_data')
     def _save_data(self, data: Dict[str, Any]):
         """保存数据文件"""
         try:
+            self._previous_stamp = file_stamp(self.data_file) if self.data_file.exists() else None
             data['metadata']['last_updated'] = datetime.now().isoformat()
-            with open(self.data_file, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=2, ensure_ascii=False)
+
+            self._write_document(data)
         except Exception as e:
             self.logger.error(f"保存数据文件失败: {e}")
             raise
 
+        if config_manager.get('stream.enabled', True):
+            # 本进程的写入已通过增量事件推送，文件监视不再把它当作其他进程的修改
+            get_broker().note_write(str(self.data_file), self._previous_stamp, file_stamp(self.data_file))
+
+        if self.segment is not None:
+            # 数据已在内存中，顺带刷新分段文件，避免下次读取时重新解析JSON
+            try:
+                self.segment.build(data, file_stamp(self.data_file))
+            except Exception as e:
+                self.logger.warning(f"刷新分段文件失败: {e}")
+
     def save_macro_data(self, macro_data: Dict[str, Any]) -> Dict[str, Any]:
         """
         保存宏观数据
@@ -76,20 +464,9 @@ class DataService:
             Dict[str, Any]: 保存后的数据
         """
         try:
-            # 数据验证
-            self._validate_macro_data(macro_data)
-
-            # 添加时间戳
-            macro_data['created_at'] = datetime.now().isoformat()
-            macro_data['id'] = f"macro_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
-
-            # 保存数据
-            data = self._load_data()
-            data['macro_data'].append(macro_data)
-            self._save_data(data)
-
-            self.logger.info(f"保存宏观数据: {macro_data['id']}")
-            return macro_data
+            # 数据验证（按模型转换字段类型）
+            record = validate_record(MacroData, macro_data)
+            return self._save_records('macro_data', [record])[0]
 
         except Exception as e:
             self.logger.error(f"保存宏观数据失败: {e}")
@@ -109,14 +486,8 @@ class DataService:
             List[Dict[str, Any]]: 宏观数据列表
         """
         try:
-            data = self._load_data()
-            macro_data = data.get('macro_data', [])
-
-            # 过滤数据
-            filtered_data = [
-                item for item in macro_data
-                if item.get('market') == market
-            ]
+            # 按市场加载数据
+            filtered_data = self._load_market_records('macro_data', market, start_date, end_date)
 
             # 日期过滤
             if start_date:
@@ -132,7 +503,7 @@ class DataService:
                 ]
 
             # 按日期排序
-            filtered_data.sort(key=lambda x: x.get('date', ''), reverse=True)
+            filtered_data.sort(key=self._record_key, reverse=True)
 
             return filtered_data
 
@@ -151,20 +522,9 @@ class DataService:
             Dict[str, Any]: 保存后的数据
         """
         try:
-            # 数据验证
-            self._validate_market_sentiment_data(sentiment_data)
-
-            # 添加时间戳
-            sentiment_data['created_at'] = datetime.now().isoformat()
-            sentiment_data['id'] = f"sentiment_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
-
-            # 保存数据
-            data = self._load_data()
-            data['market_sentiment'].append(sentiment_data)
-            self._save_data(data)
-
-            self.logger.info(f"保存市场情绪数据: {sentiment_data['id']}")
-            return sentiment_data
+            # 数据验证（按模型转换字段类型）
+            record = validate_record(MarketSentiment, sentiment_data)
+            return self._save_records('market_sentiment', [record])[0]
 
         except Exception as e:
             self.logger.error(f"保存市场情绪数据失败: {e}")
@@ -184,14 +544,8 @@ class DataService:
             List[Dict[str, Any]]: 市场情绪数据列表
         """
         try:
-            data = self._load_data()
-            sentiment_data = data.get('market_sentiment', [])
-
-            # 过滤数据
-            filtered_data = [
-                item for item in sentiment_data
-                if item.get('market') == market
-            ]
+            # 按市场加载数据
+            filtered_data = self._load_market_records('market_sentiment', market, start_date, end_date)
 
             # 日期过滤
             if start_date:
@@ -207,7 +561,7 @@ class DataService:
                 ]
 
             # 按日期排序
-            filtered_data.sort(key=lambda x: x.get('date', ''), reverse=True)
+            filtered_data.sort(key=self._record_key, reverse=True)
 
             return filtered_data
 
@@ -226,20 +580,9 @@ class DataService:
             Dict[str, Any]: 保存后的数据
         """
         try:
-            # 数据验证
-            self._validate_industry_data(industry_data)
-
-            # 添加时间戳
-            industry_data['created_at'] = datetime.now().isoformat()
-            industry_data['id'] = f"industry_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
-
-            # 保存数据
-            data = self._load_data()
-            data['industry_data'].append(industry_data)
-            self._save_data(data)
-
-            self.logger.info(f"保存行业数据: {industry_data['id']}")
-            return industry_data
+            # 数据验证（按模型转换字段类型）
+            record = validate_record(IndustryData, industry_data)
+            return self._save_records('industry_data', [record])[0]
 
         except Exception as e:
             self.logger.error(f"保存行业数据失败: {e}")
@@ -261,14 +604,8 @@ class DataService:
             List[Dict[str, Any]]: 行业数据列表
         """
         try:
-            data = self._load_data()
-            industry_data = data.get('industry_data', [])
-
-            # 过滤数据
-            filtered_data = [
-                item for item in industry_data
-                if item.get('market') == market
-            ]
+            # 按市场加载数据
+            filtered_data = self._load_market_records('industry_data', market, start_date, end_date)
 
             if industry:
                 filtered_data = [
@@ -290,7 +627,7 @@ class DataService:
                 ]
 
             # 按日期排序
-            filtered_data.sort(key=lambda x: x.get('date', ''), reverse=True)
+            filtered_data.sort(key=self._record_key, reverse=True)
 
             return filtered_data
 
@@ -298,6 +635,61 @@ class DataService:
             self.logger.error(f"获取行业数据失败: {e}")
             raise
 
+    def save_batch(self, collection: str, records: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        批量保存记录：一次调用验证整个数组（任一记录无效时不保存），再在一次读写中追加全部记录
+
+        Args:
+            collection: 集合名称（macro_data, market_sentiment, industry_data）
+            records: 记录数组
+
+        Returns:
+            List[Dict[str, Any]]: 保存后的数据
+        """
+        if collection not in INGEST_COLLECTIONS:
+            raise ValueError(f"不支持批量保存的集合: {collection}")
+
+        try:
+            return self._save_records(collection, validate_records(INGEST_COLLECTIONS[collection][0], records))
+
+        except Exception as e:
+            self.logger.error(f"批量保存{INGEST_COLLECTIONS[collection][2]}失败: {e}")
+            raise
+
+    def _save_records(self, collection: str, records: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """为已验证的记录添加时间戳和ID，追加到数据文件并同步派生存储"""
+        _, prefix, label, correlated = INGEST_COLLECTIONS[collection]
+        now = datetime.now()
+
+        # 添加时间戳和ID
+        for record, record_id in zip(records, new_record_ids(prefix, now, len(records))):
+            record['created_at'] = now.isoformat()
+            record['id'] = record_id
+
+        # 保存数据
+        with self._write_lock():
+            data = self._load_data()
+            superseded, positions = self._store_records(data, collection, records)
+            self._save_data(data)
+            self._commit_records(collection, data, superseded, positions)
+            if len(records) == 1 and not superseded:
+                self._sync_columnar(collection, records[0])
+            else:
+                # 列式存储按ID替换，同一批次内重复的自然键只保留最后一条
+                self._sync_columnar_batch(collection, list({r['id']: r for r in records}.values()))
+            if correlated:
+                for i, record in enumerate(records):
+                    if i:
+                        # 上一条已计入相关性矩阵，其文件标识对应的就是当前文件
+                        self._previous_stamp = file_stamp(self.data_file)
+                    self._sync_correlation(collection, record)
+
+        if len(records) == 1:
+            self.logger.info(f"保存{label}: {records[0]['id']}")
+        else:
+            self.logger.info(f"批量保存{label}: {len(records)}条")
+        return records
+
     def save_timing_indicators(self, indicators: Dict[str, Any]) -> Dict[str, Any]:
         """
         保存择时指标数据
@@ -310,14 +702,23 @@ class DataService:
         """
         try:
             # 添加时间戳
-            indicators['created_at'] = datetime.now().isoformat()
-            indicators['id'] = f"timing_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+            now = datetime.now()
+            indicators['created_at'] = now.isoformat()
+            indicators['id'] = new_record_ids('timing', now)[0]
 
             # 保存数据
-            data = self._load_data()
-            data['timing_indicators'].append(indicators)
-            self._save_data(data)
-
+            with self._write_lock():
+                data = self._load_data()
+                superseded, positions = self._store_records(data, 'timing_indicators', [indicators])
+                self._save_data(data)
+                self._commit_records('timing_indicators', data, superseded, positions)
+                if superseded:
+                    self._sync_columnar_batch('timing_indicators', [indicators])
+                else:
+                    self._sync_columnar('timing_indicators', indicators)
+                self._sync_correlation('timing_indicators', indicators)
+
+            self._publish('timing_indicators', indicators)
             self.logger.info(f"保存择时指标: {indicators['id']}")
             return indicators
 
@@ -339,14 +740,8 @@ class DataService:
             List[Dict[str, Any]]: 择时指标列表
         """
         try:
-            data = self._load_data()
-            timing_data = data.get('timing_indicators', [])
-
-            # 过滤数据
-            filtered_data = [
-                item for item in timing_data
-                if item.get('market') == market
-            ]
+            # 按市场加载数据
+            filtered_data = self._load_market_records('timing_indicators', market, start_date, end_date)
 
             # 日期过滤
             if start_date:
@@ -362,7 +757,7 @@ class DataService:
                 ]
 
             # 按日期排序
-            filtered_data.sort(key=lambda x: x.get('date', ''), reverse=True)
+            filtered_data.sort(key=self._record_key, reverse=True)
 
             return filtered_data
 
@@ -370,70 +765,288 @@ class DataService:
             self.logger.error(f"获取择时指标失败: {e}")
             raise
 
-    def _validate_macro_data(self, data: Dict[str, Any]):
-        """验证宏观数据"""
-        required_fields = ['date', 'market']
-        for field in required_fields:
-            if field not in data:
-                raise ValueError(f"宏观数据缺少必需字段: {field}")
-
-    def _validate_market_sentiment_data(self, data: Dict[str, Any]):
-        """验证市场情绪数据"""
-        required_fields = ['date', 'market']
-        for field in required_fields:
-            if field not in data:
-                raise ValueError(f"市场情绪数据缺少必需字段: {field}")
-
-    def _validate_industry_data(self, data: Dict[str, Any]):
-        """验证行业数据"""
-        required_fields = ['date', 'market', 'industry']
-        for field in required_fields:
-            if field not in data:
-                raise ValueError(f"行业数据缺少必需字段: {field}")
-
-    def backup_data(self) -> bool:
-        """备份数据"""
+    @staticmethod
+    def _record_key(record: Dict[str, Any]) -> Tuple[str, str]:
+        """记录排序键：(日期, ID)"""
+        return (record.get('date', ''), record.get('id', ''))
+
+    @staticmethod
+    def encode_cursor(record: Dict[str, Any]) -> str:
+        """根据记录生成分页游标"""
+        raw = json.dumps(list(DataService._record_key(record)), ensure_ascii=False)
+        return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii')
+
+    @staticmethod
+    def decode_cursor(cursor: str) -> Tuple[str, str]:
+        """解析分页游标"""
         try:
-            if not config_manager.get('database.backup_enabled', True):
-                return True
+            date, record_id = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+            return (str(date), str(record_id))
+        except Exception:
+            raise ValueError(f"无效的分页游标: {cursor}")
+
+    @classmethod
+    def _cursor_index(cls, records: List[Dict[str, Any]], after: Tuple[str, str]) -> int:
+        """二分查找按 (日期, ID) 倒序排列的记录中第一条小于游标键的位置"""
+        lo, hi = 0, len(records)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if cls._record_key(records[mid]) >= after:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def iter_records(self, records: List[Dict[str, Any]],
+                     cursor: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+        """
+        按游标遍历记录
 
-            backup_dir = Path('data/backups')
-            backup_dir.mkdir(parents=True, exist_ok=True)
+        Args:
+            records: get_*方法返回的记录列表（按日期、ID倒序）
+            cursor: 上一页最后一条记录的游标
+
+        Yields:
+            Dict[str, Any]: 游标之后的记录
+        """
+        start = self._cursor_index(records, self.decode_cursor(cursor)) if cursor else 0
+        for i in range(start, len(records)):
+            yield records[i]
+
+    def paginate_records(self, records: List[Dict[str, Any]], limit: int,
+                         cursor: Optional[str] = None) -> Dict[str, Any]:
+        """
+        键集分页
+
+        Args:
+            records: get_*方法返回的记录列表（按日期、ID倒序）
+            limit: 每页条数
+            cursor: 上一页返回的next_cursor
 
-            timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-            backup_file = backup_dir / f"backup_{timestamp}.json"
+        Returns:
+            Dict[str, Any]: 包含data和next_cursor的分页结果
+        """
+        return self._page(self.iter_records(records, cursor), limit)
+
+    def iter_market_records(self, collection: str, market: str, start_date: Optional[str] = None,
+                            end_date: Optional[str] = None, cursor: Optional[str] = None,
+                            industry: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+        """
+        按 (日期, ID) 倒序逐条读取单个市场的记录（与get_*结果顺序一致）
+
+        启用分段读取时从分段文件按日期列二分定位游标并逐条解码，不在内存中生成整个结果集；
+        否则JSON文件本身需要整体加载，加载排序后二分定位游标
+
+        Args:
+            collection: 集合名称（macro_data, market_sentiment, industry_data, timing_indicators）
+            market: 市场类型
+            start_date: 开始日期
+            end_date: 结束日期
+            cursor: 上一页最后一条记录的游标
+            industry: 行业类型（仅industry_data）
+
+        Yields:
+            Dict[str, Any]: 游标之后的记录
+        """
+        after = self.decode_cursor(cursor) if cursor else None
+
+        if self._segment_ready():
+            for record in self.segment.iter_records_desc(collection, market, start_date, end_date, after):
+                if industry and record.get('industry') != industry:
+                    continue
+                yield record
+            return
+
+        getters = {
+            'macro_data': self.get_macro_data,
+            'market_sentiment': self.get_market_sentiment,
+            'industry_data': lambda m, s, e: self.get_industry_data(m, industry, s, e),
+            'timing_indicators': self.get_timing_indicators
+        }
+        records = getters[collection](market, start_date, end_date)
+        start = self._cursor_index(records, after) if after is not None else 0
+        for i in range(start, len(records)):
+            yield records[i]
+
+    def paginate_market_records(self, collection: str, market: str, limit: int,
+                                start_date: Optional[str] = None, end_date: Optional[str] = None,
+                                cursor: Optional[str] = None,
+                                industry: Optional[str] = None) -> Dict[str, Any]:
+        """
+        从存储层键集分页（参数同iter_market_records），只读取一页加一条记录
 
+        Returns:
+            Dict[str, Any]: 包含data和next_cursor的分页结果
+        """
+        return self._page(
+            self.iter_market_records(collection, market, start_date, end_date, cursor, industry), limit
+        )
+
+    def _page(self, records: Iterator[Dict[str, Any]], limit: int) -> Dict[str, Any]:
+        """从记录迭代器中取一页，多取一条判断是否还有下一页"""
+        page = list(itertools.islice(records, limit + 1))
+        has_more = len(page) > limit
+        page = page[:limit]
+        return {
+            'data': page,
+            'next_cursor': self.encode_cursor(page[-1]) if has_more and page else None
+        }
+
+    def get_revisions(self, collection: str, market: str, date: str,
+                      industry: Optional[str] = None) -> Dict[str, Any]:
+        """
+        获取某个自然键的当前记录和被替换过的历史版本
+
+        Args:
+            collection: 集合名称（macro_data, market_sentiment, industry_data, timing_indicators）
+            market: 市场类型
+            date: 日期
+            industry: 行业类型（仅industry_data需要）
+
+        Returns:
+            Dict[str, Any]: current为当前记录，revisions为历史版本（由新到旧）
+        """
+        if collection not in NATURAL_KEYS:
+            raise ValueError(f"不支持的集合: {collection}")
+
+        key = natural_key(collection, {'market': market, 'date': date, 'industry': industry})
+        if key is None:
+            raise ValueError("缺少必需参数: industry")
+
+        current = None
+        for record in self._load_market_records(collection, market, date, date):
+            if natural_key(collection, record) == key and (current is None or
+                                                          self._record_key(record) >= self._record_key(current)):
+                current = record
+
+        return {
+            'collection': collection,
+            'key': dict(zip(NATURAL_KEYS[collection], key)),
+            'current': current,
+            'revisions': self.revisions.history(collection, key) if self.revisions is not None else []
+        }
+
+    def deduplicate_records(self) -> Dict[str, int]:
+        """
+        按自然键合并启用去重之前保存的重复记录
+
+        同一自然键只保留最后保存的一条（保留其ID，修订号为该键的提交次数），
+        其余记录按保存顺序写入修订历史。
+        旧版本按秒生成的ID可能被不同自然键的记录共用，保留下来的记录中ID重复时重新生成，
+        否则之后替换其中一条时列式存储会按ID一并移除另一条
+
+        Returns:
+            Dict[str, int]: 集合 -> 移除的重复记录数
+        """
+        removed: Dict[str, int] = {}
+        with self._write_lock():
             data = self._load_data()
-            with open(backup_file, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=2, ensure_ascii=False)
+            superseded = []
+            reassigned = 0
+            for collection in NATURAL_KEYS:
+                rows = data.get(collection, [])
+                positions = build_positions(collection, rows)
+                counts: Dict[Tuple[Any, ...], int] = {}
+                kept = []
+                for position, record in enumerate(rows):
+                    key = natural_key(collection, record)
+                    if key is None or positions[key] == position:
+                        kept.append(record)
+                        continue
+                    counts[key] = counts.get(key, 0) + 1
+                    superseded.append((collection, record))
+
+                seen_ids = set()
+                for record in kept:
+                    key = natural_key(collection, record)
+                    if key in counts:
+                        record['revision'] = record.get('revision', 1) + counts[key]
+                    if record.get('id') is not None and record['id'] in seen_ids:
+                        prefix = str(record['id']).split('_', 1)[0]
+                        record['id'] = new_record_ids(prefix, datetime.now())[0]
+                        reassigned += 1
+                    seen_ids.add(record.get('id'))
+
+                if len(kept) != len(rows):
+                    data[collection] = kept
+                    removed[collection] = len(rows) - len(kept)
+
+            if removed or reassigned:
+                self._save_data(data)
+                if self.revisions is not None:
+                    now = datetime.now().isoformat()
+                    self.revisions.append([(collection, record, now) for collection, record in superseded])
+                if self.columnar is not None:
+                    self.columnar.rebuild(data)
+                self.logger.info(f"合并重复记录: {removed}，重新生成ID: {reassigned}条")
+        return removed
+
+    def backup_data(self, force_full: bool = False) -> bool:
+        """
+        备份数据（全量或相对上次备份的增量，见BackupService）
+
+        Args:
+            force_full: 是否强制全量备份
 
-            self.logger.info(f"数据备份成功: {backup_file}")
+        Returns:
+            bool: 是否备份成功
+        """
+        try:
+            if not config_manager.get('database.backup_enabled', True):
+                return True
+
+            BackupService(self.data_file).backup(force_full)
             return True
 
         except Exception as e:
             self.logger.error(f"数据备份失败: {e}")
             return False
 
+    def restore_backup(self, upto: Optional[str] = None) -> Dict[str, Any]:
+        """
+        由全量备份和增量重放恢复数据文件
+
+        Args:
+            upto: 恢复到指定的备份文件名（含），默认为最新备份
+
+        Returns:
+            Dict[str, Any]: 恢复结果
+        """
+        with self._write_lock():
+            result = BackupService(self.data_file).restore(upto=upto)
+            if self.columnar is not None:
+                self.rebuild_columnar()
+        return result
+
     def save_ai_analysis(self, analysis_data: Dict[str, Any]) -> Dict[str, Any]:
         """
         保存AI分析结果
 
+        启用文本块存储时，分析全文（ai_analysis）保存到文本块存储，记录中只保留引用、长度和摘要
+
         Args:
             analysis_data: AI分析数据
 
         Returns:
-            Dict[str, Any]: 保存后的数据
+            Dict[str, Any]: 保存后的数据（包含全文）
         """
         try:
             # 添加时间戳
-            analysis_data['created_at'] = datetime.now().isoformat()
-            analysis_data['id'] = f"ai_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+            now = datetime.now()
+            analysis_data['created_at'] = now.isoformat()
+            analysis_data['id'] = new_record_ids('ai', now)[0]
+
+            record = self._externalize_ai_text(analysis_data)
+            if 'ai_analysis_ref' in record:
+                analysis_data['ai_analysis_ref'] = record['ai_analysis_ref']
 
             # 保存数据
-            data = self._load_data()
-            data['ai_analysis'].append(analysis_data)
-            self._save_data(data)
+            with self._write_lock():
+                data = self._load_data()
+                data['ai_analysis'].append(record)
+                self._save_data(data)
 
+            self._publish('ai_analysis', self._ai_summary(record))
             self.logger.info(f"保存AI分析结果: {analysis_data['id']}")
             return analysis_data
 
@@ -442,27 +1055,24 @@ class DataService:
             raise
 
     def get_ai_analysis(self, market: str, start_date: Optional[str] = None,
-                       end_date: Optional[str] = None) -> List[Dict[str, Any]]:
+                       end_date: Optional[str] = None, include_text: bool = False) -> List[Dict[str, Any]]:
         """
         获取AI分析数据
 
+        默认只返回摘要信息，不读取文本块；include_text为True时才为结果中的记录加载全文
+
         Args:
             market: 市场类型
             start_date: 开始日期
             end_date: 结束日期
+            include_text: 是否加载分析全文
 
         Returns:
             List[Dict[str, Any]]: AI分析数据列表
         """
         try:
-            data = self._load_data()
-            ai_data = data.get('ai_analysis', [])
-
-            # 过滤数据
-            filtered_data = [
-                item for item in ai_data
-                if item.get('market') == market
-            ]
+            # 按市场加载数据
+            filtered_data = self._load_market_records('ai_analysis', market, start_date, end_date)
 
             # 日期过滤
             if start_date:
@@ -478,10 +1088,85 @@ class DataService:
                 ]
 
             # 按日期排序
-            filtered_data.sort(key=lambda x: x.get('date', ''), reverse=True)
+            filtered_data.sort(key=self._record_key, reverse=True)
 
-            return filtered_data
+            if include_text:
+                return [self.load_ai_text(item) for item in filtered_data]
+            return [self._ai_summary(item) for item in filtered_data]
 
         except Exception as e:
             self.logger.error(f"获取AI分析数据失败: {e}")
-            raise
\ No newline at end of file
+            raise
+
+    def load_ai_text(self, record: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        为AI分析记录加载全文（旧记录的全文内联在记录中，直接返回）
+
+        Args:
+            record: AI分析记录
+
+        Returns:
+            Dict[str, Any]: 包含ai_analysis全文的记录副本，文本块缺失时全文为None
+        """
+        result = dict(record)
+        ref = result.get('ai_analysis_ref')
+        if ref and 'ai_analysis' not in result:
+            # 关闭文本块存储后，已有引用仍从原目录读取
+            store = self.blobs or BlobStore(config_manager.get('database.blob_path', 'data/blobs'))
+            try:
+                result['ai_analysis'] = store.get(ref)
+            except (FileNotFoundError, ValueError) as e:
+                self.logger.warning(f"读取AI分析全文失败: {e}")
+                result['ai_analysis'] = None
+        return result
+
+    def externalize_ai_texts(self) -> int:
+        """
+        将旧记录中内联的AI分析全文移入文本块存储
+
+        Returns:
+            int: 迁移的记录数
+        """
+        if self.blobs is None:
+            return 0
+
+        with self._write_lock():
+            data = self._load_data()
+            moved = 0
+            for i, record in enumerate(data.get('ai_analysis', [])):
+                if isinstance(record, dict) and isinstance(record.get('ai_analysis'), str):
+                    data['ai_analysis'][i] = self._externalize_ai_text(record)
+                    moved += 1
+
+            if moved:
+                self._save_data(data)
+                self.logger.info(f"AI分析全文移入文本块存储: {moved}条")
+        return moved
+
+    def _externalize_ai_text(self, record: Dict[str, Any]) -> Dict[str, Any]:
+        """将记录中的全文替换为文本块引用，返回新的记录"""
+        text = record.get('ai_analysis')
+        if self.blobs is None or not isinstance(text, str):
+            return dict(record)
+
+        result = {key: value for key, value in record.items() if key != 'ai_analysis'}
+        result['ai_analysis_ref'] = self.blobs.put(text)
+        result['ai_analysis_length'] = len(text)
+        result.setdefault('summary', self._summarize(text))
+        return result
+
+    def _ai_summary(self, record: Dict[str, Any]) -> Dict[str, Any]:
+        """列表视图：去掉全文，保留摘要等字段"""
+        text = record.get('ai_analysis')
+        if not isinstance(text, str):
+            return dict(record)
+
+        result = {key: value for key, value in record.items() if key != 'ai_analysis'}
+        result.setdefault('ai_analysis_length', len(text))
+        result.setdefault('summary', self._summarize(text))
+        return result
+
+    @staticmethod
+    def _summarize(text: str) -> str:
+        """截取全文开头作为摘要"""
+        return text[:100] + '...' if len(text) > 100 else text
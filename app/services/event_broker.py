@@ -0,0 +1,312 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+进程内事件发布/订阅
+
+保存择时指标和AI分析结果后发布精简的增量事件，仪表盘通过SSE订阅，不再轮询接口。
+事件在发布时编码一次SSE帧，写入共享的环形缓冲区并唤醒全部订阅者；
+订阅者只记录最后收到的事件ID，按市场筛选缓冲区中的新事件，发布开销与订阅者数量无关。
+断线重连时按Last-Event-ID补发缓冲区内的事件，缓冲区已覆盖时发送reset事件提示客户端重新拉取。
+同步服务器中每个订阅占用一个线程等待（订阅数按工作线程数的比例限制），ASGI模式下以asyncio等待，不占用线程。
+增量事件只在发布它的进程内分发；多进程部署时每个进程另行监视数据文件标识，
+发现其他进程写入后向全部订阅者推送refresh事件，客户端据此重新拉取数据
+"""
+
+import asyncio
+import json
+import os
+import threading
+import time
+from collections import deque
+from typing import Dict, List, Any, Iterable, Iterator, NamedTuple, Optional, Set, Tuple
+
+# 发布的事件类型
+EVENT_TYPES = ('timing_indicators', 'ai_analysis')
+
+# 增量事件包含的字段
+DELTA_FIELDS = {
+    'timing_indicators': ('id', 'market', 'date', 'overall_score', 'macro_score', 'industry_score',
+                          'sentiment_score', 'strength_level', 'created_at'),
+    'ai_analysis': ('id', 'market', 'date', 'summary', 'ai_analysis_length', 'created_at')
+}
+
+# 客户端断线后的重连间隔（毫秒）
+RETRY_MS = 3000
+
+# 其他进程写入数据文件后推送的事件类型（不限市场）
+REFRESH_EVENT = 'refresh'
+
+
+class Event(NamedTuple):
+    """已编码的事件（market为None时推送给全部订阅者）"""
+    id: int
+    type: str
+    market: Optional[str]
+    frame: str
+
+
+class SubscriberLimitError(RuntimeError):
+    """订阅数已达上限"""
+
+
+def encode_frame(event_id: int, event_type: str, payload: Dict[str, Any]) -> str:
+    """编码SSE帧"""
+    data = json.dumps(payload, ensure_ascii=False, separators=(',', ':'), default=str)
+    return f"id: {event_id}\nevent: {event_type}\ndata: {data}\n\n"
+
+
+def compact_delta(event_type: str, record: Dict[str, Any]) -> Dict[str, Any]:
+    """从保存的记录中提取增量事件字段"""
+    return {field: record[field] for field in DELTA_FIELDS[event_type] if record.get(field) is not None}
+
+
+class EventBroker:
+    """进程内事件代理"""
+
+    def __init__(self, buffer_size: int = 256, max_subscribers: int = 100):
+        self.buffer: deque = deque(maxlen=buffer_size)
+        self.max_subscribers = max_subscribers
+        self.subscribers = 0
+        self.last_id = 0
+        self.condition = threading.Condition()
+        self._async_waiters: Set[Tuple[asyncio.AbstractEventLoop, asyncio.Event]] = set()
+        # 数据文件监视：路径、监视线程所在进程、最后确认的文件标识、本进程写入前后的文件标识
+        self._watch_path: Optional[str] = None
+        self._watch_pid: Optional[int] = None
+        self._seen_stamp: Optional[Tuple[int, int]] = None
+        self._local_writes: Dict[Tuple[int, int], Tuple[int, int]] = {}
+
+    def configure(self, buffer_size: int, max_subscribers: int):
+        """按配置调整缓冲区大小和订阅上限"""
+        with self.condition:
+            if buffer_size != self.buffer.maxlen:
+                self.buffer = deque(self.buffer, maxlen=buffer_size)
+            self.max_subscribers = max_subscribers
+
+    def publish(self, event_type: str, market: Optional[str], payload: Dict[str, Any]) -> int:
+        """
+        发布事件
+
+        Args:
+            event_type: 事件类型
+            market: 市场
+            payload: 事件数据
+
+        Returns:
+            int: 事件ID
+        """
+        with self.condition:
+            self.last_id += 1
+            event_id = self.last_id
+            self.buffer.append(Event(event_id, event_type, market, encode_frame(event_id, event_type, payload)))
+            self.condition.notify_all()
+            waiters, self._async_waiters = self._async_waiters, set()
+
+        for loop, waiter in waiters:
+            try:
+                loop.call_soon_threadsafe(waiter.set)
+            except RuntimeError:
+                # 事件循环已关闭
+                pass
+        return event_id
+
+    def events_after(self, last_id: int, markets: Optional[Iterable[str]] = None
+                     ) -> Tuple[List[Event], bool, int]:
+        """
+        获取指定ID之后的事件
+
+        Args:
+            last_id: 已收到的最后一个事件ID
+            markets: 订阅的市场，为空时返回全部市场
+
+        Returns:
+            Tuple[List[Event], bool, int]: 事件列表、中间是否有事件已被缓冲区覆盖、当前最后事件ID
+        """
+        markets = set(markets) if markets else None
+        with self.condition:
+            newest = self.last_id
+            if last_id >= newest:
+                # 客户端的ID大于当前ID（服务重启过）时视为有事件丢失
+                return [], last_id > newest, newest
+            buffered = list(self.buffer)
+
+        lagged = buffered[0].id > last_id + 1
+        # 缓冲区按ID递增，从尾部倒序查找新事件
+        start = len(buffered)
+        while start > 0 and buffered[start - 1].id > last_id:
+            start -= 1
+        events = [
+            event for event in buffered[start:]
+            if markets is None or event.market is None or event.market in markets
+        ]
+        return events, lagged, newest
+
+    def wait(self, last_id: int, timeout: float) -> bool:
+        """等待ID大于last_id的事件，返回是否有新事件"""
+        with self.condition:
+            return self.condition.wait_for(lambda: self.last_id > last_id, timeout)
+
+    async def wait_async(self, last_id: int, timeout: float) -> bool:
+        """在事件循环中等待新事件，不占用线程"""
+        waiter = asyncio.Event()
+        entry = (asyncio.get_running_loop(), waiter)
+        with self.condition:
+            if self.last_id > last_id:
+                return True
+            self._async_waiters.add(entry)
+        try:
+            await asyncio.wait_for(waiter.wait(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+        finally:
+            with self.condition:
+                self._async_waiters.discard(entry)
+
+    def subscribe(self, limit: Optional[int] = None):
+        """
+        登记订阅，超过上限时抛出SubscriberLimitError
+
+        Args:
+            limit: 本次订阅额外适用的上限（同步服务器按工作线程数限制），取与max_subscribers中较小的一个
+        """
+        with self.condition:
+            max_subscribers = self.max_subscribers if limit is None else min(limit, self.max_subscribers)
+            if self.subscribers >= max_subscribers:
+                raise SubscriberLimitError(f"订阅数已达上限: {max_subscribers}")
+            self.subscribers += 1
+
+    def unsubscribe(self):
+        """注销订阅"""
+        with self.condition:
+            self.subscribers = max(self.subscribers - 1, 0)
+
+    def watch(self, path: str, interval: float):
+        """
+        在后台线程中监视数据文件（每个进程一个线程，fork出的工作进程各自启动）
+
+        Args:
+            path: 数据文件路径
+            interval: 检查间隔（秒）
+        """
+        with self.condition:
+            if self._watch_path == path and self._watch_pid == os.getpid():
+                return
+            self._watch_path = path
+            self._watch_pid = os.getpid()
+            self._seen_stamp = _stamp(path)
+            self._local_writes.clear()
+
+        def run():
+            while self._watch_path == path and self._watch_pid == os.getpid():
+                time.sleep(interval)
+                self.check_file()
+
+        threading.Thread(target=run, name='stream-file-watch', daemon=True).start()
+
+    def note_write(self, path: str, before: Optional[Tuple[int, int]], after: Tuple[int, int]):
+        """记录本进程的一次写入（写锁内调用），监视时不把它当作其他进程的修改"""
+        with self.condition:
+            if path == self._watch_path and before is not None:
+                self._local_writes[before] = after
+
+    def check_file(self) -> bool:
+        """
+        检查数据文件是否被其他进程修改，是则推送refresh事件
+
+        从上次确认的标识出发沿本进程的写入记录前进，到达不了当前标识说明中间有其他进程写入
+
+        Returns:
+            bool: 是否推送了refresh事件
+        """
+        with self.condition:
+            path = self._watch_path
+            if path is None:
+                return False
+            stamp = _stamp(path)
+            current = self._seen_stamp
+            while current != stamp and current in self._local_writes:
+                current = self._local_writes.pop(current)
+            foreign = current != stamp
+            self._seen_stamp = stamp
+            self._local_writes.clear()
+
+        if foreign:
+            self.publish(REFRESH_EVENT, None, {'reason': 'external_write'})
+        return foreign
+
+    def frames(self, last_id: int, markets: Optional[Iterable[str]]) -> Tuple[List[str], int]:
+        """
+        取出last_id之后的SSE帧
+
+        Returns:
+            Tuple[List[str], int]: 帧列表（有事件被覆盖时以reset事件开头）和新的最后事件ID
+        """
+        events, lagged, newest = self.events_after(last_id, markets)
+        frames = [encode_frame(newest, 'reset', {'last_id': newest})] if lagged else []
+        frames.extend(event.frame for event in events)
+        return frames, newest
+
+
+def _stamp(path: str) -> Optional[Tuple[int, int]]:
+    """文件标识：(修改时间ns, 大小)，文件不存在时为None"""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+_broker = EventBroker()
+
+
+def get_broker() -> EventBroker:
+    """获取进程内的事件代理"""
+    return _broker
+
+
+def stream(broker: EventBroker, markets: Optional[List[str]], last_id: Optional[int],
+           heartbeat: float) -> Iterator[str]:
+    """
+    同步SSE事件流（订阅的登记和注销由调用方负责）
+
+    Args:
+        broker: 事件代理
+        markets: 订阅的市场
+        last_id: 客户端的Last-Event-ID，为空时只推送之后发布的事件
+        heartbeat: 无事件时发送心跳注释的间隔（秒）
+    """
+    yield f"retry: {RETRY_MS}\n\n"
+    last_id = broker.last_id if last_id is None else last_id
+    # 补发重连前错过的事件
+    frames, last_id = broker.frames(last_id, markets)
+    if frames:
+        yield ''.join(frames)
+    while True:
+        # 其他市场的事件只推进last_id，超时无事件时才发送心跳
+        if not broker.wait(last_id, heartbeat):
+            yield ': keepalive\n\n'
+            continue
+        frames, last_id = broker.frames(last_id, markets)
+        if frames:
+            yield ''.join(frames)
+
+
+async def stream_async(broker: EventBroker, markets: Optional[List[str]], last_id: Optional[int],
+                       heartbeat: float):
+    """异步SSE事件流，与stream一致，结束时注销订阅"""
+    try:
+        yield f"retry: {RETRY_MS}\n\n"
+        last_id = broker.last_id if last_id is None else last_id
+        frames, last_id = broker.frames(last_id, markets)
+        if frames:
+            yield ''.join(frames)
+        while True:
+            if not await broker.wait_async(last_id, heartbeat):
+                yield ': keepalive\n\n'
+                continue
+            frames, last_id = broker.frames(last_id, markets)
+            if frames:
+                yield ''.join(frames)
+    finally:
+        broker.unsubscribe()
@@ -7,11 +7,36 @@
 """
 
 import logging
+import time
 from datetime import datetime
 from typing import Dict, List, Any, Optional
 
+import numpy as np
+
 from ..utils.config import config_manager
+from ..utils.calculations import lttb_downsample
+from ..utils.metrics import timed
+from ..utils.rolling import rolling_mean, rolling_zscore
 from .data_service import DataService
+from .correlation_service import INDICATORS as CORRELATION_INDICATORS, get_tracker as get_correlation_tracker
+from .position_sizing import CHART_SCORES, DEFAULT_CAPITAL, DEFAULT_RISK_PERCENTAGE, get_position_curve
+from .timing_scorer import (
+    DEFAULT_WEIGHTS, MACRO_FIELDS, INDUSTRY_FIELDS, SENTIMENT_FIELDS, PRESENCE_FIELDS, STRENGTH_LEVELS,
+    technical_scores, macro_scores, industry_scores, sentiment_scores, overall_scores, strength_indices
+)
+
+# 单次敏感性分析的最大样本数
+MAX_SENSITIVITY_SAMPLES = 200000
+
+# 单次情景评估的最大情景数
+MAX_SCENARIOS = 5000
+
+# 评分输入的来源: 请求字段 -> 扁平化后的字段
+INPUT_FIELDS = {
+    'macro_data': MACRO_FIELDS + ['other_macro'],
+    'industry_data': INDUSTRY_FIELDS,
+    'market_sentiment': SENTIMENT_FIELDS + ['technical_indicators']
+}
 
 
 class IndicatorService:
@@ -21,6 +46,7 @@ class IndicatorService:
         self.data_service = DataService()
         self.logger = logging.getLogger(__name__)
 
+    @timed('indicator.calculate_timing_indicators')
     def calculate_timing_indicators(self, data: Dict[str, Any]) -> Dict[str, Any]:
         """
         计算择时指标
@@ -73,6 +99,7 @@ class IndicatorService:
             self.logger.error(f"计算择时指标失败: {e}")
             raise
 
+    @timed('indicator.macro_score')
     def _calculate_macro_score(self, macro_data: Dict[str, Any]) -> float:
         """计算宏观基本面评分"""
         try:
@@ -132,9 +159,9 @@ class IndicatorService:
                 other_weight = other_config.get('weight', 0.15)
                 total_weight += other_weight
 
-            # 归一化评分
+            # 归一化评分（各分项已是0-100评分）
             if total_weight > 0:
-                return (total_score / total_weight) * 100
+                return total_score / total_weight
             else:
                 return 50.0  # 默认中性评分
 
@@ -207,6 +234,7 @@ class IndicatorService:
             # 线性插值
             return 100 - ((rate - threshold_good) / (threshold_bad - threshold_good)) * 100
 
+    @timed('indicator.industry_score')
     def _calculate_industry_score(self, industry_data: Dict[str, Any]) -> float:
         """计算行业基本面评分"""
         try:
@@ -250,6 +278,7 @@ class IndicatorService:
         else:
             return 0.0
 
+    @timed('indicator.sentiment_score')
     def _calculate_sentiment_score(self, sentiment_data: Dict[str, Any]) -> float:
         """计算市场情绪评分"""
         try:
@@ -335,21 +364,16 @@ class IndicatorService:
 
         return max(0, min(100, score))
 
+    def _calculate_technical_scores(self, rsi: np.ndarray, macd: np.ndarray,
+                                    bollinger: np.ndarray) -> np.ndarray:
+        """批量计算技术指标评分（与_calculate_technical_score规则一致，NaN表示缺失）"""
+        return technical_scores(rsi, macd, bollinger)
+
     def _get_strength_level(self, score: float) -> str:
         """获取择时强度等级"""
-        thresholds = config_manager.get('position_sizing.scoring_thresholds', {})
-
-        if score >= thresholds.get('very_strong', 80):
-            return 'very_strong'
-        elif score >= thresholds.get('strong', 60):
-            return 'strong'
-        elif score >= thresholds.get('neutral', 40):
-            return 'neutral'
-        elif score >= thresholds.get('weak', 20):
-            return 'weak'
-        else:
-            return 'very_weak'
+        return STRENGTH_LEVELS[get_position_curve().level_index(score)]
 
+    @timed('indicator.position_sizing')
     def calculate_position_sizing(self, data: Dict[str, Any]) -> Dict[str, Any]:
         """
         计算仓位建议
@@ -362,32 +386,24 @@ class IndicatorService:
         """
         try:
             timing_score = data['timing_score']
-            available_capital = data.get('available_capital', 100000)
-            risk_per_trade = data.get('risk_per_trade_percentage', 2)
+            available_capital = data.get('available_capital', DEFAULT_CAPITAL)
+            risk_per_trade = data.get('risk_per_trade_percentage', DEFAULT_RISK_PERCENTAGE)
 
-            # 获取仓位配置
-            position_sizes = config_manager.get('position_sizing.position_sizes', {})
-            strength_level = self._get_strength_level(timing_score)
-
-            # 计算建议仓位比例
-            position_percentage = position_sizes.get(strength_level, 0)
-
-            # 计算建议仓位金额
-            position_amount = (position_percentage / 100) * available_capital
-
-            # 计算单笔风险金额
-            risk_amount = (risk_per_trade / 100) * available_capital
+            # 仓位曲线按配置缓存，这里只查等级并按资金缩放
+            curve = get_position_curve()
+            index = curve.level_index(timing_score)
+            _, position_amount, risk_amount = curve.size(timing_score, available_capital, risk_per_trade)
 
             result = {
                 'market': data['market'],
                 'date': data['date'],
                 'timing_score': timing_score,
-                'strength_level': strength_level,
-                'position_percentage': position_percentage,
-                'position_amount': round(position_amount, 2),
+                'strength_level': STRENGTH_LEVELS[index],
+                'position_percentage': curve.percentages[index],
+                'position_amount': float(position_amount),
                 'available_capital': available_capital,
                 'risk_per_trade_percentage': risk_per_trade,
-                'risk_amount': round(risk_amount, 2),
+                'risk_amount': float(risk_amount),
                 'calculated_at': datetime.now().isoformat()
             }
 
@@ -397,29 +413,338 @@ class IndicatorService:
             self.logger.error(f"计算仓位建议失败: {e}")
             raise
 
+    @timed('indicator.position_sizing_batch')
+    def calculate_position_sizing_batch(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        批量计算仓位建议（多个组合或多个资金规模一次计算）
+
+        Args:
+            data: 输入数据，portfolios为组合列表，每项包含timing_score，
+                  可选available_capital和risk_per_trade_percentage（缺省取外层同名字段或默认值）
+
+        Returns:
+            Dict[str, Any]: 与portfolios顺序一致的仓位建议
+        """
+        try:
+            portfolios = data['portfolios']
+            default_capital = data.get('available_capital', DEFAULT_CAPITAL)
+            default_risk = data.get('risk_per_trade_percentage', DEFAULT_RISK_PERCENTAGE)
+            capitals = [p.get('available_capital', default_capital) for p in portfolios]
+            risks = [p.get('risk_per_trade_percentage', default_risk) for p in portfolios]
+
+            curve = get_position_curve()
+            indices, amounts, risk_amounts = curve.size(
+                [p['timing_score'] for p in portfolios], capitals, risks
+            )
+
+            results = [
+                {
+                    'timing_score': portfolio['timing_score'],
+                    'strength_level': STRENGTH_LEVELS[index],
+                    'position_percentage': curve.percentages[index],
+                    'position_amount': amount,
+                    'available_capital': capital,
+                    'risk_per_trade_percentage': risk,
+                    'risk_amount': risk_amount
+                }
+                for portfolio, index, amount, capital, risk, risk_amount in zip(
+                    portfolios, indices.tolist(), amounts.tolist(), capitals, risks, risk_amounts.tolist()
+                )
+            ]
+
+            return {
+                'market': data['market'],
+                'date': data['date'],
+                'count': len(results),
+                'results': results,
+                'calculated_at': datetime.now().isoformat()
+            }
+
+        except Exception as e:
+            self.logger.error(f"批量计算仓位建议失败: {e}")
+            raise
+
+    @timed('indicator.sensitivity')
+    def analyze_sensitivity(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        蒙特卡洛敏感性分析
+
+        对择时指标的输入数据和维度权重加入随机扰动，一次性批量计算全部样本，
+        统计各维度评分的置信区间和各强度等级的概率。不保存任何结果
+
+        Args:
+            data: 与calculate_timing_indicators相同的输入，可选n_samples、
+                  input_noise（字段 -> 标准差）、weight_noise、seed；
+                  未提供的输入数据取该市场在date当日或之前的最新记录
+
+        Returns:
+            Dict[str, Any]: 基准评分、置信区间和强度等级概率
+        """
+        try:
+            started = time.perf_counter()
+            market = data['market']
+            date = data.get('date')
+
+            n_samples = int(data.get('n_samples', config_manager.get('sensitivity.n_samples', 10000)))
+            if not 1 <= n_samples <= MAX_SENSITIVITY_SAMPLES:
+                raise ValueError(f"n_samples必须在1到{MAX_SENSITIVITY_SAMPLES}之间")
+
+            input_noise = dict(config_manager.get('sensitivity.input_noise', {}) or {})
+            input_noise.update(data.get('input_noise', {}))
+            weight_noise = float(data.get('weight_noise', config_manager.get('sensitivity.weight_noise', 0.05)))
+            rng = np.random.default_rng(data.get('seed'))
+
+            inputs = self._sensitivity_inputs(market, date, data)
+            samples = {
+                field: value + rng.normal(0.0, float(input_noise.get(field, 0.0)), n_samples)
+                for field, value in inputs.items()
+            }
+
+            # 维度权重按比例扰动后重新归一化
+            base_weights = config_manager.get_timing_weights() or {}
+            weight_names = list(DEFAULT_WEIGHTS)
+            weight_matrix = np.array([base_weights.get(name, DEFAULT_WEIGHTS[name]) for name in weight_names])
+            weight_matrix = np.clip(
+                weight_matrix * (1 + rng.normal(0.0, weight_noise, (n_samples, len(weight_names)))), 0, None
+            )
+            weight_sum = weight_matrix.sum(axis=1, keepdims=True)
+            weight_matrix /= np.where(weight_sum > 0, weight_sum, 1.0)
+
+            components = {
+                'macro_score': macro_scores(
+                    samples, config_manager.get('timing_indicators.macro_indicators', {}) or {}
+                ),
+                'industry_score': industry_scores(
+                    samples, config_manager.get('timing_indicators.industry_indicators', {}) or {}
+                ),
+                'sentiment_score': sentiment_scores(
+                    samples, config_manager.get('timing_indicators.market_sentiment_indicators', {}) or {}
+                )
+            }
+            components['overall_score'] = overall_scores(
+                components['macro_score'], components['industry_score'], components['sentiment_score'],
+                {name: weight_matrix[:, i] for i, name in enumerate(weight_names)}
+            )
+
+            thresholds = config_manager.get('position_sizing.scoring_thresholds', {}) or {}
+            counts = np.bincount(strength_indices(components['overall_score'], thresholds),
+                                 minlength=len(STRENGTH_LEVELS))
+
+            base_score = self._sensitivity_base(inputs)
+
+            return {
+                'market': market,
+                'date': date,
+                'n_samples': n_samples,
+                'base': base_score,
+                'bands': {
+                    name: self._score_band(values) for name, values in components.items()
+                },
+                'strength_probabilities': {
+                    level: round(float(count) / n_samples, 4)
+                    for level, count in zip(STRENGTH_LEVELS, counts)
+                },
+                'base_level_probability': round(
+                    float(counts[STRENGTH_LEVELS.index(base_score['strength_level'])]) / n_samples, 4
+                ),
+                'elapsed_ms': round((time.perf_counter() - started) * 1000, 2)
+            }
+
+        except Exception as e:
+            self.logger.error(f"敏感性分析失败: {e}")
+            raise
+
+    def _sensitivity_inputs(self, market: str, date: Optional[str],
+                            data: Dict[str, Any]) -> Dict[str, float]:
+        """整理敏感性分析的输入字段（扁平化，技术指标字段以technical_indicators.为前缀）"""
+        sources = {
+            'macro_data': self.data_service.get_macro_data,
+            'industry_data': lambda m, s, e: self.data_service.get_industry_data(m, None, s, e),
+            'market_sentiment': self.data_service.get_market_sentiment
+        }
+
+        inputs = {}
+        for key, getter in sources.items():
+            record = data.get(key)
+            if record is None:
+                records = getter(market, None, date)
+                record = records[0] if records else {}
+            inputs.update(self._flatten_inputs(key, record))
+        return {field: value for field, value in inputs.items() if value is not None}
+
+    @staticmethod
+    def _flatten_inputs(key: str, record: Dict[str, Any]) -> Dict[str, Optional[float]]:
+        """
+        将一类输入扁平化，只包含记录中出现的字段，显式为null的字段值为None
+
+        other_macro、technical_indicators扁平化为存在性标记（非空为1.0，空为0.0）
+        """
+        inputs = {}
+        for field in INPUT_FIELDS[key]:
+            value, present = record, True
+            for part in field.split('.'):
+                present = isinstance(value, dict) and part in value
+                value = value.get(part) if present else None
+                if not present:
+                    break
+            if present and field in PRESENCE_FIELDS:
+                inputs[field] = None if value is None else float(bool(value))
+            elif present:
+                try:
+                    inputs[field] = None if value is None else float(value)
+                except (TypeError, ValueError):
+                    raise ValueError(f"字段 {field} 必须是数值") from None
+        return inputs
+
+    def _sensitivity_base(self, inputs: Dict[str, float]) -> Dict[str, Any]:
+        """按未扰动的输入计算基准评分"""
+        columns = {field: np.array([value]) for field, value in inputs.items()}
+        macro = macro_scores(columns, config_manager.get('timing_indicators.macro_indicators', {}) or {})
+        industry = industry_scores(columns, config_manager.get('timing_indicators.industry_indicators', {}) or {})
+        sentiment = sentiment_scores(
+            columns, config_manager.get('timing_indicators.market_sentiment_indicators', {}) or {}
+        )
+        overall = overall_scores(macro, industry, sentiment, config_manager.get_timing_weights() or {})
+
+        # 某个维度没有任何输入时评分为标量
+        overall, macro, industry, sentiment = (float(np.ravel(values)[0])
+                                               for values in (overall, macro, industry, sentiment))
+        return {
+            'overall_score': round(overall, 2),
+            'macro_score': round(macro, 2),
+            'industry_score': round(industry, 2),
+            'sentiment_score': round(sentiment, 2),
+            'strength_level': self._get_strength_level(overall)
+        }
+
+    @timed('indicator.scenarios')
+    def evaluate_scenarios(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        批量评估假设情景（不保存任何结果）
+
+        每个情景在基准输入上覆盖部分字段（如PMI降至48、波动率升至25），字段为null表示缺失；
+        基准输入取请求中的macro_data/industry_data/market_sentiment，未提供的部分取该市场的最新数据。
+        全部情景组成按字段的数组，按IndicatorService的评分规则一次批量计算
+
+        Args:
+            data: 输入数据，scenarios为情景列表
+
+        Returns:
+            Dict[str, Any]: 与scenarios顺序一致的各维度评分和强度等级
+        """
+        try:
+            started = time.perf_counter()
+            market = data['market']
+            date = data.get('date')
+            scenarios = data['scenarios']
+            if not 1 <= len(scenarios) <= MAX_SCENARIOS:
+                raise ValueError(f"情景数必须在1到{MAX_SCENARIOS}之间")
+
+            base = self._sensitivity_inputs(market, date, data)
+            rows = []
+            for scenario in scenarios:
+                inputs = dict(base)
+                for key in INPUT_FIELDS:
+                    inputs.update(self._flatten_inputs(key, scenario.get(key) or {}))
+                rows.append(inputs)
+
+            # 按字段组成数组，某个情景缺失的字段为NaN，不计入该情景对应维度的加权
+            fields = [field for fields in INPUT_FIELDS.values() for field in fields
+                      if any(row.get(field) is not None for row in rows)]
+            columns = {
+                field: np.array([row.get(field) for row in rows], dtype=float)
+                for field in fields
+            }
+
+            weights = config_manager.get_timing_weights() or {}
+            macro = np.broadcast_to(macro_scores(
+                columns, config_manager.get('timing_indicators.macro_indicators', {}) or {}
+            ), (len(rows),))
+            industry = np.broadcast_to(industry_scores(
+                columns, config_manager.get('timing_indicators.industry_indicators', {}) or {}
+            ), (len(rows),))
+            sentiment = np.broadcast_to(sentiment_scores(
+                columns, config_manager.get('timing_indicators.market_sentiment_indicators', {}) or {}
+            ), (len(rows),))
+            overall = overall_scores(macro, industry, sentiment, weights)
+            levels = strength_indices(overall, get_position_curve().thresholds)
+
+            results = [
+                {
+                    'name': scenario.get('name', str(index)),
+                    'overall_score': overall_score,
+                    'macro_score': macro_score,
+                    'industry_score': industry_score,
+                    'sentiment_score': sentiment_score,
+                    'strength_level': STRENGTH_LEVELS[level]
+                }
+                for index, (scenario, overall_score, macro_score, industry_score, sentiment_score, level)
+                in enumerate(zip(scenarios, overall.round(2).tolist(), macro.round(2).tolist(),
+                                 industry.round(2).tolist(), sentiment.round(2).tolist(), levels.tolist()))
+            ]
+
+            return {
+                'market': market,
+                'date': date,
+                'count': len(results),
+                'base_inputs': base,
+                'weights': weights,
+                'results': results,
+                'elapsed_ms': round((time.perf_counter() - started) * 1000, 2)
+            }
+
+        except Exception as e:
+            self.logger.error(f"情景评估失败: {e}")
+            raise
+
+    @staticmethod
+    def _score_band(values: np.ndarray) -> Dict[str, float]:
+        """评分样本的均值、标准差和分位数"""
+        values = np.broadcast_to(values, np.shape(values) or (1,))
+        p5, p25, p50, p75, p95 = np.percentile(values, [5, 25, 50, 75, 95])
+        return {
+            'mean': round(float(values.mean()), 2),
+            'std': round(float(values.std()), 2),
+            'p5': round(float(p5), 2),
+            'p25': round(float(p25), 2),
+            'p50': round(float(p50), 2),
+            'p75': round(float(p75), 2),
+            'p95': round(float(p95), 2)
+        }
+
     def get_timing_indicators(self, market: str, start_date: Optional[str] = None,
                             end_date: Optional[str] = None) -> List[Dict[str, Any]]:
         """获取择时指标历史数据"""
         return self.data_service.get_timing_indicators(market, start_date, end_date)
 
+    def get_latest_indicators(self, markets: List[str]) -> Dict[str, Dict[str, Any]]:
+        """获取各市场最新的择时指标（一次查询，见DataService.get_latest_records）"""
+        return self.data_service.get_latest_records('timing_indicators', markets)
+
+    def _comparison_scores(self, markets: List[str]) -> Dict[str, Dict[str, Any]]:
+        """各市场最新的评分（按请求的市场顺序，没有数据的市场不在结果中）"""
+        latest = self.get_latest_indicators(markets)
+        comparison_data = {}
+
+        for market in markets:
+            latest_data = latest.get(market)
+            if latest_data:
+                comparison_data[market] = {
+                    'overall_score': latest_data.get('overall_score', 0),
+                    'macro_score': latest_data.get('macro_score', 0),
+                    'industry_score': latest_data.get('industry_score', 0),
+                    'sentiment_score': latest_data.get('sentiment_score', 0),
+                    'strength_level': latest_data.get('strength_level', 'neutral'),
+                    'date': latest_data.get('date')
+                }
+
+        return comparison_data
+
     def compare_markets(self, markets: List[str], date: Optional[str] = None) -> Dict[str, Any]:
         """多市场比较分析"""
         try:
-            comparison_data = {}
-
-            for market in markets:
-                # 获取该市场的最新择时指标
-                timing_data = self.get_timing_indicators(market)
-                if timing_data:
-                    latest_data = timing_data[0]  # 最新的数据
-                    comparison_data[market] = {
-                        'overall_score': latest_data.get('overall_score', 0),
-                        'macro_score': latest_data.get('macro_score', 0),
-                        'industry_score': latest_data.get('industry_score', 0),
-                        'sentiment_score': latest_data.get('sentiment_score', 0),
-                        'strength_level': latest_data.get('strength_level', 'neutral'),
-                        'date': latest_data.get('date')
-                    }
+            # 一次查询获取全部市场的最新择时指标
+            comparison_data = self._comparison_scores(markets)
 
             # 按综合评分排序
             sorted_markets = sorted(
@@ -442,19 +767,13 @@ class IndicatorService:
         """获取分析摘要"""
         try:
             # 获取最新择时指标
-            timing_data = self.get_timing_indicators(market)
-            if not timing_data:
+            latest_data = self.get_latest_indicators([market]).get(market)
+            if not latest_data:
                 return {'error': '暂无分析数据'}
 
-            latest_data = timing_data[0]
-
-            # 获取宏观数据
-            macro_data = self.data_service.get_macro_data(market)
-            latest_macro = macro_data[0] if macro_data else {}
-
-            # 获取市场情绪数据
-            sentiment_data = self.data_service.get_market_sentiment(market)
-            latest_sentiment = sentiment_data[0] if sentiment_data else {}
+            # 获取最新宏观数据和市场情绪数据
+            latest_macro = self.data_service.get_latest_records('macro_data', [market]).get(market, {})
+            latest_sentiment = self.data_service.get_latest_records('market_sentiment', [market]).get(market, {})
 
             summary = {
                 'market': market,
@@ -498,36 +817,78 @@ class IndicatorService:
 
     # 可视化相关方法
     def get_timing_score_trend(self, market: str, start_date: Optional[str] = None,
-                              end_date: Optional[str] = None, indicator_type: str = 'overall') -> List[Dict[str, Any]]:
-        """获取择时评分趋势数据"""
-        timing_data = self.get_timing_indicators(market, start_date, end_date)
-
-        trend_data = []
-        for data in timing_data:
-            if indicator_type == 'overall':
-                score = data.get('overall_score', 0)
-            elif indicator_type == 'macro':
-                score = data.get('macro_score', 0)
-            elif indicator_type == 'industry':
-                score = data.get('industry_score', 0)
-            elif indicator_type == 'sentiment':
-                score = data.get('sentiment_score', 0)
-            else:
-                score = data.get('overall_score', 0)
+                              end_date: Optional[str] = None, indicator_type: str = 'overall',
+                              max_points: Optional[int] = None,
+                              window: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        获取择时评分趋势数据
+
+        max_points不为空时进行降采样；window不为空时附加滚动平滑值和滚动标准分
+        （在降采样之前按完整序列计算）
+        """
+        score_fields = {
+            'overall': 'overall_score',
+            'macro': 'macro_score',
+            'industry': 'industry_score',
+            'sentiment': 'sentiment_score'
+        }
+        field = score_fields.get(indicator_type, 'overall_score')
+
+        # 列式读取（升序），翻转为与历史接口一致的倒序
+        columns = self.data_service.get_columns(
+            'timing_indicators', market, start_date, end_date, [field, 'strength_level']
+        )
+        dates = columns['date'][::-1]
+        scores = np.nan_to_num(columns[field][::-1])
+        levels = columns['strength_level'][::-1]
+
+        if max_points and len(scores) > max_points:
+            keep = self._downsample_trend(scores, levels, max_points)
+        else:
+            keep = np.arange(len(scores))
+
+        trend = [
+            {
+                'date': dates[i].item(),
+                'score': scores[i].item(),
+                'strength_level': levels[i].item() or 'neutral'
+            }
+            for i in keep
+        ]
+
+        if window is not None:
+            # 滚动统计按时间升序计算
+            smoothed = rolling_mean(scores[::-1], window)[::-1]
+            zscores = rolling_zscore(scores[::-1], window)[::-1]
+            for point, i in zip(trend, keep):
+                point['smoothed_score'] = round(float(smoothed[i]), 4)
+                point['zscore'] = round(float(zscores[i]), 4)
+
+        return trend
+
+    def _downsample_trend(self, scores: np.ndarray, levels: np.ndarray,
+                          max_points: int) -> np.ndarray:
+        """LTTB降采样，并保留强度等级切换点，返回保留点下标"""
+        max_points = max(max_points, 3)
 
-            trend_data.append({
-                'date': data.get('date'),
-                'score': score,
-                'strength_level': data.get('strength_level', 'neutral')
-            })
+        # 强度等级发生切换的位置（切换前后两个点都保留）
+        changes = np.flatnonzero(levels[1:] != levels[:-1])
+        transitions = np.union1d(changes, changes + 1)
 
-        return trend_data
+        if len(transitions) > max_points - 2:
+            # 切换点过多时，在切换点及首尾点内部再做一次降采样
+            candidates = np.union1d(transitions, [0, len(scores) - 1])
+            return candidates[lttb_downsample(candidates, scores[candidates], max_points)]
+
+        budget = max_points - len(transitions)
+        keep = lttb_downsample(np.arange(len(scores)), scores, budget)
+        return np.union1d(keep, transitions)
 
     def get_market_comparison_data(self, markets: List[str], date: Optional[str],
                                   indicators: List[str]) -> Dict[str, Any]:
         """获取市场比较图表数据"""
-        comparison_result = self.compare_markets(markets, date)
-        market_data = comparison_result.get('markets', {})
+        # 图表只需要各市场的评分，不再排序和选出最佳市场
+        market_data = self._comparison_scores(markets)
 
         chart_data = {}
         for indicator in indicators:
@@ -539,11 +900,10 @@ class IndicatorService:
 
     def get_indicator_breakdown(self, market: str, date: Optional[str]) -> Dict[str, Any]:
         """获取指标分解数据"""
-        timing_data = self.get_timing_indicators(market)
-        if not timing_data:
+        latest_data = self.get_latest_indicators([market]).get(market)
+        if not latest_data:
             return {}
 
-        latest_data = timing_data[0]
         weights = latest_data.get('weights', {})
 
         return {
@@ -564,22 +924,33 @@ class IndicatorService:
     def get_position_sizing_chart_data(self, market: str, date: Optional[str],
                                      available_capital: float) -> Dict[str, Any]:
         """获取仓位配置图表数据"""
-        timing_data = self.get_timing_indicators(market)
-        if not timing_data:
+        latest_data = self.get_latest_indicators([market]).get(market)
+        if not latest_data:
             return {}
 
-        latest_data = timing_data[0]
         timing_score = latest_data.get('overall_score', 0)
 
-        # 计算不同评分下的仓位建议
-        position_data = {}
-        for score in range(0, 101, 10):
-            position_data[str(score)] = self.calculate_position_sizing({
+        # 各评分点的等级和仓位比例随曲线缓存，按资金缩放金额即可
+        curve = get_position_curve()
+        risk_amount = round(DEFAULT_RISK_PERCENTAGE / 100 * available_capital, 2)
+        calculated_at = datetime.now().isoformat()
+        position_data = {
+            str(score): {
                 'market': market,
                 'date': date,
                 'timing_score': score,
-                'available_capital': available_capital
-            })
+                'strength_level': level,
+                'position_percentage': percentage,
+                'position_amount': amount,
+                'available_capital': available_capital,
+                'risk_per_trade_percentage': DEFAULT_RISK_PERCENTAGE,
+                'risk_amount': risk_amount,
+                'calculated_at': calculated_at
+            }
+            for score, level, percentage, amount in zip(
+                CHART_SCORES, curve.chart_levels, curve.chart_percentages, curve.chart_amounts(available_capital)
+            )
+        }
 
         return {
             'current_score': timing_score,
@@ -587,23 +958,89 @@ class IndicatorService:
         }
 
     def get_sentiment_analysis_data(self, market: str, start_date: Optional[str],
-                                  end_date: Optional[str]) -> Dict[str, Any]:
-        """获取市场情绪分析数据"""
-        sentiment_data = self.data_service.get_market_sentiment(market, start_date, end_date)
-
-        analysis_data = []
-        for data in sentiment_data:
-            analysis_data.append({
-                'date': data.get('date'),
-                'volatility': data.get('volatility', 0),
-                'investor_sentiment': data.get('investor_sentiment', 0),
-                'technical_score': self._calculate_technical_score(data.get('technical_indicators', {}))
-            })
+                                  end_date: Optional[str],
+                                  window: Optional[int] = None) -> Dict[str, Any]:
+        """获取市场情绪分析数据，window不为空时附加滚动平滑值和滚动标准分"""
+        columns = self.data_service.get_columns('market_sentiment', market, start_date, end_date)
+
+        # 列式读取为升序，翻转为倒序输出
+        dates = columns['date'][::-1]
+        volatility = np.nan_to_num(columns['volatility'][::-1])
+        investor_sentiment = np.nan_to_num(columns['investor_sentiment'][::-1])
+        technical_scores = self._calculate_technical_scores(
+            columns['technical_indicators.rsi'][::-1],
+            columns['technical_indicators.macd'][::-1],
+            columns['technical_indicators.bollinger_bands'][::-1]
+        )
+
+        analysis_data = [
+            {
+                'date': date,
+                'volatility': vol,
+                'investor_sentiment': sentiment,
+                'technical_score': technical
+            }
+            for date, vol, sentiment, technical in zip(
+                dates.tolist(), volatility.tolist(),
+                investor_sentiment.tolist(), technical_scores.tolist()
+            )
+        ]
+
+        if window is not None:
+            # 滚动统计按时间升序计算
+            rolling = {
+                'volatility_smoothed': rolling_mean(volatility[::-1], window)[::-1],
+                'volatility_zscore': rolling_zscore(volatility[::-1], window)[::-1],
+                'sentiment_smoothed': rolling_mean(investor_sentiment[::-1], window)[::-1],
+                'sentiment_zscore': rolling_zscore(investor_sentiment[::-1], window)[::-1]
+            }
+            for name, values in rolling.items():
+                for point, value in zip(analysis_data, values.round(4).tolist()):
+                    point[name] = value
 
         return {
             'sentiment_data': analysis_data,
-            'average_volatility': sum(d['volatility'] for d in analysis_data) / len(analysis_data) if analysis_data else 0,
-            'average_sentiment': sum(d['investor_sentiment'] for d in analysis_data) / len(analysis_data) if analysis_data else 0
+            'average_volatility': float(volatility.mean()) if len(volatility) else 0,
+            'average_sentiment': float(investor_sentiment.mean()) if len(investor_sentiment) else 0
+        }
+
+    def get_correlation_heatmap_data(self, markets: Optional[List[str]] = None,
+                                     indicators: Optional[List[str]] = None,
+                                     window: Optional[int] = None) -> Dict[str, Any]:
+        """
+        获取指标相关性热力图数据
+
+        相关系数来自增量维护的相关性矩阵，只做行列筛选，不重新遍历历史数据
+
+        Args:
+            markets: 市场列表，为空时包含全部市场
+            indicators: 指标列表，为空时包含全部跟踪指标
+            window: 滚动窗口（最近的日期数），为空时使用全部历史
+
+        Returns:
+            Dict[str, Any]: 标签、相关系数矩阵和成对观测数
+        """
+        unknown = set(indicators or []) - set(CORRELATION_INDICATORS)
+        if unknown:
+            raise ValueError(f"不支持的指标: {', '.join(sorted(unknown))}")
+
+        tracker = get_correlation_tracker(
+            self.data_service.data_file, self.data_service._load_data,
+            config_manager.get('correlation.min_periods', 3)
+        )
+        with tracker.lock:
+            correlation, observations = tracker.correlation(window)
+            selected = tracker.select(markets, indicators)
+            labels = [f"{market}.{field}" for market, field in (tracker.labels[i] for i in selected)]
+            revision = tracker.revision
+
+        matrix = correlation[np.ix_(selected, selected)].round(4)
+        return {
+            'labels': labels,
+            'matrix': np.where(np.isnan(matrix), None, matrix).tolist(),
+            'observations': observations[np.ix_(selected, selected)].astype(int).tolist(),
+            'window': window,
+            'revision': revision
         }
 
     def get_dashboard_summary(self, market: str, date: Optional[str]) -> Dict[str, Any]:
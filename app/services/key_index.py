@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+自然键索引
+
+各集合按自然键（市场、日期，行业数据另加行业）去重：同一自然键只保留一条当前记录，
+再次提交时替换原记录（保留原ID），被替换的版本可写入独立的修订历史文件。
+索引为 自然键 -> 记录在集合列表中的位置 的哈希表，按数据文件标识缓存：
+本进程保存后随之更新，其他进程修改了数据文件时按新内容重建
+"""
+
+import json
+import threading
+from pathlib import Path
+from typing import Dict, List, Any, Iterator, Optional, Tuple
+
+# 各集合的自然键字段
+NATURAL_KEYS: Dict[str, Tuple[str, ...]] = {
+    'macro_data': ('market', 'date'),
+    'market_sentiment': ('market', 'date'),
+    'industry_data': ('market', 'date', 'industry'),
+    'timing_indicators': ('market', 'date')
+}
+
+
+def natural_key(collection: str, record: Dict[str, Any]) -> Optional[Tuple[Any, ...]]:
+    """记录的自然键，集合不按自然键去重或缺少键字段时返回None"""
+    fields = NATURAL_KEYS.get(collection)
+    if fields is None:
+        return None
+    key = tuple(record.get(field) for field in fields)
+    return None if any(value is None for value in key) else key
+
+
+def build_positions(collection: str, records: List[Dict[str, Any]]) -> Dict[Tuple[Any, ...], int]:
+    """由记录列表构建索引，存在重复时以靠后（后提交）的记录为准"""
+    positions = {}
+    for position, record in enumerate(records):
+        key = natural_key(collection, record)
+        if key is not None:
+            positions[key] = position
+    return positions
+
+
+class KeyIndex:
+    """一个数据文件的自然键索引"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.stamp: Optional[Tuple[int, int]] = None
+        self.positions: Dict[str, Dict[Tuple[Any, ...], int]] = {}
+        self.sizes: Dict[str, int] = {}
+
+    def checkout(self, collection: str, records: List[Dict[str, Any]],
+                 stamp: Optional[Tuple[int, int]]) -> Dict[Tuple[Any, ...], int]:
+        """
+        取出集合的索引，调用方追加或替换记录时同步修改，保存成功后调用commit放回
+
+        保存失败时索引不会放回，下次使用时按文件内容重建
+
+        Args:
+            collection: 集合名称
+            records: 刚从数据文件加载的集合记录
+            stamp: 加载时的数据文件标识
+
+        Returns:
+            Dict: 自然键 -> 位置
+        """
+        with self.lock:
+            if stamp != self.stamp:
+                # 数据文件被其他进程修改过，全部集合的索引失效
+                self.positions.clear()
+                self.sizes.clear()
+                self.stamp = stamp
+
+            positions = self.positions.pop(collection, None)
+            if positions is None or self.sizes.pop(collection, None) != len(records):
+                positions = build_positions(collection, records)
+            return positions
+
+    def commit(self, collection: str, positions: Dict[Tuple[Any, ...], int], size: int,
+               stamp: Optional[Tuple[int, int]]):
+        """保存数据文件后放回索引，并更新文件标识（本进程的写入不会使其他集合的索引失效）"""
+        with self.lock:
+            self.positions[collection] = positions
+            self.sizes[collection] = size
+            self.stamp = stamp
+
+
+_indexes: Dict[str, KeyIndex] = {}
+_indexes_lock = threading.Lock()
+
+
+def get_index(data_file: Path) -> KeyIndex:
+    """获取数据文件的自然键索引"""
+    key = str(data_file)
+    with _indexes_lock:
+        index = _indexes.get(key)
+        if index is None:
+            index = _indexes[key] = KeyIndex()
+    return index
+
+
+class RevisionLog:
+    """
+    修订历史（JSON Lines，只追加）
+
+    每行保存一条被替换的记录版本：集合、自然键、替换时间和原记录
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+
+    def append(self, entries: List[Tuple[str, Dict[str, Any], str]]):
+        """
+        追加被替换的记录
+
+        Args:
+            entries: [(集合, 原记录, 替换时间)]
+        """
+        if not entries:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.path, 'a', encoding='utf-8') as f:
+            for collection, record, superseded_at in entries:
+                f.write(json.dumps({
+                    'collection': collection,
+                    'key': list(natural_key(collection, record) or ()),
+                    'superseded_at': superseded_at,
+                    'record': record
+                }, ensure_ascii=False, separators=(',', ':')) + '\n')
+
+    def iter_entries(self, collection: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+        """按写入顺序逐条读取修订历史"""
+        if not self.path.exists():
+            return
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                entry = json.loads(line)
+                if collection is None or entry['collection'] == collection:
+                    yield entry
+
+    def history(self, collection: str, key: Tuple[Any, ...]) -> List[Dict[str, Any]]:
+        """某个自然键被替换过的全部版本（由新到旧）"""
+        key = list(key)
+        entries = [entry for entry in self.iter_entries(collection) if entry['key'] == key]
+        return entries[::-1]
+
@@ -0,0 +1,273 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+数据迁移服务
+
+将application_data.json中的数据流式迁移到列式存储：
+逐个集合流式读取记录，规范化日期和ID后按批次写入目标分区，
+每批写入后记录检查点以便中断后续传，最后核对记录数和校验和。
+清单在核对通过后才写入，未完成的迁移不会被DataService当作可用存储
+"""
+
+import hashlib
+import json
+import logging
+import os
+import re
+import time
+from datetime import date as date_type
+from pathlib import Path
+from typing import Dict, List, Any, Optional, Callable
+
+from ..utils.config import config_manager
+from ..utils.json_stream import JsonCollectionStream
+from .columnar_store import COLLECTION_SCHEMAS, ColumnarStore, _get_field
+from .segment_store import file_stamp
+
+# 生成ID时使用的前缀，与DataService一致
+ID_PREFIXES = {
+    'macro_data': 'macro',
+    'market_sentiment': 'sentiment',
+    'industry_data': 'industry',
+    'timing_indicators': 'timing'
+}
+
+# 支持 2024-01-15、2024/1/15、2024.01.15、20240115 及带时间部分的写法
+_DATE_PATTERN = re.compile(r'^\s*(\d{4})(?:[-/.](\d{1,2})[-/.](\d{1,2})|(\d{2})(\d{2}))(?:$|[T\s])')
+
+_CHECKSUM_MOD = 1 << 64
+
+
+def normalize_date(value: Any) -> Optional[str]:
+    """
+    将日期规范化为YYYY-MM-DD
+
+    Args:
+        value: 原始日期
+
+    Returns:
+        Optional[str]: 规范化后的日期，无法解析时返回None
+    """
+    match = _DATE_PATTERN.match(str(value)) if value is not None else None
+    if not match:
+        return None
+
+    year, month, day = match.group(1), match.group(2) or match.group(4), match.group(3) or match.group(5)
+    try:
+        return date_type(int(year), int(month), int(day)).isoformat()
+    except ValueError:
+        return None
+
+
+def record_checksum(collection: str, record: Dict[str, Any]) -> int:
+    """
+    记录在列式存储中可表示部分的校验值
+
+    数值统一为float、空字符串视为缺失，与列式存储的读写规则一致，
+    源记录和从目标读回的记录可直接比较
+
+    Args:
+        collection: 集合名称
+        record: 数据记录
+
+    Returns:
+        int: 64位校验值
+    """
+    values: List[Any] = [str(record.get('id', '')), str(record.get('date', '')), str(record.get('market', ''))]
+    for name, kind in COLLECTION_SCHEMAS[collection].items():
+        value = _get_field(record, name)
+        if kind == 'f':
+            numeric = isinstance(value, (int, float)) and not isinstance(value, bool) and value == value
+            values.append(float(value) if numeric else None)
+        else:
+            values.append(str(value) if value is not None and value != '' else None)
+
+    canonical = json.dumps(values, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+    return int.from_bytes(hashlib.blake2b(canonical, digest_size=8).digest(), 'little')
+
+
+class MigrationService:
+    """JSON数据文件到列式存储的流式迁移"""
+
+    def __init__(self, source: Optional[str] = None, target: Optional[str] = None,
+                 batch_size: Optional[int] = None, checkpoint_path: Optional[str] = None):
+        self.source = Path(source or config_manager.get('database.file_path', 'data/application_data.json'))
+        self.target = Path(target or config_manager.get('database.columnar_path', 'data/columnar'))
+        self.batch_size = int(batch_size or config_manager.get('migration.batch_size', 5000))
+        if self.batch_size < 1:
+            raise ValueError("批次大小必须大于0")
+        self.checkpoint_path = Path(checkpoint_path) if checkpoint_path else self.target / '.migration_checkpoint.json'
+        self.store = ColumnarStore(str(self.target))
+        self.logger = logging.getLogger(__name__)
+
+    def run(self, resume: bool = False,
+            progress: Optional[Callable[[str, int], None]] = None) -> Dict[str, Any]:
+        """
+        执行迁移
+
+        Args:
+            resume: 存在检查点时从中断处继续，否则清空目标后重新迁移
+            progress: 每批写入后的回调 (集合名称, 已处理记录数)
+
+        Returns:
+            Dict[str, Any]: 各集合的记录数、校验结果和速度
+        """
+        if not self.source.exists():
+            raise FileNotFoundError(f"数据文件不存在: {self.source}")
+
+        checkpoint = self._load_checkpoint() if resume else None
+        if checkpoint is None:
+            self.store.clear()
+            checkpoint = {
+                'source': str(self.source),
+                'source_stamp': list(file_stamp(self.source)),
+                'collections': {}
+            }
+            self._save_checkpoint(checkpoint)
+        else:
+            self.logger.info(f"从检查点继续迁移: {self.checkpoint_path}")
+
+        started = time.perf_counter()
+        collections = {}
+        for collection in COLLECTION_SCHEMAS:
+            collections[collection] = self._migrate_collection(collection, checkpoint, progress)
+        elapsed = time.perf_counter() - started
+
+        verified = all(item['verified'] for item in collections.values())
+        if verified:
+            self.store.mark_built()
+            self.checkpoint_path.unlink()
+        else:
+            self.logger.error("迁移校验失败，保留检查点，未写入清单")
+
+        processed = sum(item['processed'] for item in collections.values())
+        return {
+            'source': str(self.source),
+            'target': str(self.target),
+            'batch_size': self.batch_size,
+            'resumed': resume and any(item['resumed_from'] for item in collections.values()),
+            'collections': collections,
+            'verified': verified,
+            'seconds': round(elapsed, 3),
+            'records_per_second': round(processed / elapsed, 1) if elapsed > 0 else 0.0
+        }
+
+    def _migrate_collection(self, collection: str, checkpoint: Dict[str, Any],
+                            progress: Optional[Callable[[str, int], None]]) -> Dict[str, Any]:
+        """
+        迁移单个集合
+
+        续传时已完成的记录只重新读取和规范化（用于恢复ID去重状态和源校验和），不再写入
+        """
+        state = checkpoint['collections'].setdefault(collection, {'offset': 0})
+        resumed_from = state['offset']
+
+        seen_ids = set()
+        source_count = migrated = invalid = 0
+        checksum = 0
+        batch: List[Dict[str, Any]] = []
+
+        started = time.perf_counter()
+        for offset, record in enumerate(JsonCollectionStream(self.source).iter_records(collection)):
+            source_count += 1
+            normalized = self._normalize(collection, record, offset, seen_ids)
+            if normalized is None:
+                invalid += 1
+                continue
+
+            migrated += 1
+            checksum = (checksum + record_checksum(collection, normalized)) % _CHECKSUM_MOD
+            if offset < resumed_from:
+                continue
+
+            batch.append(normalized)
+            if len(batch) >= self.batch_size:
+                self._write(collection, batch, offset + 1, checkpoint, progress)
+                batch = []
+
+        if batch or source_count > resumed_from:
+            self._write(collection, batch, source_count, checkpoint, progress)
+        elapsed = time.perf_counter() - started
+
+        target_count, target_checksum = self._target_summary(collection)
+        processed = max(source_count - resumed_from, 0)
+        result = {
+            'source_count': source_count,
+            'migrated': migrated,
+            'invalid': invalid,
+            'target_count': target_count,
+            'checksum': f"{checksum:016x}",
+            'target_checksum': f"{target_checksum:016x}",
+            'verified': target_count == migrated and target_checksum == checksum,
+            'resumed_from': resumed_from,
+            'processed': processed,
+            'records_per_second': round(processed / elapsed, 1) if elapsed > 0 else 0.0
+        }
+        self.logger.info(f"迁移集合 {collection}: {migrated}/{source_count} 条，校验{'通过' if result['verified'] else '失败'}")
+        return result
+
+    def _normalize(self, collection: str, record: Any, offset: int,
+                   seen_ids: set) -> Optional[Dict[str, Any]]:
+        """
+        规范化日期和ID
+
+        缺失或重复的ID按 前缀_日期_序号 重新生成；缺少市场或日期无法解析的记录返回None
+        """
+        if not isinstance(record, dict) or not record.get('market'):
+            return None
+
+        date = normalize_date(record.get('date'))
+        if date is None:
+            return None
+
+        record_id = str(record.get('id') or '').strip()
+        if not record_id or record_id in seen_ids:
+            base = f"{record_id}_{offset}" if record_id else f"{ID_PREFIXES[collection]}_{date.replace('-', '')}_{offset}"
+            record_id, suffix = base, 1
+            while record_id in seen_ids:
+                record_id = f"{base}_{suffix}"
+                suffix += 1
+        seen_ids.add(record_id)
+
+        return dict(record, id=record_id, date=date, market=str(record['market']))
+
+    def _write(self, collection: str, batch: List[Dict[str, Any]], offset: int,
+               checkpoint: Dict[str, Any], progress: Optional[Callable[[str, int], None]]):
+        """写入一批记录并推进检查点"""
+        if batch:
+            self.store.write_batch(collection, batch)
+        checkpoint['collections'][collection]['offset'] = offset
+        self._save_checkpoint(checkpoint)
+        if progress:
+            progress(collection, offset)
+
+    def _target_summary(self, collection: str) -> tuple:
+        """逐个分区读回目标数据，统计记录数和校验和"""
+        count = 0
+        checksum = 0
+        for market, _, columns in self.store.iter_partitions(collection):
+            for record in self.store.iter_rows(collection, columns, market):
+                count += 1
+                checksum = (checksum + record_checksum(collection, record)) % _CHECKSUM_MOD
+        return count, checksum
+
+    def _load_checkpoint(self) -> Optional[Dict[str, Any]]:
+        """加载检查点，源文件已变化时拒绝续传"""
+        if not self.checkpoint_path.exists():
+            return None
+
+        with open(self.checkpoint_path, 'r', encoding='utf-8') as f:
+            checkpoint = json.load(f)
+
+        if checkpoint.get('source') != str(self.source) or \
+                tuple(checkpoint.get('source_stamp', [])) != file_stamp(self.source):
+            raise ValueError("数据文件在中断后已被修改，无法续传，请重新迁移")
+        return checkpoint
+
+    def _save_checkpoint(self, checkpoint: Dict[str, Any]):
+        """原子写入检查点"""
+        self.checkpoint_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.checkpoint_path.with_name(self.checkpoint_path.name + '.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(checkpoint, f, ensure_ascii=False)
+        os.replace(tmp_path, self.checkpoint_path)
@@ -0,0 +1,434 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+择时参数优化服务
+
+对维度权重和宏观指标阈值做网格/随机搜索，按前推（walk-forward）
+训练/测试窗口评估回测表现：候选只按训练窗口指标选择和排序，测试窗口指标仅用于报告。
+候选参数按批次以数组广播方式一次性评分；启用进程池时批次分发到进程内复用的进程池并行执行
+"""
+
+import atexit
+import itertools
+import logging
+import math
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, List, Any, Optional, Tuple
+
+import numpy as np
+
+from ..utils.config import config_manager
+from .backtest_service import BacktestService, position_fractions
+from .timing_scorer import (
+    MACRO_DEFAULTS, DEFAULT_WEIGHTS, MACRO_FIELDS, INDUSTRY_FIELDS, SENTIMENT_FIELDS,
+    macro_scores, industry_scores, sentiment_scores, overall_scores
+)
+
+WEIGHT_NAMES = list(DEFAULT_WEIGHTS)
+PARAM_NAMES = [f'weights.{name}' for name in WEIGHT_NAMES] + [
+    f'{name}.{kind}' for name in MACRO_DEFAULTS for kind in ('threshold_good', 'threshold_bad')
+]
+METRICS = ('sharpe', 'total_return')
+
+# 进程内复用的进程池（按进程数创建，不在每个请求中新建）
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_workers = 0
+_pool_lock = threading.Lock()
+
+
+def _get_pool(workers: int) -> ProcessPoolExecutor:
+    """获取复用的进程池，进程数配置变化时重建"""
+    global _pool, _pool_workers
+    with _pool_lock:
+        if _pool is None or _pool_workers != workers:
+            if _pool is not None:
+                _pool.shutdown(wait=False)
+            _pool = ProcessPoolExecutor(max_workers=workers)
+            _pool_workers = workers
+        return _pool
+
+
+def _reset_pool():
+    """关闭进程池（进程退出或进程池损坏时调用）"""
+    global _pool, _pool_workers
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False)
+        _pool, _pool_workers = None, 0
+
+
+atexit.register(_reset_pool)
+
+
+def align_previous(source_dates: np.ndarray, columns: Dict[str, np.ndarray],
+                   fields: List[str], target_dates: np.ndarray) -> Dict[str, np.ndarray]:
+    """
+    将数据列对齐到目标日期：取目标日期之前（不含当日）最近一个日期的值，
+    同一日期有多条记录时（如多个行业）取平均
+
+    Args:
+        source_dates: 数据日期（升序）
+        columns: 数据列
+        fields: 需要对齐的字段
+        target_dates: 目标日期（升序）
+
+    Returns:
+        Dict[str, np.ndarray]: 对齐后的列，无可用数据处为NaN
+    """
+    if len(source_dates) == 0:
+        return {field: np.full(len(target_dates), np.nan) for field in fields}
+
+    unique_dates, starts = np.unique(np.asarray(source_dates, dtype=str), return_index=True)
+    index = np.searchsorted(unique_dates, target_dates, side='left') - 1
+    valid = index >= 0
+
+    aligned = {}
+    for field in fields:
+        values = np.asarray(columns.get(field, np.full(len(source_dates), np.nan)), dtype=float)
+        present = ~np.isnan(values)
+        sums = np.add.reduceat(np.where(present, values, 0.0), starts)
+        counts = np.add.reduceat(present.astype(float), starts)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            means = np.where(counts > 0, sums / counts, np.nan)
+        aligned[field] = np.where(valid, means[np.clip(index, 0, None)], np.nan)
+    return aligned
+
+
+def evaluate_candidates(candidates: np.ndarray, panels: List[Dict[str, Any]],
+                        settings: Dict[str, Any]) -> np.ndarray:
+    """
+    批量评估候选参数
+
+    Args:
+        candidates: 候选参数矩阵 (候选数, len(PARAM_NAMES))
+        panels: 各市场的对齐输入面板
+        settings: 评分与回测设置
+
+    Returns:
+        np.ndarray: (候选数, 窗口数, 2) 的训练/测试指标，按市场平均
+    """
+    weights = {name: candidates[:, i:i + 1] for i, name in enumerate(WEIGHT_NAMES)}
+    thresholds = {
+        name: (candidates[:, column:column + 1], candidates[:, column + 1:column + 2])
+        for name, column in settings['threshold_columns'].items()
+    }
+
+    per_market = []
+    for panel in panels:
+        macro = macro_scores(panel['macro'], settings['macro_config'], thresholds)
+        overall = overall_scores(macro, panel['industry'], panel['sentiment'], weights)
+
+        positions = position_fractions(overall, settings['scoring_thresholds'], settings['position_sizes'])
+        turnover = np.abs(np.diff(positions, axis=1, prepend=0.0))
+        returns = positions * panel['returns'] - turnover * settings['cost_bps'] / 10000.0
+
+        folds = [
+            [_window_metric(returns[:, lo:hi], settings) for lo, hi in ((a, b), (c, d))]
+            for a, b, c, d in panel['folds']
+        ]
+        per_market.append(np.stack([np.stack(fold, axis=1) for fold in folds], axis=1))
+
+    with np.errstate(invalid='ignore'):
+        return np.nanmean(np.stack(per_market), axis=0)
+
+
+def _window_metric(returns: np.ndarray, settings: Dict[str, Any]) -> np.ndarray:
+    """计算每个候选在窗口内的目标指标"""
+    if returns.shape[1] < 2:
+        return np.full(returns.shape[0], np.nan)
+
+    if settings['metric'] == 'total_return':
+        return np.prod(1.0 + returns, axis=1) - 1.0
+
+    std = returns.std(axis=1, ddof=1)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        sharpe = returns.mean(axis=1) / std * np.sqrt(settings['periods_per_year'])
+    return np.where(std > 0, sharpe, 0.0)
+
+
+class OptimizerService:
+    """择时参数前推优化服务"""
+
+    def __init__(self):
+        self.backtest_service = BacktestService()
+        self.data_service = self.backtest_service.data_service
+        self.logger = logging.getLogger(__name__)
+
+    def optimize(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        运行参数搜索
+
+        Args:
+            data: 优化参数，包含markets、可选的start_date/end_date/series（同回测），
+                  method（random或grid）、n_samples、grid、folds、metric、top_n、workers、seed
+
+        Returns:
+            Dict[str, Any]: 排序后的候选参数、建议配置、前推结果和耗时明细
+        """
+        try:
+            timings = {}
+            started = time.perf_counter()
+
+            metric = data.get('metric', 'sharpe')
+            if metric not in METRICS:
+                raise ValueError(f"不支持的优化指标: {metric}")
+
+            markets = data.get('markets') or [data['market']]
+            n_folds = int(data.get('folds', config_manager.get('optimizer.folds', 4)))
+            if n_folds < 1:
+                raise ValueError("folds必须大于0")
+
+            panels, boundaries = self._build_panels(
+                markets, data.get('series', {}), data.get('start_date'), data.get('end_date'), n_folds
+            )
+            settings = self._settings(metric, data)
+            timings['load_seconds'] = time.perf_counter() - started
+
+            step = time.perf_counter()
+            candidates = self._generate_candidates(data)
+            timings['generate_seconds'] = time.perf_counter() - step
+
+            step = time.perf_counter()
+            results, workers, chunks = self._run_search(candidates, panels, settings, data.get('workers'))
+            timings['search_seconds'] = time.perf_counter() - step
+
+            step = time.perf_counter()
+            ranking = self._rank(candidates, results, boundaries, int(data.get('top_n', 10)))
+            timings['rank_seconds'] = time.perf_counter() - step
+
+            timings['total_seconds'] = time.perf_counter() - started
+            timings = {key: round(value, 4) for key, value in timings.items()}
+            timings.update({
+                'candidates': len(candidates),
+                'workers': workers,
+                'chunks': chunks,
+                'microseconds_per_candidate': round(
+                    timings['search_seconds'] * 1e6 / max(len(candidates), 1), 2
+                )
+            })
+
+            self.logger.info(
+                f"参数优化完成: {len(candidates)}个候选, 耗时{timings['total_seconds']}秒"
+            )
+            ranking.update({'metric': metric, 'markets': markets, 'timings': timings})
+            return ranking
+
+        except Exception as e:
+            self.logger.error(f"参数优化失败: {e}")
+            raise
+
+    def _settings(self, metric: str, data: Dict[str, Any]) -> Dict[str, Any]:
+        """评估所需的配置快照（传递给工作进程）"""
+        return {
+            'metric': metric,
+            'macro_config': config_manager.get('timing_indicators.macro_indicators', {}) or {},
+            'scoring_thresholds': config_manager.get('position_sizing.scoring_thresholds', {}) or {},
+            'position_sizes': config_manager.get('position_sizing.position_sizes', {}) or {},
+            'cost_bps': float(data.get('cost_bps', config_manager.get('backtest.cost_bps', 0))),
+            'periods_per_year': config_manager.get('backtest.periods_per_year', 252),
+            'threshold_columns': {
+                name: PARAM_NAMES.index(f'{name}.threshold_good') for name in MACRO_DEFAULTS
+            }
+        }
+
+    def _build_panels(self, markets: List[str], series: Dict[str, Any], start_date: Optional[str],
+                      end_date: Optional[str], n_folds: int) -> Tuple[List[Dict[str, Any]], List[Tuple[str, ...]]]:
+        """加载各市场收益率和输入数据，对齐为评分面板，并划分前推窗口"""
+        config = {
+            'industry': config_manager.get('timing_indicators.industry_indicators', {}) or {},
+            'sentiment': config_manager.get('timing_indicators.market_sentiment_indicators', {}) or {}
+        }
+
+        panels = []
+        for market in markets:
+            dates, returns = self.backtest_service.load_return_series(
+                market, series.get(market), start_date, end_date
+            )
+            aligned = {}
+            for collection, fields in (('macro_data', MACRO_FIELDS),
+                                       ('industry_data', INDUSTRY_FIELDS),
+                                       ('market_sentiment', SENTIMENT_FIELDS)):
+                columns = self.data_service.get_columns(collection, market, None, end_date, fields)
+                aligned.update(align_previous(columns.get('date', []), columns, fields, dates))
+
+            # 行业和情绪维度不受搜索参数影响，预先计算
+            panels.append({
+                'market': market,
+                'dates': dates,
+                'returns': returns,
+                'macro': {name: aligned[name] for name in MACRO_FIELDS},
+                'industry': industry_scores(aligned, config['industry']),
+                'sentiment': sentiment_scores(aligned, config['sentiment'])
+            })
+
+        # 扩展窗口前推：将全部日期等分为 n_folds+1 段，第i折以前i段训练、第i+1段测试
+        all_dates = np.unique(np.concatenate([panel['dates'] for panel in panels]))
+        if len(all_dates) < 2 * (n_folds + 1):
+            raise ValueError("历史数据不足以划分前推窗口")
+
+        edges = np.linspace(0, len(all_dates), n_folds + 2).astype(int)
+        boundaries = [
+            (all_dates[0], all_dates[edges[i + 1] - 1], all_dates[edges[i + 1]], all_dates[edges[i + 2] - 1])
+            for i in range(n_folds)
+        ]
+        for panel in panels:
+            panel['folds'] = []
+            for _, train_end, _, test_end in boundaries:
+                train_hi, test_hi = np.searchsorted(panel['dates'], [train_end, test_end], side='right')
+                panel['folds'].append((0, int(train_hi), int(train_hi), int(test_hi)))
+
+        return panels, [tuple(str(d) for d in bounds) for bounds in boundaries]
+
+    def _current_params(self) -> np.ndarray:
+        """当前配置对应的参数向量"""
+        weights = config_manager.get_timing_weights() or {}
+        macro_config = config_manager.get('timing_indicators.macro_indicators', {}) or {}
+
+        params = [weights.get(name, DEFAULT_WEIGHTS[name]) for name in WEIGHT_NAMES]
+        for name, (good, bad, _) in MACRO_DEFAULTS.items():
+            config = macro_config.get(name, {})
+            params += [config.get('threshold_good', good), config.get('threshold_bad', bad)]
+        return np.array(params, dtype=float)
+
+    def _generate_candidates(self, data: Dict[str, Any]) -> np.ndarray:
+        """生成候选参数矩阵，第0行为当前配置；候选数量超过optimizer.max_candidates时抛出ValueError"""
+        current = self._current_params()
+        method = data.get('method', 'random')
+        max_candidates = int(config_manager.get('optimizer.max_candidates', 20000))
+
+        if method == 'grid':
+            grid = data.get('grid') or {}
+            unknown = set(grid) - set(PARAM_NAMES)
+            if unknown:
+                raise ValueError(f"未知的搜索参数: {', '.join(sorted(unknown))}")
+
+            axes = [grid.get(name, [current[i]]) for i, name in enumerate(PARAM_NAMES)]
+            if any(not isinstance(axis, list) or not axis for axis in axes):
+                raise ValueError("grid中每个参数的取值必须是非空数组")
+            # 先计算网格大小，超出上限时不生成候选矩阵
+            size = math.prod(len(axis) for axis in axes)
+            if size > max_candidates:
+                raise ValueError(f"网格候选数量 {size} 超过上限 {max_candidates}")
+            candidates = np.array(list(itertools.product(*axes)), dtype=float)
+            # 好坏阈值相等时阈值评分无定义（NaN）
+            for i in range(len(WEIGHT_NAMES), len(PARAM_NAMES), 2):
+                if np.any(candidates[:, i] == candidates[:, i + 1]):
+                    raise ValueError(f"grid中{PARAM_NAMES[i]}与{PARAM_NAMES[i + 1]}不能取相同的值")
+
+        elif method == 'random':
+            rng = np.random.default_rng(data.get('seed'))
+            n_samples = int(data.get('n_samples', config_manager.get('optimizer.n_samples', 2000)))
+            if not 1 <= n_samples <= max_candidates:
+                raise ValueError(f"n_samples必须在1到{max_candidates}之间")
+            spread = float(data.get('spread', config_manager.get('optimizer.threshold_spread', 0.4)))
+            # 两个阈值各自最多移动spread倍间距，spread小于0.5时好坏阈值不会相等或交叉
+            if not 0 <= spread < 0.5:
+                raise ValueError(f"spread必须在[0, 0.5)之间: {spread}")
+
+            candidates = np.tile(current, (n_samples, 1))
+            candidates[:, :len(WEIGHT_NAMES)] = rng.dirichlet(np.ones(len(WEIGHT_NAMES)), n_samples)
+
+            # 阈值在当前值附近按好坏阈值间距的比例扰动
+            for i in range(len(WEIGHT_NAMES), len(PARAM_NAMES), 2):
+                gap = abs(current[i] - current[i + 1])
+                candidates[:, i:i + 2] += rng.uniform(-spread, spread, (n_samples, 2)) * gap
+
+        else:
+            raise ValueError(f"不支持的搜索方式: {method}")
+
+        # 维度权重归一化
+        weight_sum = candidates[:, :len(WEIGHT_NAMES)].sum(axis=1, keepdims=True)
+        candidates[:, :len(WEIGHT_NAMES)] /= np.where(weight_sum > 0, weight_sum, 1.0)
+
+        return self._dedupe(np.vstack([current, candidates]))
+
+    @staticmethod
+    def _dedupe(candidates: np.ndarray) -> np.ndarray:
+        """去除重复候选，保持原有顺序"""
+        _, index = np.unique(candidates.round(6), axis=0, return_index=True)
+        return candidates[np.sort(index)]
+
+    def _run_search(self, candidates: np.ndarray, panels: List[Dict[str, Any]],
+                    settings: Dict[str, Any], workers: Optional[int]) -> Tuple[np.ndarray, int, int]:
+        """
+        分批评估候选参数
+
+        启用optimizer.process_pool且批次多于一个时，批次分发到进程内复用的进程池
+        （optimizer.max_workers个进程）；请求中workers为1或未启用时在当前线程内逐批评估，
+        不在Web工作进程中为每个请求新建进程
+        """
+        chunk_size = max(1, int(config_manager.get('optimizer.chunk_size', 256)))
+        chunks = [candidates[i:i + chunk_size] for i in range(0, len(candidates), chunk_size)]
+
+        pool_size = int(config_manager.get('optimizer.max_workers', 0) or os.cpu_count() or 1)
+        if (workers is not None and int(workers) <= 1) or not config_manager.get('optimizer.process_pool', False):
+            workers = 1
+        else:
+            workers = min(pool_size, len(chunks))
+
+        if workers <= 1:
+            results = [evaluate_candidates(chunk, panels, settings) for chunk in chunks]
+        else:
+            executor = _get_pool(pool_size)
+            count = len(chunks)
+            try:
+                results = list(executor.map(evaluate_candidates, chunks, [panels] * count, [settings] * count))
+            except BrokenProcessPool:
+                _reset_pool()
+                raise
+
+        return np.concatenate(results), max(workers, 1), len(chunks)
+
+    def _rank(self, candidates: np.ndarray, results: np.ndarray,
+              boundaries: List[Tuple[str, ...]], top_n: int) -> Dict[str, Any]:
+        """
+        按训练窗口平均指标排序，并给出每折按训练窗口选出的最优参数
+
+        测试窗口指标只随结果报告，不参与选择，避免用样本外数据挑选参数
+        """
+        with np.errstate(invalid='ignore'):
+            train_mean = np.nanmean(results[:, :, 0], axis=1)
+            test_mean = np.nanmean(results[:, :, 1], axis=1)
+
+        order = np.argsort(-np.nan_to_num(train_mean, nan=-np.inf), kind='stable')
+
+        def describe(index: int) -> Dict[str, Any]:
+            return {
+                'params': self._to_config(candidates[index]),
+                'train_metric': round(float(train_mean[index]), 4),
+                'test_metric': round(float(test_mean[index]), 4)
+            }
+
+        walk_forward = []
+        for fold, (train_start, train_end, test_start, test_end) in enumerate(boundaries):
+            best = int(np.nanargmax(np.nan_to_num(results[:, fold, 0], nan=-np.inf)))
+            walk_forward.append({
+                'train': [train_start, train_end],
+                'test': [test_start, test_end],
+                'best_train_metric': round(float(results[best, fold, 0]), 4),
+                'test_metric': round(float(results[best, fold, 1]), 4),
+                'params': self._to_config(candidates[best])
+            })
+
+        return {
+            'suggestion': describe(int(order[0])),
+            'current': describe(0),
+            'ranking': [describe(int(i)) for i in order[:top_n]],
+            'walk_forward': walk_forward
+        }
+
+    @staticmethod
+    def _to_config(params: np.ndarray) -> Dict[str, Any]:
+        """将参数向量转换为配置结构"""
+        config: Dict[str, Any] = {'weights': {}, 'macro_indicators': {}}
+        for name, value in zip(PARAM_NAMES, params.tolist()):
+            group, key = name.split('.', 1)
+            if group == 'weights':
+                config['weights'][key] = round(value, 4)
+            else:
+                config['macro_indicators'].setdefault(group, {})[key] = round(value, 4)
+        return {'timing_indicators': config}
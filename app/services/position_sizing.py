@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+仓位曲线
+
+仓位比例只取决于择时评分所在的强度等级，是以scoring_thresholds为断点的阶梯函数；
+仓位金额和风险金额与可用资金成正比。因此按position_sizing配置计算一次曲线
+（断点、各等级仓位比例、图表评分点对应的等级和比例），之后任意资金规模只需按比例缩放。
+曲线按配置内容缓存，配置修改后自动重新计算
+"""
+
+import threading
+from typing import Dict, List, Any, Tuple
+
+import numpy as np
+
+from ..utils.config import config_manager
+from .timing_scorer import STRENGTH_LEVELS, strength_indices
+
+# 仓位图表的评分点
+CHART_SCORES = tuple(range(0, 101, 10))
+
+DEFAULT_CAPITAL = 100000
+DEFAULT_RISK_PERCENTAGE = 2
+
+
+class PositionCurve:
+    """一个配置版本下的仓位曲线"""
+
+    def __init__(self, thresholds: Dict[str, float], position_sizes: Dict[str, float]):
+        self.thresholds = dict(thresholds)
+        # 保留配置中的原始数值，单条计算的输出与配置一致
+        self.percentages = [position_sizes.get(level, 0) for level in STRENGTH_LEVELS]
+        self.fractions = np.array(self.percentages, dtype=float) / 100
+
+        chart_indices = strength_indices(np.array(CHART_SCORES, dtype=float), self.thresholds)
+        self.chart_levels = [STRENGTH_LEVELS[i] for i in chart_indices]
+        self.chart_percentages = [self.percentages[i] for i in chart_indices]
+        self.chart_fractions = self.fractions[chart_indices]
+
+    def level_index(self, score: float) -> int:
+        """单个评分的强度等级下标"""
+        return int(strength_indices(np.array([score], dtype=float), self.thresholds)[0])
+
+    def size(self, scores: Any, capitals: Any, risk_percentages: Any = DEFAULT_RISK_PERCENTAGE
+             ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        批量计算仓位，参数可为标量或可相互广播的数组
+
+        Args:
+            scores: 择时评分
+            capitals: 可用资金
+            risk_percentages: 单笔风险比例（%）
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray, np.ndarray]: 等级下标、仓位金额、风险金额（金额保留两位小数）
+        """
+        scores, capitals, risk_percentages = np.broadcast_arrays(
+            np.asarray(scores, dtype=float), np.asarray(capitals, dtype=float),
+            np.asarray(risk_percentages, dtype=float)
+        )
+        indices = strength_indices(scores, self.thresholds)
+        amounts = np.round(self.fractions[indices] * capitals, 2)
+        risk_amounts = np.round(risk_percentages / 100 * capitals, 2)
+        return indices, amounts, risk_amounts
+
+    def chart_amounts(self, capital: float) -> List[float]:
+        """图表评分点对应的仓位金额"""
+        return np.round(self.chart_fractions * capital, 2).tolist()
+
+
+_curves: Dict[Tuple, PositionCurve] = {}
+_curves_lock = threading.Lock()
+
+
+def _config_key(thresholds: Dict[str, float], position_sizes: Dict[str, float]) -> Tuple:
+    return (tuple(sorted(thresholds.items())), tuple(sorted(position_sizes.items())))
+
+
+def get_position_curve() -> PositionCurve:
+    """
+    获取当前配置下的仓位曲线（首次调用时计算，配置不变时复用）
+
+    Returns:
+        PositionCurve: 仓位曲线
+    """
+    thresholds = config_manager.get('position_sizing.scoring_thresholds', {}) or {}
+    position_sizes = config_manager.get('position_sizing.position_sizes', {}) or {}
+    key = _config_key(thresholds, position_sizes)
+
+    curve = _curves.get(key)
+    if curve is None:
+        with _curves_lock:
+            curve = _curves.get(key)
+            if curve is None:
+                curve = PositionCurve(thresholds, position_sizes)
+                # 只保留少量历史版本，配置反复修改时不无限增长
+                if len(_curves) >= 8:
+                    _curves.clear()
+                _curves[key] = curve
+    return curve
@@ -0,0 +1,336 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+二进制分段存储
+
+将JSON数据文件压缩为单个内存映射的只读分段文件：
+每个集合按 (市场, 日期, ID) 排序，包含市场偏移索引、定长日期列、
+定长数值列以及按记录偏移寻址的JSON载荷区。
+查询单个市场时只会触及该市场对应的页面
+"""
+
+import json
+import logging
+import mmap
+import os
+import struct
+import tempfile
+import threading
+from pathlib import Path
+from typing import Dict, List, Any, Iterator, Optional, Tuple
+
+import numpy as np
+
+from ..utils.metrics import record_cache
+from .columnar_store import COLLECTION_SCHEMAS, _get_field, _to_column
+
+# 文件格式：MAGIC | 对齐的数据区... | 头部JSON | 头部偏移(uint64) | 头部长度(uint64)
+MAGIC = b'VILSEG01'
+TRAILER = struct.Struct('<QQ')
+ALIGNMENT = 64
+
+# 进程内已打开的分段文件缓存：路径 -> (文件标识, mmap, 头部)
+_open_segments: Dict[str, Tuple[Tuple[int, int], mmap.mmap, Dict[str, Any]]] = {}
+_open_lock = threading.Lock()
+
+
+def file_stamp(path: Path) -> Tuple[int, int]:
+    """文件标识：(修改时间ns, 大小)"""
+    stat = os.stat(path)
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+class SegmentStore:
+    """内存映射的二进制分段存储"""
+
+    def __init__(self, path: str):
+        self.path = Path(path)
+        self.logger = logging.getLogger(__name__)
+
+    def build(self, data: Dict[str, Any], source_stamp: Tuple[int, int]):
+        """
+        根据完整数据文档生成分段文件
+
+        Args:
+            data: _load_data返回的数据文档
+            source_stamp: 源JSON文件标识，用于判断分段是否过期
+        """
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        # 每次生成使用独立的临时文件，多个工作进程同时重建时不会写坏彼此的临时文件
+        fd, tmp_path = tempfile.mkstemp(prefix=f".{self.path.name}.", suffix='.tmp', dir=self.path.parent)
+        header: Dict[str, Any] = {'version': 1, 'source': list(source_stamp), 'collections': {}}
+
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                self._write_file(f, data, header)
+            os.replace(tmp_path, self.path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+        self.logger.info(f"生成分段文件: {self.path}")
+
+    def _write_file(self, f, data: Dict[str, Any], header: Dict[str, Any]):
+        """写入分段文件内容"""
+        f.write(MAGIC)
+
+        def write_region(payload: bytes) -> Dict[str, int]:
+            padding = -f.tell() % ALIGNMENT
+            f.write(b'\0' * padding)
+            offset = f.tell()
+            f.write(payload)
+            return {'offset': offset, 'length': len(payload)}
+
+        for collection, records in data.items():
+            if not isinstance(records, list):
+                continue
+            header['collections'][collection] = self._write_collection(
+                collection, records, write_region
+            )
+
+        header_bytes = json.dumps(header, ensure_ascii=False).encode('utf-8')
+        header_offset = f.tell()
+        f.write(header_bytes)
+        f.write(TRAILER.pack(header_offset, len(header_bytes)))
+
+    def _write_collection(self, collection: str, records: List[Dict[str, Any]],
+                          write_region) -> Dict[str, Any]:
+        """写入单个集合的索引、列和载荷区"""
+        rows = [
+            r for r in records
+            if isinstance(r, dict) and isinstance(r.get('market'), str)
+        ]
+        rows.sort(key=lambda r: (r['market'], str(r.get('date', '')), str(r.get('id', ''))))
+
+        # 市场偏移索引
+        markets: Dict[str, List[int]] = {}
+        for i, record in enumerate(rows):
+            markets.setdefault(record['market'], [i, i])[1] = i + 1
+
+        dates = [str(r.get('date', '')).encode('utf-8') for r in rows]
+        date_width = max((len(d) for d in dates), default=1) or 1
+        date_column = np.array(dates, dtype=f'S{date_width}')
+
+        payloads = [
+            json.dumps(r, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+            for r in rows
+        ]
+        offsets = np.zeros(len(payloads) + 1, dtype=np.uint64)
+        offsets[1:] = np.cumsum([len(p) for p in payloads], dtype=np.uint64)
+
+        columns = {'date': dict(write_region(date_column.tobytes()), dtype=date_column.dtype.str)}
+        for name, kind in COLLECTION_SCHEMAS.get(collection, {}).items():
+            if kind == 'f':
+                column = _to_column([_get_field(r, name) for r in rows], 'f')
+                columns[name] = dict(write_region(column.tobytes()), dtype=column.dtype.str)
+
+        return {
+            'count': len(rows),
+            'markets': markets,
+            'columns': columns,
+            'offsets': write_region(offsets.tobytes()),
+            'payload': write_region(b''.join(payloads))
+        }
+
+    def is_fresh(self, source_stamp: Tuple[int, int]) -> bool:
+        """分段文件是否与源JSON文件一致"""
+        try:
+            _, header = self._open()
+            return tuple(header.get('source', [])) == tuple(source_stamp)
+        except Exception:
+            return False
+
+    def read_records(self, collection: str, market: str, start_date: Optional[str] = None,
+                     end_date: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        读取单个市场的记录（按日期、ID升序）
+
+        Args:
+            collection: 集合名称
+            market: 市场类型
+            start_date: 开始日期
+            end_date: 结束日期
+
+        Returns:
+            List[Dict[str, Any]]: 数据记录
+        """
+        mm, header = self._open()
+        meta = header['collections'].get(collection)
+        if not meta:
+            return []
+
+        lo, hi = self._locate(mm, meta, market, start_date, end_date)
+        if hi <= lo:
+            return []
+
+        offsets = self._column(mm, meta['offsets'], '<u8')
+        base = meta['payload']['offset']
+        return [
+            json.loads(mm[base + int(offsets[i]):base + int(offsets[i + 1])])
+            for i in range(lo, hi)
+        ]
+
+    def iter_records_desc(self, collection: str, market: str, start_date: Optional[str] = None,
+                          end_date: Optional[str] = None,
+                          before: Optional[Tuple[str, str]] = None) -> Iterator[Dict[str, Any]]:
+        """
+        按 (日期, ID) 倒序逐条读取单个市场的记录
+
+        游标位置通过日期列二分定位，只需解码游标当日的行比较ID，之后按需逐条解码，
+        分页和流式输出不会先解码整个结果集
+
+        Args:
+            collection: 集合名称
+            market: 市场类型
+            start_date: 开始日期
+            end_date: 结束日期
+            before: 只返回 (日期, ID) 小于该键的记录
+
+        Yields:
+            Dict[str, Any]: 数据记录
+        """
+        mm, header = self._open()
+        meta = header['collections'].get(collection)
+        if not meta:
+            return
+
+        lo, hi = self._locate(mm, meta, market, start_date, end_date)
+        if hi <= lo:
+            return
+
+        offsets = self._column(mm, meta['offsets'], '<u8')
+        base = meta['payload']['offset']
+
+        def decode(i: int) -> Dict[str, Any]:
+            return json.loads(mm[base + int(offsets[i]):base + int(offsets[i + 1])])
+
+        if before is not None:
+            date_meta = meta['columns']['date']
+            dates = self._column(mm, date_meta, date_meta['dtype'])[lo:hi]
+            key = before[0].encode('utf-8')
+            same_lo = lo + int(np.searchsorted(dates, key, side='left'))
+            same_hi = lo + int(np.searchsorted(dates, key, side='right'))
+            # 游标当日的行按ID升序，倒序输出ID小于游标的部分
+            for i in range(same_hi - 1, same_lo - 1, -1):
+                record = decode(i)
+                if str(record.get('id', '')) < before[1]:
+                    yield record
+            hi = same_lo
+
+        for i in range(hi - 1, lo - 1, -1):
+            yield decode(i)
+
+    def read_latest(self, collection: str, markets: List[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        读取各市场最新的一条记录
+
+        每个市场的行按 (日期, ID) 升序存放，只需解码市场索引末尾最后一个日期的行；
+        日期和ID都相同时取文件中靠前的一条，与按日期倒序排序后取第一条一致
+
+        Args:
+            collection: 集合名称
+            markets: 市场列表
+
+        Returns:
+            Dict[str, Dict[str, Any]]: 市场 -> 最新记录（没有记录的市场不在结果中）
+        """
+        mm, header = self._open()
+        meta = header['collections'].get(collection)
+        if not meta:
+            return {}
+
+        date_meta = meta['columns']['date']
+        dates = self._column(mm, date_meta, date_meta['dtype'])
+        offsets = self._column(mm, meta['offsets'], '<u8')
+        base = meta['payload']['offset']
+
+        latest = {}
+        for market in markets:
+            if market in latest or market not in meta['markets']:
+                continue
+            start, end = meta['markets'][market]
+            lo = start + int(np.searchsorted(dates[start:end], dates[end - 1], side='left'))
+            rows = [
+                json.loads(mm[base + int(offsets[i]):base + int(offsets[i + 1])])
+                for i in range(lo, end)
+            ]
+            last_id = str(rows[-1].get('id', ''))
+            latest[market] = next(r for r in rows if str(r.get('id', '')) == last_id)
+        return latest
+
+    def read_columns(self, collection: str, market: str, start_date: Optional[str] = None,
+                     end_date: Optional[str] = None,
+                     fields: Optional[List[str]] = None) -> Dict[str, np.ndarray]:
+        """
+        读取单个市场的定长数值列（按日期、ID升序，返回内存映射视图）
+
+        Args:
+            collection: 集合名称
+            market: 市场类型
+            start_date: 开始日期
+            end_date: 结束日期
+            fields: 需要的数值字段，默认全部
+
+        Returns:
+            Dict[str, np.ndarray]: 字段名 -> 列数组，包含date
+        """
+        mm, header = self._open()
+        meta = header['collections'].get(collection)
+        if not meta:
+            return {}
+
+        lo, hi = self._locate(mm, meta, market, start_date, end_date)
+        hi = max(lo, hi)
+        names = ['date'] + [name for name in (fields or meta['columns']) if name != 'date']
+
+        columns = {}
+        for name in names:
+            column_meta = meta['columns'].get(name)
+            if column_meta is None:
+                continue
+            columns[name] = self._column(mm, column_meta, column_meta['dtype'])[lo:hi]
+        return columns
+
+    def _locate(self, mm: mmap.mmap, meta: Dict[str, Any], market: str,
+                start_date: Optional[str], end_date: Optional[str]) -> Tuple[int, int]:
+        """通过市场索引和日期列二分定位行范围"""
+        if market not in meta['markets']:
+            return (0, 0)
+
+        start, end = meta['markets'][market]
+        date_meta = meta['columns']['date']
+        dates = self._column(mm, date_meta, date_meta['dtype'])[start:end]
+
+        lo = int(np.searchsorted(dates, start_date.encode('utf-8'), side='left')) if start_date else 0
+        hi = int(np.searchsorted(dates, end_date.encode('utf-8'), side='right')) if end_date else len(dates)
+        return (start + lo, start + hi)
+
+    @staticmethod
+    def _column(mm: mmap.mmap, region: Dict[str, int], dtype: str) -> np.ndarray:
+        """在mmap上构造零拷贝数组视图"""
+        dtype = np.dtype(dtype)
+        return np.frombuffer(mm, dtype=dtype, count=region['length'] // dtype.itemsize,
+                             offset=region['offset'])
+
+    def _open(self) -> Tuple[mmap.mmap, Dict[str, Any]]:
+        """打开（或复用已打开的）分段文件"""
+        key = str(self.path)
+        stamp = file_stamp(self.path)
+
+        cached = _open_segments.get(key)
+        hit = bool(cached) and cached[0] == stamp
+        record_cache('segment_mmap', hit)
+        if hit:
+            return cached[1], cached[2]
+
+        with _open_lock:
+            with open(self.path, 'rb') as f:
+                mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+            if mm[:len(MAGIC)] != MAGIC:
+                mm.close()
+                raise ValueError(f"无效的分段文件: {self.path}")
+
+            header_offset, header_length = TRAILER.unpack(mm[-TRAILER.size:])
+            header = json.loads(mm[header_offset:header_offset + header_length])
+            _open_segments[key] = (stamp, mm, header)
+            return mm, header
@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+批量择时评分
+
+以NumPy数组实现与IndicatorService一致的各维度评分规则，
+输入可以是单个市场的历史序列，也可以是按候选参数广播的二维数组，
+供参数优化、敏感性分析等需要大量重复评分的场景使用。
+缺失值以NaN表示，不计入对应维度的加权
+"""
+
+from typing import Dict, List, Any, Optional
+
+import numpy as np
+
+# 宏观指标: (threshold_good, threshold_bad, weight) 默认值，与IndicatorService一致
+MACRO_DEFAULTS = {
+    'pmi': (50.0, 45.0, 0.2),
+    'cpi': (2.0, 5.0, 0.2),
+    'ppi': (1.5, 4.0, 0.15),
+    'm2': (8.0, 15.0, 0.15),
+    'interest_rate': (2.0, 5.0, 0.15)
+}
+# 其他宏观指标只计入权重（评分为0），与IndicatorService一致
+OTHER_MACRO_WEIGHT = 0.15
+INDUSTRY_DEFAULTS = {'free_cash_flow': 0.6, 'industry_sentiment': 0.4}
+SENTIMENT_DEFAULTS = {'volatility': 0.3, 'investor_sentiment': 0.4, 'technical_indicators': 0.3}
+DEFAULT_WEIGHTS = {'macro_fundamental': 0.4, 'industry_fundamental': 0.3, 'market_sentiment': 0.3}
+
+# 强度等级（由弱到强）及默认阈值，与IndicatorService._get_strength_level一致
+STRENGTH_LEVELS = ['very_weak', 'weak', 'neutral', 'strong', 'very_strong']
+DEFAULT_THRESHOLDS = {'weak': 20, 'neutral': 40, 'strong': 60, 'very_strong': 80}
+
+# 评分所需的原始输入字段
+MACRO_FIELDS = list(MACRO_DEFAULTS)
+INDUSTRY_FIELDS = ['free_cash_flow', 'industry_sentiment']
+SENTIMENT_FIELDS = ['volatility', 'investor_sentiment', 'technical_indicators.rsi',
+                    'technical_indicators.macd', 'technical_indicators.bollinger_bands']
+
+# 存在性标记字段：值为1表示记录中该项非空（other_macro、technical_indicators），0或NaN表示为空或缺失。
+# 逐条计算时这两项只要非空就计入权重，与其中的具体数值无关
+PRESENCE_FIELDS = ('other_macro', 'technical_indicators')
+
+
+def threshold_score(values: np.ndarray, good: Any, bad: Any) -> np.ndarray:
+    """
+    阈值线性插值评分（0-100）
+
+    good大于bad时数值越高越好（如PMI），反之越低越好（如CPI），
+    在good处为100分、bad处为0分，两者之间线性插值
+
+    Args:
+        values: 指标数值
+        good: 优秀阈值，可为标量或可广播的数组
+        bad: 较差阈值，可为标量或可广播的数组
+
+    Returns:
+        np.ndarray: 评分数组
+    """
+    good = np.asarray(good, dtype=float)
+    bad = np.asarray(bad, dtype=float)
+    scale = 100 / np.where(good == bad, np.nan, good - bad)
+    return np.clip((values - bad) * scale, 0, 100)
+
+
+def weighted_scores(scores: List[np.ndarray], weights: List[Any], fallback: float = 50.0) -> np.ndarray:
+    """
+    对存在的分项按权重求平均，全部缺失时返回默认中性评分
+
+    Args:
+        scores: 分项评分数组列表（NaN表示缺失）
+        weights: 对应权重，可为标量或可广播的数组
+        fallback: 全部缺失时的评分
+
+    Returns:
+        np.ndarray: 加权评分
+    """
+    total = 0.0
+    total_weight = 0.0
+    for score, weight in zip(scores, weights):
+        present = ~np.isnan(score)
+        total = total + np.where(present, score, 0.0) * weight
+        total_weight = total_weight + np.where(present, weight, 0.0)
+    return _normalize(total, total_weight, fallback)
+
+
+def _normalize(total: Any, total_weight: Any, fallback: float = 50.0) -> np.ndarray:
+    """加权和除以权重和，权重和为0处取默认评分"""
+    total_weight = np.asarray(total_weight, dtype=float)
+    has_weight = total_weight > 0
+    return np.where(has_weight, total / np.where(has_weight, total_weight, 1.0), fallback)
+
+
+def technical_scores(rsi: np.ndarray, macd: np.ndarray, bollinger: np.ndarray) -> np.ndarray:
+    """批量计算技术指标评分（与_calculate_technical_score规则一致）"""
+    score = np.full(np.shape(rsi), 50.0)
+
+    score += np.where(np.isnan(rsi), 0, np.where((rsi >= 30) & (rsi <= 70), 20, -20))
+    score += np.where(np.isnan(macd), 0, np.where(macd > 0, 15, -15))
+    score += np.where(np.isnan(bollinger), 0, np.where(np.abs(bollinger) <= 1, 15, -15))
+
+    return np.clip(score, 0, 100)
+
+
+def macro_scores(columns: Dict[str, np.ndarray], macro_config: Dict[str, Any],
+                 thresholds: Optional[Dict[str, tuple]] = None) -> np.ndarray:
+    """
+    批量计算宏观基本面评分
+
+    Args:
+        columns: 宏观指标列（pmi、cpi等），可包含other_macro存在性标记
+        macro_config: timing_indicators.macro_indicators配置
+        thresholds: 覆盖配置的阈值 {指标: (good, bad)}，可为按候选广播的数组
+
+    Returns:
+        np.ndarray: 宏观评分
+    """
+    thresholds = thresholds or {}
+    total = 0.0
+    total_weight = 0.0
+    for name, (good, bad, weight) in MACRO_DEFAULTS.items():
+        if name not in columns:
+            continue
+        config = macro_config.get(name, {})
+        good, bad = thresholds.get(name, (config.get('threshold_good', good),
+                                          config.get('threshold_bad', bad)))
+
+        # 缺失掩码只依赖输入数据，在广播到候选维度之前处理
+        values = np.asarray(columns[name], dtype=float)
+        present = ~np.isnan(values)
+        weight = np.where(present, config.get('weight', weight), 0.0)
+
+        total = total + threshold_score(np.where(present, values, 0.0), good, bad) * weight
+        total_weight = total_weight + weight
+
+    other = columns.get('other_macro')
+    if other is not None:
+        # 其他宏观指标非空时只增加权重
+        with np.errstate(invalid='ignore'):
+            present = np.asarray(other, dtype=float) > 0
+        total_weight = total_weight + np.where(
+            present, macro_config.get('other_macro', {}).get('weight', OTHER_MACRO_WEIGHT), 0.0
+        )
+    return _normalize(total, total_weight)
+
+
+def industry_scores(columns: Dict[str, np.ndarray], industry_config: Dict[str, Any]) -> np.ndarray:
+    """批量计算行业基本面评分"""
+    scores, weights = [], []
+
+    fcf = columns.get('free_cash_flow')
+    if fcf is not None:
+        with np.errstate(invalid='ignore'):
+            fcf_score = np.where(fcf > 0, np.minimum(fcf / 10 * 100, 100), 0.0)
+        scores.append(np.where(np.isnan(fcf), np.nan, fcf_score))
+        weights.append(industry_config.get('free_cash_flow', {}).get('weight', INDUSTRY_DEFAULTS['free_cash_flow']))
+
+    sentiment = columns.get('industry_sentiment')
+    if sentiment is not None:
+        scores.append(sentiment)
+        weights.append(industry_config.get('industry_sentiment', {}).get('weight', INDUSTRY_DEFAULTS['industry_sentiment']))
+
+    return weighted_scores(scores, weights)
+
+
+def sentiment_scores(columns: Dict[str, np.ndarray], sentiment_config: Dict[str, Any]) -> np.ndarray:
+    """
+    批量计算市场情绪评分
+
+    提供technical_indicators存在性标记时按标记决定是否计入技术指标（各项均为空时评分为50），
+    否则以任一技术指标有值为准
+    """
+    scores, weights = [], []
+
+    volatility = columns.get('volatility')
+    if volatility is not None:
+        scores.append(np.clip(100 - (volatility - 10) / 20 * 100, 0, 100))
+        weights.append(sentiment_config.get('volatility', {}).get('weight', SENTIMENT_DEFAULTS['volatility']))
+
+    investor = columns.get('investor_sentiment')
+    if investor is not None:
+        scores.append(investor)
+        weights.append(sentiment_config.get('investor_sentiment', {}).get('weight', SENTIMENT_DEFAULTS['investor_sentiment']))
+
+    technical = [columns.get(f'technical_indicators.{name}') for name in ('rsi', 'macd', 'bollinger_bands')]
+    flag = columns.get('technical_indicators')
+    if flag is not None or any(column is not None for column in technical):
+        shape = np.shape(next(column for column in technical + [flag] if column is not None))
+        rsi, macd, bollinger = [np.full(shape, np.nan) if c is None else c for c in technical]
+        if flag is not None:
+            with np.errstate(invalid='ignore'):
+                present = np.asarray(flag, dtype=float) > 0
+        else:
+            present = ~(np.isnan(rsi) & np.isnan(macd) & np.isnan(bollinger))
+        scores.append(np.where(present, technical_scores(rsi, macd, bollinger), np.nan))
+        weights.append(sentiment_config.get('technical_indicators', {}).get('weight', SENTIMENT_DEFAULTS['technical_indicators']))
+
+    return weighted_scores(scores, weights)
+
+
+def overall_scores(macro: np.ndarray, industry: np.ndarray, sentiment: np.ndarray,
+                   weights: Dict[str, Any]) -> np.ndarray:
+    """按维度权重合成综合评分，权重可为按候选广播的数组"""
+    return (
+        macro * weights.get('macro_fundamental', DEFAULT_WEIGHTS['macro_fundamental']) +
+        industry * weights.get('industry_fundamental', DEFAULT_WEIGHTS['industry_fundamental']) +
+        sentiment * weights.get('market_sentiment', DEFAULT_WEIGHTS['market_sentiment'])
+    )
+
+
+def strength_indices(scores: np.ndarray, thresholds: Dict[str, float]) -> np.ndarray:
+    """
+    批量计算强度等级下标（对应STRENGTH_LEVELS）
+
+    Args:
+        scores: 综合评分数组
+        thresholds: position_sizing.scoring_thresholds配置
+
+    Returns:
+        np.ndarray: 等级下标数组
+    """
+    scores = np.asarray(scores, dtype=float)
+    bounds = np.array([thresholds.get(level, DEFAULT_THRESHOLDS[level]) for level in STRENGTH_LEVELS[1:]],
+                      dtype=float)
+
+    # 阈值递增时，满足的阈值个数即为等级下标，等价于_get_strength_level的if/elif链
+    if np.all(np.diff(bounds) > 0):
+        return np.searchsorted(bounds, scores, side='right')
+
+    indices = np.zeros(scores.shape, dtype=np.intp)
+    for index, bound in enumerate(bounds, start=1):
+        indices = np.where(scores >= bound, index, indices)
+    return indices
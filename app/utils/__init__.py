@@ -4,14 +4,13 @@
 工具模块
 
 包含配置管理、计算工具等辅助功能
+
+计算工具依赖numpy，首次访问时才导入，只需读取配置的命令行工具不加载numpy
 """
 
 from .config import config_manager, init_config
-from .calculations import (
-    normalize_score,
-    calculate_weighted_average,
-    linear_interpolation
-)
+
+_CALCULATIONS = ('normalize_score', 'calculate_weighted_average', 'linear_interpolation')
 
 __all__ = [
     'config_manager',
@@ -19,4 +18,13 @@ __all__ = [
     'normalize_score',
     'calculate_weighted_average',
     'linear_interpolation'
-]
\ No newline at end of file
+]
+
+
+def __getattr__(name):
+    if name not in _CALCULATIONS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    from . import calculations
+    value = getattr(calculations, name)
+    globals()[name] = value
+    return value
@@ -9,6 +9,10 @@
 import math
 from typing import List, Dict, Any, Optional
 
+import numpy as np
+
+from .rolling import rolling_mean
+
 
 def normalize_score(value: float, min_val: float, max_val: float, reverse: bool = False) -> float:
     """
@@ -221,23 +225,70 @@ def smooth_data(data: List[float], window_size: int = 3) -> List[float]:
     if len(data) < window_size:
         return data
 
-    smoothed = []
-    for i in range(len(data)):
-        start = max(0, i - window_size + 1)
-        end = i + 1
-        window_data = data[start:end]
-        smoothed.append(sum(window_data) / len(window_data))
+    return rolling_mean(data, window_size).tolist()
+
+
+def lttb_downsample(x: np.ndarray, y: np.ndarray, max_points: int) -> np.ndarray:
+    """
+    Largest-Triangle-Three-Buckets降采样
+
+    Args:
+        x: 横轴数组（需单调）
+        y: 纵轴数组
+        max_points: 最大保留点数
+
+    Returns:
+        np.ndarray: 被保留点的下标（升序）
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    n = len(x)
+
+    if max_points >= n or n <= 2:
+        return np.arange(n)
+    if max_points < 3:
+        # 不足3个点时优先保留最新的末尾点
+        return np.array([0, n - 1])[-max(max_points, 1):]
+
+    # 首尾点固定保留，中间点均分为max_points-2个桶
+    edges = np.linspace(1, n - 1, max_points - 1).astype(int)
+    selected = np.empty(max_points, dtype=int)
+    selected[0] = 0
+    selected[-1] = n - 1
+
+    prev = 0
+    for i in range(max_points - 2):
+        start, end = edges[i], edges[i + 1]
+
+        # 下一个桶的均值点作为三角形第三个顶点
+        next_start = end
+        next_end = edges[i + 2] if i + 2 < len(edges) else n
+        if next_start >= next_end:
+            avg_x, avg_y = x[n - 1], y[n - 1]
+        else:
+            avg_x = x[next_start:next_end].mean()
+            avg_y = y[next_start:next_end].mean()
+
+        # 向量化计算桶内各点构成的三角形面积
+        bucket_x = x[start:end]
+        bucket_y = y[start:end]
+        areas = np.abs(
+            (x[prev] - avg_x) * (bucket_y - y[prev]) -
+            (x[prev] - bucket_x) * (avg_y - y[prev])
+        )
+        prev = start + int(np.argmax(areas))
+        selected[i + 1] = prev
 
-    return smoothed
+    return selected
 
 
-def calculate_correlation(x: List[float], y: List[float]) -> float:
+def calculate_correlation(x, y) -> float:
     """
     计算两个序列的相关系数
 
     Args:
-        x: 第一个序列
-        y: 第二个序列
+        x: 第一个序列（列表或NumPy数组）
+        y: 第二个序列（列表或NumPy数组）
 
     Returns:
         float: 相关系数（-1到1）
@@ -249,19 +300,19 @@ def calculate_correlation(x: List[float], y: List[float]) -> float:
     if n < 2:
         return 0.0
 
-    # 计算均值
-    mean_x = sum(x) / n
-    mean_y = sum(y) / n
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
 
-    # 计算协方差和标准差
-    covariance = sum((xi - mean_x) * (yi - mean_y) for xi, yi in zip(x, y))
-    std_x = math.sqrt(sum((xi - mean_x) ** 2 for xi in x))
-    std_y = math.sqrt(sum((yi - mean_y) ** 2 for yi in y))
+    # 计算离差、协方差和标准差
+    dx = x - x.mean()
+    dy = y - y.mean()
+    std_x = math.sqrt(float(np.dot(dx, dx)))
+    std_y = math.sqrt(float(np.dot(dy, dy)))
 
     if std_x == 0 or std_y == 0:
         return 0.0
 
-    return covariance / (std_x * std_y)
+    return float(np.dot(dx, dy)) / (std_x * std_y)
 
 
 def normalize_weights(weights: Dict[str, float]) -> Dict[str, float]:
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+压缩工具
+
+优先使用zstd（需安装可选依赖zstandard），未安装时回退为标准库gzip；
+压缩文件以扩展名区分算法，读取时按扩展名选择解压方式
+"""
+
+import gzip
+import io
+import logging
+from pathlib import Path
+from typing import Optional
+
+try:
+    import zstandard
+except ImportError:  # 可选依赖
+    zstandard = None
+
+COMPRESSION_SUFFIXES = {'zstd': '.zst', 'gzip': '.gz'}
+
+
+def resolve_compression(name: Optional[str]) -> str:
+    """确定实际使用的压缩算法，zstandard未安装时回退为gzip"""
+    name = (name or 'zstd').lower()
+    if name not in COMPRESSION_SUFFIXES:
+        raise ValueError(f"不支持的压缩算法: {name}")
+    if name == 'zstd' and zstandard is None:
+        logging.getLogger(__name__).warning("未安装zstandard，改用gzip压缩")
+        return 'gzip'
+    return name
+
+
+def _require_zstandard(path: Path):
+    if zstandard is None:
+        raise RuntimeError(f"读取 {path.name} 需要安装zstandard")
+
+
+def open_compressed(path: Path, mode: str):
+    """
+    以文本方式打开压缩文件，按扩展名选择zstd或gzip
+
+    Args:
+        path: 文件路径
+        mode: 'r' 或 'w'
+    """
+    if path.suffix == COMPRESSION_SUFFIXES['zstd']:
+        _require_zstandard(path)
+        raw = open(path, mode + 'b')
+        if mode == 'w':
+            stream = zstandard.ZstdCompressor(level=3).stream_writer(raw)
+        else:
+            stream = zstandard.ZstdDecompressor().stream_reader(raw)
+        return io.TextIOWrapper(stream, encoding='utf-8')
+    return gzip.open(path, mode + 't', encoding='utf-8', compresslevel=6)
+
+
+def compress_bytes(data: bytes, algorithm: str) -> bytes:
+    """按指定算法压缩字节串"""
+    if algorithm == 'zstd':
+        return zstandard.ZstdCompressor(level=3).compress(data)
+    return gzip.compress(data, compresslevel=6, mtime=0)
+
+
+def decompress_file(path: Path) -> bytes:
+    """按扩展名解压整个文件"""
+    data = path.read_bytes()
+    if path.suffix == COMPRESSION_SUFFIXES['zstd']:
+        _require_zstandard(path)
+        return zstandard.ZstdDecompressor().decompress(data)
+    return gzip.decompress(data)
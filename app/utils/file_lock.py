@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+跨进程文件锁
+
+多进程部署时各工作进程共享同一个数据文件，"读取-修改-写回"必须互斥，否则并发写入会丢失更新。
+POSIX系统使用fcntl.flock（每次加锁单独打开锁文件，同一进程的不同线程之间同样互斥）；
+不支持fcntl的平台退化为进程内锁，此时只能以单进程多线程方式部署。
+同一线程内可重入
+"""
+
+import os
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterator, Union
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+_held = threading.local()
+_process_locks: Dict[str, threading.Lock] = {}
+_process_locks_guard = threading.Lock()
+
+
+@contextmanager
+def exclusive_lock(path: Union[str, Path]) -> Iterator[None]:
+    """
+    获取排他锁
+
+    Args:
+        path: 锁文件路径（不存在时创建，内容为空）
+    """
+    key = os.path.abspath(path)
+    depth: Dict[str, int] = _held.__dict__.setdefault('depth', {})
+    if depth.get(key):
+        depth[key] += 1
+        try:
+            yield
+        finally:
+            depth[key] -= 1
+        return
+
+    if fcntl is None:
+        with _process_locks_guard:
+            lock = _process_locks.setdefault(key, threading.Lock())
+        with lock:
+            depth[key] = 1
+            try:
+                yield
+            finally:
+                del depth[key]
+        return
+
+    fd = os.open(key, os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX)
+        depth[key] = 1
+        try:
+            yield
+        finally:
+            del depth[key]
+            fcntl.flock(fd, fcntl.LOCK_UN)
+    finally:
+        os.close(fd)
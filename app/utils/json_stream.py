@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+JSON流式读取工具
+
+按块读取数据文件，只解析指定顶层集合中的记录，
+其他集合仅做括号/字符串扫描跳过，不构建Python对象
+"""
+
+import json
+import re
+from pathlib import Path
+from typing import Any, BinaryIO, Dict, Iterator, Optional, Tuple
+
+_WHITESPACE = re.compile(rb'\s*')
+_STRING = re.compile(rb'"[^"\\]*(?:\\.[^"\\]*)*"', re.S)
+# 不含括号的连续内容（字符串整体跳过，其中的括号不计入层级）
+_SKIP_RUN = re.compile(rb'[^"\[\]{}]*(?:"[^"\\]*(?:\\.[^"\\]*)*"[^"\[\]{}]*)*', re.S)
+_SCALAR_END = re.compile(rb'[\s,\]}]')
+
+
+class JsonCollectionStream:
+    """顶层为对象的JSON文件的集合级流式读取器"""
+
+    def __init__(self, path: Path, chunk_size: int = 64 * 1024):
+        self.path = Path(path)
+        self.chunk_size = chunk_size
+        self._file: Optional[BinaryIO] = None
+        self._buf = b''
+        self._pos = 0
+        self._keep_from: Optional[int] = None
+
+    def iter_records(self, collection: str,
+                     contains: Optional[bytes] = None) -> Iterator[Dict[str, Any]]:
+        """
+        逐条产出指定顶层集合中的记录
+
+        读完目标集合后立即停止，不再读取文件剩余部分
+
+        Args:
+            collection: 顶层键名
+            contains: 预过滤字节串，原始文本中不包含它的记录不做解析
+
+        Yields:
+            Dict[str, Any]: 数据记录
+        """
+        with open(self.path, 'rb') as f:
+            self._file = f
+            self._buf = b''
+            self._pos = 0
+            self._keep_from = None
+
+            self._expect(b'{')
+            if self._peek() == b'}':
+                return
+
+            while True:
+                key = json.loads(self._read_string())
+                self._expect(b':')
+
+                if key == collection and self._peek() == b'[':
+                    yield from self._iter_array(contains)
+                    return
+
+                self._skip_value()
+                if self._next_separator(b'}'):
+                    return
+
+    def iter_top_level(self) -> Iterator[Tuple[str, Any]]:
+        """
+        单次打开文件，按顺序产出全部顶层键值
+
+        数组值以记录迭代器的形式产出（逐条解析），其他值直接解析后产出。
+        数组迭代器须在取下一个键值之前使用，未读完的元素会被自动跳过
+
+        Yields:
+            Tuple[str, Any]: (键名, 记录迭代器或值)
+        """
+        with open(self.path, 'rb') as f:
+            self._file = f
+            self._buf = b''
+            self._pos = 0
+            self._keep_from = None
+
+            self._expect(b'{')
+            if self._peek() == b'}':
+                return
+
+            while True:
+                key = json.loads(self._read_string())
+                self._expect(b':')
+
+                if self._peek() == b'[':
+                    records = self._iter_array()
+                    yield key, records
+                    for _ in records:
+                        pass
+                else:
+                    yield key, json.loads(self._read_raw())
+
+                if self._next_separator(b'}'):
+                    return
+
+    def _iter_array(self, contains: Optional[bytes] = None) -> Iterator[Any]:
+        """逐个解析数组元素"""
+        self._expect(b'[')
+        if self._peek() == b']':
+            self._pos += 1
+            return
+
+        while True:
+            raw = self._read_raw()
+            if contains is None or contains in raw:
+                yield json.loads(raw)
+
+            if self._next_separator(b']'):
+                return
+
+    def _read_raw(self) -> bytes:
+        """读取一个完整JSON值的原始字节"""
+        self._skip_ws()
+        self._keep_from = self._pos
+        self._skip_value()
+        raw = self._buf[self._keep_from:self._pos]
+        self._keep_from = None
+        return raw
+
+    def _more(self) -> bool:
+        """读取下一块数据，丢弃已消费（且不需保留）的前缀"""
+        chunk = self._file.read(self.chunk_size)
+        if not chunk:
+            return False
+
+        cut = self._pos if self._keep_from is None else self._keep_from
+        self._buf = self._buf[cut:] + chunk
+        self._pos -= cut
+        if self._keep_from is not None:
+            self._keep_from = 0
+        return True
+
+    def _skip_ws(self):
+        while True:
+            self._pos = _WHITESPACE.match(self._buf, self._pos).end()
+            if self._pos < len(self._buf) or not self._more():
+                return
+
+    def _peek(self) -> bytes:
+        self._skip_ws()
+        if self._pos >= len(self._buf):
+            raise ValueError(f"JSON意外结束: {self.path}")
+        return self._buf[self._pos:self._pos + 1]
+
+    def _expect(self, char: bytes):
+        if self._peek() != char:
+            raise ValueError(f"JSON格式错误: 期望 {char.decode()}，位置 {self._pos}")
+        self._pos += 1
+
+    def _next_separator(self, closing: bytes) -> bool:
+        """读取逗号或结束符，遇到结束符返回True"""
+        char = self._peek()
+        self._pos += 1
+        if char == closing:
+            return True
+        if char != b',':
+            raise ValueError(f"JSON格式错误: 意外的字符 {char!r}")
+        return False
+
+    def _read_string(self) -> bytes:
+        if self._peek() != b'"':
+            raise ValueError(f"JSON格式错误: 期望字符串，位置 {self._pos}")
+        while True:
+            match = _STRING.match(self._buf, self._pos)
+            if match:
+                self._pos = match.end()
+                return match.group()
+            if not self._more():
+                raise ValueError(f"JSON意外结束: {self.path}")
+
+    def _skip_value(self):
+        """跳过一个完整的JSON值（只扫描结构字符和字符串边界）"""
+        char = self._peek()
+        if char == b'"':
+            self._read_string()
+            return
+
+        if char in (b'[', b'{'):
+            depth = 0
+            while True:
+                self._pos = _SKIP_RUN.match(self._buf, self._pos).end()
+                if self._pos >= len(self._buf) or self._buf[self._pos] == 0x22:
+                    # 到达块末尾，或字符串跨越块边界
+                    if not self._more():
+                        raise ValueError(f"JSON意外结束: {self.path}")
+                    continue
+
+                token = self._buf[self._pos]
+                self._pos += 1
+                depth += 1 if token in b'[{' else -1
+                if depth == 0:
+                    return
+
+        # 数字、true/false/null
+        while True:
+            match = _SCALAR_END.search(self._buf, self._pos)
+            if match:
+                self._pos = match.start()
+                return
+            self._pos = len(self._buf)
+            if not self._more():
+                return
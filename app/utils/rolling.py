@@ -0,0 +1,306 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+滚动窗口统计工具
+
+流式类每次更新为O(1)（最值使用单调队列，均摊O(1)），适用于逐条到达的数据；
+批量函数以NumPy累加和/滑动窗口视图实现，结果与流式类一致。
+滚动窗口在序列开头不足window个点时按已有的点计算
+"""
+
+import math
+from collections import deque
+from typing import Deque, Optional, Tuple
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+
+class RollingWindow:
+    """固定窗口的流式均值、方差和最值"""
+
+    def __init__(self, window: int):
+        if window < 1:
+            raise ValueError("窗口大小必须大于0")
+        self.window = window
+        self._values: Deque[float] = deque()
+        self._mean = 0.0
+        self._m2 = 0.0
+        self._index = 0
+        # 单调队列：(序号, 数值)
+        self._min: Deque[Tuple[int, float]] = deque()
+        self._max: Deque[Tuple[int, float]] = deque()
+
+    def update(self, value: float):
+        """加入一个新值，超出窗口的旧值自动移出"""
+        value = float(value)
+
+        # Welford增量更新
+        self._values.append(value)
+        delta = value - self._mean
+        self._mean += delta / len(self._values)
+        self._m2 += delta * (value - self._mean)
+
+        if len(self._values) > self.window:
+            old = self._values.popleft()
+            delta = old - self._mean
+            self._mean -= delta / len(self._values)
+            self._m2 = max(self._m2 - delta * (old - self._mean), 0.0)
+
+        while self._min and self._min[-1][1] >= value:
+            self._min.pop()
+        self._min.append((self._index, value))
+        while self._max and self._max[-1][1] <= value:
+            self._max.pop()
+        self._max.append((self._index, value))
+
+        expired = self._index - self.window
+        if self._min[0][0] <= expired:
+            self._min.popleft()
+        if self._max[0][0] <= expired:
+            self._max.popleft()
+        self._index += 1
+
+    @property
+    def count(self) -> int:
+        return len(self._values)
+
+    @property
+    def mean(self) -> float:
+        return self._mean if self._values else math.nan
+
+    @property
+    def variance(self) -> float:
+        """样本方差（ddof=1）"""
+        return self._m2 / (len(self._values) - 1) if len(self._values) > 1 else math.nan
+
+    @property
+    def std(self) -> float:
+        return math.sqrt(self.variance) if len(self._values) > 1 else math.nan
+
+    @property
+    def min(self) -> float:
+        return self._min[0][1] if self._min else math.nan
+
+    @property
+    def max(self) -> float:
+        return self._max[0][1] if self._max else math.nan
+
+    def zscore(self, value: float) -> float:
+        """value相对当前窗口的标准分，窗口标准差为0时返回0"""
+        std = self.std
+        if not std or math.isnan(std):
+            return 0.0
+        return (value - self._mean) / std
+
+
+class EWMA:
+    """指数加权移动平均"""
+
+    def __init__(self, alpha: Optional[float] = None, span: Optional[int] = None):
+        if alpha is None:
+            if span is None:
+                raise ValueError("需要指定alpha或span")
+            alpha = 2.0 / (span + 1)
+        if not 0 < alpha <= 1:
+            raise ValueError("alpha必须在(0, 1]之间")
+        self.alpha = alpha
+        self.value: Optional[float] = None
+
+    def update(self, value: float) -> float:
+        value = float(value)
+        self.value = value if self.value is None else self.alpha * value + (1 - self.alpha) * self.value
+        return self.value
+
+
+class RollingCorrelation:
+    """固定窗口的流式相关系数"""
+
+    def __init__(self, window: int):
+        if window < 2:
+            raise ValueError("窗口大小必须大于1")
+        self.window = window
+        self._pairs: Deque[Tuple[float, float]] = deque()
+        self._mean_x = 0.0
+        self._mean_y = 0.0
+        self._m2_x = 0.0
+        self._m2_y = 0.0
+        self._cov = 0.0
+
+    def update(self, x: float, y: float):
+        """加入一对新值，超出窗口的旧值自动移出"""
+        x, y = float(x), float(y)
+        self._pairs.append((x, y))
+        n = len(self._pairs)
+        dx = x - self._mean_x
+        dy = y - self._mean_y
+        self._mean_x += dx / n
+        self._mean_y += dy / n
+        self._m2_x += dx * (x - self._mean_x)
+        self._m2_y += dy * (y - self._mean_y)
+        self._cov += dx * (y - self._mean_y)
+
+        if n > self.window:
+            old_x, old_y = self._pairs.popleft()
+            n -= 1
+            dx = old_x - self._mean_x
+            dy = old_y - self._mean_y
+            self._mean_x -= dx / n
+            self._mean_y -= dy / n
+            self._m2_x = max(self._m2_x - dx * (old_x - self._mean_x), 0.0)
+            self._m2_y = max(self._m2_y - dy * (old_y - self._mean_y), 0.0)
+            self._cov -= dx * (old_y - self._mean_y)
+
+    @property
+    def correlation(self) -> float:
+        """当前窗口的相关系数，任一序列方差为0时返回0"""
+        denominator = math.sqrt(self._m2_x * self._m2_y)
+        if len(self._pairs) < 2 or denominator == 0:
+            return 0.0
+        return max(-1.0, min(1.0, self._cov / denominator))
+
+
+def _check_window(window: int):
+    """窗口大小必须是正整数"""
+    if window < 1:
+        raise ValueError("窗口大小必须大于0")
+
+
+def _window_sums(values: np.ndarray, window: int) -> Tuple[np.ndarray, np.ndarray]:
+    """每个位置的窗口内累加和及点数"""
+    cumsum = np.concatenate(([0.0], np.cumsum(values)))
+    index = np.arange(1, len(values) + 1)
+    start = np.maximum(index - window, 0)
+    return cumsum[index] - cumsum[start], (index - start).astype(float)
+
+
+def rolling_mean(values, window: int) -> np.ndarray:
+    """
+    滚动均值
+
+    Args:
+        values: 数值序列（不含NaN）
+        window: 窗口大小
+
+    Returns:
+        np.ndarray: 滚动均值
+    """
+    _check_window(window)
+    values = np.asarray(values, dtype=float)
+    sums, counts = _window_sums(values, window)
+    return sums / counts
+
+
+def rolling_std(values, window: int) -> np.ndarray:
+    """滚动样本标准差（ddof=1），窗口内不足2个点处为NaN"""
+    _check_window(window)
+    values = np.asarray(values, dtype=float)
+    if len(values) == 0:
+        return values
+
+    # 先减去整体均值，降低平方和相减的精度损失
+    centered = values - values.mean()
+    sums, counts = _window_sums(centered, window)
+    squares, _ = _window_sums(centered * centered, window)
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        variance = (squares - sums * sums / counts) / (counts - 1)
+    return np.where(counts > 1, np.sqrt(np.maximum(variance, 0.0)), np.nan)
+
+
+def rolling_zscore(values, window: int) -> np.ndarray:
+    """每个点相对其所在滚动窗口（含自身）的标准分，标准差为0或不足2个点处为0"""
+    _check_window(window)
+    values = np.asarray(values, dtype=float)
+    std = rolling_std(values, window)
+    # 相对于整体尺度可忽略的标准差视为0（常数窗口的舍入误差）
+    valid = np.nan_to_num(std) > 1e-9 * (np.abs(values).max(initial=0.0) + 1e-300)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        scores = (values - rolling_mean(values, window)) / std
+    return np.where(valid, scores, 0.0)
+
+
+def rolling_min(values, window: int) -> np.ndarray:
+    """滚动最小值"""
+    _check_window(window)
+    values = np.asarray(values, dtype=float)
+    if len(values) == 0:
+        return values
+    padded = np.concatenate((np.full(window - 1, np.inf), values))
+    return sliding_window_view(padded, window).min(axis=1)
+
+
+def rolling_max(values, window: int) -> np.ndarray:
+    """滚动最大值"""
+    _check_window(window)
+    values = np.asarray(values, dtype=float)
+    if len(values) == 0:
+        return values
+    padded = np.concatenate((np.full(window - 1, -np.inf), values))
+    return sliding_window_view(padded, window).max(axis=1)
+
+
+def ewma(values, alpha: Optional[float] = None, span: Optional[int] = None) -> np.ndarray:
+    """
+    指数加权移动平均（首点为初值，与EWMA类一致）
+
+    分块使用闭式解 y_k = d^(k+1)·y_prev + α·d^k·Σ x_j·d^(-j)，
+    块长度保证 d^(-j) 不超过1e12，避免溢出和精度损失
+
+    Args:
+        values: 数值序列
+        alpha: 平滑系数
+        span: 跨度，alpha = 2 / (span + 1)
+
+    Returns:
+        np.ndarray: 指数加权移动平均
+    """
+    alpha = EWMA(alpha, span).alpha
+    values = np.asarray(values, dtype=float)
+    result = np.empty_like(values)
+    if len(values) == 0:
+        return result
+
+    decay = 1.0 - alpha
+    if decay == 0:
+        return values.copy()
+
+    block = max(1, int(12 * math.log(10) / -math.log(decay)))
+    previous = values[0]
+    for start in range(0, len(values), block):
+        chunk = values[start:start + block]
+        powers = decay ** np.arange(len(chunk))
+        result[start:start + len(chunk)] = (
+            decay * powers * previous + alpha * powers * np.cumsum(chunk / powers)
+        )
+        previous = result[start + len(chunk) - 1]
+    return result
+
+
+def rolling_correlation(x, y, window: int) -> np.ndarray:
+    """滚动相关系数，任一序列窗口内方差为0处为0"""
+    _check_window(window)
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    if len(x) != len(y):
+        raise ValueError("两个序列长度必须相同")
+    if len(x) == 0:
+        return x
+
+    x = x - x.mean()
+    y = y - y.mean()
+    sum_x, counts = _window_sums(x, window)
+    sum_y, _ = _window_sums(y, window)
+    sum_xx, _ = _window_sums(x * x, window)
+    sum_yy, _ = _window_sums(y * y, window)
+    sum_xy, _ = _window_sums(x * y, window)
+
+    cov = sum_xy - sum_x * sum_y / counts
+    var_x = np.maximum(sum_xx - sum_x * sum_x / counts, 0.0)
+    var_y = np.maximum(sum_yy - sum_y * sum_y / counts, 0.0)
+
+    # 相对于整体方差可忽略的窗口方差视为0（常数窗口的舍入误差）
+    valid = (var_x > 1e-12 * counts * (x * x).mean()) & (var_y > 1e-12 * counts * (y * y).mean())
+    with np.errstate(invalid='ignore', divide='ignore'):
+        correlation = cov / np.sqrt(var_x * var_y)
+    return np.where(valid, np.clip(correlation, -1.0, 1.0), 0.0)
@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+合成数据生成
+
+按固定随机种子生成宏观、市场情绪、行业和择时指标记录，供基准测试和压测使用。
+相同参数生成的数据完全一致；记录按日期轮流分配给各市场，
+write_dataset逐条写出，百万级规模也不需要在内存中构造整个数据文档。
+prepare_workspace在独立目录中写入数据文件和配置，应用以该目录为工作目录启动即可使用
+"""
+
+import json
+import random
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Union
+
+COLLECTIONS = ('macro_data', 'market_sentiment', 'industry_data', 'timing_indicators')
+INDUSTRIES = ('technology', 'finance', 'healthcare', 'consumer', 'energy')
+SCALES = {'1k': 1_000, '100k': 100_000, '1m': 1_000_000}
+START_DATE = date(2000, 1, 1)
+
+
+def parse_scale(value: Union[str, int]) -> int:
+    """解析规模参数（1k/100k/1m或整数）"""
+    text = str(value).lower()
+    if text in SCALES:
+        return SCALES[text]
+    try:
+        records = int(text)
+    except ValueError:
+        raise ValueError(f"无效的数据规模: {value}") from None
+    if records <= 0:
+        raise ValueError(f"数据规模必须为正数: {value}")
+    return records
+
+
+def market_names(markets: int) -> List[str]:
+    """合成市场名称"""
+    return [f"market_{m:03d}" for m in range(markets)]
+
+
+def days_for(records: int, markets: int) -> int:
+    """每个市场覆盖的天数"""
+    return -(-records // markets)
+
+
+def iter_records(collection: str, records: int, markets: int, seed: int = 42) -> Iterator[Dict[str, Any]]:
+    """
+    生成单个集合的记录
+
+    Args:
+        collection: 集合名称
+        records: 记录总数
+        markets: 市场数量
+        seed: 随机种子
+
+    Yields:
+        Dict[str, Any]: 记录（按日期、市场顺序）
+    """
+    if collection not in COLLECTIONS:
+        raise ValueError(f"不支持的集合: {collection}")
+
+    rng = random.Random(f"{seed}:{collection}")
+    names = market_names(markets)
+    prefix = collection.split('_')[0]
+
+    for i in range(records):
+        d, m = divmod(i, markets)
+        record = {
+            'id': f"{prefix}_{m}_{d}",
+            'date': (START_DATE + timedelta(days=d)).isoformat(),
+            'market': names[m]
+        }
+
+        if collection == 'macro_data':
+            record.update({
+                'pmi': round(rng.uniform(45, 55), 2), 'cpi': round(rng.uniform(0, 5), 2),
+                'ppi': round(rng.uniform(-2, 4), 2), 'm2': round(rng.uniform(6, 14), 2),
+                'interest_rate': round(rng.uniform(1, 5), 2)
+            })
+        elif collection == 'market_sentiment':
+            record.update({
+                'volatility': round(rng.uniform(8, 35), 2),
+                'investor_sentiment': round(rng.uniform(20, 90), 2),
+                'technical_indicators': {
+                    'rsi': round(rng.uniform(20, 80), 2),
+                    'macd': round(rng.uniform(-3, 3), 2),
+                    'bollinger_bands': round(rng.uniform(-2, 2), 2)
+                }
+            })
+        elif collection == 'industry_data':
+            record.update({
+                'industry': INDUSTRIES[d % len(INDUSTRIES)],
+                'free_cash_flow': round(rng.uniform(-5, 15), 2),
+                'industry_sentiment': round(rng.uniform(20, 90), 2)
+            })
+        else:
+            scores = [round(rng.uniform(0, 100), 2) for _ in range(3)]
+            record.update({
+                'overall_score': round(scores[0] * 0.4 + scores[1] * 0.3 + scores[2] * 0.3, 2),
+                'macro_score': scores[0],
+                'industry_score': scores[1],
+                'sentiment_score': scores[2],
+                'strength_level': 'neutral'
+            })
+
+        yield record
+
+
+def generate_dataset(records: int, markets: int, seed: int = 42) -> Dict[str, Any]:
+    """生成完整的数据文档（每个集合records条记录）"""
+    data: Dict[str, Any] = {
+        collection: list(iter_records(collection, records, markets, seed))
+        for collection in COLLECTIONS
+    }
+    data['ai_analysis'] = []
+    data['metadata'] = {'created_at': START_DATE.isoformat(), 'last_updated': START_DATE.isoformat()}
+    return data
+
+
+def write_dataset(path: Union[str, Path], records: int, markets: int, seed: int = 42) -> Dict[str, int]:
+    """
+    逐条写出数据文件，结构与DataService的数据文件一致
+
+    Args:
+        path: 输出文件路径
+        records: 每个集合的记录数
+        markets: 市场数量
+        seed: 随机种子
+
+    Returns:
+        Dict[str, int]: 各集合写出的记录数
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    counts = {}
+
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write('{')
+        for collection in COLLECTIONS:
+            f.write(f'\n"{collection}": [')
+            count = 0
+            for record in iter_records(collection, records, markets, seed):
+                f.write(',\n' if count else '\n')
+                f.write(json.dumps(record, ensure_ascii=False))
+                count += 1
+            f.write('\n],')
+            counts[collection] = count
+
+        metadata = {'created_at': START_DATE.isoformat(), 'last_updated': START_DATE.isoformat()}
+        f.write(f'\n"ai_analysis": [],\n"metadata": {json.dumps(metadata)}\n}}\n')
+
+    return counts
+
+
+def prepare_workspace(root: Union[str, Path], records: int, markets: int, seed: int = 42,
+                      overrides: Optional[Dict[str, Any]] = None) -> Path:
+    """
+    准备独立的运行目录：data/application_data.json 和 config/config.json
+
+    配置以 config/config.template.json 为基础，数据和文本块路径指向该目录，
+    关闭定时备份，AI使用离线客户端
+
+    Args:
+        root: 运行目录
+        records: 每个集合的记录数
+        markets: 市场数量
+        seed: 随机种子
+        overrides: 额外的配置覆盖（点分隔键 -> 值）
+
+    Returns:
+        Path: 数据文件路径
+    """
+    root = Path(root)
+    data_file = root / 'data' / 'application_data.json'
+    write_dataset(data_file, records, markets, seed)
+
+    template = Path(__file__).resolve().parents[2] / 'config' / 'config.template.json'
+    with open(template, 'r', encoding='utf-8') as f:
+        config = json.load(f)
+
+    settings = {
+        'database.file_path': str(data_file),
+        'database.backup_enabled': False,
+        'database.blob_path': str(root / 'data' / 'blobs'),
+        'database.blob_compression': 'gzip',
+        'ai.provider': 'offline',
+        'logging.level': 'WARNING'
+    }
+    settings.update(overrides or {})
+    for key, value in settings.items():
+        section = config
+        *parents, name = key.split('.')
+        for parent in parents:
+            section = section.setdefault(parent, {})
+        section[name] = value
+
+    (root / 'config').mkdir(parents=True, exist_ok=True)
+    with open(root / 'config' / 'config.json', 'w', encoding='utf-8') as f:
+        json.dump(config, f, indent=2, ensure_ascii=False)
+    return data_file
@@ -0,0 +1,18 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+WSGI入口
+
+供外部WSGI服务器加载，例如:
+    gunicorn -c gunicorn.conf.py app.wsgi:app
+配置文件可由 python -m app.server --print-config 生成（其中开启preload_app时，
+本模块在主进程中导入一次，预加载的状态由工作进程继承；关闭时每个工作进程各自导入）
+"""
+
+from . import create_app
+from .server import preload_state
+from .utils.config import config_manager
+
+app = create_app()
+if config_manager.get('server.preload_app', True):
+    preload_state()
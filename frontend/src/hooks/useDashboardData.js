@@ -1,5 +1,9 @@
 import { useState, useEffect } from 'react'
-import { visualizationAPI } from '@services/api'
+import { visualizationAPI, streamAPI } from '@services/api'
+
+const DASHBOARD_MARKET = 'a_share'
+// 长时间没有收到事件时的兜底刷新间隔（推送断开或事件遗漏时仪表盘不会一直停留在旧数据）
+const FALLBACK_REFRESH_MS = 5 * 60 * 1000
 
 const useDashboardData = () => {
   const [data, setData] = useState(null)
@@ -7,14 +11,14 @@ const useDashboardData = () => {
   const [error, setError] = useState(null)
 
   useEffect(() => {
-    const fetchDashboardData = async () => {
+    const fetchDashboardData = async (showLoading = true) => {
       try {
-        setLoading(true)
+        if (showLoading) setLoading(true)
         setError(null)
 
         // 获取仪表盘摘要数据
         const dashboardData = await visualizationAPI.getDashboardSummary({
-          market: 'a_share',
+          market: DASHBOARD_MARKET,
           date: new Date().toISOString().split('T')[0],
         })
 
@@ -66,6 +70,32 @@ const useDashboardData = () => {
     }
 
     fetchDashboardData()
+
+    // 每次刷新后重新计时，只有一段时间内没有任何事件时才兜底刷新
+    let fallbackTimer
+    const scheduleFallback = () => {
+      clearTimeout(fallbackTimer)
+      fallbackTimer = setTimeout(refresh, FALLBACK_REFRESH_MS)
+    }
+    const refresh = () => {
+      fetchDashboardData(false)
+      scheduleFallback()
+    }
+    scheduleFallback()
+
+    // 订阅实时推送：有新的择时指标时才重新获取摘要
+    if (typeof EventSource === 'undefined') return () => clearTimeout(fallbackTimer)
+    const source = streamAPI.subscribe([DASHBOARD_MARKET], {
+      timing_indicators: refresh,
+      // 重连时有事件丢失
+      reset: refresh,
+      // 其他工作进程写入了数据
+      refresh,
+    })
+    return () => {
+      clearTimeout(fallbackTimer)
+      source.close()
+    }
   }, [])
 
   return { data, loading, error }
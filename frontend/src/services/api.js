@@ -121,11 +121,25 @@ export const visualizationAPI = {
   getDashboardSummary: (params) => api.get('/visualization/dashboard-summary', { params }),
 }
 
+// 实时推送（SSE）
+export const streamAPI = {
+  // 订阅实时事件，handlers为 { 事件类型: 回调 }，返回EventSource，调用close()取消订阅
+  subscribe: (markets, handlers) => {
+    const params = markets && markets.length ? `?markets=${encodeURIComponent(markets.join(','))}` : ''
+    const source = new EventSource(`${getBaseURL()}/stream/events${params}`)
+    Object.entries(handlers).forEach(([type, handler]) => {
+      source.addEventListener(type, (event) => handler(JSON.parse(event.data)))
+    })
+    return source
+  },
+}
+
 // 健康检查
 export const healthAPI = {
   checkDataService: () => api.get('/data/health'),
   checkAnalysisService: () => api.get('/analysis/health'),
   checkVisualizationService: () => api.get('/visualization/health'),
+  checkStreamService: () => api.get('/stream/health'),
 }
 
 export default api
\ No newline at end of file
@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+数据备份脚本
+
+手动执行备份、查看备份链或由全量备份和增量重放恢复数据文件
+
+使用: python scripts/backup_data.py backup [--full]
+     python scripts/backup_data.py list
+     python scripts/backup_data.py restore [--upto 备份文件名] [--target 输出文件]
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from app.utils.config import config_manager  # noqa: E402
+from app.services.backup_service import BackupService  # noqa: E402
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description='全量 + 增量数据备份')
+    parser.add_argument('--data-file', help='数据文件，默认使用database.file_path')
+    parser.add_argument('--backup-dir', help='备份目录，默认使用database.backup_path')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    backup_parser = subparsers.add_parser('backup', help='执行一次备份')
+    backup_parser.add_argument('--full', action='store_true', help='强制全量备份')
+
+    subparsers.add_parser('list', help='列出备份链')
+
+    restore_parser = subparsers.add_parser('restore', help='恢复数据文件')
+    restore_parser.add_argument('--upto', help='恢复到指定的备份文件（含），默认为最新备份')
+    restore_parser.add_argument('--target', help='恢复到的文件，默认覆盖数据文件')
+    args = parser.parse_args()
+
+    config_manager.load_config()
+    service = BackupService(args.data_file, args.backup_dir)
+
+    try:
+        if args.command == 'backup':
+            result = service.backup(force_full=args.full)
+        elif args.command == 'list':
+            result = service.list_backups()
+        else:
+            result = service.restore(args.target, args.upto)
+    except (RuntimeError, ValueError, FileNotFoundError) as e:
+        print(f"操作失败: {e}", file=sys.stderr)
+        return 1
+
+    print(json.dumps(result, ensure_ascii=False, indent=2))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,422 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+基准测试套件
+
+在临时工作目录中用合成数据（见app/utils/synthetic_data.py）初始化数据文件，
+测量数据写入、区间查询、择时评分、趋势/仪表盘端点、AI缓存路径、请求验证和应用冷启动的耗时，
+结果可保存为基线并与之后的运行对比
+
+使用:
+    python scripts/benchmark.py --scale 100k --markets 50 --save main
+    python scripts/benchmark.py --scale 100k --markets 50 --compare main
+"""
+
+import argparse
+import json
+import math
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from app.utils.synthetic_data import (  # noqa: E402
+    START_DATE, days_for, market_names, parse_scale, prepare_workspace
+)
+
+DEFAULT_BASELINE_DIR = PROJECT_ROOT / 'benchmarks' / 'baselines'
+
+# 名称 -> (说明, 函数)
+BENCHMARKS: Dict[str, tuple] = {}
+
+
+def benchmark(name: str, description: str) -> Callable:
+    """注册基准测试"""
+    def decorator(func: Callable) -> Callable:
+        BENCHMARKS[name] = (description, func)
+        return func
+    return decorator
+
+
+class Workspace:
+    """基准测试工作目录：配置、数据文件和Flask应用"""
+
+    def __init__(self, records: int, markets: int, seed: int):
+        self.records = records
+        self.markets = market_names(markets)
+        self.market = self.markets[0]
+        days = days_for(records, markets)
+        self.last_date = self._date(days - 1)
+        self.range_start = self._date(max(days - 90, 0))
+
+        self.root = Path(tempfile.mkdtemp(prefix='benchmark_'))
+        self._cwd = os.getcwd()
+
+        started = time.perf_counter()
+        data_file = prepare_workspace(self.root, records, markets, seed)
+        self.generate_seconds = time.perf_counter() - started
+        self.data_file_mb = data_file.stat().st_size / 1024 / 1024
+
+        # 配置按相对当前目录的路径加载
+        os.chdir(self.root)
+        from app import create_app
+        self.app = create_app()
+        self.app.config['TESTING'] = True
+        self.client = self.app.test_client()
+
+    @staticmethod
+    def _date(day: int) -> str:
+        return (START_DATE + timedelta(days=day)).isoformat()
+
+    def close(self):
+        os.chdir(self._cwd)
+        shutil.rmtree(self.root, ignore_errors=True)
+
+
+@benchmark('ingest.macro', '写入一条宏观数据')
+def bench_ingest_macro(ws: Workspace) -> Callable:
+    from app.services.data_service import DataService
+    data_service = DataService()
+    record = {'date': ws.last_date, 'market': ws.market, 'pmi': 51.0, 'cpi': 2.0,
+              'ppi': 1.0, 'm2': 8.0, 'interest_rate': 3.0}
+    return lambda: data_service.save_macro_data(dict(record))
+
+
+@benchmark('ingest.sentiment', '写入一条市场情绪数据')
+def bench_ingest_sentiment(ws: Workspace) -> Callable:
+    from app.services.data_service import DataService
+    data_service = DataService()
+    record = {'date': ws.last_date, 'market': ws.market, 'volatility': 15.0, 'investor_sentiment': 60.0,
+              'technical_indicators': {'rsi': 55.0, 'macd': 0.5, 'bollinger_bands': 0.2}}
+    return lambda: data_service.save_market_sentiment(json.loads(json.dumps(record)))
+
+
+@benchmark('query.macro_range', '单市场近90天宏观数据区间查询')
+def bench_query_macro(ws: Workspace) -> Callable:
+    from app.services.data_service import DataService
+    data_service = DataService()
+    return lambda: data_service.get_macro_data(ws.market, ws.range_start, ws.last_date)
+
+
+@benchmark('query.timing_range', '单市场近90天择时指标区间查询')
+def bench_query_timing(ws: Workspace) -> Callable:
+    from app.services.data_service import DataService
+    data_service = DataService()
+    return lambda: data_service.get_timing_indicators(ws.market, ws.range_start, ws.last_date)
+
+
+@benchmark('scoring.compare_markets', '全部市场最新择时指标比较（单次分组查询）')
+def bench_compare_markets(ws: Workspace) -> Callable:
+    from app.services.indicator_service import IndicatorService
+    indicator_service = IndicatorService()
+    return lambda: indicator_service.compare_markets(ws.markets)
+
+
+@benchmark('scoring.timing_indicators', '计算并保存一次择时指标')
+def bench_scoring(ws: Workspace) -> Callable:
+    from app.services.indicator_service import IndicatorService
+    indicator_service = IndicatorService()
+    data = {
+        'market': ws.market, 'date': ws.last_date,
+        'macro_data': {'pmi': 51.0, 'cpi': 2.0, 'ppi': 1.0, 'm2': 8.0, 'interest_rate': 3.0},
+        'industry_data': {'free_cash_flow': 5.0, 'industry_sentiment': 60.0},
+        'market_sentiment': {'volatility': 15.0, 'investor_sentiment': 60.0,
+                             'technical_indicators': {'rsi': 55.0, 'macd': 0.5, 'bollinger_bands': 0.2}}
+    }
+    return lambda: indicator_service.calculate_timing_indicators(json.loads(json.dumps(data)))
+
+
+@benchmark('scoring.position_chart', '仓位配置图表（11个评分点）')
+def bench_position_chart(ws: Workspace) -> Callable:
+    from app.services.indicator_service import IndicatorService
+    indicator_service = IndicatorService()
+    return lambda: indicator_service.get_position_sizing_chart_data(ws.market, ws.last_date, 100000)
+
+
+@benchmark('scoring.position_batch_1000', '批量计算1000个组合的仓位建议')
+def bench_position_batch(ws: Workspace) -> Callable:
+    from app.services.indicator_service import IndicatorService
+    indicator_service = IndicatorService()
+    data = {
+        'market': ws.market, 'date': ws.last_date,
+        'portfolios': [{'timing_score': i % 101, 'available_capital': 10000 * (i + 1)} for i in range(1000)]
+    }
+    return lambda: indicator_service.calculate_position_sizing_batch(data)
+
+
+@benchmark('scoring.scenarios_500', '批量评估500个假设情景（不保存）')
+def bench_scenarios(ws: Workspace) -> Callable:
+    from app.services.indicator_service import IndicatorService
+    indicator_service = IndicatorService()
+    data = {
+        'market': ws.market, 'date': ws.last_date,
+        'scenarios': [{'macro_data': {'pmi': 45 + i * 0.02}, 'market_sentiment': {'volatility': 10 + i * 0.05}}
+                      for i in range(500)]
+    }
+    return lambda: indicator_service.evaluate_scenarios(data)
+
+
+@benchmark('endpoint.timing_score_trend', 'GET /api/visualization/timing-score-trend（全历史，降采样到500点）')
+def bench_trend(ws: Workspace) -> Callable:
+    url = f"/api/visualization/timing-score-trend?market={ws.market}&max_points=500"
+    return lambda: _get(ws, url)
+
+
+@benchmark('endpoint.dashboard_summary', 'GET /api/visualization/dashboard-summary')
+def bench_dashboard(ws: Workspace) -> Callable:
+    url = f"/api/visualization/dashboard-summary?market={ws.market}"
+    return lambda: _get(ws, url)
+
+
+@benchmark('ai.cache_hit', 'AI分析命中结果缓存')
+def bench_ai_cache_hit(ws: Workspace) -> Callable:
+    ai_service = _ai_service()
+    data = {'market': ws.market, 'date': ws.last_date}
+    ai_service.analyze_timing_indicators(dict(data))
+    return lambda: ai_service.analyze_timing_indicators(dict(data))
+
+
+@benchmark('ai.cache_miss', 'AI分析未命中缓存（离线客户端，含准备数据和保存结果）')
+def bench_ai_cache_miss(ws: Workspace) -> Callable:
+    ai_service = _ai_service()
+    data = {'market': ws.market, 'date': ws.last_date}
+
+    def run():
+        ai_service.cache.clear()
+        return ai_service.analyze_timing_indicators(dict(data))
+    return run
+
+
+def _legacy_validate(data, required_fields):
+    """改用模型验证之前的做法：路由和DataService各检查一遍必需字段"""
+    for _ in range(2):
+        for field in required_fields:
+            if field not in data:
+                raise ValueError(f"缺少必需字段: {field}")
+
+
+@benchmark('validation.legacy_record', '手写必需字段检查（路由+DataService两次），单条宏观数据')
+def bench_validation_legacy(ws: Workspace) -> Callable:
+    record = _validation_records(ws, 1)[0]
+    return lambda: _legacy_validate(record, ['date', 'market'])
+
+
+@benchmark('validation.model_record', '构造模型实例再model_dump（对照），单条宏观数据')
+def bench_validation_model(ws: Workspace) -> Callable:
+    from app.models import MacroData
+    record = _validation_records(ws, 1)[0]
+    return lambda: MacroData.model_validate(record).model_dump(exclude_unset=True)
+
+
+@benchmark('validation.compiled_record', '模型验证器（类型转换和范围检查），单条宏观数据')
+def bench_validation_record(ws: Workspace) -> Callable:
+    from app.models import MacroData, validate_record
+    record = _validation_records(ws, 1)[0]
+    return lambda: validate_record(MacroData, record)
+
+
+@benchmark('validation.compiled_loop_1000', '模型验证器逐条验证1000条宏观数据')
+def bench_validation_loop(ws: Workspace) -> Callable:
+    from app.models import MacroData, validate_record
+    records = _validation_records(ws, 1000)
+    return lambda: [validate_record(MacroData, record) for record in records]
+
+
+@benchmark('validation.compiled_batch_1000', '模型验证器批量模式一次验证1000条宏观数据')
+def bench_validation_batch(ws: Workspace) -> Callable:
+    from app.models import MacroData, validate_records
+    records = _validation_records(ws, 1000)
+    return lambda: validate_records(MacroData, records)
+
+
+def _validation_records(ws: Workspace, count: int) -> List[Dict[str, Any]]:
+    return [{'date': ws.last_date, 'market': ws.market, 'pmi': 50.0 + i % 10, 'cpi': '2.1',
+             'ppi': 1.0, 'm2': 8.0, 'interest_rate': 3.0} for i in range(count)]
+
+
+@benchmark('startup.create_app', '新解释器中导入应用并执行create_app（工作进程/命令行工具冷启动）')
+def bench_startup(ws: Workspace) -> Callable:
+    command = [sys.executable, '-c', 'from app import create_app; create_app()']
+    env = dict(os.environ, PYTHONPATH=str(PROJECT_ROOT))
+    return lambda: subprocess.run(command, cwd=ws.root, env=env, check=True,
+                                  stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+
+def _ai_service():
+    from app.services.ai_service import AIService
+    return AIService()
+
+
+def _get(ws: Workspace, url: str):
+    response = ws.client.get(url)
+    if response.status_code != 200:
+        raise RuntimeError(f"{url} 返回 {response.status_code}: {response.get_data(as_text=True)[:200]}")
+    return response
+
+
+def measure(func: Callable, rounds: int, warmup: int) -> Dict[str, float]:
+    """执行并统计耗时（秒）"""
+    for _ in range(warmup):
+        func()
+
+    samples = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - start)
+
+    samples.sort()
+    mean = statistics.fmean(samples)
+    return {
+        'rounds': rounds,
+        'min': samples[0],
+        'max': samples[-1],
+        'mean': mean,
+        'median': statistics.median(samples),
+        'p95': samples[min(len(samples) - 1, math.ceil(0.95 * len(samples)) - 1)],
+        'stddev': statistics.stdev(samples) if len(samples) > 1 else 0.0,
+        'ops': 1 / mean if mean > 0 else float('inf')
+    }
+
+
+def run_suite(records: int, markets: int, rounds: int, warmup: int, seed: int = 42,
+              selected: Optional[List[str]] = None) -> Dict[str, Any]:
+    """生成数据并依次运行基准测试"""
+    names = [name for name in BENCHMARKS if not selected or any(s in name for s in selected)]
+    if not names:
+        raise ValueError(f"没有匹配的基准测试: {selected}")
+
+    ws = Workspace(records, markets, seed)
+    try:
+        results = {}
+        for name in names:
+            description, setup = BENCHMARKS[name]
+            stats = measure(setup(ws), rounds, warmup)
+            stats['description'] = description
+            results[name] = stats
+
+        return {
+            'created_at': datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'machine': f"{platform.system()} {platform.machine()} ({os.cpu_count()} CPU)",
+            'records': records,
+            'markets': markets,
+            'seed': seed,
+            'data_file_mb': round(ws.data_file_mb, 1),
+            'generate_seconds': round(ws.generate_seconds, 3),
+            'benchmarks': results
+        }
+    finally:
+        ws.close()
+
+
+def baseline_path(name: str, baseline_dir: Path) -> Path:
+    return Path(baseline_dir) / f"{name}.json"
+
+
+def compare(report: Dict[str, Any], baseline: Dict[str, Any], threshold: float) -> List[Dict[str, Any]]:
+    """
+    按中位数与基线对比
+
+    Returns:
+        List[Dict[str, Any]]: 每项包含基线/当前中位数、变化比例以及是否超出阈值
+    """
+    if (baseline.get('records'), baseline.get('markets')) != (report['records'], report['markets']):
+        raise ValueError(f"基线数据规模不同: {baseline.get('records')}条 x {baseline.get('markets')}个市场")
+
+    rows = []
+    for name, stats in report['benchmarks'].items():
+        base = baseline.get('benchmarks', {}).get(name)
+        if base is None:
+            rows.append({'name': name, 'baseline': None, 'current': stats['median'],
+                         'change': None, 'regression': False})
+            continue
+        change = stats['median'] / base['median'] - 1 if base['median'] > 0 else 0.0
+        rows.append({'name': name, 'baseline': base['median'], 'current': stats['median'],
+                     'change': change, 'regression': change > threshold})
+    return rows
+
+
+def _ms(seconds: Optional[float]) -> str:
+    return '-' if seconds is None else f"{seconds * 1000:.3f}"
+
+
+def print_report(report: Dict[str, Any]):
+    print(f"数据规模: 每个集合{report['records']}条 x {report['markets']}个市场, "
+          f"数据文件 {report['data_file_mb']}MB（生成 {report['generate_seconds']}s）")
+    print(f"{'基准测试':<30}{'中位数(ms)':>12}{'均值(ms)':>12}{'p95(ms)':>12}{'标准差(ms)':>12}{'ops/s':>10}")
+    for name, stats in report['benchmarks'].items():
+        print(f"{name:<30}{_ms(stats['median']):>12}{_ms(stats['mean']):>12}{_ms(stats['p95']):>12}"
+              f"{_ms(stats['stddev']):>12}{stats['ops']:>10.1f}")
+
+
+def print_comparison(rows: List[Dict[str, Any]], threshold: float):
+    print(f"\n与基线对比（中位数，回归阈值 +{threshold:.0%}）")
+    print(f"{'基准测试':<30}{'基线(ms)':>12}{'当前(ms)':>12}{'变化':>10}")
+    for row in rows:
+        change = '新增' if row['change'] is None else f"{row['change']:+.1%}"
+        flag = '  回归' if row['regression'] else ''
+        print(f"{row['name']:<30}{_ms(row['baseline']):>12}{_ms(row['current']):>12}{change:>10}{flag}")
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description='合成数据基准测试')
+    parser.add_argument('--scale', default='1k', help='每个集合的记录数: 1k, 100k, 1m 或整数')
+    parser.add_argument('--markets', type=int, default=20, help='市场数量')
+    parser.add_argument('--rounds', type=int, default=20, help='每项测量次数')
+    parser.add_argument('--warmup', type=int, default=2, help='每项预热次数')
+    parser.add_argument('--seed', type=int, default=42, help='随机种子')
+    parser.add_argument('--filter', action='append', help='只运行名称包含该字符串的基准测试（可重复）')
+    parser.add_argument('--list', action='store_true', help='列出全部基准测试')
+    parser.add_argument('--save', metavar='NAME', help='将结果保存为基线')
+    parser.add_argument('--compare', metavar='NAME', help='与已保存的基线对比，出现回归时返回码为1')
+    parser.add_argument('--threshold', type=float, default=0.2, help='判定回归的中位数增幅（默认0.2即20%%）')
+    parser.add_argument('--baseline-dir', default=str(DEFAULT_BASELINE_DIR), help='基线目录')
+    parser.add_argument('--json', action='store_true', help='以JSON格式输出结果')
+    args = parser.parse_args()
+
+    if args.list:
+        for name, (description, _) in BENCHMARKS.items():
+            print(f"{name:<30}{description}")
+        return 0
+
+    baseline = None
+    if args.compare:
+        with open(baseline_path(args.compare, args.baseline_dir), 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+
+    report = run_suite(parse_scale(args.scale), args.markets, args.rounds, args.warmup,
+                       args.seed, args.filter)
+
+    if args.save:
+        path = baseline_path(args.save, args.baseline_dir)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+
+    rows = compare(report, baseline, args.threshold) if baseline else None
+    if args.json:
+        print(json.dumps({'report': report, 'comparison': rows}, ensure_ascii=False))
+    else:
+        print_report(report)
+        if rows is not None:
+            print_comparison(rows, args.threshold)
+        if args.save:
+            print(f"\n基线已保存: {baseline_path(args.save, args.baseline_dir)}")
+
+    return 1 if rows and any(row['regression'] for row in rows) else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+内存基准测试脚本
+
+对比JSON全量加载、流式解析与内存映射分段读取在查询单个市场时的峰值RSS
+
+使用: python scripts/benchmark_memory.py --markets 20 --days 2000
+"""
+
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from app.utils.synthetic_data import write_dataset  # noqa: E402
+
+MODES = ('baseline', 'json', 'stream', 'segment')
+
+
+def peak_rss_mb() -> float:
+    """当前进程峰值RSS（MB）
+
+    Linux下ru_maxrss会跨exec继承父进程的峰值，优先读取/proc中的VmHWM
+    """
+    try:
+        with open('/proc/self/status', 'r', encoding='utf-8') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return round(int(line.split()[1]) / 1024, 1)
+    except OSError:
+        pass
+    return round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+
+
+def run_child(mode: str, data_file: str, segment_file: str, market: str) -> dict:
+    """子进程：按指定模式查询一个市场并报告峰值RSS"""
+    from app.utils.config import config_manager
+    config_manager.set('database.file_path', data_file)
+    config_manager.set('database.segment_enabled', mode == 'segment')
+    config_manager.set('database.segment_path', segment_file)
+    config_manager.set('database.read_mode', 'stream' if mode == 'stream' else 'json')
+
+    from app.services.data_service import DataService
+    data_service = DataService()
+
+    rows = 0
+    start = time.perf_counter()
+    if mode != 'baseline':
+        rows += len(data_service.get_market_sentiment(market))
+        rows += len(data_service.get_timing_indicators(market))
+    elapsed = time.perf_counter() - start
+
+    return {
+        'mode': mode,
+        'rows': rows,
+        'seconds': round(elapsed, 4),
+        'peak_rss_mb': peak_rss_mb()
+    }
+
+
+def run_benchmark(markets: int, days: int) -> dict:
+    """生成数据并在独立子进程中测量各模式"""
+    from app.services.segment_store import SegmentStore, file_stamp
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        data_file = os.path.join(temp_dir, 'application_data.json')
+        segment_file = os.path.join(temp_dir, 'application_data.seg')
+
+        write_dataset(data_file, markets * days, markets)
+
+        with open(data_file, 'r', encoding='utf-8') as f:
+            SegmentStore(segment_file).build(json.load(f), file_stamp(Path(data_file)))
+
+        results = []
+        for mode in MODES:
+            output = subprocess.run(
+                [sys.executable, __file__, '--child', mode, data_file, segment_file, 'market_000'],
+                check=True, capture_output=True, text=True, cwd=temp_dir
+            ).stdout
+            results.append(json.loads(output.strip().splitlines()[-1]))
+
+        return {
+            'markets': markets,
+            'days': days,
+            'json_file_mb': round(os.path.getsize(data_file) / 1024 / 1024, 1),
+            'segment_file_mb': round(os.path.getsize(segment_file) / 1024 / 1024, 1),
+            'results': results
+        }
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description='JSON加载与分段读取的内存对比')
+    parser.add_argument('--markets', type=int, default=20, help='市场数量')
+    parser.add_argument('--days', type=int, default=2000, help='每个市场的天数')
+    parser.add_argument('--json', action='store_true', help='以JSON格式输出结果')
+    parser.add_argument('--child', nargs=4, metavar=('MODE', 'DATA', 'SEGMENT', 'MARKET'),
+                        help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(run_child(*args.child)))
+        return 0
+
+    report = run_benchmark(args.markets, args.days)
+    if args.json:
+        print(json.dumps(report, ensure_ascii=False))
+        return 0
+
+    print(f"数据规模: {report['markets']}个市场 x {report['days']}天")
+    print(f"JSON文件: {report['json_file_mb']}MB, 分段文件: {report['segment_file_mb']}MB")
+    print(f"{'模式':<10}{'记录数':>10}{'耗时(s)':>12}{'峰值RSS(MB)':>14}")
+    for result in report['results']:
+        print(f"{result['mode']:<10}{result['rows']:>10}{result['seconds']:>12}{result['peak_rss_mb']:>14}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
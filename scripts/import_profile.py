@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+导入耗时报告
+
+在新解释器中以 python -X importtime 导入目标模块，汇总各模块和各顶层包的导入耗时，
+用于定位拖慢工作进程启动和命令行工具启动的依赖
+
+使用:
+    python scripts/import_profile.py
+    python scripts/import_profile.py --module app.services.ai_service --top 30
+    python scripts/import_profile.py --json > importtime.json
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+from collections import defaultdict
+from pathlib import Path
+from typing import Any, Dict, List
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+
+# create_app导入的模块：应用包和三个蓝图
+DEFAULT_MODULES = ['app', 'app.routes.data_input', 'app.routes.analysis', 'app.routes.visualization']
+
+
+def parse_importtime(output: str) -> List[Dict[str, Any]]:
+    """
+    解析 -X importtime 的输出
+
+    Args:
+        output: 标准错误输出
+
+    Returns:
+        List[Dict[str, Any]]: 按导入完成顺序排列的模块记录（self_us、cumulative_us、depth、module）
+    """
+    entries = []
+    for line in output.splitlines():
+        if not line.startswith('import time:'):
+            continue
+        parts = line[len('import time:'):].split('|')
+        if len(parts) != 3 or not parts[0].strip().isdigit():
+            continue  # 表头
+        name = parts[2].rstrip()
+        stripped = name.lstrip()
+        entries.append({
+            'module': stripped,
+            'self_us': int(parts[0]),
+            'cumulative_us': int(parts[1]),
+            'depth': (len(name) - len(stripped) - 1) // 2
+        })
+    return entries
+
+
+def summarize(entries: List[Dict[str, Any]], top: int) -> Dict[str, Any]:
+    """汇总总耗时、最慢的模块和各顶层包的耗时"""
+    packages: Dict[str, int] = defaultdict(int)
+    for entry in entries:
+        packages[entry['module'].split('.')[0]] += entry['self_us']
+
+    slowest = sorted(entries, key=lambda e: e['cumulative_us'], reverse=True)[:top]
+    return {
+        'modules': len(entries),
+        'total_ms': round(sum(e['self_us'] for e in entries) / 1000, 1),
+        'slowest': [{'module': e['module'], 'cumulative_ms': round(e['cumulative_us'] / 1000, 1),
+                     'self_ms': round(e['self_us'] / 1000, 1)} for e in slowest],
+        'packages': [{'package': name, 'ms': round(us / 1000, 1)}
+                     for name, us in sorted(packages.items(), key=lambda item: item[1], reverse=True)[:top]]
+    }
+
+
+def profile(modules: List[str]) -> List[Dict[str, Any]]:
+    """在新解释器中导入模块并返回导入耗时记录"""
+    env = dict(os.environ, PYTHONPATH=str(PROJECT_ROOT))
+    code = '; '.join(f'import {module}' for module in modules)
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', code], cwd=PROJECT_ROOT,
+                            env=env, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+    if result.returncode != 0:
+        errors = [line for line in result.stderr.splitlines() if not line.startswith('import time:')]
+        raise RuntimeError('\n'.join(errors[-5:]) or f"导入失败: {code}")
+    return parse_importtime(result.stderr)
+
+
+def print_report(summary: Dict[str, Any], modules: List[str]):
+    """打印报告"""
+    print(f"导入: {', '.join(modules)}")
+    print(f"共 {summary['modules']} 个模块，总耗时 {summary['total_ms']} ms\n")
+
+    print(f"{'模块':<50}{'累计(ms)':>12}{'自身(ms)':>12}")
+    for row in summary['slowest']:
+        print(f"{row['module']:<50}{row['cumulative_ms']:>12.1f}{row['self_ms']:>12.1f}")
+
+    print(f"\n{'顶层包':<50}{'耗时(ms)':>12}")
+    for row in summary['packages']:
+        print(f"{row['package']:<50}{row['ms']:>12.1f}")
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description='导入耗时报告')
+    parser.add_argument('--module', action='append', help='要导入的模块（可重复），默认为create_app导入的模块')
+    parser.add_argument('--top', type=int, default=20, help='显示的条目数')
+    parser.add_argument('--json', action='store_true', help='以JSON格式输出结果')
+    args = parser.parse_args()
+
+    modules = args.module or DEFAULT_MODULES
+    try:
+        entries = profile(modules)
+    except RuntimeError as e:
+        print(f"导入失败: {e}", file=sys.stderr)
+        return 1
+
+    summary = summarize(entries, args.top)
+    if args.json:
+        print(json.dumps(summary, ensure_ascii=False))
+    else:
+        print_report(summary, modules)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,379 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+闭环压测工具
+
+对每个工作进程数分别在独立目录中准备合成数据、在本机启动服务（默认为生产入口app.server），
+由固定数量的虚拟用户循环发送请求（收到响应后再发下一个），
+按请求类型统计延迟分位数、错误率和吞吐量。AI请求使用离线客户端（ai.provider=offline）
+
+使用:
+    python scripts/load_test.py --workers 1,2,4 --concurrency 16 --duration 30
+    python scripts/load_test.py --mix read=60,ingest=30,ai=10 --ai-latency-ms 200 --output report.json
+"""
+
+import argparse
+import http.client
+import json
+import math
+import os
+import random
+import shlex
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from app.utils.synthetic_data import (  # noqa: E402
+    START_DATE, days_for, market_names, parse_scale, prepare_workspace
+)
+
+HOST = '127.0.0.1'
+HEALTH_PATH = '/api/data/health'
+DEFAULT_MIX = 'read=70,ingest=20,ai=10'
+# 生产入口（gunicorn/waitress，见app/server.py）
+PRODUCTION_SERVER_CMD = '{python} -m app.server --host {host} --port {port} --workers {workers}'
+# 未安装生产服务器时使用内置服务器的多进程模式：工作进程数即同时处理请求的进程数
+BUILTIN_SERVER_CMD = '{python} ' + shlex.quote(str(Path(__file__).resolve())) + ' --serve {root} {port} {workers}'
+
+
+class RequestMix:
+    """按权重随机生成请求"""
+
+    def __init__(self, weights: Dict[str, float], markets: List[str], last_day: int):
+        unknown = set(weights) - {'read', 'ingest', 'ai'}
+        if unknown:
+            raise ValueError(f"未知的请求类型: {', '.join(sorted(unknown))}")
+        self.kinds = [kind for kind, weight in weights.items() if weight > 0]
+        if not self.kinds:
+            raise ValueError("请求类型权重不能全部为0")
+        self.weights = [weights[kind] for kind in self.kinds]
+        self.markets = markets
+        self.last_day = last_day
+
+    def next(self, rng: random.Random) -> Tuple[str, str, str, Optional[Dict[str, Any]]]:
+        """返回 (类型, 方法, 路径, 请求体)"""
+        kind = rng.choices(self.kinds, self.weights)[0]
+        market = rng.choice(self.markets)
+
+        if kind == 'ingest':
+            # 写入最后一天之后的新日期
+            day = _date(self.last_day + rng.randint(1, 365))
+            if rng.random() < 0.5:
+                body = {'date': day, 'market': market, 'pmi': round(rng.uniform(45, 55), 2),
+                        'cpi': round(rng.uniform(0, 5), 2), 'ppi': round(rng.uniform(-2, 4), 2),
+                        'm2': round(rng.uniform(6, 14), 2), 'interest_rate': round(rng.uniform(1, 5), 2)}
+                return kind, 'POST', '/api/data/macro', body
+            body = {'date': day, 'market': market, 'volatility': round(rng.uniform(8, 35), 2),
+                    'investor_sentiment': round(rng.uniform(20, 90), 2),
+                    'technical_indicators': {'rsi': round(rng.uniform(20, 80), 2),
+                                             'macd': round(rng.uniform(-3, 3), 2),
+                                             'bollinger_bands': round(rng.uniform(-2, 2), 2)}}
+            return kind, 'POST', '/api/data/market-sentiment', body
+
+        if kind == 'ai':
+            day = _date(rng.randint(max(self.last_day - 30, 0), self.last_day))
+            return kind, 'POST', '/api/analysis/ai-analysis', {'market': market, 'date': day}
+
+        start = _date(max(self.last_day - 90, 0))
+        path = rng.choice([
+            f"/api/visualization/timing-score-trend?market={market}&max_points=500",
+            f"/api/visualization/dashboard-summary?market={market}",
+            f"/api/data/macro?market={market}&start_date={start}&limit=100",
+            f"/api/analysis/summary?market={market}"
+        ])
+        return kind, 'GET', path, None
+
+
+def _date(day: int) -> str:
+    return (START_DATE + timedelta(days=day)).isoformat()
+
+
+def parse_mix(text: str) -> Dict[str, float]:
+    """解析请求比例，如 read=70,ingest=20,ai=10"""
+    weights = {}
+    for part in text.split(','):
+        kind, _, weight = part.partition('=')
+        try:
+            weights[kind.strip()] = float(weight)
+        except ValueError:
+            raise ValueError(f"无效的请求比例: {part}") from None
+    return weights
+
+
+def default_server_cmd() -> str:
+    from app.server import resolve_backend
+    try:
+        resolve_backend('auto')
+        return PRODUCTION_SERVER_CMD
+    except RuntimeError:
+        return BUILTIN_SERVER_CMD
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind((HOST, 0))
+        return sock.getsockname()[1]
+
+
+class Server:
+    """在指定目录中启动服务子进程"""
+
+    def __init__(self, command: str, root: Path, workers: int, startup_timeout: float = 60):
+        self.port = free_port()
+        self.root = root
+        args = shlex.split(command.format(python=shlex.quote(sys.executable), root=shlex.quote(str(root)),
+                                          port=self.port, workers=workers, host=HOST))
+        env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [str(PROJECT_ROOT),
+                                                                        os.environ.get('PYTHONPATH')])))
+        self.log = open(root / 'server.log', 'wb')
+        self.process = subprocess.Popen(args, cwd=root, env=env, stdout=self.log, stderr=subprocess.STDOUT)
+        self._wait_ready(startup_timeout)
+
+    def _wait_ready(self, timeout: float):
+        deadline = time.time() + timeout
+        while time.time() < deadline:
+            if self.process.poll() is not None:
+                raise RuntimeError(f"服务启动失败（退出码 {self.process.returncode}）:\n{self.output()}")
+            try:
+                conn = http.client.HTTPConnection(HOST, self.port, timeout=2)
+                conn.request('GET', HEALTH_PATH)
+                if conn.getresponse().status == 200:
+                    conn.close()
+                    return
+                conn.close()
+            except OSError:
+                pass
+            time.sleep(0.1)
+        self.stop()
+        raise RuntimeError(f"服务在{timeout}秒内未就绪:\n{self.output()}")
+
+    def output(self) -> str:
+        self.log.flush()
+        return (self.root / 'server.log').read_text(encoding='utf-8', errors='replace')[-4000:]
+
+    def stop(self):
+        if self.process.poll() is None:
+            self.process.terminate()
+            try:
+                self.process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+                self.process.wait()
+        self.log.close()
+
+
+class VirtualUser(threading.Thread):
+    """闭环虚拟用户：保持连接，收到响应后立即发送下一个请求"""
+
+    def __init__(self, port: int, mix: RequestMix, seed: int, measure_from: float, stop_at: float,
+                 timeout: float):
+        super().__init__(daemon=True)
+        self.port = port
+        self.mix = mix
+        self.rng = random.Random(seed)
+        self.measure_from = measure_from
+        self.stop_at = stop_at
+        self.timeout = timeout
+        self.conn: Optional[http.client.HTTPConnection] = None
+        # (类型, 耗时秒, 是否成功)
+        self.samples: List[Tuple[str, float, bool]] = []
+        self.errors: Dict[str, int] = {}
+
+    def run(self):
+        while time.perf_counter() < self.stop_at:
+            kind, method, path, body = self.mix.next(self.rng)
+            start = time.perf_counter()
+            status, error = self._send(method, path, body)
+            end = time.perf_counter()
+
+            ok = error is None and 200 <= status < 300
+            if not ok:
+                key = error or f"HTTP {status}"
+                self.errors[key] = self.errors.get(key, 0) + 1
+            if start >= self.measure_from and end <= self.stop_at:
+                self.samples.append((kind, end - start, ok))
+        if self.conn:
+            self.conn.close()
+
+    def _send(self, method: str, path: str, body: Optional[Dict[str, Any]]) -> Tuple[int, Optional[str]]:
+        payload = json.dumps(body).encode('utf-8') if body is not None else None
+        headers = {'Content-Type': 'application/json'} if payload is not None else {}
+
+        # 复用的连接可能已被服务端关闭，未收到响应时重连重试一次
+        for attempt in range(2):
+            reused = self.conn is not None
+            if self.conn is None:
+                self.conn = http.client.HTTPConnection(HOST, self.port, timeout=self.timeout)
+            try:
+                self.conn.request(method, path, body=payload, headers=headers)
+                response = self.conn.getresponse()
+                response.read()
+                if response.will_close:
+                    self.conn.close()
+                    self.conn = None
+                return response.status, None
+            except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError) as e:
+                self.conn.close()
+                self.conn = None
+                if not reused or attempt:
+                    return 0, type(e).__name__
+            except (OSError, http.client.HTTPException) as e:
+                self.conn.close()
+                self.conn = None
+                return 0, type(e).__name__
+        return 0, 'RetryFailed'
+
+
+def percentile(sorted_values: List[float], q: float) -> float:
+    """最近秩法分位数"""
+    if not sorted_values:
+        return 0.0
+    return sorted_values[max(0, math.ceil(q / 100 * len(sorted_values)) - 1)]
+
+
+def summarize(samples: List[Tuple[str, float, bool]], seconds: float) -> Dict[str, Any]:
+    """统计请求数、吞吐量、错误率和延迟分位数（毫秒）"""
+    latencies = sorted(latency for _, latency, _ in samples)
+    errors = sum(1 for _, _, ok in samples if not ok)
+    count = len(samples)
+    return {
+        'requests': count,
+        'errors': errors,
+        'error_rate': round(errors / count, 4) if count else 0.0,
+        'throughput_rps': round(count / seconds, 2) if seconds > 0 else 0.0,
+        'latency_ms': {
+            'mean': round(sum(latencies) / count * 1000, 2) if count else 0.0,
+            'p50': round(percentile(latencies, 50) * 1000, 2),
+            'p90': round(percentile(latencies, 90) * 1000, 2),
+            'p99': round(percentile(latencies, 99) * 1000, 2),
+            'max': round(latencies[-1] * 1000, 2) if latencies else 0.0
+        }
+    }
+
+
+def run_load(workers: int, args, mix_weights: Dict[str, float]) -> Dict[str, Any]:
+    """在新目录中以指定工作进程数启动服务并施压"""
+    records = parse_scale(args.scale)
+    root = Path(tempfile.mkdtemp(prefix=f'load_test_w{workers}_'))
+    try:
+        prepare_workspace(root, records, args.markets, args.seed,
+                          {'ai.offline_latency_ms': args.ai_latency_ms})
+        mix = RequestMix(mix_weights, market_names(args.markets), days_for(records, args.markets) - 1)
+
+        server = Server(args.server_cmd, root, workers)
+        try:
+            start = time.perf_counter()
+            measure_from = start + args.warmup
+            stop_at = measure_from + args.duration
+            users = [VirtualUser(server.port, mix, args.seed * 1000 + i, measure_from, stop_at, args.timeout)
+                     for i in range(args.concurrency)]
+            for user in users:
+                user.start()
+            for user in users:
+                user.join()
+        finally:
+            server.stop()
+
+        samples = [sample for user in users for sample in user.samples]
+        errors: Dict[str, int] = {}
+        for user in users:
+            for key, count in user.errors.items():
+                errors[key] = errors.get(key, 0) + count
+
+        result = {'workers': workers, **summarize(samples, args.duration), 'error_types': errors, 'by_type': {}}
+        for kind in mix.kinds:
+            result['by_type'][kind] = summarize([s for s in samples if s[0] == kind], args.duration)
+        return result
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+def print_report(report: Dict[str, Any]):
+    settings = report['settings']
+    print(f"压测: 并发 {settings['concurrency']}, 持续 {settings['duration']}s（预热 {settings['warmup']}s）, "
+          f"请求比例 {settings['mix']}, 数据 {settings['records']}条 x {settings['markets']}个市场")
+    header = f"{'进程数':<8}{'类型':<8}{'请求数':>8}{'吞吐(rps)':>11}{'错误率':>9}" \
+             f"{'p50(ms)':>10}{'p90(ms)':>10}{'p99(ms)':>10}{'max(ms)':>10}"
+    print(header)
+    for result in report['results']:
+        rows = [('all', result)] + list(result['by_type'].items())
+        for kind, stats in rows:
+            latency = stats['latency_ms']
+            print(f"{result['workers']:<8}{kind:<8}{stats['requests']:>8}{stats['throughput_rps']:>11}"
+                  f"{stats['error_rate']:>9.2%}{latency['p50']:>10}{latency['p90']:>10}"
+                  f"{latency['p99']:>10}{latency['max']:>10}")
+        if result['error_types']:
+            print(f"{'':<8}错误: {result['error_types']}")
+
+
+def serve(root: str, port: int, workers: int):
+    """内置服务模式：以root为工作目录启动应用"""
+    os.chdir(root)
+    from werkzeug.serving import run_simple
+    from app import create_app
+    app = create_app()
+    run_simple(HOST, port, app, threaded=False, processes=max(workers, 1))
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description='闭环压测')
+    parser.add_argument('--workers', default='1,2,4', help='服务工作进程数列表，逗号分隔')
+    parser.add_argument('--concurrency', type=int, default=8, help='虚拟用户数')
+    parser.add_argument('--duration', type=float, default=20, help='统计时长（秒）')
+    parser.add_argument('--warmup', type=float, default=3, help='预热时长（秒），不计入统计')
+    parser.add_argument('--mix', default=DEFAULT_MIX, help='请求比例，类型为read/ingest/ai')
+    parser.add_argument('--scale', default='1k', help='每个集合的初始记录数: 1k, 100k, 1m 或整数')
+    parser.add_argument('--markets', type=int, default=10, help='市场数量')
+    parser.add_argument('--ai-latency-ms', type=float, default=0, help='离线AI客户端模拟的调用延迟（毫秒）')
+    parser.add_argument('--timeout', type=float, default=30, help='单个请求超时（秒）')
+    parser.add_argument('--seed', type=int, default=42, help='随机种子')
+    parser.add_argument('--server-cmd', default=None,
+                        help='服务启动命令，可用占位符 {python} {root} {host} {port} {workers}；'
+                             '默认使用生产入口，未安装gunicorn/waitress时使用内置服务器')
+    parser.add_argument('--output', help='将报告保存为JSON文件')
+    parser.add_argument('--json', action='store_true', help='以JSON格式输出结果')
+    parser.add_argument('--serve', nargs=3, metavar=('ROOT', 'PORT', 'WORKERS'), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve:
+        serve(args.serve[0], int(args.serve[1]), int(args.serve[2]))
+        return 0
+
+    args.server_cmd = args.server_cmd or default_server_cmd()
+    mix_weights = parse_mix(args.mix)
+    worker_counts = [int(w) for w in args.workers.split(',') if w.strip()]
+    report = {
+        'created_at': datetime.now().isoformat(timespec='seconds'),
+        'machine': f"{os.uname().sysname} ({os.cpu_count()} CPU)",
+        'settings': {
+            'concurrency': args.concurrency, 'duration': args.duration, 'warmup': args.warmup,
+            'mix': mix_weights, 'records': parse_scale(args.scale), 'markets': args.markets,
+            'ai_latency_ms': args.ai_latency_ms, 'server_cmd': args.server_cmd
+        },
+        'results': [run_load(workers, args, mix_weights) for workers in worker_counts]
+    }
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+
+    if args.json:
+        print(json.dumps(report, ensure_ascii=False))
+    else:
+        print_report(report)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
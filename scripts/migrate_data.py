@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+数据迁移脚本
+
+将application_data.json流式迁移到列式存储，支持中断后续传，
+完成后核对记录数和校验和并报告迁移速度
+
+使用: python scripts/migrate_data.py --source data/application_data.json --target data/columnar
+     python scripts/migrate_data.py --resume
+"""
+
+import argparse
+import json
+import logging
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from app.utils.config import config_manager  # noqa: E402
+from app.services.migration_service import MigrationService  # noqa: E402
+
+
+def print_report(report: dict):
+    """打印迁移报告"""
+    print(f"源文件: {report['source']}")
+    print(f"目标目录: {report['target']}")
+    print(f"{'集合':<20}{'源记录':>10}{'已迁移':>10}{'无效':>8}{'目标记录':>10}{'记录/秒':>12}{'校验':>8}")
+    for name, item in report['collections'].items():
+        print(f"{name:<20}{item['source_count']:>10}{item['migrated']:>10}{item['invalid']:>8}"
+              f"{item['target_count']:>10}{item['records_per_second']:>12}{'OK' if item['verified'] else 'FAIL':>8}")
+    print(f"总耗时: {report['seconds']}s, 平均 {report['records_per_second']} 条/秒")
+    print("迁移完成，校验通过" if report['verified'] else "校验失败，已保留检查点")
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description='application_data.json到列式存储的流式迁移')
+    parser.add_argument('--source', help='源JSON数据文件，默认使用database.file_path')
+    parser.add_argument('--target', help='目标列式存储目录，默认使用database.columnar_path')
+    parser.add_argument('--batch-size', type=int, help='每批写入的记录数，默认使用migration.batch_size')
+    parser.add_argument('--checkpoint', help='检查点文件，默认位于目标目录下')
+    parser.add_argument('--resume', action='store_true', help='从上次中断的检查点继续')
+    parser.add_argument('--json', action='store_true', help='以JSON格式输出结果')
+    args = parser.parse_args()
+
+    config_manager.load_config()
+    logging.basicConfig(level=logging.WARNING)
+
+    def progress(collection: str, offset: int):
+        if not args.json:
+            print(f"  {collection}: 已处理 {offset} 条", flush=True)
+
+    try:
+        report = MigrationService(args.source, args.target, args.batch_size, args.checkpoint).run(
+            resume=args.resume, progress=progress
+        )
+    except (FileNotFoundError, ValueError) as e:
+        print(f"迁移失败: {e}", file=sys.stderr)
+        return 2
+
+    if args.json:
+        print(json.dumps(report, ensure_ascii=False))
+    else:
+        print_report(report)
+    return 0 if report['verified'] else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
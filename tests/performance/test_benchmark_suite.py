@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+基准测试套件冒烟测试
+"""
+
+import unittest
+import json
+import shutil
+import subprocess
+import tempfile
+
+import sys
+import os
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+SCRIPT = os.path.join(PROJECT_ROOT, 'scripts', 'benchmark.py')
+
+
+class TestBenchmarkSuite(unittest.TestCase):
+    """小规模运行全部基准测试，并保存、对比基线"""
+
+    def setUp(self):
+        """测试前准备"""
+        self.temp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        """测试后清理"""
+        shutil.rmtree(self.temp_dir)
+
+    def _run(self, *args):
+        return subprocess.run(
+            [sys.executable, SCRIPT, '--scale', '300', '--markets', '3', '--rounds', '3', '--warmup', '1',
+             '--baseline-dir', self.temp_dir, '--json', *args],
+            capture_output=True, text=True, cwd=self.temp_dir
+        )
+
+    def test_save_and_compare_baseline(self):
+        """测试保存基线后再次运行可按中位数对比"""
+        saved = self._run('--save', 'smoke')
+        self.assertEqual(saved.returncode, 0, saved.stderr)
+        report = json.loads(saved.stdout.strip().splitlines()[-1])['report']
+        self.assertTrue(os.path.exists(os.path.join(self.temp_dir, 'smoke.json')))
+        for name in ('ingest.macro', 'query.macro_range', 'scoring.timing_indicators',
+                     'endpoint.timing_score_trend', 'endpoint.dashboard_summary', 'ai.cache_hit', 'ai.cache_miss'):
+            self.assertEqual(report['benchmarks'][name]['rounds'], 3)
+
+        # 阈值设为极大值，只验证对比流程而不受机器负载波动影响
+        compared = self._run('--compare', 'smoke', '--threshold', '1000', '--filter', 'query')
+        self.assertEqual(compared.returncode, 0, compared.stderr)
+        rows = json.loads(compared.stdout.strip().splitlines()[-1])['comparison']
+        self.assertEqual({row['name'] for row in rows}, {'query.macro_range', 'query.timing_range'})
+        self.assertTrue(all(row['change'] is not None for row in rows))
+
+        print("基准测试（300条 x 3个市场）:")
+        for name, stats in report['benchmarks'].items():
+            print(f"  {name}: 中位数 {stats['median'] * 1000:.2f}ms")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+启动导入耗时测试
+"""
+
+import unittest
+import json
+import subprocess
+
+import sys
+import os
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+SCRIPT = os.path.join(PROJECT_ROOT, 'scripts', 'import_profile.py')
+sys.path.insert(0, os.path.join(PROJECT_ROOT, 'scripts'))
+
+from import_profile import parse_importtime, summarize  # noqa: E402
+
+
+class TestImportProfile(unittest.TestCase):
+    """导入耗时报告和延迟导入测试类"""
+
+    def _loaded_modules(self, code):
+        result = subprocess.run(
+            [sys.executable, '-c', f"import sys; {code}; print(','.join(sys.modules))"],
+            capture_output=True, text=True, cwd=PROJECT_ROOT, timeout=60
+        )
+        self.assertEqual(result.returncode, 0, result.stderr)
+        return set(result.stdout.strip().split(','))
+
+    def test_routes_do_not_import_ai_client(self):
+        """测试导入应用和全部蓝图时不加载openai"""
+        modules = self._loaded_modules(
+            "import app, app.services, app.routes.data_input, app.routes.analysis, app.routes.visualization"
+        )
+        self.assertIn('app.services.ai_service', modules)
+        self.assertNotIn('openai', modules)
+
+    def test_config_does_not_import_numpy(self):
+        """测试只读取配置时不加载numpy"""
+        modules = self._loaded_modules("from app.utils import config_manager")
+        self.assertNotIn('numpy', modules)
+
+    def test_parse_and_summarize(self):
+        """测试解析 -X importtime 输出并按顶层包汇总"""
+        output = (
+            "import time: self [us] | cumulative | imported package\n"
+            "import time:       100 |        100 |   pkg.sub\n"
+            "import time:       300 |        400 | pkg\n"
+            "import time:        50 |         50 | other\n"
+        )
+        entries = parse_importtime(output)
+        self.assertEqual([e['module'] for e in entries], ['pkg.sub', 'pkg', 'other'])
+        self.assertEqual([e['depth'] for e in entries], [1, 0, 0])
+
+        summary = summarize(entries, top=2)
+        self.assertEqual(summary['total_ms'], 0.5)
+        self.assertEqual(summary['slowest'][0]['module'], 'pkg')
+        self.assertEqual(summary['packages'], [{'package': 'pkg', 'ms': 0.4}, {'package': 'other', 'ms': 0.1}])
+
+    def test_report_json(self):
+        """测试报告命令输出JSON"""
+        result = subprocess.run([sys.executable, SCRIPT, '--json', '--top', '5'],
+                                capture_output=True, text=True, timeout=60)
+        self.assertEqual(result.returncode, 0, result.stderr)
+        summary = json.loads(result.stdout)
+        self.assertGreater(summary['modules'], 0)
+        self.assertEqual(len(summary['slowest']), 5)
+        self.assertIn('app', [row['module'] for row in summary['slowest']])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+闭环压测工具冒烟测试
+"""
+
+import unittest
+import json
+import subprocess
+import tempfile
+
+import sys
+import os
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+SCRIPT = os.path.join(PROJECT_ROOT, 'scripts', 'load_test.py')
+
+
+class TestLoadTest(unittest.TestCase):
+    """启动本地服务进行短时压测"""
+
+    def test_short_run_reports_percentiles(self):
+        """测试各请求类型均有统计，离线AI客户端下无错误"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            output = os.path.join(temp_dir, 'report.json')
+            result = subprocess.run(
+                [sys.executable, SCRIPT, '--workers', '1', '--concurrency', '2', '--duration', '2',
+                 '--warmup', '0.5', '--scale', '200', '--markets', '2', '--mix', 'read=50,ingest=30,ai=20',
+                 '--output', output, '--json'],
+                capture_output=True, text=True, cwd=temp_dir, timeout=120
+            )
+            self.assertEqual(result.returncode, 0, result.stderr)
+            report = json.loads(result.stdout.strip().splitlines()[-1])
+            with open(output, 'r', encoding='utf-8') as f:
+                self.assertEqual(json.load(f), report)
+
+        run = report['results'][0]
+        self.assertEqual(run['workers'], 1)
+        self.assertGreater(run['requests'], 0)
+        self.assertEqual(run['errors'], 0, run['error_types'])
+        self.assertEqual(set(run['by_type']), {'read', 'ingest', 'ai'})
+        latency = run['latency_ms']
+        self.assertLessEqual(latency['p50'], latency['p99'])
+        self.assertLessEqual(latency['p99'], latency['max'])
+
+        print(f"压测（1个进程，并发2）: {run['throughput_rps']} rps, "
+              f"p50 {latency['p50']}ms, p99 {latency['p99']}ms")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,39 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+分段读取内存基准测试
+"""
+
+import unittest
+import json
+import subprocess
+
+import sys
+import os
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+class TestMemoryBenchmark(unittest.TestCase):
+    """JSON加载与分段读取的峰值RSS对比"""
+
+    def test_segment_read_uses_less_memory(self):
+        """测试单市场查询时分段读取的峰值内存低于JSON全量加载"""
+        output = subprocess.run(
+            [sys.executable, os.path.join(PROJECT_ROOT, 'scripts', 'benchmark_memory.py'),
+             '--markets', '10', '--days', '500', '--json'],
+            check=True, capture_output=True, text=True
+        ).stdout
+        report = json.loads(output.strip().splitlines()[-1])
+        results = {result['mode']: result for result in report['results']}
+
+        self.assertEqual(results['json']['rows'], results['segment']['rows'])
+        self.assertLess(results['segment']['peak_rss_mb'], results['json']['peak_rss_mb'])
+
+        print(f"内存基准测试:")
+        for mode, result in results.items():
+            print(f"  {mode}: 峰值RSS {result['peak_rss_mb']}MB, 耗时 {result['seconds']}s")
+
+
+if __name__ == '__main__':
+    unittest.main()
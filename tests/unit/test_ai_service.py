@@ -203,6 +203,54 @@ class TestAIService(unittest.TestCase):
         cache_exists = self.ai_service._check_cache(cache_key)
         self.assertFalse(cache_exists)
 
+    def test_offline_provider(self):
+        """测试离线提供商返回固定文本并走完整解析路径"""
+        from app.services.ai_service import OfflineAIClient
+        ai_config = {'provider': 'offline', 'offline_latency_ms': 0}
+        with patch('app.services.ai_service.config_manager.get_ai_config', return_value=ai_config):
+            client = self.ai_service._init_openai_client()
+        self.assertIsInstance(client, OfflineAIClient)
+
+        self.ai_service.client = client
+        result = self.ai_service._call_ai_analysis({
+            "market": "a_share", "date": "2024-01-15", "timing_indicators": {},
+            "macro_data": {}, "market_sentiment": {}, "industry_data": {}, "weights": {}
+        })
+        self.assertEqual(result["ai_analysis"], OfflineAIClient.RESPONSE)
+
+    def test_async_analysis_concurrency(self):
+        """测试异步分析：大量进行中的AI请求并发等待，而不是逐个串行"""
+        import asyncio
+        import time
+        from app.services import ai_service as module
+
+        ai_config = {'provider': 'offline', 'offline_latency_ms': 200}
+        self.ai_service.data_service = MagicMock()
+        self.ai_service._prepare_analysis_data = lambda data: {
+            "market": data["market"], "date": data["date"], "timing_indicators": {},
+            "macro_data": {}, "market_sentiment": {}, "industry_data": {}, "weights": {}
+        }
+        requests = [{"market": "a_share", "date": f"2024-01-{i % 28 + 1:02d}", "seq": i} for i in range(100)]
+
+        async def run():
+            return await asyncio.gather(*(
+                self.ai_service.analyze_timing_indicators_async(data) for data in requests
+            ))
+
+        module._async_clients.clear()
+        with patch('app.services.ai_service.config_manager.get_ai_config', return_value=ai_config):
+            start = time.perf_counter()
+            results = asyncio.run(run())
+            elapsed = time.perf_counter() - start
+        module._async_clients.clear()
+
+        # 串行需要20秒
+        self.assertLess(elapsed, 5)
+        self.assertEqual(len(results), 100)
+        for result in results:
+            self.assertEqual(result["ai_analysis"], module.OfflineAIClient.RESPONSE)
+        self.assertEqual(self.ai_service.data_service.save_ai_analysis.call_count, 100)
+
     def test_get_ai_analysis_history(self):
         """测试获取AI分析历史"""
         history = self.ai_service.get_ai_analysis_history("a_share")
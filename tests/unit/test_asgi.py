@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+ASGI服务入口单元测试
+"""
+
+import asyncio
+import importlib.util
+import unittest
+from unittest.mock import patch
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+
+ASGI_AVAILABLE = all(importlib.util.find_spec(name) for name in ('starlette', 'a2wsgi', 'httpx'))
+
+
+@unittest.skipUnless(ASGI_AVAILABLE, "需要安装starlette、a2wsgi和httpx")
+class TestASGIApp(unittest.TestCase):
+    """ASGI应用单元测试类"""
+
+    def setUp(self):
+        """测试前准备"""
+        from app import create_app
+        from app.asgi import create_asgi_app
+        with patch('app.init_config', return_value=True):
+            self.flask_app = create_app()
+        self.asgi_app = create_asgi_app(self.flask_app, bridge_threads=4)
+
+    def _request(self, method, path, **kwargs):
+        import httpx
+
+        async def send():
+            transport = httpx.ASGITransport(app=self.asgi_app)
+            async with httpx.AsyncClient(transport=transport, base_url='http://test') as client:
+                return await client.request(method, path, **kwargs)
+        return asyncio.run(send())
+
+    def test_bridged_routes_match_wsgi(self):
+        """测试桥接的同步路由与Flask应用返回相同结果"""
+        response = self._request('GET', '/api/docs')
+        expected = self.flask_app.test_client().get('/api/docs')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), expected.get_json())
+
+    def test_ai_analysis_validation(self):
+        """测试异步AI分析路由的字段校验与同步模式一致"""
+        response = self._request('POST', '/api/analysis/ai-analysis', json={'market': 'a_share'})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()['error'], '缺少必需字段: date')
+
+    def test_ai_analysis_async(self):
+        """测试异步AI分析路由调用异步服务方法"""
+        result = {'ai_analysis': '分析', 'market': 'a_share', 'date': '2024-01-15'}
+
+        async def analyze(data):
+            return result
+
+        with patch('app.services.ai_service.AIService.__init__', return_value=None), \
+                patch('app.services.ai_service.AIService.analyze_timing_indicators_async',
+                      side_effect=analyze, create=True):
+            response = self._request('POST', '/api/analysis/ai-analysis',
+                                     json={'market': 'a_share', 'date': '2024-01-15'})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {'message': 'AI分析成功', 'data': result})
+
+    def test_stream_subscriber_limit(self):
+        """测试异步SSE路由的订阅数上限"""
+        from app.services.event_broker import EventBroker
+        with patch('app.routes.stream.configured_broker', return_value=EventBroker(max_subscribers=0)):
+            response = self._request('GET', '/api/stream/events?markets=a_share')
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response.json()['error'], '订阅数已达上限')
+
+
+if __name__ == '__main__':
+    unittest.main()
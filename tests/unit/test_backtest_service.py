@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+回测服务单元测试
+"""
+
+import time
+import unittest
+from datetime import date, timedelta
+from unittest.mock import patch
+
+import numpy as np
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+
+from app.services.backtest_service import BacktestService, compute_metrics, position_fractions
+
+THRESHOLDS = {'very_strong': 80, 'strong': 60, 'neutral': 40, 'weak': 20, 'very_weak': 0}
+POSITION_SIZES = {'very_strong': 80, 'strong': 60, 'neutral': 30, 'weak': 10, 'very_weak': 0}
+CONFIG = {
+    'position_sizing.scoring_thresholds': THRESHOLDS,
+    'position_sizing.position_sizes': POSITION_SIZES
+}
+
+
+def fake_config_get(key, default=None):
+    return CONFIG.get(key, default)
+
+
+class TestBacktestService(unittest.TestCase):
+    """回测服务单元测试类"""
+
+    def setUp(self):
+        """测试前准备"""
+        self.backtest_service = BacktestService()
+
+    def test_position_fractions(self):
+        """测试评分到仓位比例的映射"""
+        scores = np.array([95, 80, 79.9, 60, 45, 20, 5])
+        fractions = position_fractions(scores, THRESHOLDS, POSITION_SIZES)
+        np.testing.assert_allclose(fractions, [0.8, 0.8, 0.6, 0.6, 0.3, 0.1, 0.0])
+
+    def test_compute_metrics(self):
+        """测试绩效指标计算"""
+        returns = np.array([0.10, -0.10, 0.05])
+        weights = np.array([1.0, 0.5, 0.0])
+        metrics = compute_metrics(returns, weights, cost_bps=0)
+
+        self.assertAlmostEqual(metrics['total_return'], 1.1 * 0.95 - 1, places=6)
+        self.assertAlmostEqual(metrics['max_drawdown'], -0.05, places=6)
+        self.assertAlmostEqual(metrics['turnover'], 2.0)
+        self.assertAlmostEqual(metrics['hit_rate'], 0.5)
+        self.assertAlmostEqual(metrics['benchmark_total_return'], 1.1 * 0.9 * 1.05 - 1, places=6)
+
+    @patch('app.services.backtest_service.config_manager.get', side_effect=fake_config_get)
+    def test_run_backtest_no_look_ahead(self, _):
+        """测试当日收益只使用前一日及更早的信号"""
+        signal = {
+            'date': np.array(['2024-01-01', '2024-01-02', '2024-01-03']),
+            'overall_score': np.array([90.0, 10.0, 90.0])
+        }
+        series = {'dates': ['2024-01-01', '2024-01-02', '2024-01-03', '2024-01-04'],
+                  'returns': [0.5, 0.1, 0.2, 0.3]}
+
+        with patch.object(self.backtest_service.data_service, 'get_columns', return_value=signal):
+            result = self.backtest_service.run_backtest({
+                'markets': ['a_share'],
+                'series': {'a_share': series},
+                'include_curve': True
+            })
+
+        metrics = result['markets']['a_share']
+        # 权重依次为 0（无前序信号）、0.8、0、0.8
+        expected = (1 + 0.8 * 0.1) * (1 + 0.8 * 0.3) - 1
+        self.assertAlmostEqual(metrics['total_return'], expected, places=6)
+        self.assertEqual(metrics['periods'], 4)
+        self.assertEqual(len(metrics['equity_curve']), 4)
+
+    @patch('app.services.backtest_service.config_manager.get', side_effect=fake_config_get)
+    def test_equity_curve_includes_cost(self, _):
+        """测试净值曲线扣除换手成本，终值与total_return一致"""
+        signal = {'date': np.array(['2024-01-01', '2024-01-02']), 'overall_score': np.array([90.0, 10.0])}
+        series = {'dates': ['2024-01-01', '2024-01-02', '2024-01-03'], 'returns': [0.0, 0.1, 0.2]}
+
+        with patch.object(self.backtest_service.data_service, 'get_columns', return_value=signal):
+            result = self.backtest_service.run_backtest({
+                'markets': ['a_share'],
+                'series': {'a_share': series},
+                'cost_bps': 50,
+                'include_curve': True
+            })
+
+        metrics = result['markets']['a_share']
+        # 权重依次为 0、0.8、0，两次换手各0.8
+        expected = [1.0, 1 + 0.08 - 0.8 * 0.005, (1 + 0.08 - 0.8 * 0.005) * (1 - 0.8 * 0.005)]
+        self.assertEqual([point['equity'] for point in metrics['equity_curve']], [round(v, 6) for v in expected])
+        self.assertAlmostEqual(metrics['equity_curve'][-1]['equity'] - 1, metrics['total_return'], places=6)
+
+    def test_run_backtest_missing_price_file(self):
+        """测试缺少价格数据时报错"""
+        with patch('app.services.backtest_service.config_manager.get',
+                   side_effect=lambda key, default=None: '/nonexistent' if key == 'backtest.price_dir' else default):
+            with self.assertRaises(ValueError):
+                self.backtest_service.run_backtest({'markets': ['a_share']})
+
+    def test_series_length_mismatch(self):
+        """测试dates与returns/prices长度不一致时报错，接口返回400"""
+        for series in ({'dates': ['2024-01-01', '2024-01-02', '2024-01-03'], 'returns': [0.1]},
+                       {'dates': ['2024-01-01'], 'returns': [0.1, 0.2]},
+                       {'dates': ['2024-01-01', '2024-01-02'], 'prices': [1.0, 1.1, 1.2]}):
+            with self.assertRaises(ValueError):
+                self.backtest_service.load_return_series('a_share', series, None, None)
+
+        from app import create_app
+        with patch('app.init_config', return_value=True):
+            client = create_app().test_client()
+        response = client.post('/api/analysis/backtest', json={
+            'markets': ['a_share'],
+            'series': {'a_share': {'dates': ['2024-01-01', '2024-01-02', '2024-01-03'], 'returns': [0.1]}}
+        })
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('长度不一致', response.get_json()['message'])
+
+    @patch('app.services.backtest_service.config_manager.get', side_effect=fake_config_get)
+    def test_backtest_performance(self, _):
+        """测试十年日频、多市场回测耗时"""
+        rng = np.random.default_rng(0)
+        start = date(2015, 1, 1)
+        dates = [(start + timedelta(days=i)).isoformat() for i in range(2520)]
+        markets = [f'market_{i}' for i in range(10)]
+
+        signals = {
+            market: {'date': np.array(dates), 'overall_score': rng.uniform(0, 100, len(dates))}
+            for market in markets
+        }
+        series = {
+            market: {'dates': dates, 'prices': list(100 * np.cumprod(1 + rng.normal(0, 0.01, len(dates))))}
+            for market in markets
+        }
+
+        with patch.object(self.backtest_service.data_service, 'get_columns',
+                          side_effect=lambda collection, market, *args: signals[market]):
+            started = time.perf_counter()
+            result = self.backtest_service.run_backtest({'markets': markets, 'series': series})
+            elapsed = time.perf_counter() - started
+
+        self.assertEqual(len(result['markets']), 10)
+        self.assertEqual(result['markets']['market_0']['periods'], 2519)
+        self.assertLess(elapsed, 1.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
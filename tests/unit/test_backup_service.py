@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+数据备份服务单元测试
+"""
+
+import json
+import shutil
+import tempfile
+import time
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+
+from app.services.backup_service import BackupService, BackupScheduler
+
+
+class TestBackupService(unittest.TestCase):
+    """数据备份服务单元测试类"""
+
+    def setUp(self):
+        """测试前准备"""
+        self.temp_dir = Path(tempfile.mkdtemp())
+        self.data_file = self.temp_dir / 'application_data.json'
+        self.backup_dir = self.temp_dir / 'backups'
+        self.settings = {
+            'database.backup_compression': 'gzip',
+            'database.backup_full_every': 3,
+            'database.backup_retention': 2,
+            'database.blob_path': str(self.temp_dir / 'blobs')
+        }
+        patcher = patch('app.services.backup_service.config_manager.get',
+                        side_effect=lambda key, default=None: self.settings.get(key, default))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.data = {
+            'macro_data': [
+                {'id': f"macro_{i // 2}", 'date': f"2024-01-{i + 1:02d}", 'market': 'a_share', 'pmi': 50.0 + i}
+                for i in range(20)
+            ],
+            'market_sentiment': [{'date': '2024-01-01', 'market': 'nasdaq', 'volatility': 12.5}],
+            'ai_analysis': [],
+            'metadata': {'created_at': '2024-01-01', 'last_updated': '2024-01-01'}
+        }
+        self._write()
+
+    def tearDown(self):
+        """测试后清理"""
+        shutil.rmtree(self.temp_dir)
+
+    def _write(self):
+        with open(self.data_file, 'w', encoding='utf-8') as f:
+            json.dump(self.data, f, indent=2, ensure_ascii=False)
+
+    def _service(self):
+        return BackupService(self.data_file, str(self.backup_dir))
+
+    def test_incremental_backup_and_restore(self):
+        """测试增量备份只保存变更，且每个时间点都能按全量 + 增量恢复"""
+        service = self._service()
+        snapshots = []
+
+        full = service.backup()
+        self.assertEqual(full['type'], 'full')
+        snapshots.append((full['file'], json.loads(json.dumps(self.data))))
+        self.assertEqual(service.backup()['type'], 'unchanged')
+
+        # 追加、修改重复ID中的第二条、删除、修改元数据
+        self.data['macro_data'].append({'id': 'macro_new', 'date': '2024-02-01', 'market': 'a_share', 'pmi': 49.0})
+        self.data['macro_data'][3]['pmi'] = 99.0
+        del self.data['macro_data'][0]
+        self.data['metadata']['last_updated'] = '2024-02-01'
+        self._write()
+        delta = service.backup()
+        self.assertEqual(delta['type'], 'delta')
+        # 新增1 + 修改1 + 元数据1，删除重复ID的第一条使第二条的记录键前移（修改1 + 删除1）
+        self.assertEqual(delta['changed'], 5)
+        self.assertLess(delta['size_bytes'], full['size_bytes'])
+        snapshots.append((delta['file'], json.loads(json.dumps(self.data))))
+
+        # 集合内顺序变化和新增顶层集合
+        self.data['market_sentiment'].insert(0, {'date': '2023-12-31', 'market': 'nasdaq', 'volatility': 10.0})
+        self.data['industry_data'] = [{'id': 'industry_1', 'date': '2024-02-02', 'market': 'a_share'}]
+        self._write()
+        snapshots.append((service.backup()['file'], json.loads(json.dumps(self.data))))
+
+        for name, expected in snapshots:
+            target = self.temp_dir / f"restored_{name}.json"
+            result = service.restore(target, upto=name)
+            with open(target, 'r', encoding='utf-8') as f:
+                self.assertEqual(json.load(f), expected)
+            self.assertEqual(result['files'][-1], name)
+
+    def test_retention_prunes_old_chains(self):
+        """测试超过保留数的备份链及其文件被删除"""
+        self.settings['database.backup_full_every'] = 1
+        service = self._service()
+        for i in range(7):
+            self.data['metadata']['last_updated'] = f"2024-03-{i + 1:02d}"
+            self._write()
+            service.backup()
+
+        chains = service.list_backups()
+        self.assertEqual(len(chains), 2)
+        expected = {'manifest.json'}
+        for chain in chains:
+            expected.update([chain['full']] + chain['deltas'])
+        files = {path.name for path in self.backup_dir.iterdir() if not path.name.startswith('index_')}
+        self.assertEqual(files, expected)
+        self.assertEqual(len(list(self.backup_dir.glob('index_*'))), 1)
+
+    def test_blobs_copied_incrementally(self):
+        """测试文本块随备份增量复制，恢复时补回缺失的文本块"""
+        from app.services.blob_store import BlobStore
+        blobs = BlobStore(self.settings['database.blob_path'], 'gzip')
+        ref = blobs.put("AI分析全文")
+
+        service = self._service()
+        self.assertEqual(service.backup()['blobs'], 1)
+        self.assertEqual(service.backup()['blobs'], 0)
+
+        shutil.rmtree(self.settings['database.blob_path'])
+        service.restore(self.temp_dir / 'restored.json')
+        self.assertEqual(blobs.get(ref), "AI分析全文")
+
+    def test_concurrent_backup_rejected(self):
+        """测试其他进程持有备份锁时拒绝备份"""
+        self.backup_dir.mkdir()
+        (self.backup_dir / '.backup.lock').write_text('1')
+        with self.assertRaises(RuntimeError):
+            self._service().backup()
+
+    def test_scheduler_runs_backup(self):
+        """测试定时备份线程按间隔执行"""
+        service = self._service()
+        scheduler = BackupScheduler(service, interval_hours=24)
+        self.assertEqual(scheduler.next_delay(), 0.0)
+
+        scheduler.start()
+        deadline = time.time() + 10
+        while not service.list_backups() and time.time() < deadline:
+            time.sleep(0.05)
+        scheduler.stop(timeout=5)
+
+        self.assertEqual(len(service.list_backups()), 1)
+        self.assertGreater(scheduler.next_delay(), 23 * 3600)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+文本块存储单元测试
+"""
+
+import json
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+
+from app.services.blob_store import BlobStore
+from app.services.data_service import DataService
+
+
+class TestBlobStore(unittest.TestCase):
+    """文本块存储单元测试类"""
+
+    def setUp(self):
+        """测试前准备"""
+        self.temp_dir = Path(tempfile.mkdtemp())
+        self.store = BlobStore(str(self.temp_dir / 'blobs'), 'gzip')
+        self.text = "综合评估：当前择时信号强劲，宏观基本面改善。" * 200
+
+    def tearDown(self):
+        """测试后清理"""
+        shutil.rmtree(self.temp_dir)
+
+    def test_put_and_get(self):
+        """测试按内容寻址保存、去重和压缩"""
+        ref = self.store.put(self.text)
+        self.assertEqual(self.store.put(self.text), ref)
+        self.assertEqual(self.store.get(ref), self.text)
+
+        files = list(self.store.iter_files())
+        self.assertEqual(len(files), 1)
+        self.assertLess(files[0].stat().st_size, len(self.text.encode('utf-8')) / 10)
+
+    def test_invalid_or_corrupted_blob(self):
+        """测试无效引用和内容被篡改的文本块"""
+        with self.assertRaises(ValueError):
+            self.store.get('sha256:../../etc/passwd')
+
+        ref = self.store.put(self.text)
+        path = next(self.store.iter_files())
+        BlobStore(str(self.temp_dir / 'other'), 'gzip').put("其他内容")
+        shutil.copy(next(BlobStore(str(self.temp_dir / 'other')).iter_files()), path)
+        with self.assertRaises(ValueError):
+            self.store.get(ref)
+
+    def test_data_service_keeps_reference_only(self):
+        """测试AI分析全文移出数据文件，列表视图不读取文本块"""
+        settings = {
+            'database.file_path': str(self.temp_dir / 'application_data.json'),
+            'database.blob_path': str(self.temp_dir / 'blobs'),
+            'database.blob_compression': 'gzip'
+        }
+        with patch('app.services.data_service.config_manager.get',
+                   side_effect=lambda key, default=None: settings.get(key, default)):
+            data_service = DataService()
+            saved = data_service.save_ai_analysis({
+                'market': 'a_share', 'date': '2024-01-15', 'ai_analysis': self.text, 'recommendation': '建议买入'
+            })
+            self.assertEqual(saved['ai_analysis'], self.text)
+
+            with open(data_service.data_file, 'r', encoding='utf-8') as f:
+                record = json.load(f)['ai_analysis'][0]
+            self.assertNotIn('ai_analysis', record)
+            self.assertEqual(record['ai_analysis_ref'], saved['ai_analysis_ref'])
+            self.assertEqual(record['ai_analysis_length'], len(self.text))
+
+            with patch.object(BlobStore, 'get', side_effect=AssertionError("列表视图不应读取文本块")):
+                summaries = data_service.get_ai_analysis('a_share')
+            self.assertEqual(len(summaries), 1)
+            self.assertTrue(summaries[0]['summary'].endswith('...'))
+            self.assertNotIn('ai_analysis', summaries[0])
+
+            full = data_service.get_ai_analysis('a_share', include_text=True)
+            self.assertEqual(full[0]['ai_analysis'], self.text)
+
+    def test_externalize_legacy_records(self):
+        """测试旧记录中内联的全文迁移到文本块存储"""
+        settings = {
+            'database.file_path': str(self.temp_dir / 'application_data.json'),
+            'database.blob_path': str(self.temp_dir / 'blobs'),
+            'database.blob_compression': 'gzip'
+        }
+        with patch('app.services.data_service.config_manager.get',
+                   side_effect=lambda key, default=None: settings.get(key, default)):
+            data_service = DataService()
+            data = data_service._load_data()
+            data['ai_analysis'] = [
+                {'id': 'ai_1', 'market': 'a_share', 'date': '2024-01-01', 'ai_analysis': self.text},
+                {'id': 'ai_2', 'market': 'a_share', 'date': '2024-01-02', 'ai_analysis': self.text}
+            ]
+            data_service._save_data(data)
+
+            self.assertEqual(data_service.externalize_ai_texts(), 2)
+            self.assertEqual(data_service.externalize_ai_texts(), 0)
+            self.assertEqual(len(list(data_service.blobs.iter_files())), 1)
+
+            history = data_service.get_ai_analysis('a_share', include_text=True)
+            self.assertEqual([item['ai_analysis'] for item in history], [self.text, self.text])
+
+
+if __name__ == '__main__':
+    unittest.main()
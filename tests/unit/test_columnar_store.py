@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+列式存储单元测试
+"""
+
+import unittest
+import tempfile
+import shutil
+
+import numpy as np
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+
+from app.services.columnar_store import ColumnarStore, records_to_columns
+
+
+class TestColumnarStore(unittest.TestCase):
+    """列式存储单元测试类"""
+
+    def setUp(self):
+        """测试前准备"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.store = ColumnarStore(os.path.join(self.temp_dir, 'columnar'))
+
+        self.sentiment_records = [
+            {
+                "id": f"sentiment_{i:03d}",
+                "date": f"{2023 + i // 12}-{i % 12 + 1:02d}-15",
+                "market": "a_share",
+                "volatility": 10.0 + i,
+                "investor_sentiment": 50.0 + i,
+                "technical_indicators": {"rsi": 40.0 + i, "macd": 1.0}
+            }
+            for i in range(24)
+        ]
+        self.store.rebuild({
+            "market_sentiment": self.sentiment_records,
+            "macro_data": [{"id": "macro_1", "date": "2024-01-15", "market": "nasdaq", "pmi": 51.0}]
+        })
+
+    def tearDown(self):
+        """测试后清理"""
+        shutil.rmtree(self.temp_dir)
+
+    def test_rebuild_creates_manifest(self):
+        """测试重建后生成清单"""
+        self.assertTrue(self.store.is_built())
+
+    def test_read_columns_single_partition_is_view(self):
+        """测试单分区范围读取返回内存映射视图"""
+        columns = self.store.read_columns(
+            "market_sentiment", "a_share", "2023-03-01", "2023-06-30", ["volatility"]
+        )
+
+        self.assertEqual(columns["date"].tolist(), ["2023-03-15", "2023-04-15", "2023-05-15", "2023-06-15"])
+        self.assertEqual(columns["volatility"].tolist(), [12.0, 13.0, 14.0, 15.0])
+        self.assertIsInstance(columns["volatility"].base, np.memmap)
+
+    def test_read_columns_across_years(self):
+        """测试跨年份范围读取"""
+        columns = self.store.read_columns("market_sentiment", "a_share", "2023-11-01", "2024-02-28")
+
+        self.assertEqual(len(columns["date"]), 4)
+        self.assertEqual(columns["technical_indicators.rsi"].tolist(), [50.0, 51.0, 52.0, 53.0])
+
+    def test_append_and_iter_rows(self):
+        """测试追加记录并物化为字典"""
+        self.store.append("macro_data", {"id": "macro_2", "date": "2024-02-15", "market": "nasdaq", "cpi": 3.1})
+
+        columns = self.store.read_columns("macro_data", "nasdaq")
+        rows = list(self.store.iter_rows("macro_data", columns, "nasdaq"))
+
+        self.assertEqual(rows, [
+            {"market": "nasdaq", "date": "2024-01-15", "id": "macro_1", "pmi": 51.0},
+            {"market": "nasdaq", "date": "2024-02-15", "id": "macro_2", "cpi": 3.1}
+        ])
+
+    def test_records_to_columns_matches_store(self):
+        """测试列表转换结果与存储读取一致"""
+        expected = self.store.read_columns("market_sentiment", "a_share")
+        converted = records_to_columns("market_sentiment", self.sentiment_records)
+
+        for name, column in expected.items():
+            np.testing.assert_array_equal(converted[name], column)
+
+    def test_missing_market_returns_empty(self):
+        """测试不存在的市场返回空列"""
+        columns = self.store.read_columns("macro_data", "hong_kong", fields=["pmi"])
+
+        self.assertEqual(len(columns["date"]), 0)
+        self.assertEqual(len(columns["pmi"]), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
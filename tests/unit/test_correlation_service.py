@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+相关性矩阵服务单元测试
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+from datetime import date, timedelta
+from unittest.mock import patch
+
+import numpy as np
+
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+
+from app.services.correlation_service import CorrelationTracker, get_tracker
+from app.services.data_service import DataService
+from app.services.indicator_service import IndicatorService
+from app.services.segment_store import file_stamp
+
+
+class TestCorrelationService(unittest.TestCase):
+    """相关性矩阵服务单元测试类"""
+
+    def setUp(self):
+        """测试前准备"""
+        rng = np.random.default_rng(11)
+        self.records = {'macro_data': [], 'market_sentiment': []}
+        for i in range(60):
+            day = (date(2024, 1, 1) + timedelta(days=i)).isoformat()
+            pmi = rng.normal(50, 2)
+            for market in ('a_share', 'us_stock'):
+                # 部分日期缺少某些指标，检验成对完整观测
+                macro = {'date': day, 'market': market, 'pmi': pmi + rng.normal(0, 1), 'cpi': rng.normal(2, 1)}
+                if i % 7 == 0:
+                    del macro['cpi']
+                self.records['macro_data'].append(macro)
+                if i % 5:
+                    self.records['market_sentiment'].append({
+                        'date': day, 'market': market,
+                        'volatility': 30 - pmi / 3 + rng.normal(0, 0.5), 'investor_sentiment': rng.uniform(20, 80)
+                    })
+
+    def _split(self, count):
+        head = {name: records[:count] for name, records in self.records.items()}
+        tail = [(name, record) for name, records in self.records.items() for record in records[count:]]
+        return head, tail
+
+    def _assert_same(self, tracker, expected, window=None):
+        order = [expected.labels.index(label) for label in tracker.labels]
+        correlation, observations = tracker.correlation(window)
+        expected_correlation, expected_observations = expected.correlation(window)
+        np.testing.assert_array_equal(observations, expected_observations[np.ix_(order, order)])
+        np.testing.assert_allclose(correlation, expected_correlation[np.ix_(order, order)], atol=1e-9)
+
+    def test_incremental_matches_batch(self):
+        """测试逐条增量更新（含同日覆盖）与完整数据批量计算一致"""
+        head, tail = self._split(40)
+        tracker = CorrelationTracker()
+        tracker.build(head)
+
+        # 先写入错误数值再覆盖，覆盖时应移除旧值
+        name, record = tail[0]
+        tracker.observe(name, dict(record, pmi=999.0))
+        for name, record in tail:
+            tracker.observe(name, record)
+
+        expected = CorrelationTracker()
+        expected.build(self.records)
+        self._assert_same(tracker, expected)
+        self._assert_same(tracker, expected, window=15)
+
+    def test_window_matches_corrcoef(self):
+        """测试滚动窗口结果与最近N个日期的直接计算一致"""
+        tracker = CorrelationTracker()
+        tracker.build(self.records)
+        correlation, observations = tracker.correlation(window=20)
+
+        i = tracker.labels.index(('a_share', 'pmi'))
+        j = tracker.labels.index(('a_share', 'volatility'))
+        recent = sorted({record['date'] for record in self.records['macro_data']})[-20:]
+        pmi = {r['date']: r['pmi'] for r in self.records['macro_data'] if r['market'] == 'a_share'}
+        volatility = {r['date']: r['volatility'] for r in self.records['market_sentiment']
+                      if r['market'] == 'a_share'}
+        common = [day for day in recent if day in volatility]
+
+        self.assertEqual(observations[i, j], len(common))
+        self.assertAlmostEqual(correlation[i, j],
+                               np.corrcoef([pmi[d] for d in common], [volatility[d] for d in common])[0, 1])
+        self.assertLess(correlation[i, j], 0)
+
+    def test_save_updates_tracker_incrementally(self):
+        """测试保存数据时增量更新相关性状态而不重新加载文件"""
+        temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, temp_dir, ignore_errors=True)
+        data_file = os.path.join(temp_dir, 'application_data.json')
+
+        with patch('app.services.data_service.config_manager.get',
+                   side_effect=lambda key, default=None: data_file if key == 'database.file_path' else default):
+            data_service = DataService()
+            for record in self.records['macro_data'][:10]:
+                data_service.save_macro_data(dict(record))
+
+            tracker = get_tracker(data_service.data_file, data_service._load_data)
+            revision = tracker.revision
+
+            with patch.object(data_service, '_load_data', wraps=data_service._load_data) as load_data:
+                data_service.save_macro_data(dict(self.records['macro_data'][10]))
+                get_tracker(data_service.data_file, load_data)
+                load_data.assert_called_once()  # 仅save_macro_data自身读取，状态未重建
+
+            self.assertEqual(tracker.revision, revision + 1)
+            self.assertEqual(tracker.stamp, file_stamp(data_service.data_file))
+
+            indicator_service = IndicatorService()
+            indicator_service.data_service = data_service
+            heatmap = indicator_service.get_correlation_heatmap_data(markets=['a_share'], indicators=['pmi', 'cpi'])
+            self.assertEqual(heatmap['labels'], ['a_share.pmi', 'a_share.cpi'])
+            self.assertEqual(heatmap['matrix'][0][0], 1.0)
+            self.assertEqual(heatmap['observations'][0][0], 6)
+
+            with self.assertRaises(ValueError):
+                indicator_service.get_correlation_heatmap_data(indicators=['unknown'])
+
+
+if __name__ == '__main__':
+    unittest.main()
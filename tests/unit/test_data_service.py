@@ -151,11 +151,212 @@ class TestDataService(unittest.TestCase):
         with self.assertRaises(ValueError):
             self.data_service.save_macro_data(invalid_data)
 
+    def test_paginate_records(self):
+        """测试键集分页"""
+        records = [
+            {"date": f"2024-01-{day:02d}", "id": f"macro_{day:02d}", "market": "a_share"}
+            for day in range(20, 0, -1)
+        ]
+
+        first = self.data_service.paginate_records(records, 8)
+        self.assertEqual(len(first["data"]), 8)
+        self.assertIsNotNone(first["next_cursor"])
+
+        second = self.data_service.paginate_records(records, 8, first["next_cursor"])
+        third = self.data_service.paginate_records(records, 8, second["next_cursor"])
+        self.assertEqual(len(third["data"]), 4)
+        self.assertIsNone(third["next_cursor"])
+
+        pages = first["data"] + second["data"] + third["data"]
+        self.assertEqual(pages, records)
+
+        with self.assertRaises(ValueError):
+            self.data_service.paginate_records(records, 8, "not-a-cursor")
+
+    def test_stream_records(self):
+        """测试流式读取单个集合"""
+        saved = self.data_service.save_macro_data({"date": "2024-01-17", "market": "a_share", "pmi": 52.0})
+
+        streamed = list(self.data_service.stream_records("macro_data", "a_share", "2024-01-17", "2024-01-17"))
+        self.assertIn(saved, streamed)
+        self.assertTrue(all(item["market"] == "a_share" for item in streamed))
+
     def test_backup_data(self):
         """测试数据备份"""
         result = self.data_service.backup_data()
         self.assertTrue(result)
 
 
+class TestLatestRecords(unittest.TestCase):
+    """各市场最新记录查询单元测试类"""
+
+    def setUp(self):
+        """测试前准备"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.addCleanup(__import__('shutil').rmtree, self.temp_dir)
+        self.settings = {
+            'database.file_path': os.path.join(self.temp_dir, 'data.json'),
+            'database.blob_enabled': False
+        }
+        patcher = patch('app.services.data_service.config_manager.get',
+                        side_effect=lambda key, default=None: self.settings.get(key, default))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        markets = [f"market_{m:02d}" for m in range(12)]
+        records = [
+            {"id": f"timing_{m}_{day}", "date": f"2024-03-{day:02d}", "market": market,
+             "overall_score": float(m * 10 + day)}
+            for day in (3, 1, 5, 2, 4)
+            for m, market in enumerate(markets)
+        ]
+        # 同一日期ID也相同的重复记录：取文件中靠前的一条
+        records.append({"id": "timing_0_5", "date": "2024-03-05", "market": "market_00", "overall_score": -1.0})
+        DataService()  # 创建数据文件
+        with open(self.settings['database.file_path'], 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        data['timing_indicators'] = records
+        with open(self.settings['database.file_path'], 'w', encoding='utf-8') as f:
+            json.dump(data, f)
+        self.markets = markets + ["missing"]
+
+    def _expected(self, data_service):
+        return {
+            market: data_service.get_timing_indicators(market)[0]
+            for market in self.markets if data_service.get_timing_indicators(market)
+        }
+
+    def test_latest_matches_per_market_queries(self):
+        """测试JSON、流式和分段读取方式下与逐个市场查询后取第一条一致，且只读取一次数据"""
+        for mode in ({}, {'database.read_mode': 'stream'},
+                     {'database.segment_enabled': True,
+                      'database.segment_path': os.path.join(self.temp_dir, 'data.seg')}):
+            self.settings.update(mode)
+            data_service = DataService()
+            expected = self._expected(data_service)
+            self.assertEqual(len(expected), 12)
+            self.assertEqual(expected["market_00"]["overall_score"], 5.0)
+
+            with patch.object(DataService, '_load_data', autospec=True,
+                              side_effect=DataService._load_data) as load:
+                latest = data_service.get_latest_records('timing_indicators', self.markets)
+            self.assertEqual(latest, expected, mode)
+            self.assertLessEqual(load.call_count, 1)
+
+        self.assertEqual(data_service.get_latest_records('timing_indicators', []), {})
+
+    def test_compare_markets_single_query(self):
+        """测试多市场比较只查询一次"""
+        from app.services.indicator_service import IndicatorService
+        indicator_service = IndicatorService()
+        with patch.object(DataService, 'get_timing_indicators') as per_market:
+            result = indicator_service.compare_markets(self.markets)
+        per_market.assert_not_called()
+        self.assertEqual(list(result['markets'])[0], "market_11")
+        self.assertEqual(result['best_market'], "market_11")
+        self.assertEqual(len(result['markets']), 12)
+
+        chart = indicator_service.get_market_comparison_data(["market_01", "missing"], None, ['overall_score'])
+        self.assertEqual(chart, {'overall_score': {"market_01": 15.0}})
+
+
+class TestStoragePagination(unittest.TestCase):
+    """存储层分页与流式读取单元测试类"""
+
+    def setUp(self):
+        """测试前准备"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.addCleanup(__import__('shutil').rmtree, self.temp_dir)
+        self.settings = {
+            'database.file_path': os.path.join(self.temp_dir, 'data.json'),
+            'database.blob_enabled': False
+        }
+        patcher = patch('app.services.data_service.config_manager.get',
+                        side_effect=lambda key, default=None: self.settings.get(key, default))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        # 每天两个行业、ID无序写入，另有其他市场的记录
+        records = [
+            {"id": f"industry_{day:02d}_{name}", "date": f"2024-04-{day:02d}", "market": market,
+             "industry": name, "industry_sentiment": float(day)}
+            for day in (9, 3, 12, 1, 7, 10, 2, 11, 5, 8, 4, 6)
+            for name in ("technology", "healthcare")
+            for market in ("a_share", "nasdaq")
+        ]
+        DataService()
+        with open(self.settings['database.file_path'], 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        data['industry_data'] = records
+        with open(self.settings['database.file_path'], 'w', encoding='utf-8') as f:
+            json.dump(data, f)
+
+    def _modes(self):
+        return ({}, {'database.read_mode': 'stream'},
+                {'database.segment_enabled': True, 'database.segment_path': os.path.join(self.temp_dir, 'data.seg')})
+
+    def test_pages_match_full_query(self):
+        """测试各读取方式下逐页读取与全量查询结果一致"""
+        for mode in self._modes():
+            self.settings.update(mode)
+            data_service = DataService()
+            for industry, start_date in ((None, None), ("healthcare", "2024-04-03")):
+                expected = data_service.get_industry_data("a_share", industry, start_date, "2024-04-11")
+                pages, cursor = [], None
+                while True:
+                    page = data_service.paginate_market_records(
+                        'industry_data', "a_share", 5, start_date, "2024-04-11", cursor, industry
+                    )
+                    pages += page['data']
+                    cursor = page['next_cursor']
+                    if cursor is None:
+                        break
+                self.assertEqual([r['id'] for r in pages], [r['id'] for r in expected], mode)
+
+    def test_segment_reads_without_full_result(self):
+        """测试启用分段读取时分页不经过全量查询，也不加载JSON文件"""
+        self.settings.update(self._modes()[2])
+        data_service = DataService()
+        self.assertTrue(data_service._segment_ready())
+
+        first = data_service.paginate_market_records('industry_data', "a_share", 3)
+        with patch.object(DataService, 'get_industry_data') as get_all, \
+                patch.object(DataService, '_load_data') as load:
+            second = data_service.paginate_market_records('industry_data', "a_share", 3,
+                                                          cursor=first['next_cursor'])
+            streamed = list(data_service.iter_market_records('industry_data', "a_share",
+                                                             cursor=second['next_cursor']))
+        get_all.assert_not_called()
+        load.assert_not_called()
+        self.assertEqual([r['id'] for r in first['data'] + second['data']],
+                         ["industry_12_technology", "industry_12_healthcare", "industry_11_technology",
+                          "industry_11_healthcare", "industry_10_technology", "industry_10_healthcare"])
+        self.assertEqual(len(streamed), 18)
+        self.assertEqual(streamed[0]['id'], "industry_09_technology")
+
+    def test_list_routes(self):
+        """测试查询接口的分页、NDJSON和limit校验"""
+        from app import create_app
+        with patch('app.init_config', return_value=True):
+            client = create_app().test_client()
+
+        response = client.get('/api/data/industry?market=a_share&industry=technology&limit=4')
+        self.assertEqual(response.status_code, 200)
+        body = response.get_json()
+        self.assertEqual([r['date'] for r in body['data']], ["2024-04-12", "2024-04-11", "2024-04-10", "2024-04-09"])
+
+        response = client.get(f"/api/data/industry?market=a_share&industry=technology&format=ndjson"
+                              f"&cursor={body['next_cursor']}")
+        lines = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+        self.assertEqual(len(lines), 8)
+        self.assertEqual(lines[0]['date'], "2024-04-08")
+
+        for limit in ("abc", "0", "-3"):
+            response = client.get(f'/api/data/industry?market=a_share&limit={limit}')
+            self.assertEqual(response.status_code, 400, limit)
+        self.assertEqual(client.get('/api/data/industry?market=a_share&cursor=bad').status_code, 400)
+        self.assertEqual(client.get('/api/data/industry?market=a_share').get_json()['count'], 24)
+
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,247 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+实时事件推送单元测试
+"""
+
+import asyncio
+import json
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+
+from app.services.data_service import DataService
+from app.services.event_broker import EventBroker, SubscriberLimitError, stream, stream_async
+
+
+def _parse_frames(text):
+    """解析SSE文本为 (id, event, data) 列表，忽略注释和retry"""
+    events = []
+    for block in text.strip().split('\n\n'):
+        fields = dict(line.split(': ', 1) for line in block.split('\n') if not line.startswith((':', 'retry')))
+        if fields:
+            events.append((int(fields['id']), fields['event'], json.loads(fields['data'])))
+    return events
+
+
+class TestEventBroker(unittest.TestCase):
+    """事件代理单元测试类"""
+
+    def test_publish_and_filter(self):
+        """测试按市场筛选、增量读取和缓冲区覆盖"""
+        broker = EventBroker(buffer_size=4)
+        for i in range(3):
+            broker.publish('timing_indicators', 'a_share' if i % 2 == 0 else 'nasdaq', {'n': i})
+
+        events, lagged, newest = broker.events_after(0, ['a_share'])
+        self.assertEqual([e.id for e in events], [1, 3])
+        self.assertFalse(lagged)
+        self.assertEqual(newest, 3)
+        self.assertEqual(broker.events_after(3), ([], False, 3))
+
+        for i in range(3, 8):
+            broker.publish('ai_analysis', 'a_share', {'n': i})
+        frames, last_id = broker.frames(2, None)
+        self.assertEqual(last_id, 8)
+        parsed = _parse_frames(''.join(frames))
+        self.assertEqual(parsed[0], (8, 'reset', {'last_id': 8}))
+        self.assertEqual([e[0] for e in parsed[1:]], [5, 6, 7, 8])
+
+        # 客户端ID大于当前ID（服务重启过）
+        frames, last_id = broker.frames(100, None)
+        self.assertEqual(last_id, 8)
+        self.assertEqual(_parse_frames(''.join(frames))[0][1], 'reset')
+
+    def test_wait(self):
+        """测试同步和异步等待在发布时被唤醒"""
+        broker = EventBroker()
+        self.assertFalse(broker.wait(0, 0.01))
+
+        timer = threading.Timer(0.05, broker.publish, ('timing_indicators', 'a_share', {}))
+        timer.start()
+        started = time.perf_counter()
+        self.assertTrue(broker.wait(0, 5))
+        self.assertLess(time.perf_counter() - started, 1)
+
+        async def wait_many():
+            waiters = [asyncio.create_task(broker.wait_async(1, 5)) for _ in range(200)]
+            await asyncio.sleep(0.01)
+            threading.Thread(target=broker.publish, args=('timing_indicators', 'a_share', {})).start()
+            return await asyncio.gather(*waiters)
+
+        self.assertEqual(asyncio.run(wait_many()), [True] * 200)
+        self.assertEqual(broker._async_waiters, set())
+        self.assertFalse(asyncio.run(broker.wait_async(2, 0.01)))
+
+    def test_streams(self):
+        """测试同步和异步事件流：补发、筛选市场、心跳"""
+        broker = EventBroker()
+        broker.publish('timing_indicators', 'nasdaq', {'n': 1})
+        broker.publish('timing_indicators', 'a_share', {'n': 2})
+
+        events = stream(broker, ['a_share'], 0, heartbeat=0.01)
+        self.assertTrue(next(events).startswith('retry:'))
+        self.assertEqual(_parse_frames(next(events)), [(2, 'timing_indicators', {'n': 2})])
+        self.assertEqual(next(events), ': keepalive\n\n')
+        broker.publish('timing_indicators', 'nasdaq', {'n': 3})
+        broker.publish('timing_indicators', 'a_share', {'n': 4})
+        self.assertEqual(_parse_frames(next(events)), [(4, 'timing_indicators', {'n': 4})])
+
+        async def read_async():
+            broker.subscribe()
+            events = stream_async(broker, None, 3, heartbeat=0.01)
+            chunks = [await events.__anext__() for _ in range(3)]
+            await events.aclose()
+            return chunks
+
+        chunks = asyncio.run(read_async())
+        self.assertEqual(_parse_frames(chunks[1]), [(4, 'timing_indicators', {'n': 4})])
+        self.assertEqual(chunks[2], ': keepalive\n\n')
+        self.assertEqual(broker.subscribers, 0)
+
+    def test_subscriber_limit(self):
+        """测试订阅数上限"""
+        broker = EventBroker(max_subscribers=2)
+        broker.subscribe()
+        broker.subscribe()
+        with self.assertRaises(SubscriberLimitError):
+            broker.subscribe()
+        broker.unsubscribe()
+        broker.subscribe()
+
+        broker = EventBroker(max_subscribers=5)
+        broker.subscribe(limit=1)
+        with self.assertRaises(SubscriberLimitError):
+            broker.subscribe(limit=1)
+        broker.subscribe()
+
+
+class TestEventPublishing(unittest.TestCase):
+    """保存数据后推送事件的单元测试类"""
+
+    def setUp(self):
+        """测试前准备"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.temp_dir)
+        self.settings = {
+            'database.file_path': str(Path(self.temp_dir) / 'data.json'),
+            'database.blob_enabled': False,
+            'stream.heartbeat_seconds': 0.05,
+            'stream.watch_seconds': 0
+        }
+        self.broker = EventBroker()
+        patchers = [
+            patch('app.services.data_service.config_manager.get',
+                  side_effect=lambda key, default=None: self.settings.get(key, default)),
+            patch('app.routes.stream.config_manager.get',
+                  side_effect=lambda key, default=None: self.settings.get(key, default)),
+            patch('app.services.data_service.get_broker', return_value=self.broker),
+            patch('app.routes.stream.get_broker', return_value=self.broker)
+        ]
+        for patcher in patchers:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_save_publishes_compact_delta(self):
+        """测试保存择时指标和AI分析结果后推送精简事件"""
+        data_service = DataService()
+        data_service.save_timing_indicators({
+            'market': 'a_share', 'date': '2024-01-15', 'overall_score': 65.5, 'macro_score': 70.0,
+            'industry_score': 65.0, 'sentiment_score': 60.0, 'strength_level': 'strong',
+            'weights': {'macro_fundamental': 0.4}
+        })
+        data_service.save_ai_analysis({'market': 'nasdaq', 'date': '2024-01-15', 'ai_analysis': '分析' * 100})
+
+        events, _, _ = self.broker.events_after(0)
+        self.assertEqual([(e.type, e.market) for e in events],
+                         [('timing_indicators', 'a_share'), ('ai_analysis', 'nasdaq')])
+        timing = _parse_frames(events[0].frame)[0][2]
+        self.assertEqual(timing['overall_score'], 65.5)
+        self.assertNotIn('weights', timing)
+        analysis = _parse_frames(events[1].frame)[0][2]
+        self.assertNotIn('ai_analysis', analysis)
+        self.assertEqual(analysis['ai_analysis_length'], 200)
+
+        self.settings['stream.enabled'] = False
+        data_service.save_timing_indicators({'market': 'a_share', 'date': '2024-01-16'})
+        self.assertEqual(self.broker.last_id, 2)
+
+    def test_refresh_on_write_from_other_process(self):
+        """测试其他进程写入数据文件后推送refresh事件，本进程的写入不重复推送"""
+        data_service = DataService()
+        self.broker.watch(str(data_service.data_file), 3600)
+
+        data_service.save_timing_indicators({'market': 'a_share', 'date': '2024-01-15', 'overall_score': 60.0})
+        data_service.save_macro_data({'market': 'a_share', 'date': '2024-01-15', 'pmi': 50.0})
+        self.assertFalse(self.broker.check_file())
+        self.assertEqual([e.type for e in self.broker.events_after(0)[0]], ['timing_indicators'])
+
+        # 模拟其他工作进程写入（不经过本进程的代理），之后本进程再写入一次
+        data = json.loads(data_service.data_file.read_text(encoding='utf-8'))
+        data['macro_data'].append({'id': 'other', 'market': 'nasdaq', 'date': '2024-01-15', 'pmi': 49.0})
+        data_service.data_file.write_text(json.dumps(data), encoding='utf-8')
+        data_service.save_macro_data({'market': 'a_share', 'date': '2024-01-16', 'pmi': 50.5})
+
+        self.assertTrue(self.broker.check_file())
+        self.assertFalse(self.broker.check_file())
+        events, _, _ = self.broker.events_after(1, ['a_share'])
+        self.assertEqual([(e.type, e.market) for e in events], [('refresh', None)])
+        self.assertEqual(_parse_frames(events[0].frame)[0][2], {'reason': 'external_write'})
+
+    def test_events_route(self):
+        """测试SSE接口：补发Last-Event-ID之后的事件，关闭连接后注销订阅"""
+        from app import create_app
+        with patch('app.init_config', return_value=True):
+            client = create_app().test_client()
+
+        self.broker.publish('timing_indicators', 'a_share', {'n': 1})
+        self.broker.publish('timing_indicators', 'nasdaq', {'n': 2})
+
+        response = client.get('/api/stream/events?markets=a_share', headers={'Last-Event-ID': '0'},
+                              buffered=False)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.mimetype, 'text/event-stream')
+        chunks = iter(response.response)
+        self.assertTrue(next(chunks).startswith(b'retry:'))
+        self.assertEqual(_parse_frames(next(chunks).decode()), [(1, 'timing_indicators', {'n': 1})])
+        self.assertEqual(self.broker.subscribers, 1)
+        response.close()
+        self.assertEqual(self.broker.subscribers, 0)
+
+        self.settings['stream.max_subscribers'] = 0
+        self.assertEqual(client.get('/api/stream/events').status_code, 503)
+
+    def test_events_route_thread_limit(self):
+        """测试同步模式下订阅数按工作线程比例限制"""
+        from app import create_app
+        with patch('app.init_config', return_value=True):
+            client = create_app().test_client()
+        self.settings.update({'server.threads': 4, 'stream.sync_thread_ratio': 0.5})
+
+        responses = [client.get('/api/stream/events', buffered=False) for _ in range(2)]
+        self.assertEqual([r.status_code for r in responses], [200, 200])
+        rejected = client.get('/api/stream/events')
+        self.assertEqual(rejected.status_code, 503)
+        self.assertIn('--asgi', rejected.get_json()['message'])
+
+        responses.pop().close()
+        responses.append(client.get('/api/stream/events', buffered=False))
+        self.assertEqual(responses[-1].status_code, 200)
+        for response in responses:
+            response.close()
+        self.assertEqual(self.broker.subscribers, 0)
+
+        self.settings['stream.sync_thread_ratio'] = 0
+        self.assertEqual(client.get('/api/stream/events').status_code, 503)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -4,6 +4,8 @@
 指标计算服务单元测试
 """
 
+import random
+import time
 import unittest
 from unittest.mock import patch, MagicMock
 
@@ -12,6 +14,7 @@ import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
 
 from app.services.indicator_service import IndicatorService
+from app.utils.config import config_manager
 
 
 class TestIndicatorService(unittest.TestCase):
@@ -62,6 +65,16 @@ class TestIndicatorService(unittest.TestCase):
         # 由于评分计算可能存在权重问题，暂时放宽上限检查
         # self.assertLessEqual(result["overall_score"], 100)
 
+    def test_macro_score_is_weighted_average(self):
+        """测试宏观评分为各分项0-100评分的加权平均，不再放大100倍"""
+        pmi_config = config_manager.get('timing_indicators.macro_indicators', {}).get('pmi', {})
+        expected = self.indicator_service._calculate_pmi_score(47.5, pmi_config)
+
+        score = self.indicator_service._calculate_macro_score({"pmi": 47.5})
+
+        self.assertAlmostEqual(score, expected)
+        self.assertLess(score, 100)
+
     def test_calculate_position_sizing(self):
         """测试仓位计算"""
         data = {
@@ -108,6 +121,234 @@ class TestIndicatorService(unittest.TestCase):
 
         self.assertIsInstance(result, list)
 
+    def test_get_timing_score_trend_downsampled(self):
+        """测试择时评分趋势降采样并保留强度切换点"""
+        history = []
+        for i in range(1000):
+            score = 50 + 30 * ((i // 100) % 2)
+            history.append({
+                'date': f"day_{i:04d}",
+                'overall_score': score,
+                'strength_level': 'strong' if score >= 60 else 'neutral'
+            })
+
+        with patch.object(self.indicator_service.data_service, 'get_timing_indicators',
+                          return_value=history[::-1]):
+            result = self.indicator_service.get_timing_score_trend("a_share", max_points=50)
+
+        self.assertLessEqual(len(result), 50)
+        self.assertEqual(result[0]['date'], 'day_0999')
+        self.assertEqual(result[-1]['date'], 'day_0000')
+
+        # 每个强度切换点都应保留
+        dates = {point['date'] for point in result}
+        for i in range(100, 1000, 100):
+            self.assertIn(f"day_{i - 1:04d}", dates)
+            self.assertIn(f"day_{i:04d}", dates)
+
+    def test_get_timing_score_trend_rolling_window(self):
+        """测试趋势数据附加滚动平滑值和标准分"""
+        history = [
+            {'date': f"day_{i:04d}", 'overall_score': float(i % 10), 'strength_level': 'neutral'}
+            for i in range(100)
+        ]
+
+        with patch.object(self.indicator_service.data_service, 'get_timing_indicators',
+                          return_value=history[::-1]):
+            result = self.indicator_service.get_timing_score_trend("a_share", window=5)
+
+        # 倒序输出：result[0]为day_0099，其窗口为day_0095..day_0099（分数5..9）
+        self.assertEqual(result[0]['date'], 'day_0099')
+        self.assertAlmostEqual(result[0]['smoothed_score'], 7.0)
+        self.assertGreater(result[0]['zscore'], 0)
+        self.assertEqual(result[-1]['zscore'], 0.0)
+
+        with self.assertRaises(ValueError):
+            self.indicator_service.get_timing_score_trend("a_share", window=0)
+
+    def test_visualization_window_validation(self):
+        """测试可视化接口的window不是1到上限之间的整数时返回400"""
+        from app import create_app
+        with patch('app.init_config', return_value=True):
+            client = create_app().test_client()
+
+        for max_points in ('1', '2', 'abc'):
+            response = client.get(f'/api/visualization/timing-score-trend?max_points={max_points}')
+            self.assertEqual(response.status_code, 400, max_points)
+            self.assertIn('max_points', response.get_json()['message'])
+
+        for path in ('timing-score-trend', 'sentiment-analysis', 'correlation-heatmap'):
+            for window in ('0', '-1', 'abc', '1000000'):
+                response = client.get(f'/api/visualization/{path}?window={window}')
+                self.assertEqual(response.status_code, 400, (path, window))
+                self.assertIn('window', response.get_json()['message'])
+
+    def _sensitivity_request(self, **kwargs):
+        request = {
+            "market": "a_share",
+            "date": "2024-01-15",
+            "macro_data": {"pmi": 48.5, "cpi": 2.8, "ppi": 1.8, "m2": 9.5, "interest_rate": 3.0},
+            "industry_data": {"free_cash_flow": 6.5, "industry_sentiment": 60.0},
+            "market_sentiment": {
+                "volatility": 18.0,
+                "investor_sentiment": 55.0,
+                "technical_indicators": {"rsi": 55.0, "macd": 0.5, "bollinger_bands": 0.8}
+            },
+            "seed": 1
+        }
+        request.update(kwargs)
+        return request
+
+    def test_analyze_sensitivity_without_noise(self):
+        """测试无扰动时敏感性分析与逐条评分一致"""
+        request = self._sensitivity_request(n_samples=100, input_noise={}, weight_noise=0)
+        with patch('app.services.indicator_service.config_manager.get',
+                   side_effect=lambda key, default=None: {} if key == 'sensitivity.input_noise' else default):
+            result = self.indicator_service.analyze_sensitivity(request)
+
+        expected_macro = self.indicator_service._calculate_macro_score(request["macro_data"])
+        self.assertAlmostEqual(result["base"]["macro_score"], round(expected_macro, 2))
+        self.assertAlmostEqual(result["bands"]["macro_score"]["std"], 0.0)
+        self.assertEqual(result["base_level_probability"], 1.0)
+
+    def test_analyze_sensitivity_performance(self):
+        """测试一万个样本的敏感性分析耗时"""
+        noise = {"pmi": 1.0, "cpi": 0.5, "industry_sentiment": 5.0, "investor_sentiment": 5.0}
+        request = self._sensitivity_request(n_samples=10000, input_noise=noise, weight_noise=0.1)
+
+        self.indicator_service.analyze_sensitivity(request)
+        started = time.perf_counter()
+        result = self.indicator_service.analyze_sensitivity(request)
+        elapsed = time.perf_counter() - started
+
+        self.assertLess(elapsed, 0.1)
+        self.assertAlmostEqual(sum(result["strength_probabilities"].values()), 1.0, places=3)
+        band = result["bands"]["overall_score"]
+        self.assertLessEqual(band["p5"], band["p50"])
+        self.assertLessEqual(band["p50"], band["p95"])
+        self.assertGreater(band["std"], 0)
+
+    def test_evaluate_scenarios_matches_single_scoring(self):
+        """测试情景评估与逐条计算择时指标一致，且不保存任何结果"""
+        base = self._sensitivity_request()
+        overrides = [
+            {"macro_data": {"pmi": 48.0}},
+            {"macro_data": {"pmi": 48.0}, "market_sentiment": {"volatility": 25.0}},
+            {"market_sentiment": {"technical_indicators": {"rsi": 78.0, "macd": -0.3}}},
+            {"macro_data": {"cpi": None, "m2": 16.0}, "industry_data": {"free_cash_flow": -2.0}},
+            {"industry_data": {"free_cash_flow": None, "industry_sentiment": None}}
+        ]
+        request = dict(base, scenarios=[dict(o, name=f"s{i}") for i, o in enumerate(overrides)])
+
+        with patch.object(self.indicator_service.data_service, 'save_timing_indicators') as save, \
+                patch.object(self.indicator_service.data_service, '_save_data') as save_data:
+            result = self.indicator_service.evaluate_scenarios(request)
+            save.assert_not_called()
+            save_data.assert_not_called()
+
+            self.assertEqual(result["count"], len(overrides))
+            for override, row in zip(overrides, result["results"]):
+                merged = {}
+                for key in ("macro_data", "industry_data", "market_sentiment"):
+                    record = dict(base[key])
+                    for field, value in override.get(key, {}).items():
+                        if isinstance(value, dict):
+                            record[field] = dict(record.get(field, {}), **value)
+                        else:
+                            record[field] = value
+                    merged[key] = {k: v for k, v in record.items() if v is not None}
+                expected = self.indicator_service.calculate_timing_indicators(dict(base, **merged))
+                for key in ("overall_score", "macro_score", "industry_score", "sentiment_score",
+                            "strength_level"):
+                    if key == "strength_level":
+                        self.assertEqual(row[key], expected[key])
+                    else:
+                        self.assertAlmostEqual(row[key], expected[key], places=2)
+
+        self.assertEqual(result["results"][0]["name"], "s0")
+        self.assertEqual(result["base_inputs"]["pmi"], 48.5)
+
+    def test_batch_scoring_parity_with_random_records(self):
+        """测试随机记录（含other_macro、空技术指标和缺失字段）经批量评分与逐条计算结果一致"""
+        rng = random.Random(11)
+
+        def maybe(value):
+            return value if rng.random() < 0.8 else None
+
+        def random_record():
+            macro = {"pmi": maybe(rng.uniform(40, 56)), "cpi": maybe(rng.uniform(-1, 7)),
+                     "ppi": maybe(rng.uniform(-2, 6)), "m2": maybe(rng.uniform(5, 18)),
+                     "interest_rate": maybe(rng.uniform(0, 7))}
+            other = rng.choice([None, {}, {"gdp": 5.2}])
+            if other is not None:
+                macro["other_macro"] = other
+            sentiment = {"volatility": maybe(rng.uniform(5, 40)), "investor_sentiment": maybe(rng.uniform(0, 100))}
+            technical = rng.choice([None, {}, {"rsi": None, "macd": None, "bollinger_bands": None},
+                                    {"rsi": rng.uniform(10, 90)},
+                                    {"rsi": rng.uniform(10, 90), "macd": rng.uniform(-2, 2),
+                                     "bollinger_bands": rng.uniform(-2, 2)}])
+            if technical is not None:
+                sentiment["technical_indicators"] = technical
+            industry = {"free_cash_flow": maybe(rng.uniform(-5, 15)), "industry_sentiment": maybe(rng.uniform(0, 100))}
+            strip = lambda record: {k: v for k, v in record.items() if v is not None}
+            return {"macro_data": strip(macro), "industry_data": strip(industry), "market_sentiment": strip(sentiment)}
+
+        records = [random_record() for _ in range(300)]
+        request = {"market": "a_share", "date": "2024-01-15", "macro_data": {}, "industry_data": {},
+                   "market_sentiment": {}, "scenarios": records}
+
+        with patch.object(self.indicator_service.data_service, 'save_timing_indicators'):
+            result = self.indicator_service.evaluate_scenarios(request)
+            for record, row in zip(records, result["results"]):
+                expected = self.indicator_service.calculate_timing_indicators(
+                    dict(record, market="a_share", date="2024-01-15")
+                )
+                base = self.indicator_service._sensitivity_base(
+                    self.indicator_service._sensitivity_inputs("a_share", None, record)
+                )
+                for key in ("overall_score", "macro_score", "industry_score", "sentiment_score"):
+                    self.assertAlmostEqual(row[key], expected[key], places=2, msg=(key, record))
+                    self.assertAlmostEqual(base[key], expected[key], places=2, msg=(key, record))
+                self.assertEqual(row["strength_level"], expected["strength_level"])
+                self.assertEqual(base["strength_level"], expected["strength_level"])
+
+    def test_evaluate_scenarios_batch(self):
+        """测试数百个情景一次批量计算，以及参数错误"""
+        request = self._sensitivity_request(scenarios=[
+            {"macro_data": {"pmi": 40 + i * 0.05}, "market_sentiment": {"volatility": 10 + i * 0.1}}
+            for i in range(500)
+        ])
+        result = self.indicator_service.evaluate_scenarios(request)
+        self.assertEqual(result["count"], 500)
+        self.assertEqual(result["results"][0]["name"], "0")
+        macro = [row["macro_score"] for row in result["results"]]
+        self.assertEqual(macro, sorted(macro))
+
+        with self.assertRaises(ValueError):
+            self.indicator_service.evaluate_scenarios(dict(request, scenarios=[]))
+        with self.assertRaises(ValueError):
+            self.indicator_service.evaluate_scenarios(dict(request, scenarios=[{"macro_data": {"pmi": "高"}}]))
+
+    def test_scenarios_route(self):
+        """测试情景评估接口及其验证错误"""
+        from app import create_app
+        with patch('app.init_config', return_value=True):
+            client = create_app().test_client()
+
+        request = self._sensitivity_request(scenarios=[{"name": "PMI回落", "macro_data": {"pmi": 48}}])
+        response = client.post('/api/analysis/scenarios', json=request)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.get_json()['data']['results'][0]['name'], 'PMI回落')
+
+        response = client.post('/api/analysis/scenarios', json=dict(request, scenarios=[{"macro_data": 48}]))
+        self.assertEqual(response.status_code, 400)
+        self.assertTrue(response.get_json()['error'].startswith('第1条记录字段 macro_data 无效'))
+
+        response = client.post('/api/analysis/scenarios',
+                               json=dict(request, scenarios=[{"macro_data": {"pmi": "高"}}]))
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.get_json()['message'], '字段 pmi 必须是数值')
+
     def test_get_indicator_breakdown(self):
         """测试获取指标分解"""
         result = self.indicator_service.get_indicator_breakdown("a_share", "2024-01-15")
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+JSON流式读取单元测试
+"""
+
+import unittest
+import tempfile
+import shutil
+import json
+from pathlib import Path
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+
+from app.utils.json_stream import JsonCollectionStream
+
+
+class TestJsonCollectionStream(unittest.TestCase):
+    """JSON流式读取单元测试类"""
+
+    def setUp(self):
+        """测试前准备"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.path = Path(self.temp_dir) / 'application_data.json'
+        self.data = {
+            "ai_analysis": [
+                {"market": "a_share", "ai_analysis": "含有括号]}的文本和\"转义引号\"", "nested": [[1, {"x": "}"}]]}
+            ],
+            "macro_data": [
+                {"date": f"2024-01-{day:02d}", "market": "a_share", "pmi": 50.0 + day, "flag": day % 2 == 0}
+                for day in range(1, 31)
+            ],
+            "empty": [],
+            "metadata": {"created_at": "2024-01-01", "count": 3, "ok": None}
+        }
+        with open(self.path, 'w', encoding='utf-8') as f:
+            json.dump(self.data, f, indent=2, ensure_ascii=False)
+
+    def tearDown(self):
+        """测试后清理"""
+        shutil.rmtree(self.temp_dir)
+
+    def test_iter_records_matches_json_load(self):
+        """测试各种块大小下的解析结果与json.load一致"""
+        for chunk_size in (1, 7, 64, 1 << 16):
+            stream = JsonCollectionStream(self.path, chunk_size=chunk_size)
+            self.assertEqual(list(stream.iter_records("macro_data")), self.data["macro_data"])
+            self.assertEqual(list(stream.iter_records("ai_analysis")), self.data["ai_analysis"])
+
+    def test_missing_or_empty_collection(self):
+        """测试不存在或为空的集合"""
+        stream = JsonCollectionStream(self.path, chunk_size=5)
+        self.assertEqual(list(stream.iter_records("empty")), [])
+        self.assertEqual(list(stream.iter_records("industry_data")), [])
+        self.assertEqual(list(stream.iter_records("metadata")), [])
+
+    def test_iter_top_level(self):
+        """测试单次遍历全部顶层键值，未读完的数组自动跳过"""
+        for chunk_size in (3, 1 << 16):
+            result = {}
+            for key, value in JsonCollectionStream(self.path, chunk_size=chunk_size).iter_top_level():
+                if key == "macro_data":
+                    result[key] = [next(value)]
+                elif key in ("ai_analysis", "empty"):
+                    result[key] = list(value)
+                else:
+                    result[key] = value
+
+            self.assertEqual(result["macro_data"], self.data["macro_data"][:1])
+            self.assertEqual(result["ai_analysis"], self.data["ai_analysis"])
+            self.assertEqual(result["empty"], [])
+            self.assertEqual(result["metadata"], self.data["metadata"])
+
+    def test_invalid_json(self):
+        """测试格式错误的文件"""
+        self.path.write_text('{"macro_data": [{"date": "2024-01-01"', encoding='utf-8')
+        with self.assertRaises(ValueError):
+            list(JsonCollectionStream(self.path).iter_records("macro_data"))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+运行指标采集单元测试
+"""
+
+import time
+import unittest
+from unittest.mock import patch
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+
+from app.utils import metrics
+from app.utils.metrics import Counter, Histogram, MetricsRegistry
+
+
+class TestMetrics(unittest.TestCase):
+    """运行指标采集单元测试类"""
+
+    def setUp(self):
+        """测试前准备"""
+        metrics.registry.reset()
+        self.addCleanup(metrics.registry.reset)
+
+    def test_histogram_exposition(self):
+        """测试直方图输出累积分桶、总和与计数"""
+        histogram = Histogram('latency_seconds', '耗时', ('endpoint',), buckets=(0.1, 1.0))
+        for value in (0.05, 0.1, 0.5, 3.0):
+            histogram.observe(value, '/api/"x"')
+
+        self.assertEqual(histogram.collect(), [
+            'latency_seconds_bucket{endpoint="/api/\\"x\\"",le="0.1"} 2',
+            'latency_seconds_bucket{endpoint="/api/\\"x\\"",le="1.0"} 3',
+            'latency_seconds_bucket{endpoint="/api/\\"x\\"",le="+Inf"} 4',
+            'latency_seconds_sum{endpoint="/api/\\"x\\""} 3.65',
+            'latency_seconds_count{endpoint="/api/\\"x\\""} 4'
+        ])
+
+    def test_registry_render(self):
+        """测试注册表输出HELP/TYPE头，重复注册返回同一指标"""
+        registry = MetricsRegistry()
+        counter = registry.counter('cache_total', '缓存查询次数', ('result',))
+        self.assertIs(registry.counter('cache_total', '缓存查询次数', ('result',)), counter)
+        with self.assertRaises(ValueError):
+            registry.histogram('cache_total', '类型冲突')
+
+        counter.inc('hit')
+        counter.inc('hit')
+        self.assertEqual(registry.render(), (
+            '# HELP cache_total 缓存查询次数\n'
+            '# TYPE cache_total counter\n'
+            'cache_total{result="hit"} 2\n'
+        ))
+        with self.assertRaises(ValueError):
+            Counter('c', 'c').inc(amount=-1)
+
+    def test_spans_and_cache_counters(self):
+        """测试装饰器和上下文管理器记录耗时（异常时同样记录），以及缓存命中计数"""
+        @metrics.timed('test.fail')
+        def fail():
+            raise RuntimeError("失败")
+
+        with metrics.span('test.block'):
+            time.sleep(0.001)
+        with self.assertRaises(RuntimeError):
+            fail()
+        metrics.record_cache('test', True)
+        metrics.record_cache('test', False)
+        metrics.record_cache('test', False)
+
+        self.assertEqual(metrics.SPAN_LATENCY.count('test.block'), 1)
+        self.assertEqual(metrics.SPAN_LATENCY.count('test.fail'), 1)
+        self.assertEqual(metrics.CACHE_REQUESTS.value('test', 'hit'), 1)
+        self.assertEqual(metrics.CACHE_REQUESTS.value('test', 'miss'), 2)
+
+        metrics.registry.enabled = False
+        self.addCleanup(setattr, metrics.registry, 'enabled', True)
+        with metrics.span('test.block'):
+            pass
+        self.assertEqual(metrics.SPAN_LATENCY.count('test.block'), 1)
+
+    def test_timed_coroutine(self):
+        """测试装饰协程函数时记录的是await的完整耗时"""
+        import asyncio
+
+        @metrics.timed('test.async')
+        async def wait():
+            await asyncio.sleep(0.01)
+            return 'done'
+
+        self.assertTrue(asyncio.iscoroutinefunction(wait))
+        self.assertEqual(asyncio.run(wait()), 'done')
+        self.assertEqual(metrics.SPAN_LATENCY.count('test.async'), 1)
+        self.assertIn('app_span_duration_seconds_bucket{span="test.async",le="0.01"} 0', metrics.registry.render())
+
+    def test_metrics_endpoint(self):
+        """测试请求耗时按路由模板计入 /metrics 输出"""
+        from app import create_app
+        with patch('app.init_config', return_value=True):
+            client = create_app().test_client()
+
+        client.get('/api/docs')
+        client.get('/api/nonexistent')
+        response = client.get('/metrics')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.content_type.startswith('text/plain'))
+
+        text = response.get_data(as_text=True)
+        self.assertIn('# TYPE http_request_duration_seconds histogram', text)
+        self.assertIn('endpoint="/api/docs",method="GET",status="200",le="+Inf"} 1', text)
+        self.assertIn('endpoint="<unmatched>",method="GET",status="404"', text)
+
+
+if __name__ == '__main__':
+    unittest.main()
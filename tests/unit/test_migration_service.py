@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+数据迁移服务单元测试
+"""
+
+import json
+import shutil
+import subprocess
+import tempfile
+import unittest
+from unittest.mock import patch
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+
+from app.services.columnar_store import ColumnarStore
+from app.services.migration_service import MigrationService, normalize_date
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+class TestMigrationService(unittest.TestCase):
+    """数据迁移服务单元测试类"""
+
+    def setUp(self):
+        """测试前准备"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.source = os.path.join(self.temp_dir, 'application_data.json')
+        self.target = os.path.join(self.temp_dir, 'columnar')
+
+        macro = []
+        for i in range(50):
+            record = {'date': f"2023/{i % 12 + 1}/{i % 28 + 1}", 'market': 'a_share', 'pmi': 45 + i * 0.2}
+            if i % 10:
+                # 同一秒内生成的ID会重复
+                record['id'] = f"macro_20240101_{i // 2}"
+            macro.append(record)
+        macro.append({'date': 'not-a-date', 'market': 'a_share', 'pmi': 50})
+
+        sentiment = [
+            {'id': f"sentiment_{i}", 'date': f"2024{i % 12 + 1:02d}15", 'market': 'nasdaq',
+             'volatility': 10 + i, 'technical_indicators': {'rsi': 40 + i}}
+            for i in range(30)
+        ]
+        with open(self.source, 'w', encoding='utf-8') as f:
+            json.dump({'macro_data': macro, 'market_sentiment': sentiment, 'industry_data': [],
+                       'timing_indicators': [], 'ai_analysis': [], 'metadata': {}}, f)
+
+    def tearDown(self):
+        """测试后清理"""
+        shutil.rmtree(self.temp_dir)
+
+    def test_normalize_date(self):
+        """测试日期规范化"""
+        self.assertEqual(normalize_date('2024/1/5'), '2024-01-05')
+        self.assertEqual(normalize_date('20240105'), '2024-01-05')
+        self.assertEqual(normalize_date('2024-01-05T09:30:00'), '2024-01-05')
+        self.assertIsNone(normalize_date('2024-02-30'))
+        self.assertIsNone(normalize_date(None))
+
+    def test_migrate_and_verify(self):
+        """测试分批迁移后记录数和校验和一致，日期和ID已规范化"""
+        report = MigrationService(self.source, self.target, batch_size=7).run()
+
+        self.assertTrue(report['verified'])
+        macro = report['collections']['macro_data']
+        self.assertEqual((macro['source_count'], macro['migrated'], macro['invalid']), (51, 50, 1))
+        self.assertEqual(macro['target_count'], 50)
+        self.assertEqual(report['collections']['market_sentiment']['target_count'], 30)
+
+        store = ColumnarStore(self.target)
+        self.assertTrue(store.is_built())
+        self.assertFalse(os.path.exists(os.path.join(self.target, '.migration_checkpoint.json')))
+
+        columns = store.read_columns('macro_data', 'a_share')
+        self.assertEqual(len(set(columns['id'].tolist())), 50)
+        self.assertTrue(all(len(day) == 10 and day[4] == '-' for day in columns['date'].tolist()))
+
+    def test_resume_after_interruption(self):
+        """测试写入中断后从检查点续传，不产生重复记录"""
+        original = ColumnarStore.write_batch
+        calls = []
+
+        def failing_write(store, collection, records):
+            calls.append(collection)
+            if len(calls) == 3:
+                raise OSError("磁盘已满")
+            return original(store, collection, records)
+
+        with patch.object(ColumnarStore, 'write_batch', failing_write):
+            with self.assertRaises(OSError):
+                MigrationService(self.source, self.target, batch_size=10).run()
+        self.assertFalse(ColumnarStore(self.target).is_built())
+
+        report = MigrationService(self.source, self.target, batch_size=10).run(resume=True)
+        self.assertTrue(report['resumed'])
+        self.assertEqual(report['collections']['macro_data']['resumed_from'], 20)
+        self.assertEqual(report['collections']['macro_data']['target_count'], 50)
+        self.assertTrue(report['verified'])
+
+    def test_resume_rejects_modified_source(self):
+        """测试中断后源文件被修改时拒绝续传"""
+        with patch.object(ColumnarStore, 'write_batch', side_effect=OSError("中断")):
+            with self.assertRaises(OSError):
+                MigrationService(self.source, self.target).run()
+
+        with open(self.source, 'a', encoding='utf-8') as f:
+            f.write('\n')
+        with self.assertRaises(ValueError):
+            MigrationService(self.source, self.target).run(resume=True)
+
+    def test_cli_reports_rate(self):
+        """测试命令行工具输出迁移速度"""
+        output = subprocess.run(
+            [sys.executable, os.path.join(PROJECT_ROOT, 'scripts', 'migrate_data.py'),
+             '--source', self.source, '--target', self.target, '--json'],
+            check=True, capture_output=True, text=True, cwd=self.temp_dir
+        ).stdout
+        report = json.loads(output.strip().splitlines()[-1])
+
+        self.assertTrue(report['verified'])
+        self.assertGreater(report['records_per_second'], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+参数优化服务单元测试
+"""
+
+import json
+import unittest
+from datetime import date, timedelta
+from pathlib import Path
+from unittest.mock import patch
+
+import numpy as np
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+
+from app.services import optimizer_service
+from app.services.indicator_service import IndicatorService
+from app.services.optimizer_service import OptimizerService, PARAM_NAMES, align_previous
+from app.services.timing_scorer import macro_scores
+
+TEMPLATE = json.loads((Path(__file__).resolve().parents[2] / 'config' / 'config.template.json')
+                      .read_text(encoding='utf-8'))
+
+
+def template_get(key, default=None):
+    value = TEMPLATE
+    for part in key.split('.'):
+        if not isinstance(value, dict) or part not in value:
+            return default
+        value = value[part]
+    return value
+
+
+class TestOptimizerService(unittest.TestCase):
+    """参数优化服务单元测试类"""
+
+    def setUp(self):
+        """测试前准备"""
+        patcher = patch('app.utils.config.config_manager.get', side_effect=template_get)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        rng = np.random.default_rng(7)
+        n = 600
+        self.dates = np.array([(date(2020, 1, 1) + timedelta(days=i)).isoformat() for i in range(n)])
+        self.inputs = {
+            'pmi': rng.uniform(44, 54, n), 'cpi': rng.uniform(0, 6, n),
+            'ppi': rng.uniform(-1, 5, n), 'm2': rng.uniform(6, 16, n),
+            'interest_rate': rng.uniform(1, 6, n),
+            'free_cash_flow': rng.uniform(-5, 15, n), 'industry_sentiment': rng.uniform(20, 80, n),
+            'volatility': rng.uniform(8, 35, n), 'investor_sentiment': rng.uniform(20, 90, n),
+            'technical_indicators.rsi': rng.uniform(20, 80, n),
+            'technical_indicators.macd': rng.uniform(-3, 3, n),
+            'technical_indicators.bollinger_bands': rng.uniform(-2, 2, n)
+        }
+        # 次日收益与前一日PMI正相关
+        returns = np.r_[0.0, (self.inputs['pmi'][:-1] - 49) * 0.002] + rng.normal(0, 0.002, n)
+        self.series = {'a_share': {'dates': list(self.dates), 'returns': list(returns)}}
+
+        self.optimizer_service = OptimizerService()
+
+    def _get_columns(self, collection, market, start_date, end_date, fields):
+        columns = {'date': self.dates}
+        columns.update({field: self.inputs[field] for field in fields})
+        return columns
+
+    def test_macro_scores_match_indicator_service(self):
+        """测试批量宏观评分与逐条计算一致"""
+        indicator_service = IndicatorService()
+        columns = {name: self.inputs[name][:50] for name in ('pmi', 'cpi', 'ppi', 'm2', 'interest_rate')}
+        batch = macro_scores(columns, template_get('timing_indicators.macro_indicators'))
+
+        for i in range(50):
+            record = {name: float(values[i]) for name, values in columns.items()}
+            self.assertAlmostEqual(batch[i], indicator_service._calculate_macro_score(record), places=6)
+
+    def test_align_previous(self):
+        """测试对齐只使用目标日期之前的数据，并对同日多条记录取平均"""
+        source_dates = np.array(['2024-01-01', '2024-01-01', '2024-01-03'])
+        columns = {'value': np.array([1.0, 3.0, 10.0])}
+        target = np.array(['2024-01-01', '2024-01-02', '2024-01-03', '2024-01-04'])
+
+        aligned = align_previous(source_dates, columns, ['value'], target)['value']
+        self.assertTrue(np.isnan(aligned[0]))
+        np.testing.assert_allclose(aligned[1:], [2.0, 2.0, 10.0])
+
+    def test_grid_search(self):
+        """测试网格搜索的候选数量和排序结果"""
+        grid = {
+            'weights.macro_fundamental': [0.2, 0.6, 1.0],
+            'pmi.threshold_good': [50, 52]
+        }
+        with patch.object(self.optimizer_service.data_service, 'get_columns', side_effect=self._get_columns):
+            result = self.optimizer_service.optimize({
+                'markets': ['a_share'], 'series': self.series,
+                'method': 'grid', 'grid': grid, 'folds': 3, 'workers': 1
+            })
+
+        # 6个网格点 + 当前配置
+        self.assertEqual(result['timings']['candidates'], 7)
+        self.assertEqual(len(result['walk_forward']), 3)
+        # 按训练窗口指标选择，测试窗口指标只随结果报告
+        self.assertGreaterEqual(result['suggestion']['train_metric'], result['current']['train_metric'])
+        train_metrics = [row['train_metric'] for row in result['ranking']]
+        self.assertEqual(train_metrics, sorted(train_metrics, reverse=True))
+        self.assertIn('test_metric', result['suggestion'])
+        self.assertIn('weights', result['suggestion']['params']['timing_indicators'])
+
+    def test_selection_ignores_test_windows(self):
+        """测试候选选择不受测试窗口指标影响"""
+        candidates = np.zeros((3, len(PARAM_NAMES)))
+        # (候选, 折, 训练/测试)：候选1训练最好，候选2测试最好
+        results = np.array([
+            [[0.1, 0.1]], [[0.9, -0.5]], [[0.2, 2.0]]
+        ])
+        ranking = self.optimizer_service._rank(candidates, results, [('a', 'b', 'c', 'd')], 3)
+        self.assertEqual([row['train_metric'] for row in ranking['ranking']], [0.9, 0.2, 0.1])
+        self.assertEqual(ranking['suggestion']['test_metric'], -0.5)
+
+    def test_candidate_limits(self):
+        """测试网格和随机搜索的候选数量上限"""
+        with patch.object(self.optimizer_service.data_service, 'get_columns', side_effect=self._get_columns):
+            with self.assertRaises(ValueError):
+                self.optimizer_service.optimize({
+                    'markets': ['a_share'], 'series': self.series, 'method': 'grid',
+                    'grid': {name: list(range(10)) for name in PARAM_NAMES[:5]}
+                })
+            with self.assertRaises(ValueError):
+                self.optimizer_service.optimize({
+                    'markets': ['a_share'], 'series': self.series, 'n_samples': 10 ** 9
+                })
+
+    def test_thresholds_never_coincide(self):
+        """测试spread不小于0.5或网格中好坏阈值相等时报错，合法的spread下阈值不会相等或交叉"""
+        with patch.object(self.optimizer_service.data_service, 'get_columns', side_effect=self._get_columns):
+            for spread in (0.5, 2.0, -0.1):
+                with self.assertRaises(ValueError):
+                    self.optimizer_service.optimize({
+                        'markets': ['a_share'], 'series': self.series, 'n_samples': 10, 'spread': spread
+                    })
+            with self.assertRaises(ValueError):
+                self.optimizer_service.optimize({
+                    'markets': ['a_share'], 'series': self.series, 'method': 'grid',
+                    'grid': {'pmi.threshold_good': [50, 52], 'pmi.threshold_bad': [50]}
+                })
+
+        candidates = self.optimizer_service._generate_candidates({'n_samples': 2000, 'seed': 0, 'spread': 0.49})
+        current = self.optimizer_service._current_params()
+        for i in range(len(optimizer_service.WEIGHT_NAMES), len(PARAM_NAMES), 2):
+            direction = np.sign(current[i] - current[i + 1])
+            self.assertTrue(np.all(np.sign(candidates[:, i] - candidates[:, i + 1]) == direction))
+
+    def test_invalid_grid_parameter(self):
+        """测试未知的搜索参数"""
+        with patch.object(self.optimizer_service.data_service, 'get_columns', side_effect=self._get_columns):
+            with self.assertRaises(ValueError):
+                self.optimizer_service.optimize({
+                    'markets': ['a_share'], 'series': self.series,
+                    'method': 'grid', 'grid': {'unknown.param': [1]}
+                })
+
+    def test_parallel_matches_serial(self):
+        """测试进程池并行评估与单进程结果一致"""
+        request = {'markets': ['a_share'], 'series': self.series, 'n_samples': 40, 'seed': 3, 'folds': 2}
+
+        settings = {'optimizer.chunk_size': 16, 'optimizer.process_pool': True, 'optimizer.max_workers': 2}
+
+        with patch.object(self.optimizer_service.data_service, 'get_columns', side_effect=self._get_columns), \
+                patch('app.services.optimizer_service.config_manager.get',
+                      side_effect=lambda key, default=None: settings.get(key, template_get(key, default))):
+            serial = self.optimizer_service.optimize(dict(request, workers=1))
+            parallel = self.optimizer_service.optimize(request)
+            pool = optimizer_service._pool
+            again = self.optimizer_service.optimize(request)
+
+        self.addCleanup(optimizer_service._reset_pool)
+        self.assertEqual(parallel['timings']['workers'], 2)
+        self.assertEqual(parallel['timings']['chunks'], 3)
+        self.assertEqual(serial['ranking'], parallel['ranking'])
+        # 进程池在请求之间复用
+        self.assertIsNotNone(pool)
+        self.assertIs(optimizer_service._pool, pool)
+        self.assertEqual(again['ranking'], parallel['ranking'])
+        self.assertEqual(len(PARAM_NAMES), 13)
+
+
+if __name__ == '__main__':
+    unittest.main()
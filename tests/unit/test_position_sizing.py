@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+仓位曲线单元测试
+"""
+
+import unittest
+from unittest.mock import patch
+
+import numpy as np
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+
+from app.services.indicator_service import IndicatorService
+from app.services.position_sizing import PositionCurve, get_position_curve
+
+THRESHOLDS = {'very_strong': 80, 'strong': 60, 'neutral': 40, 'weak': 20, 'very_weak': 0}
+POSITION_SIZES = {'very_strong': 80, 'strong': 60, 'neutral': 30, 'weak': 10, 'very_weak': 0}
+
+
+def _legacy_sizing(score, capital, risk, thresholds, position_sizes):
+    """原有的逐条计算规则"""
+    if score >= thresholds.get('very_strong', 80):
+        level = 'very_strong'
+    elif score >= thresholds.get('strong', 60):
+        level = 'strong'
+    elif score >= thresholds.get('neutral', 40):
+        level = 'neutral'
+    elif score >= thresholds.get('weak', 20):
+        level = 'weak'
+    else:
+        level = 'very_weak'
+    percentage = position_sizes.get(level, 0)
+    return level, percentage, round((percentage / 100) * capital, 2), round((risk / 100) * capital, 2)
+
+
+class TestPositionSizing(unittest.TestCase):
+    """仓位曲线单元测试类"""
+
+    def setUp(self):
+        """测试前准备"""
+        self.settings = {
+            'position_sizing.scoring_thresholds': dict(THRESHOLDS),
+            'position_sizing.position_sizes': dict(POSITION_SIZES)
+        }
+        patcher = patch('app.services.position_sizing.config_manager.get',
+                        side_effect=lambda key, default=None: self.settings.get(key, default))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.indicator_service = IndicatorService()
+
+    def test_curve_matches_legacy_rules(self):
+        """测试曲线与原有逐条计算规则一致（含阈值边界和非递增阈值）"""
+        rng = np.random.default_rng(7)
+        scores = np.concatenate([rng.uniform(0, 100, 500), [0, 19.99, 20, 40, 60, 79.99, 80, 100]])
+        capitals = rng.uniform(1000, 1e7, len(scores)).round(2)
+
+        for thresholds in (THRESHOLDS, {'very_strong': 50, 'strong': 70, 'neutral': 40, 'weak': 20}):
+            curve = PositionCurve(thresholds, POSITION_SIZES)
+            indices, amounts, risk_amounts = curve.size(scores, capitals, 2)
+            for score, capital, index, amount, risk_amount in zip(scores, capitals, indices, amounts, risk_amounts):
+                level, percentage, expected_amount, expected_risk = _legacy_sizing(
+                    score, capital, 2, thresholds, POSITION_SIZES
+                )
+                self.assertEqual(curve.percentages[index], percentage)
+                self.assertAlmostEqual(amount, expected_amount, places=2)
+                self.assertAlmostEqual(risk_amount, expected_risk, places=2)
+
+    def test_curve_cached_per_config(self):
+        """测试配置不变时复用曲线，修改配置后重新计算"""
+        curve = get_position_curve()
+        self.assertIs(get_position_curve(), curve)
+
+        self.settings['position_sizing.position_sizes'] = dict(POSITION_SIZES, strong=50)
+        updated = get_position_curve()
+        self.assertIsNot(updated, curve)
+        self.assertEqual(self.indicator_service.calculate_position_sizing({
+            'market': 'a_share', 'date': '2024-01-15', 'timing_score': 65
+        })['position_percentage'], 50)
+
+    def test_chart_data_matches_single_calculation(self):
+        """测试仓位图表与逐个评分调用calculate_position_sizing的结果一致"""
+        with patch.object(self.indicator_service, 'get_latest_indicators',
+                          return_value={'a_share': {'overall_score': 66.0}}):
+            chart = self.indicator_service.get_position_sizing_chart_data('a_share', '2024-01-15', 250000)
+
+        self.assertEqual(chart['current_score'], 66.0)
+        self.assertEqual(list(chart['position_data']), [str(score) for score in range(0, 101, 10)])
+        for score, point in chart['position_data'].items():
+            expected = self.indicator_service.calculate_position_sizing({
+                'market': 'a_share', 'date': '2024-01-15', 'timing_score': int(score),
+                'available_capital': 250000
+            })
+            point.pop('calculated_at')
+            expected.pop('calculated_at')
+            self.assertEqual(point, expected)
+
+    def test_batch(self):
+        """测试批量计算：组合未提供的字段取外层字段或默认值，结果与单条计算一致"""
+        portfolios = [
+            {'timing_score': 78, 'available_capital': 100000},
+            {'timing_score': 78, 'available_capital': 5000000},
+            {'timing_score': 42, 'risk_per_trade_percentage': 1},
+            {'timing_score': 10}
+        ]
+        result = self.indicator_service.calculate_position_sizing_batch({
+            'market': 'a_share', 'date': '2024-01-15', 'portfolios': portfolios,
+            'available_capital': 200000
+        })
+
+        self.assertEqual(result['count'], 4)
+        for portfolio, row in zip(portfolios, result['results']):
+            single = self.indicator_service.calculate_position_sizing(
+                dict({'market': 'a_share', 'date': '2024-01-15', 'available_capital': 200000}, **portfolio)
+            )
+            for key in ('strength_level', 'position_percentage', 'position_amount', 'available_capital',
+                        'risk_per_trade_percentage', 'risk_amount'):
+                self.assertEqual(row[key], single[key], key)
+        self.assertEqual(result['results'][1]['position_amount'], 3000000.0)
+        self.assertEqual(result['results'][3]['position_amount'], 0.0)
+
+    def test_batch_route(self):
+        """测试批量仓位接口及其验证错误"""
+        from app import create_app
+        with patch('app.init_config', return_value=True):
+            client = create_app().test_client()
+
+        response = client.post('/api/analysis/position-sizing/batch', json={
+            'market': 'a_share', 'date': '2024-01-15',
+            'portfolios': [{'timing_score': '85', 'available_capital': 1000}, {'timing_score': 30}]
+        })
+        self.assertEqual(response.status_code, 200)
+        data = response.get_json()['data']
+        self.assertEqual([row['position_amount'] for row in data['results']], [800.0, 10000.0])
+
+        response = client.post('/api/analysis/position-sizing/batch', json={
+            'market': 'a_share', 'date': '2024-01-15',
+            'portfolios': [{'timing_score': 50}, {'timing_score': 150}]
+        })
+        self.assertEqual(response.status_code, 400)
+        self.assertTrue(response.get_json()['error'].startswith('第2条记录字段 timing_score 无效'))
+
+        response = client.post('/api/analysis/position-sizing/batch', json={
+            'market': 'a_share', 'date': '2024-01-15', 'portfolios': []
+        })
+        self.assertEqual(response.status_code, 400)
+
+
+if __name__ == '__main__':
+    unittest.main()
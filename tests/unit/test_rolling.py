@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+滚动窗口统计单元测试
+"""
+
+import unittest
+
+import numpy as np
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+
+from app.utils.calculations import lttb_downsample, smooth_data
+from app.utils.rolling import (
+    RollingWindow, EWMA, RollingCorrelation,
+    rolling_mean, rolling_std, rolling_zscore, rolling_min, rolling_max, ewma, rolling_correlation
+)
+
+
+class TestRolling(unittest.TestCase):
+    """滚动窗口统计单元测试类"""
+
+    def setUp(self):
+        """测试前准备"""
+        rng = np.random.default_rng(0)
+        self.x = rng.normal(100, 5, 500)
+        self.y = 0.5 * self.x + rng.normal(0, 3, 500)
+        self.window = 20
+
+    def test_streaming_matches_batch(self):
+        """测试流式统计与批量计算一致"""
+        stats = RollingWindow(self.window)
+        correlation = RollingCorrelation(self.window)
+        average = EWMA(span=10)
+
+        streamed = {'mean': [], 'std': [], 'min': [], 'max': [], 'zscore': [], 'corr': [], 'ewma': []}
+        for x, y in zip(self.x, self.y):
+            stats.update(x)
+            correlation.update(x, y)
+            streamed['mean'].append(stats.mean)
+            streamed['std'].append(stats.std)
+            streamed['min'].append(stats.min)
+            streamed['max'].append(stats.max)
+            streamed['zscore'].append(stats.zscore(x))
+            streamed['corr'].append(correlation.correlation)
+            streamed['ewma'].append(average.update(x))
+
+        np.testing.assert_allclose(rolling_mean(self.x, self.window), streamed['mean'])
+        np.testing.assert_allclose(rolling_std(self.x, self.window)[1:], streamed['std'][1:])
+        np.testing.assert_array_equal(rolling_min(self.x, self.window), streamed['min'])
+        np.testing.assert_array_equal(rolling_max(self.x, self.window), streamed['max'])
+        np.testing.assert_allclose(rolling_zscore(self.x, self.window), streamed['zscore'], atol=1e-9)
+        np.testing.assert_allclose(rolling_correlation(self.x, self.y, self.window), streamed['corr'], atol=1e-9)
+        np.testing.assert_allclose(ewma(self.x, span=10), streamed['ewma'])
+
+    def test_batch_matches_direct_computation(self):
+        """测试批量结果与逐窗口直接计算一致"""
+        i = 250
+        window_data = self.x[i - self.window + 1:i + 1]
+
+        self.assertAlmostEqual(rolling_mean(self.x, self.window)[i], window_data.mean())
+        self.assertAlmostEqual(rolling_std(self.x, self.window)[i], window_data.std(ddof=1))
+        self.assertAlmostEqual(
+            rolling_correlation(self.x, self.y, self.window)[i],
+            np.corrcoef(window_data, self.y[i - self.window + 1:i + 1])[0, 1]
+        )
+
+    def test_constant_series(self):
+        """测试常数序列的标准分和相关系数为0"""
+        constant = np.full(50, 3.7)
+        np.testing.assert_array_equal(rolling_zscore(constant, 5), np.zeros(50))
+        np.testing.assert_array_equal(rolling_correlation(constant, np.arange(50), 5), np.zeros(50))
+
+    def test_invalid_window(self):
+        """测试批量函数的窗口小于1时抛出ValueError"""
+        for function in (rolling_mean, rolling_std, rolling_zscore, rolling_min, rolling_max):
+            for window in (0, -3):
+                with self.assertRaises(ValueError):
+                    function(self.x, window)
+        with self.assertRaises(ValueError):
+            rolling_correlation(self.x, self.y, 0)
+        np.testing.assert_allclose(rolling_mean(self.x[:5], 1), self.x[:5])
+
+    def test_long_ewma_is_stable(self):
+        """测试小alpha、长序列的分块EWMA没有精度损失"""
+        values = np.random.default_rng(1).normal(0, 1, 20000)
+        average = EWMA(alpha=0.001)
+        expected = [average.update(value) for value in values]
+        np.testing.assert_allclose(ewma(values, alpha=0.001), expected, atol=1e-9)
+
+    def test_smooth_data(self):
+        """测试移动平均平滑保持原有行为"""
+        self.assertEqual(smooth_data([1, 2, 3, 4, 5], 3), [1.0, 1.5, 2.0, 3.0, 4.0])
+        self.assertEqual(smooth_data([1, 2], 3), [1, 2])
+
+
+    def test_lttb_keeps_last_point(self):
+        """测试保留点数不足3时LTTB仍保留最新的末尾点"""
+        x = np.arange(10)
+        self.assertEqual(lttb_downsample(x, x * 2.0, 1).tolist(), [9])
+        self.assertEqual(lttb_downsample(x, x * 2.0, 2).tolist(), [0, 9])
+        self.assertEqual(lttb_downsample(x, x * 2.0, 3)[[0, -1]].tolist(), [0, 9])
+
+
+if __name__ == '__main__':
+    unittest.main()
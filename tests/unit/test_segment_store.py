@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+分段存储单元测试
+"""
+
+import unittest
+import tempfile
+import shutil
+import threading
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+
+from app.services.segment_store import SegmentStore
+
+
+class TestSegmentStore(unittest.TestCase):
+    """分段存储单元测试类"""
+
+    def setUp(self):
+        """测试前准备"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.store = SegmentStore(os.path.join(self.temp_dir, 'application_data.seg'))
+        self.data = {
+            "macro_data": [
+                {"id": f"macro_{market}_{day}", "date": f"2024-01-{day:02d}", "market": market,
+                 "pmi": 45.0 + day, "other_macro": {"note": "宏观"}}
+                for market in ("nasdaq", "a_share")
+                for day in range(10, 0, -1)
+            ],
+            "ai_analysis": [
+                {"id": "ai_1", "date": "2024-01-05", "market": "a_share", "ai_analysis": "市场整体表现积极"}
+            ],
+            "metadata": {"created_at": "2024-01-01T00:00:00"}
+        }
+        self.store.build(self.data, (1, 2))
+
+    def tearDown(self):
+        """测试后清理"""
+        shutil.rmtree(self.temp_dir)
+
+    def test_is_fresh(self):
+        """测试源文件标识校验"""
+        self.assertTrue(self.store.is_fresh((1, 2)))
+        self.assertFalse(self.store.is_fresh((1, 3)))
+        self.assertFalse(SegmentStore(os.path.join(self.temp_dir, 'missing.seg')).is_fresh((1, 2)))
+
+    def test_read_records_by_market_and_date(self):
+        """测试按市场和日期范围读取记录"""
+        records = self.store.read_records("a_share", "a_share")
+        self.assertEqual(records, [])
+
+        records = self.store.read_records("macro_data", "a_share", "2024-01-03", "2024-01-05")
+        self.assertEqual([r["date"] for r in records], ["2024-01-03", "2024-01-04", "2024-01-05"])
+        self.assertTrue(all(r["market"] == "a_share" for r in records))
+        self.assertEqual(records[0]["other_macro"], {"note": "宏观"})
+
+    def test_read_columns(self):
+        """测试读取定长数值列"""
+        columns = self.store.read_columns("macro_data", "nasdaq", end_date="2024-01-02", fields=["pmi"])
+
+        self.assertEqual(columns["date"].tolist(), [b"2024-01-01", b"2024-01-02"])
+        self.assertEqual(columns["pmi"].tolist(), [46.0, 47.0])
+
+    def test_iter_records_desc(self):
+        """测试按 (日期, ID) 倒序读取，游标当日只返回ID更小的记录"""
+        self.data["macro_data"].append(
+            {"id": "macro_a_share_5b", "date": "2024-01-05", "market": "a_share", "pmi": 1.0}
+        )
+        self.store.build(self.data, (9, 9))
+
+        records = self.store.iter_records_desc("macro_data", "a_share", "2024-01-02", "2024-01-08",
+                                               before=("2024-01-05", "macro_a_share_5b"))
+        self.assertEqual([r["id"] for r in records],
+                         ["macro_a_share_5", "macro_a_share_4", "macro_a_share_3", "macro_a_share_2"])
+        records = self.store.iter_records_desc("macro_data", "nasdaq", start_date="2024-01-09")
+        self.assertEqual([r["date"] for r in records], ["2024-01-10", "2024-01-09"])
+        self.assertEqual(list(self.store.iter_records_desc("macro_data", "hong_kong")), [])
+
+    def test_rebuild_replaces_segment(self):
+        """测试重建后读取新内容"""
+        self.data["ai_analysis"].append(
+            {"id": "ai_2", "date": "2024-01-06", "market": "a_share", "ai_analysis": "谨慎"}
+        )
+        self.store.build(self.data, (3, 4))
+
+        self.assertTrue(self.store.is_fresh((3, 4)))
+        self.assertEqual(len(self.store.read_records("ai_analysis", "a_share")), 2)
+
+    def test_concurrent_builds(self):
+        """测试多个写入方同时重建时各自使用独立的临时文件，结果完整且不残留临时文件"""
+        threads = [threading.Thread(target=self.store.build, args=(self.data, (7, 8))) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertTrue(self.store.is_fresh((7, 8)))
+        self.assertEqual(len(self.store.read_records("macro_data", "nasdaq")), 10)
+        self.assertEqual(os.listdir(self.temp_dir), ["application_data.seg"])
+
+    def test_read_latest(self):
+        """测试按市场索引读取各市场最新记录，同日期取ID最大、ID相同时取靠前的记录"""
+        self.data["macro_data"] += [
+            {"id": "macro_nasdaq_9", "date": "2024-01-10", "market": "nasdaq", "pmi": 1.0},
+            {"id": "macro_nasdaq_9", "date": "2024-01-10", "market": "nasdaq", "pmi": 2.0}
+        ]
+        self.store.build(self.data, (5, 6))
+
+        latest = self.store.read_latest("macro_data", ["a_share", "nasdaq", "hong_kong"])
+        self.assertEqual(set(latest), {"a_share", "nasdaq"})
+        self.assertEqual(latest["a_share"]["id"], "macro_a_share_10")
+        self.assertEqual(latest["nasdaq"]["id"], "macro_nasdaq_9")
+        self.assertEqual(latest["nasdaq"]["pmi"], 1.0)
+        self.assertEqual(self.store.read_latest("timing_indicators", ["a_share"]), {})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+生产环境服务入口与跨进程写锁单元测试
+"""
+
+import json
+import multiprocessing
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+
+from app import server
+from app.utils.config import config_manager
+
+
+def _concurrent_writer(data_file: str, worker: int, count: int):
+    """子进程：连续写入宏观数据"""
+    config_manager.set('database.file_path', data_file)
+    config_manager.set('database.blob_enabled', False)
+    from app.services.data_service import DataService
+    data_service = DataService()
+    for i in range(count):
+        data_service.save_macro_data({'date': f"2024-01-{i + 1:02d}", 'market': f"market_{worker}", 'pmi': 50.0})
+
+
+class TestServer(unittest.TestCase):
+    """生产环境服务入口单元测试类"""
+
+    def setUp(self):
+        """测试前准备"""
+        self.settings = {
+            'server.host': '127.0.0.1',
+            'server.port': 8000,
+            'server.workers': 0,
+            'server.threads': 1,
+            'server.max_requests': 500
+        }
+        patcher = patch('app.server.config_manager.get',
+                        side_effect=lambda key, default=None: self.settings.get(key, default))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_gunicorn_options_from_config(self):
+        """测试由server.*配置生成gunicorn设置，命令行参数优先"""
+        options = server.gunicorn_options()
+        self.assertEqual(options['bind'], '127.0.0.1:8000')
+        self.assertEqual(options['workers'], 2 * (os.cpu_count() or 1) + 1)
+        self.assertEqual(options['worker_class'], 'sync')
+        self.assertEqual(options['max_requests'], 500)
+        self.assertTrue(options['preload_app'])
+
+        options = server.gunicorn_options(port=9000, workers=3, threads=8)
+        self.assertEqual(options['bind'], '127.0.0.1:9000')
+        self.assertEqual((options['workers'], options['threads'], options['worker_class']), (3, 8, 'gthread'))
+
+        config = server.render_gunicorn_config(options)
+        namespace = {}
+        exec(config, namespace)
+        self.assertEqual(namespace['workers'], 3)
+        self.assertIs(namespace['post_fork'], server.post_fork)
+
+        with self.assertRaises(ValueError):
+            server.resolve_backend('uwsgi')
+
+    def test_app_loaded_per_preload_setting(self):
+        """测试主进程不创建应用，由preload_app决定是否预加载共享状态"""
+        with patch('app.server.init_config', return_value=True), \
+                patch('app.server.resolve_backend', return_value='gunicorn'), \
+                patch('app.server.run_gunicorn') as run, \
+                patch('app.create_app') as create_app:
+            self.assertEqual(server.main([]), 0)
+        create_app.assert_not_called()
+        self.assertTrue(run.call_args[0][0]['preload_app'])
+
+        for preload in (True, False):
+            with patch('app.create_app') as create_app, patch('app.server.preload_state') as preload_state:
+                self.assertIs(server.load_app(preload), create_app.return_value)
+            self.assertEqual(preload_state.called, preload)
+
+
+class TestConcurrentWriters(unittest.TestCase):
+    """跨进程写锁单元测试类"""
+
+    def test_concurrent_writers_keep_all_records(self):
+        """测试多个进程并发写入同一数据文件时不丢失更新"""
+        temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, temp_dir)
+        data_file = str(Path(temp_dir) / 'application_data.json')
+
+        context = multiprocessing.get_context('fork')
+        processes = [context.Process(target=_concurrent_writer, args=(data_file, worker, 15))
+                     for worker in range(4)]
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join(60)
+            self.assertEqual(process.exitcode, 0)
+
+        with open(data_file, 'r', encoding='utf-8') as f:
+            records = json.load(f)['macro_data']
+        self.assertEqual(len(records), 60)
+        for worker in range(4):
+            self.assertEqual(sum(1 for r in records if r['market'] == f"market_{worker}"), 15)
+
+
+if __name__ == '__main__':
+    unittest.main()
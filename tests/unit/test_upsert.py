@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+按自然键去重保存单元测试
+"""
+
+import json
+import shutil
+import tempfile
+import unittest
+from datetime import datetime
+from pathlib import Path
+from unittest.mock import patch
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+
+from app.services import key_index
+from app.services.data_service import DataService
+
+
+class TestUpsert(unittest.TestCase):
+    """按自然键去重保存单元测试类"""
+
+    def setUp(self):
+        """测试前准备"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.temp_dir)
+        self.data_file = Path(self.temp_dir) / 'data.json'
+        self.settings = {
+            'database.file_path': str(self.data_file),
+            'database.blob_enabled': False,
+            'database.columnar_enabled': True,
+            'database.columnar_path': str(Path(self.temp_dir) / 'columnar'),
+            'stream.enabled': False
+        }
+        patcher = patch('app.services.data_service.config_manager.get',
+                        side_effect=lambda key, default=None: self.settings.get(key, default))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.data_service = DataService()
+
+    def _stored(self, collection):
+        with open(self.data_file, 'r', encoding='utf-8') as f:
+            return json.load(f)[collection]
+
+    def _revision_lines(self):
+        path = self.data_file.with_suffix('.revisions.jsonl')
+        if not path.exists():
+            return []
+        with open(path, 'r', encoding='utf-8') as f:
+            return [json.loads(line) for line in f]
+
+    def test_resubmission_replaces_record(self):
+        """测试同一市场、日期再次提交时替换原记录，原版本进入修订历史"""
+        first = self.data_service.save_macro_data({"date": "2024-01-15", "market": "a_share", "pmi": 50.5,
+                                                   "cpi": 2.1})
+        second = self.data_service.save_macro_data({"date": "2024-01-15", "market": "a_share", "pmi": 50.8})
+        self.data_service.save_macro_data({"date": "2024-01-15", "market": "nasdaq", "pmi": 49.0})
+
+        self.assertEqual(second['id'], first['id'])
+        self.assertEqual(second['created_at'], first['created_at'])
+        self.assertEqual(second['revision'], 2)
+        self.assertIn('updated_at', second)
+
+        stored = self._stored('macro_data')
+        self.assertEqual(len(stored), 2)
+        records = self.data_service.get_macro_data('a_share')
+        self.assertEqual(len(records), 1)
+        self.assertEqual(records[0]['pmi'], 50.8)
+        self.assertNotIn('cpi', records[0])
+
+        columns = self.data_service.get_columns('macro_data', 'a_share', fields=['pmi'])
+        self.assertEqual(columns['pmi'].tolist(), [50.8])
+
+        revisions = self.data_service.get_revisions('macro_data', 'a_share', '2024-01-15')
+        self.assertEqual(revisions['current']['pmi'], 50.8)
+        self.assertEqual(len(revisions['revisions']), 1)
+        self.assertEqual(revisions['revisions'][0]['record']['pmi'], 50.5)
+        self.assertEqual(revisions['revisions'][0]['key'], ['a_share', '2024-01-15'])
+
+    def test_industry_key_and_batch(self):
+        """测试行业数据的键包含行业，批量保存时批内与已有记录的重复都被合并"""
+        self.data_service.save_industry_data({"date": "2024-01-15", "market": "a_share", "industry": "technology",
+                                              "industry_sentiment": 60})
+        saved = self.data_service.save_batch('industry_data', [
+            {"date": "2024-01-15", "market": "a_share", "industry": "healthcare", "industry_sentiment": 50},
+            {"date": "2024-01-15", "market": "a_share", "industry": "technology", "industry_sentiment": 65},
+            {"date": "2024-01-15", "market": "a_share", "industry": "technology", "industry_sentiment": 70}
+        ])
+
+        self.assertEqual([r['revision'] for r in saved if r['industry'] == 'technology'], [2, 3])
+        stored = self._stored('industry_data')
+        self.assertEqual(sorted((r['industry'], r['industry_sentiment']) for r in stored),
+                         [('healthcare', 50), ('technology', 70)])
+        self.assertEqual(len(self._revision_lines()), 2)
+
+        columns = self.data_service.get_columns('industry_data', 'a_share', fields=['industry_sentiment'])
+        self.assertEqual(sorted(columns['industry_sentiment'].tolist()), [50.0, 70.0])
+
+        with self.assertRaises(ValueError):
+            self.data_service.get_revisions('industry_data', 'a_share', '2024-01-15')
+
+    def test_timing_indicators(self):
+        """测试择时指标按市场、日期去重"""
+        for score in (60.0, 62.5):
+            self.data_service.save_timing_indicators({"market": "a_share", "date": "2024-01-15",
+                                                      "overall_score": score})
+        records = self.data_service.get_timing_indicators('a_share')
+        self.assertEqual(len(records), 1)
+        self.assertEqual(records[0]['overall_score'], 62.5)
+        columns = self.data_service.get_columns('timing_indicators', 'a_share', fields=['overall_score'])
+        self.assertEqual(columns['overall_score'].tolist(), [62.5])
+
+    def test_storage_scales_with_distinct_keys(self):
+        """测试反复提交时存储只随不同的日期增长，索引在本进程保存之间复用"""
+        with patch('app.services.data_service.build_positions', wraps=key_index.build_positions) as build:
+            for round_ in range(5):
+                for day in range(1, 11):
+                    self.data_service.save_market_sentiment({"date": f"2024-01-{day:02d}", "market": "a_share",
+                                                             "volatility": 10 + round_})
+        self.assertEqual(len(self._stored('market_sentiment')), 10)
+        self.assertEqual(build.call_count, 0)
+        self.assertEqual({r['revision'] for r in self._stored('market_sentiment')}, {5})
+
+    def test_external_modification_rebuilds_index(self):
+        """测试数据文件被其他进程修改后按文件内容重建索引"""
+        self.data_service.save_macro_data({"date": "2024-01-15", "market": "a_share", "pmi": 50.0})
+
+        data = json.loads(self.data_file.read_text(encoding='utf-8'))
+        data['macro_data'].insert(0, {"id": "external", "date": "2024-01-10", "market": "a_share", "pmi": 48.0})
+        self.data_file.write_text(json.dumps(data), encoding='utf-8')
+
+        saved = self.data_service.save_macro_data({"date": "2024-01-15", "market": "a_share", "pmi": 51.0})
+        self.assertEqual(saved['revision'], 2)
+        self.assertEqual(sorted(r['pmi'] for r in self._stored('macro_data')), [48.0, 51.0])
+
+    def test_upsert_disabled(self):
+        """测试关闭去重时保持追加"""
+        self.settings['database.upsert_enabled'] = False
+        data_service = DataService()
+        for pmi in (50.0, 51.0):
+            data_service.save_macro_data({"date": "2024-01-15", "market": "a_share", "pmi": pmi})
+        self.assertEqual(len(self._stored('macro_data')), 2)
+        self.assertEqual(self._revision_lines(), [])
+
+    def test_deduplicate_records(self):
+        """测试合并启用去重之前保存的重复记录"""
+        data = json.loads(self.data_file.read_text(encoding='utf-8'))
+        data['macro_data'] = [
+            {"id": "m1", "date": "2024-01-15", "market": "a_share", "pmi": 50.0},
+            {"id": "m2", "date": "2024-01-16", "market": "a_share", "pmi": 50.2},
+            {"id": "m3", "date": "2024-01-15", "market": "a_share", "pmi": 50.5},
+            {"id": "m4", "date": "2024-01-15", "market": "a_share", "pmi": 50.8}
+        ]
+        self.data_file.write_text(json.dumps(data), encoding='utf-8')
+
+        self.assertEqual(self.data_service.deduplicate_records(), {'macro_data': 2})
+        stored = self._stored('macro_data')
+        self.assertEqual([r['id'] for r in stored], ['m2', 'm4'])
+        self.assertEqual(stored[1]['revision'], 3)
+        self.assertEqual([line['record']['id'] for line in self._revision_lines()], ['m1', 'm3'])
+        self.assertEqual(self.data_service.deduplicate_records(), {})
+
+        columns = self.data_service.get_columns('macro_data', 'a_share', fields=['pmi'])
+        self.assertEqual(columns['pmi'].tolist(), [50.8, 50.2])
+
+    def test_ids_unique_within_same_second(self):
+        """测试同一秒内多次保存的ID不重复，替换其中一条时列式存储不会丢失其他日期"""
+        fixed = datetime(2026, 1, 5, 9, 30, 0)
+        with patch('app.services.data_service.datetime') as mock_datetime:
+            mock_datetime.now.return_value = fixed
+            first = self.data_service.save_macro_data({"date": "2024-01-01", "market": "a_share", "pmi": 50.0})
+            second = self.data_service.save_macro_data({"date": "2024-01-02", "market": "a_share", "pmi": 51.0})
+            self.assertNotEqual(first['id'], second['id'])
+            self.data_service.save_macro_data({"date": "2024-01-01", "market": "a_share", "pmi": 52.0})
+
+        columns = self.data_service.get_columns('macro_data', 'a_share', fields=['pmi'])
+        self.assertEqual(columns['date'].tolist(), ['2024-01-01', '2024-01-02'])
+        self.assertEqual(columns['pmi'].tolist(), [52.0, 51.0])
+
+    def test_batch_ids_keep_order(self):
+        """测试批量保存的ID序号补零，字典序与保存顺序一致"""
+        saved = self.data_service.save_batch('macro_data', [
+            {"date": f"2024-02-{day:02d}", "market": "a_share", "pmi": 50.0} for day in range(1, 13)
+        ])
+        ids = [record['id'] for record in saved]
+        self.assertEqual(len(set(ids)), 12)
+        self.assertEqual(sorted(ids), ids)
+
+    def test_deduplicate_reassigns_shared_ids(self):
+        """测试合并重复记录时为共用ID的不同自然键记录重新生成ID"""
+        data = json.loads(self.data_file.read_text(encoding='utf-8'))
+        data['macro_data'] = [
+            {"id": "macro_20240101_093000", "date": "2024-01-01", "market": "a_share", "pmi": 50.0},
+            {"id": "macro_20240101_093000", "date": "2024-01-02", "market": "a_share", "pmi": 51.0}
+        ]
+        self.data_file.write_text(json.dumps(data), encoding='utf-8')
+
+        self.assertEqual(self.data_service.deduplicate_records(), {})
+        stored = self._stored('macro_data')
+        self.assertEqual(stored[0]['id'], 'macro_20240101_093000')
+        self.assertNotEqual(stored[1]['id'], stored[0]['id'])
+        self.assertTrue(stored[1]['id'].startswith('macro_'))
+
+        self.data_service.save_macro_data({"date": "2024-01-01", "market": "a_share", "pmi": 52.0})
+        columns = self.data_service.get_columns('macro_data', 'a_share', fields=['pmi'])
+        self.assertEqual(columns['pmi'].tolist(), [52.0, 51.0])
+
+    def test_revisions_route(self):
+        """测试修订历史接口"""
+        from app import create_app
+        with patch('app.init_config', return_value=True):
+            client = create_app().test_client()
+
+        for pmi in (50.0, 50.4):
+            self.data_service.save_macro_data({"date": "2024-01-15", "market": "a_share", "pmi": pmi})
+
+        response = client.get('/api/data/revisions?collection=macro_data&market=a_share&date=2024-01-15')
+        self.assertEqual(response.status_code, 200)
+        body = response.get_json()
+        self.assertEqual(body['count'], 1)
+        self.assertEqual(body['data']['current']['pmi'], 50.4)
+
+        self.assertEqual(client.get('/api/data/revisions?collection=ai_analysis&date=2024-01-15').status_code, 400)
+        self.assertEqual(client.get('/api/data/revisions?collection=macro_data').status_code, 400)
+
+
+if __name__ == '__main__':
+    unittest.main()
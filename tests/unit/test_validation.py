@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+请求数据验证单元测试
+"""
+
+import json
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+
+from app.models import (
+    MacroData, MarketSentiment, IndustryData, PositionSizingRequest, RequestValidationError,
+    validate_record, validate_records
+)
+from app.services.data_service import DataService
+
+
+class TestValidation(unittest.TestCase):
+    """模型验证器单元测试类"""
+
+    def test_validate_record_coerces_and_keeps_extra_fields(self):
+        """测试按字段类型转换，只返回提供的字段，保留未声明的字段"""
+        record = validate_record(MacroData, {"date": "2024-01-15", "market": "a_share", "pmi": "50.5",
+                                             "cpi": 2, "source": "manual"})
+        self.assertEqual(record, {"date": "2024-01-15", "market": "a_share", "pmi": 50.5,
+                                  "cpi": 2.0, "source": "manual"})
+        self.assertIsInstance(record["cpi"], float)
+
+    def test_validate_record_errors(self):
+        """测试缺少字段、类型不符和非对象输入的错误信息"""
+        with self.assertRaises(RequestValidationError) as ctx:
+            validate_record(IndustryData, {"date": "2024-01-15", "market": "a_share"})
+        self.assertEqual(str(ctx.exception), "缺少必需字段: industry")
+        self.assertEqual(ctx.exception.errors[0]["loc"], ("industry",))
+
+        with self.assertRaises(RequestValidationError) as ctx:
+            validate_record(MacroData, {"date": "2024-01-15", "market": "a_share", "pmi": "abc"})
+        self.assertTrue(str(ctx.exception).startswith("字段 pmi 无效"))
+
+        # 指数类字段限定取值范围
+        for model, field, value in ((MacroData, "pmi", 200), (MarketSentiment, "volatility", -1),
+                                    (MarketSentiment, "investor_sentiment", 101),
+                                    (IndustryData, "industry_sentiment", -5)):
+            record = {"date": "2024-01-15", "market": "a_share", "industry": "technology", field: value}
+            with self.assertRaises(RequestValidationError) as ctx:
+                validate_record(model, record)
+            self.assertTrue(str(ctx.exception).startswith(f"字段 {field} 无效"))
+
+        with self.assertRaises(RequestValidationError) as ctx:
+            validate_record(PositionSizingRequest, None)
+        self.assertTrue(str(ctx.exception).startswith("请求数据格式无效"))
+
+        # 仍是ValueError，服务层原有的异常处理保持不变
+        self.assertIsInstance(ctx.exception, ValueError)
+
+    def test_validate_records_batch(self):
+        """测试批量验证：一次返回全部记录，错误信息指出第几条记录"""
+        records = [{"date": f"2024-01-{day:02d}", "market": "a_share", "pmi": str(50 + day)}
+                   for day in range(1, 11)]
+        validated = validate_records(MacroData, records)
+        self.assertEqual([r["pmi"] for r in validated], [float(50 + day) for day in range(1, 11)])
+
+        records[6] = {"date": "2024-01-07"}
+        with self.assertRaises(RequestValidationError) as ctx:
+            validate_records(MacroData, records)
+        self.assertEqual(str(ctx.exception), "第7条记录缺少必需字段: market")
+
+        with self.assertRaises(RequestValidationError):
+            validate_records(MacroData, {"date": "2024-01-15"})
+
+
+class TestBatchSave(unittest.TestCase):
+    """批量保存与接口验证单元测试类"""
+
+    def setUp(self):
+        """测试前准备"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.temp_dir)
+        self.data_file = Path(self.temp_dir) / 'data.json'
+        self.settings = {
+            'database.file_path': str(self.data_file),
+            'database.blob_enabled': False,
+            'database.columnar_enabled': True,
+            'database.columnar_path': str(Path(self.temp_dir) / 'columnar')
+        }
+        patcher = patch('app.services.data_service.config_manager.get',
+                        side_effect=lambda key, default=None: self.settings.get(key, default))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _stored(self, collection):
+        with open(self.data_file, 'r', encoding='utf-8') as f:
+            return json.load(f)[collection]
+
+    def test_save_batch(self):
+        """测试批量保存：ID唯一，一次写入，列式存储同步"""
+        data_service = DataService()
+        records = [{"date": f"2024-02-{day:02d}", "market": "a_share", "pmi": 50 + day / 10}
+                   for day in range(1, 21)]
+
+        with patch.object(DataService, '_save_data', autospec=True, side_effect=DataService._save_data) as save:
+            saved = data_service.save_batch('macro_data', records)
+        self.assertEqual(save.call_count, 1)
+        self.assertEqual(len(saved), 20)
+        self.assertEqual(len({r["id"] for r in saved}), 20)
+        self.assertEqual(len(self._stored('macro_data')), 20)
+
+        columns = data_service.get_columns('macro_data', 'a_share', '2024-02-01', '2024-02-29', ['pmi'])
+        self.assertEqual(len(columns['pmi']), 20)
+
+    def test_invalid_batch_is_not_saved(self):
+        """测试任一记录无效时整批不保存"""
+        data_service = DataService()
+        records = [{"date": "2024-02-01", "market": "a_share"}, {"date": "2024-02-02", "market": "a_share",
+                                                                   "industry_sentiment": "高"}]
+        with self.assertRaises(RequestValidationError):
+            data_service.save_batch('industry_data', records)
+        self.assertEqual(self._stored('industry_data'), [])
+
+        with self.assertRaises(ValueError):
+            data_service.save_batch('timing_indicators', [])
+
+    def test_routes(self):
+        """测试录入接口的批量模式和分析接口的验证错误"""
+        from app import create_app
+        with patch('app.init_config', return_value=True):
+            client = create_app().test_client()
+
+        response = client.post('/api/data/market-sentiment', json=[
+            {"date": "2024-02-01", "market": "a_share", "volatility": "15.5"},
+            {"date": "2024-02-02", "market": "a_share", "investor_sentiment": 60}
+        ])
+        self.assertEqual(response.status_code, 201)
+        body = response.get_json()
+        self.assertEqual(body['count'], 2)
+        self.assertEqual(body['data'][0]['volatility'], 15.5)
+
+        response = client.post('/api/data/macro', json={"date": "2024-02-01", "pmi": 50})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.get_json()['error'], '缺少必需字段: market')
+        self.assertEqual(response.get_json()['details'][0]['loc'], ['market'])
+
+        response = client.post('/api/analysis/position-sizing',
+                               json={"market": "a_share", "date": "2024-02-01", "timing_score": 150})
+        self.assertEqual(response.status_code, 400)
+        self.assertTrue(response.get_json()['error'].startswith('字段 timing_score 无效'))
+
+    def test_backtest_and_optimize_routes(self):
+        """测试回测和参数优化接口按请求模型验证，兼容单个market"""
+        from app import create_app
+        with patch('app.init_config', return_value=True):
+            client = create_app().test_client()
+
+        for path in ('/api/analysis/backtest', '/api/analysis/optimize'):
+            response = client.post(path, json={"start_date": "2024-01-01"})
+            self.assertEqual(response.status_code, 400)
+            self.assertEqual(response.get_json()['error'], '缺少必需字段: markets')
+
+            response = client.post(path, json={"markets": [], "cost_bps": 5})
+            self.assertEqual(response.status_code, 400)
+            self.assertEqual(response.get_json()['details'][0]['loc'], ['markets'])
+
+            response = client.post(path, json={"markets": ["a_share"], "cost_bps": -1})
+            self.assertTrue(response.get_json()['error'].startswith('字段 cost_bps 无效'))
+
+        response = client.post('/api/analysis/optimize', json={"markets": ["a_share"], "n_samples": "abc"})
+        self.assertTrue(response.get_json()['error'].startswith('字段 n_samples 无效'))
+
+        with patch('app.routes.analysis.BacktestService') as service:
+            service.return_value.run_backtest.return_value = {'markets': {}}
+            response = client.post('/api/analysis/backtest', json={"market": "a_share", "cost_bps": "5"})
+        self.assertEqual(response.status_code, 200)
+        data = service.return_value.run_backtest.call_args[0][0]
+        self.assertEqual(data['markets'], ["a_share"])
+        self.assertEqual(data['cost_bps'], 5.0)
+
+
+if __name__ == '__main__':
+    unittest.main()